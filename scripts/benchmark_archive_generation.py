@@ -0,0 +1,117 @@
+#!python
+"""
+Benchmark generation of module archives.
+
+Compares the previous archive generation (tarfile, followed by zip CLI, with each
+archive read into memory for upload) against ModuleArchiveGenerator,
+which generates both archives in a single pass and streams them to file storage.
+
+Usage:
+    python scripts/benchmark_archive_generation.py [--size-mb 500] [--file-size-kb 256]
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append('.')
+
+from terrareg.file_storage import LocalFileStorage
+from terrareg.module_archive_generator import ModuleArchiveGenerator
+
+
+def create_repository(directory, size_mb, file_size_kb):
+    """Create repository containing Terraform files and semi-compressible binary content."""
+    file_size = file_size_kb * 1024
+    file_count = max(1, (size_mb * 1024 * 1024) // file_size)
+    for itx in range(file_count):
+        sub_directory = os.path.join(directory, 'modules', f'module-{itx // 100}')
+        os.makedirs(sub_directory, exist_ok=True)
+        with open(os.path.join(sub_directory, f'main-{itx}.tf'), 'w') as fh:
+            fh.write(f'resource "null_resource" "test_{itx}" {{}}\n')
+        with open(os.path.join(sub_directory, f'data-{itx}.bin'), 'wb') as fh:
+            # Half random, half repeating data, to provide realistic compression work
+            fh.write(os.urandom(file_size // 2))
+            fh.write(b'terraform' * (file_size // 18))
+
+    # Add git directory, which is excluded from archives
+    os.makedirs(os.path.join(directory, '.git'), exist_ok=True)
+    with open(os.path.join(directory, '.git', 'HEAD'), 'w') as fh:
+        fh.write('ref: refs/heads/main\n')
+
+
+def legacy_generate(source_directory, file_storage):
+    """Generate archives using previous implementation."""
+    def tar_filter(tarinfo):
+        if tarinfo.name == ".git":
+            return None
+        return tarinfo
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        tar_file_path = os.path.join(temp_dir, 'source.tar.gz')
+        with tarfile.open(tar_file_path, "w:gz") as tar:
+            tar.add(source_directory, arcname='', recursive=True, filter=tar_filter)
+        # Previous S3 upload read the entire file into memory
+        with open(tar_file_path, 'rb') as fh:
+            file_storage.write_file('/legacy/source.tar.gz', fh.read(), binary=True)
+
+        zip_file_path = os.path.join(temp_dir, 'source.zip')
+        subprocess.call(
+            ['zip', '-q', '-r', zip_file_path, '--exclude=./.git/*', '.'],
+            cwd=source_directory
+        )
+        with open(zip_file_path, 'rb') as fh:
+            file_storage.write_file('/legacy/source.zip', fh.read(), binary=True)
+
+
+def streaming_generate(source_directory, file_storage):
+    """Generate archives using ModuleArchiveGenerator."""
+    with file_storage.open_write('/streaming/source.tar.gz') as tar_gz_fh, \
+            file_storage.open_write('/streaming/source.zip') as zip_fh:
+        ModuleArchiveGenerator(source_directory=source_directory).generate(tar_gz_fh=tar_gz_fh, zip_fh=zip_fh)
+
+
+def benchmark(name, func, *args):
+    """Run function, printing wall time, CPU time and peak Python memory allocation."""
+    tracemalloc.start()
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+    func(*args)
+    cpu_time = time.process_time() - start_cpu
+    wall_time = time.perf_counter() - start_wall
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<10} wall: {wall_time:8.2f}s  cpu (python process): {cpu_time:8.2f}s  peak memory: {peak_memory / 1024 / 1024:8.1f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size-mb', type=int, default=500, help='Size of generated repository in MB')
+    parser.add_argument('--file-size-kb', type=int, default=256, help='Size of each generated file in KB')
+    args = parser.parse_args()
+
+    source_directory = tempfile.mkdtemp()
+    storage_directory = tempfile.mkdtemp()
+    try:
+        print(f"Creating {args.size_mb}MB repository")
+        create_repository(source_directory, args.size_mb, args.file_size_kb)
+        file_storage = LocalFileStorage(storage_directory)
+
+        benchmark('legacy', legacy_generate, source_directory, file_storage)
+        benchmark('streaming', streaming_generate, source_directory, file_storage)
+
+        for path in ['legacy/source.tar.gz', 'legacy/source.zip', 'streaming/source.tar.gz', 'streaming/source.zip']:
+            print(f"{path:<25} {os.path.getsize(os.path.join(storage_directory, path)) / 1024 / 1024:8.1f}MB")
+    finally:
+        shutil.rmtree(source_directory)
+        shutil.rmtree(storage_directory)
+
+
+if __name__ == '__main__':
+    main()
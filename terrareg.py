@@ -1,13 +1,19 @@
 
 from argparse import ArgumentParser
+import sys
 
 from terrareg.server import Server
 import terrareg.config
+import terrareg.provider_mirror
 
 
 parser = ArgumentParser('terrareg')
 config = terrareg.config.Config()
 
+parser.add_argument('command', nargs='?', default='server',
+                    choices=['server', 'worker', 'populate-provider-mirror', 'bulk-import'],
+                    help='Run web server, import job worker, add hosted providers to provider mirror or import module versions for git tags of a module provider')
+
 parser.add_argument('--ssl-cert-private-key', dest='ssl_priv_key',
                     default=config.SSL_CERT_PRIVATE_KEY,
                     help='Path to SSL private key')
@@ -15,11 +21,36 @@ parser.add_argument('--ssl-cert-public-key', dest='ssl_pub_key',
                     default=config.SSL_CERT_PUBLIC_KEY,
                     help='Path to SSL public key')
 
+parser.add_argument('--namespace', dest='namespace',
+                    help='Namespace of module provider to import versions for (bulk-import)')
+parser.add_argument('--module', dest='module',
+                    help='Name of module to import versions for (bulk-import)')
+parser.add_argument('--provider', dest='provider',
+                    help='Provider of module to import versions for (bulk-import)')
+parser.add_argument('--git-tag', dest='git_tags', action='append', default=None,
+                    help='Git tag to import, may be provided multiple times. Defaults to all tags matching the git tag format of the module provider (bulk-import)')
+parser.add_argument('--concurrency', dest='concurrency', type=int,
+                    default=config.BULK_IMPORT_MAX_CONCURRENCY,
+                    help='Number of module versions to import concurrently (bulk-import)')
+
 args = parser.parse_args()
 
 s = Server(ssl_public_key=args.ssl_pub_key, ssl_private_key=args.ssl_priv_key)
 
-if config.SERVER == terrareg.config.ServerType.WAITRESS:
+if args.command == 'worker':
+    s.run_import_job_workers()
+elif args.command == 'populate-provider-mirror':
+    provider_mirror = terrareg.provider_mirror.ProviderMirror.get()
+    if provider_mirror is None:
+        parser.error('TERRAFORM_PROVIDER_MIRROR_DIRECTORY must be configured to populate provider mirror')
+    print(f'Added {provider_mirror.populate()} provider binaries to mirror')
+elif args.command == 'bulk-import':
+    if not (args.namespace and args.module and args.provider):
+        parser.error('--namespace, --module and --provider are required for bulk-import')
+    if not s.run_bulk_module_version_import(namespace=args.namespace, module=args.module, provider=args.provider,
+                                            git_tags=args.git_tags, concurrency=args.concurrency):
+        sys.exit(1)
+elif config.SERVER == terrareg.config.ServerType.WAITRESS:
     s.run_waitress()
 else:
     s.run()
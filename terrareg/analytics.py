@@ -11,6 +11,8 @@ import terrareg.models
 import terrareg.provider_version_model
 import terrareg.provider_model
 import terrareg.database
+import terrareg.file_storage
+import terrareg.extraction_report
 
 
 class AnalyticsEngine:
@@ -21,6 +23,24 @@ class AnalyticsEngine:
 
     DEFAULT_ENVIRONMENT_NAME = 'Default'
 
+    # Analytics token stored in module provider name usage for downloads without an analytics token,
+    # as NULL values are not considered duplicates by the unique index
+    NAME_USAGE_EMPTY_ANALYTICS_TOKEN = ''
+
+    # Number of rows fetched from the database cursor
+    # at a time whilst exporting analytics
+    EXPORT_BATCH_SIZE = 1000
+
+    RAW_EXPORT_FIELDS = [
+        'id', 'timestamp', 'namespace', 'module', 'provider', 'version',
+        'terraform_version', 'analytics_token', 'environment',
+        'requested_namespace', 'requested_module', 'requested_provider'
+    ]
+    DAILY_SUMMARY_EXPORT_FIELDS = [
+        'date', 'namespace', 'module', 'provider', 'version',
+        'analytics_token', 'environment', 'download_count'
+    ]
+
     @classmethod
     def get_datetime_now(cls):
         """Return datetime now"""
@@ -153,9 +173,10 @@ class AnalyticsEngine:
 
         # Insert analytics details into DB
         db = Database.get()
+        timestamp = AnalyticsEngine.get_datetime_now()
         insert_statement = db.analytics.insert().values(
             parent_module_version=module_version.pk,
-            timestamp=AnalyticsEngine.get_datetime_now(),
+            timestamp=timestamp,
             terraform_version=terraform_version,
             analytics_token=analytics_token,
             auth_token=auth_token,
@@ -167,6 +188,60 @@ class AnalyticsEngine:
         with db.get_connection() as conn:
             conn.execute(insert_statement)
 
+        AnalyticsEngine._record_module_provider_name_usage(
+            module_version=module_version,
+            analytics_token=analytics_token,
+            namespace_name=namespace_name,
+            module_name=module_name,
+            provider_name=provider_name,
+            timestamp=timestamp
+        )
+
+    @staticmethod
+    def _record_module_provider_name_usage(module_version, analytics_token, namespace_name, module_name, provider_name, timestamp):
+        """
+        Record the name used by the analytics token to download the module provider,
+        replacing any previous usage, which is used to check if redirects are in use.
+        """
+        if analytics_token is None:
+            analytics_token = AnalyticsEngine.NAME_USAGE_EMPTY_ANALYTICS_TOKEN
+
+        db = Database.get()
+        module_provider_id = sqlalchemy.select(
+            db.module_version.c.module_provider_id
+        ).where(
+            db.module_version.c.id == module_version.pk
+        ).scalar_subquery()
+        name_usage_values = dict(
+            namespace_name=namespace_name,
+            module_name=module_name,
+            provider_name=provider_name,
+            timestamp=timestamp
+        )
+        update_statement = db.module_provider_name_usage.update().where(
+            db.module_provider_name_usage.c.module_provider_id == module_provider_id,
+            db.module_provider_name_usage.c.analytics_token == analytics_token
+        ).values(**name_usage_values)
+
+        with db.get_connection() as conn:
+            if conn.execute(update_statement).rowcount:
+                return
+
+        # Insert new row in a nested transaction, so that if a concurrent download
+        # has inserted the row, the unique index causes the insert to fail
+        # without aborting any outer transaction and the existing row is updated instead
+        try:
+            with Database.get_new_transaction_or_nested():
+                with db.get_connection() as conn:
+                    conn.execute(db.module_provider_name_usage.insert().values(
+                        module_provider_id=module_provider_id,
+                        analytics_token=analytics_token,
+                        **name_usage_values
+                    ))
+        except sqlalchemy.exc.IntegrityError:
+            with db.get_connection() as conn:
+                conn.execute(update_statement)
+
     def get_total_downloads():
         """Return number of downloads for a given module version."""
         db = Database.get()
@@ -304,43 +379,21 @@ class AnalyticsEngine:
             for namespace_redirect in terrareg.models.NamespaceRedirect.get_by_namespace(module_provider_redirect.namespace)
         ]
 
-        # Obtain all tokens
+        # Obtain latest names used by each analytics token to access the module provider,
+        # filtering to those that are using the redirect details
         db = Database.get()
-
-        # Get all analytics, join to module version and module provider to filter by module_provider_id of
-        # the module provider redirect. Group by each analytics token, getting the latest (max ID) for each
-        id_subquery = sqlalchemy.select(
-            sqlalchemy.func.max(db.analytics.c.id).label('latest_id'),
-        ).select_from(
-            db.analytics
-        ).join(
-            db.module_version,
-            db.module_version.c.id == db.analytics.c.parent_module_version
-        ).join(
-            db.module_provider,
-            db.module_version.c.module_provider_id == db.module_provider.c.id
-        ).where(
-            db.module_provider.c.id == module_provider_redirect.module_provider_id,
-        ).group_by(
-            db.analytics.c.analytics_token
-        ).subquery()
-
-        # Pass this query into as a sub-query to filter those analytics that are
-        # using the redirect details
         filter_query = sqlalchemy.select(
-            db.analytics.c.analytics_token,
-            db.analytics.c.timestamp,
-            db.analytics.c.provider_name,
-            db.analytics.c.namespace_name
+            db.module_provider_name_usage.c.analytics_token,
+            db.module_provider_name_usage.c.timestamp,
+            db.module_provider_name_usage.c.provider_name,
+            db.module_provider_name_usage.c.namespace_name
         ).select_from(
-            db.analytics
-        ).join(
-            id_subquery,
-            id_subquery.c.latest_id==db.analytics.c.id
+            db.module_provider_name_usage
         ).where(
-            db.analytics.c.module_name==module_provider_redirect.module_name,
-            db.analytics.c.provider_name==module_provider_redirect.provider_name,
-            db.analytics.c.namespace_name.in_(namespace_names)
+            db.module_provider_name_usage.c.module_provider_id == module_provider_redirect.module_provider_id,
+            db.module_provider_name_usage.c.module_name == module_provider_redirect.module_name,
+            db.module_provider_name_usage.c.provider_name == module_provider_redirect.provider_name,
+            db.module_provider_name_usage.c.namespace_name.in_(namespace_names)
         )
 
         # If look-back days has been configured, limit the query
@@ -348,7 +401,7 @@ class AnalyticsEngine:
         lookback_days = Config().REDIRECT_DELETION_LOOKBACK_DAYS
         if lookback_days >= 0:
             filter_query = filter_query.where(
-                db.analytics.c.timestamp>=(AnalyticsEngine.get_datetime_now() - datetime.timedelta(days=lookback_days))
+                db.module_provider_name_usage.c.timestamp>=(AnalyticsEngine.get_datetime_now() - datetime.timedelta(days=lookback_days))
             )
 
         with db.get_connection() as conn:
@@ -448,6 +501,176 @@ class AnalyticsEngine:
 
         return token_version_mapping
 
+    @staticmethod
+    def _filter_analytics_export_query(
+            db: 'terrareg.database.Database',
+            query,
+            namespace: 'terrareg.models.Namespace',
+            module_provider: Optional['terrareg.models.ModuleProvider'],
+            from_timestamp: Optional[datetime.datetime],
+            to_timestamp: Optional[datetime.datetime],
+            since: Optional[int],
+            watermark: Optional[int]=None):
+        """Join query to module version, module provider and namespace and apply export filters."""
+        query = query.select_from(
+            db.analytics
+        ).join(
+            db.module_version,
+            db.module_version.c.id == db.analytics.c.parent_module_version
+        ).join(
+            db.module_provider,
+            db.module_version.c.module_provider_id == db.module_provider.c.id
+        ).join(
+            db.namespace,
+            db.module_provider.c.namespace_id == db.namespace.c.id
+        ).where(
+            db.namespace.c.id == namespace.pk
+        )
+
+        if module_provider is not None:
+            query = query.where(db.module_provider.c.id == module_provider.pk)
+        if from_timestamp is not None:
+            query = query.where(db.analytics.c.timestamp >= from_timestamp)
+        if to_timestamp is not None:
+            query = query.where(db.analytics.c.timestamp < to_timestamp)
+        if since is not None:
+            query = query.where(db.analytics.c.id > since)
+        if watermark is not None:
+            query = query.where(db.analytics.c.id <= watermark)
+        return query
+
+    @classmethod
+    def get_analytics_export_watermark(
+            cls,
+            namespace: 'terrareg.models.Namespace',
+            module_provider: Optional['terrareg.models.ModuleProvider']=None,
+            from_timestamp: Optional[datetime.datetime]=None,
+            to_timestamp: Optional[datetime.datetime]=None,
+            since: Optional[int]=None) -> Optional[int]:
+        """
+        Return the highest analytics ID matching the export filters.
+
+        The watermark is obtained before streaming an export, so that the export
+        is bound to a consistent set of rows and can be passed back as `since`
+        to retrieve only newer rows in a subsequent export.
+        If no rows match, the original `since` value is returned.
+        """
+        db = Database.get()
+        select = cls._filter_analytics_export_query(
+            db=db,
+            query=sqlalchemy.select(sqlalchemy.func.max(db.analytics.c.id)),
+            namespace=namespace, module_provider=module_provider,
+            from_timestamp=from_timestamp, to_timestamp=to_timestamp,
+            since=since
+        )
+        with db.get_connection() as conn:
+            watermark = conn.execute(select).scalar()
+        return since if watermark is None else watermark
+
+    @classmethod
+    def iterate_analytics_export(
+            cls,
+            namespace: 'terrareg.models.Namespace',
+            module_provider: Optional['terrareg.models.ModuleProvider']=None,
+            from_timestamp: Optional[datetime.datetime]=None,
+            to_timestamp: Optional[datetime.datetime]=None,
+            since: Optional[int]=None,
+            watermark: Optional[int]=None,
+            daily_summary: bool=False):
+        """
+        Yield analytics rows for export, as dictionaries.
+
+        Rows are read using a server-side cursor in batches of EXPORT_BATCH_SIZE,
+        so memory usage does not depend on the number of rows being exported.
+
+        If daily_summary is enabled, downloads are counted per day, module version,
+        analytics token and environment, otherwise each individual download is returned.
+        Auth tokens are never included in exports.
+        """
+        db = Database.get()
+
+        if daily_summary:
+            day_column = sqlalchemy.func.date(db.analytics.c.timestamp).label('day')
+            select = sqlalchemy.select(
+                day_column,
+                db.namespace.c.namespace,
+                db.module_provider.c.module,
+                db.module_provider.c.provider,
+                db.module_version.c.version,
+                db.analytics.c.analytics_token,
+                db.analytics.c.environment,
+                sqlalchemy.func.count().label('download_count')
+            )
+            group_columns = [
+                day_column,
+                db.namespace.c.namespace,
+                db.module_provider.c.module,
+                db.module_provider.c.provider,
+                db.module_version.c.version,
+                db.analytics.c.analytics_token,
+                db.analytics.c.environment,
+            ]
+        else:
+            select = sqlalchemy.select(
+                db.analytics.c.id,
+                db.analytics.c.timestamp,
+                db.namespace.c.namespace,
+                db.module_provider.c.module,
+                db.module_provider.c.provider,
+                db.module_version.c.version,
+                db.analytics.c.terraform_version,
+                db.analytics.c.analytics_token,
+                db.analytics.c.environment,
+                db.analytics.c.namespace_name,
+                db.analytics.c.module_name,
+                db.analytics.c.provider_name
+            )
+
+        select = cls._filter_analytics_export_query(
+            db=db, query=select,
+            namespace=namespace, module_provider=module_provider,
+            from_timestamp=from_timestamp, to_timestamp=to_timestamp,
+            since=since, watermark=watermark
+        )
+
+        if daily_summary:
+            select = select.group_by(*group_columns).order_by(*group_columns)
+        else:
+            select = select.order_by(db.analytics.c.id)
+
+        with db.get_connection() as conn:
+            res = conn.execution_options(stream_results=True).execute(select)
+            for rows in res.partitions(cls.EXPORT_BATCH_SIZE):
+                for row in rows:
+                    if daily_summary:
+                        # Date functions return a string in SQLite and a date in MySQL
+                        day = row['day']
+                        yield {
+                            'date': day.isoformat() if isinstance(day, datetime.date) else day,
+                            'namespace': row['namespace'],
+                            'module': row['module'],
+                            'provider': row['provider'],
+                            'version': row['version'],
+                            'analytics_token': row['analytics_token'],
+                            'environment': row['environment'],
+                            'download_count': row['download_count'],
+                        }
+                    else:
+                        yield {
+                            'id': row['id'],
+                            'timestamp': row['timestamp'].isoformat() if row['timestamp'] else None,
+                            'namespace': row['namespace'],
+                            'module': row['module'],
+                            'provider': row['provider'],
+                            'version': row['version'],
+                            'terraform_version': row['terraform_version'],
+                            'analytics_token': row['analytics_token'],
+                            'environment': row['environment'],
+                            'requested_namespace': row['namespace_name'],
+                            'requested_module': row['module_name'],
+                            'requested_provider': row['provider_name'],
+                        }
+
     @classmethod
     def delete_analytics_for_module_version(cls, module_version):
         """Delete all analytics for given module version."""
@@ -458,6 +681,36 @@ class AnalyticsEngine:
                 db.analytics.c.parent_module_version == module_version.pk
             ))
 
+            # Remove names used by analytics tokens that no longer have
+            # any analytics for the module provider
+            remaining_analytics = sqlalchemy.select(
+                db.analytics.c.id
+            ).select_from(
+                db.analytics
+            ).join(
+                db.module_version,
+                db.analytics.c.parent_module_version == db.module_version.c.id
+            ).where(
+                db.module_version.c.module_provider_id == db.module_provider_name_usage.c.module_provider_id,
+                sqlalchemy.func.coalesce(
+                    db.analytics.c.analytics_token, AnalyticsEngine.NAME_USAGE_EMPTY_ANALYTICS_TOKEN
+                ) == db.module_provider_name_usage.c.analytics_token
+            )
+            conn.execute(db.module_provider_name_usage.delete().where(
+                db.module_provider_name_usage.c.module_provider_id == module_version.module_provider.pk,
+                ~remaining_analytics.exists()
+            ))
+
+    @classmethod
+    def delete_name_usage_for_module_provider(cls, module_provider):
+        """Delete record of names used to download given module provider."""
+        db = Database.get()
+
+        with db.get_connection() as conn:
+            conn.execute(db.module_provider_name_usage.delete().where(
+                db.module_provider_name_usage.c.module_provider_id == module_provider.pk
+            ))
+
     @classmethod
     def migrate_analytics_to_new_module_version(cls, old_version_version_pk, new_module_version):
         """Migrate all analytics for old module version ID to new module version."""
@@ -558,6 +811,36 @@ class AnalyticsEngine:
             )
         prometheus_generator.add_metric(module_provider_usage_metric)
 
+        extraction_stage_duration_metric = PrometheusHistogram(
+            'module_extraction_stage_duration_seconds',
+            help='Duration of module extraction stages, completed since the process started'
+        )
+        for stage_name, histogram in sorted(terrareg.extraction_report.ExtractionReport.get_duration_histograms().items()):
+            extraction_stage_duration_metric.add_histogram(
+                bucket_counts=histogram['buckets'],
+                sum_=histogram['sum'],
+                count=histogram['count'],
+                labels={'stage': stage_name}
+            )
+        prometheus_generator.add_metric(extraction_stage_duration_metric)
+
+        # Add metrics for local cache of S3 files, if enabled
+        if Config().S3_CACHE_DIRECTORY:
+            cache_metrics = terrareg.file_storage.CachedFileStorage.get_metrics()
+            for metric_name, help in [
+                    ('hits', 'Reads of files from S3 that were served from the local cache'),
+                    ('misses', 'Reads of files from S3 that were not present in the local cache'),
+                    ('deduplicated_fills', 'Reads of files from S3 that waited for a concurrent read to cache the file'),
+                    ('evictions', 'Files removed from the local cache of S3 files'),
+                    ('evicted_bytes', 'Total size of files removed from the local cache of S3 files')]:
+                cache_metric = PrometheusMetric(
+                    f's3_cache_{metric_name}_total',
+                    type_='counter',
+                    help=f'{help}, since the process started'
+                )
+                cache_metric.add_data_row(value=cache_metrics[metric_name])
+                prometheus_generator.add_metric(cache_metric)
+
         return prometheus_generator.generate()
 
 
@@ -682,20 +965,41 @@ class PrometheusMetric:
             f'# TYPE {self._name} {self._type}'
         ]
 
-    def add_data_row(self, value, labels=None):
-        """Add data row, with optional labels"""
+    def add_data_row(self, value, labels=None, name_suffix=''):
+        """Add data row, with optional labels and suffix for metric name"""
         labels = {} if labels is None else labels
         label_strings = [f'{key}="{labels[key]}"' for key in labels]
         label_string = ', '.join(label_strings)
         if label_string:
             label_string = '{' + label_string + '}'
 
-        self._lines.append(f'{self._name}{label_string} {value}')
+        self._lines.append(f'{self._name}{name_suffix}{label_string} {value}')
 
     def generate(self):
         """Return generated lines for metric."""
         return self._lines
 
+
+class PrometheusHistogram(PrometheusMetric):
+    """Prometheus histogram metric"""
+
+    def __init__(self, name, help):
+        """Initialise help and type lines."""
+        super(PrometheusHistogram, self).__init__(name=name, type_='histogram', help=help)
+
+    def add_histogram(self, bucket_counts, sum_, count, labels=None):
+        """Add bucket, sum and count data rows, from cumulative counts of each bucket, with optional labels"""
+        labels = {} if labels is None else labels
+        for bucket in sorted(bucket_counts):
+            self.add_data_row(
+                value=bucket_counts[bucket],
+                labels=dict(labels, le=str(bucket)),
+                name_suffix='_bucket'
+            )
+        self.add_data_row(value=count, labels=dict(labels, le='+Inf'), name_suffix='_bucket')
+        self.add_data_row(value=sum_, labels=labels, name_suffix='_sum')
+        self.add_data_row(value=count, labels=labels, name_suffix='_count')
+
 class PrometheusGenerator:
     """Generate Prometheus metrics output"""
 
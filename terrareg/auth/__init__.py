@@ -16,6 +16,7 @@ from .terraform_analytics_auth_key_auth_method import TerraformAnalyticsAuthKeyA
 from .terraform_ignore_analytics_auth_method import TerraformIgnoreAnalyticsAuthMethod
 from .terraform_internal_extraction import TerraformInternalExtractionAuthMethod
 from .not_authenticated import NotAuthenticated
+from .import_job_auth_method import ImportJobAuthMethod
 from .authentication_type import AuthenticationType
 
 
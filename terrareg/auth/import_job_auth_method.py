@@ -0,0 +1,49 @@
+
+from .base_auth_method import BaseAuthMethod
+
+
+class ImportJobAuthMethod(BaseAuthMethod):
+    """
+    Auth method used whilst processing import jobs in background workers.
+
+    This is never obtained from a request - it is set by the worker,
+    retaining the username of the user that created the import job.
+    """
+
+    def __init__(self, username=None):
+        """Store member variables"""
+        self._username = username
+
+    @property
+    def requires_csrf_tokens(self):
+        """Whether auth type requires CSRF tokens"""
+        return False
+
+    @classmethod
+    def is_enabled(cls):
+        """Whether authentication method is enabled"""
+        return False
+
+    @classmethod
+    def check_auth_state(cls):
+        """Import job authentication cannot be obtained from a request"""
+        return False
+
+    def check_namespace_access(self, permission_type, namespace):
+        """Check level of access to namespace"""
+        return False
+
+    def can_upload_module_version(self, namespace):
+        """Whether user can upload/index module version within a namespace."""
+        # Permissions were checked when the job was created
+        return True
+
+    def get_username(self):
+        """Get username of current user"""
+        if self._username:
+            return f"{self._username} (import job)"
+        return "Import job"
+
+    def can_access_read_api(self):
+        """Whether the user can access 'read' APIs"""
+        return False
@@ -39,6 +39,13 @@ class Product(Enum):
     OPENTOFU = "opentofu"
 
 
+class DownloadOffloadMode(Enum):
+    """Header used to offload serving of files to a reverse proxy"""
+    NONE = "none"
+    X_ACCEL_REDIRECT = "x-accel-redirect"
+    X_SENDFILE = "x-sendfile"
+
+
 class Config:
 
     @property
@@ -148,6 +155,132 @@ class Config:
             raise InvalidUploadDirectoryError('UPLOAD_DIRECTORY must be configured with a path, if DATA_DIRECTORY is configured for s3.')
         return upload_directory
 
+    @property
+    def S3_TRANSFER_PART_SIZE(self):
+        """
+        Size (in MB) of each part of multipart transfers, when `DATA_DIRECTORY` is configured for S3.
+
+        Files larger than this are uploaded to S3 using multipart uploads, streamed from disk,
+        rather than being read into memory.
+        """
+        return int(os.environ.get('S3_TRANSFER_PART_SIZE', '8'))
+
+    @property
+    def S3_TRANSFER_MAX_CONCURRENCY(self):
+        """
+        Maximum number of parts of a multipart transfer to S3 that are transferred concurrently.
+        """
+        return int(os.environ.get('S3_TRANSFER_MAX_CONCURRENCY', '10'))
+
+    @property
+    def S3_DOWNLOAD_REDIRECT(self):
+        """
+        Whether module archive downloads are redirected to S3, when `DATA_DIRECTORY` is configured for S3.
+
+        When enabled, after performing authentication (e.g. validating the pre-signed download URL),
+        Terrareg responds with a redirect to a short-lived S3 pre-signed URL (see `S3_DOWNLOAD_REDIRECT_EXPIRY`),
+        so that the archive is downloaded directly from S3, rather than being proxied through Terrareg.
+
+        Terraform must be able to access the S3 endpoint to download modules.
+        """
+        return self.convert_boolean(os.environ.get('S3_DOWNLOAD_REDIRECT', 'False'))
+
+    @property
+    def S3_DOWNLOAD_REDIRECT_EXPIRY(self):
+        """
+        Number of seconds that S3 pre-signed URLs, generated when `S3_DOWNLOAD_REDIRECT` is enabled, are valid for.
+        """
+        return int(os.environ.get('S3_DOWNLOAD_REDIRECT_EXPIRY', '60'))
+
+    @property
+    def S3_CACHE_DIRECTORY(self):
+        """
+        Local directory used to cache files read from S3, when `DATA_DIRECTORY` is an S3 bucket.
+
+        Files (e.g. module archives) are cached when they are first read, so subsequent downloads are served from local disk.
+        Cached files are stored against the ETag of the S3 object, which is checked periodically (see `S3_CACHE_REVALIDATE_INTERVAL`),
+        so files that are modified by other hosts (e.g. when module versions are re-indexed) are not read from the cache.
+
+        The directory may be shared between Terrareg processes on the same host.
+
+        Leave empty to disable the cache.
+        """
+        return os.environ.get('S3_CACHE_DIRECTORY', '')
+
+    @property
+    def S3_CACHE_MAX_SIZE(self):
+        """
+        Maximum total size, in MB, of files cached from S3 (see `S3_CACHE_DIRECTORY`).
+
+        When exceeded, the least recently read files are removed.
+        Files larger than this size are not cached.
+
+        Set to 0 to disable removal of files.
+        """
+        return int(os.environ.get('S3_CACHE_MAX_SIZE', '1024'))
+
+    @property
+    def S3_CACHE_REVALIDATE_INTERVAL(self):
+        """
+        Interval, in seconds, after which the ETag of a cached file is checked against S3 when the file is read (see `S3_CACHE_DIRECTORY`).
+
+        Within this interval, cached files are served without any requests to S3.
+        Files modified or deleted by Terrareg processes using the same cache directory are removed from the cache immediately,
+        whereas files modified or deleted by other hosts may be served from the cache until this interval has passed.
+
+        Set to 0 to check the ETag whenever a file is read.
+        """
+        return int(os.environ.get('S3_CACHE_REVALIDATE_INTERVAL', '300'))
+
+    @property
+    def LOCAL_STORAGE_DOWNLOAD_OFFLOAD(self):
+        """
+        Offload serving of module archives, stored in local file storage, to a reverse proxy.
+
+        After performing authentication checks, the registry returns a header containing the location of the archive,
+        rather than the archive content, and the reverse proxy serves the file.
+
+        Set to one of the following:
+         * none - Archives are served by the registry
+         * x-accel-redirect - Return `X-Accel-Redirect` header (nginx), containing the path of the archive, prefixed with [LOCAL_STORAGE_DOWNLOAD_OFFLOAD_PREFIX](#local_storage_download_offload_prefix)
+         * x-sendfile - Return `X-Sendfile` header (Apache mod_xsendfile, lighttpd), containing the absolute path of the archive on the filesystem
+
+        The reverse proxy must be able to read the data directory and must be configured to prevent
+        external requests to the internal location.
+
+        This does not affect archives stored in S3 (see [S3_DOWNLOAD_REDIRECT](#s3_download_redirect)).
+        """
+        return DownloadOffloadMode(os.environ.get('LOCAL_STORAGE_DOWNLOAD_OFFLOAD', DownloadOffloadMode.NONE.value).lower())
+
+    @property
+    def LOCAL_STORAGE_DOWNLOAD_OFFLOAD_PREFIX(self):
+        """
+        Internal location of the data directory in the reverse proxy, used when [LOCAL_STORAGE_DOWNLOAD_OFFLOAD](#local_storage_download_offload) is set to `x-accel-redirect`.
+
+        For example, with the default value, nginx may be configured with:
+        ```
+        location /_terrareg_data/ {
+            internal;
+            alias /app/data/;
+        }
+        ```
+        """
+        return os.environ.get('LOCAL_STORAGE_DOWNLOAD_OFFLOAD_PREFIX', '/_terrareg_data')
+
+    @property
+    def MODULE_ARCHIVE_CACHE_MAX_AGE(self):
+        """
+        Number of seconds that clients and proxies may cache downloaded module archives for, without revalidating.
+
+        Archives of published module versions do not change, so can be cached for long periods.
+        If module versions are re-indexed, clients may continue to use a previously downloaded archive until it expires.
+
+        Archives are marked as private, when unauthenticated access is disabled.
+
+        Set to 0 to require clients to revalidate archives on each download.
+        """
+        return int(os.environ.get('MODULE_ARCHIVE_CACHE_MAX_AGE', str(60 * 60 * 24 * 365)))
+
     @property
     def DATABASE_URL(self):
         """
@@ -274,6 +407,29 @@ class Config:
         """
         return int(os.environ.get('REDIRECT_DELETION_LOOKBACK_DAYS', "-1"))
 
+    @property
+    def MODULE_LEADERBOARD_SIZE(self):
+        """
+        Number of module providers/module versions held in the 'most downloaded' and 'most recently published' leaderboards.
+
+        This is the maximum number of results that can be returned by the top module providers endpoint.
+        """
+        return int(os.environ.get('MODULE_LEADERBOARD_SIZE', '10'))
+
+    @property
+    def MODULE_LEADERBOARD_REFRESH_INTERVAL(self):
+        """
+        Interval, in seconds, between re-calculating the 'most downloaded' and 'most recently published' leaderboards,
+        which are displayed on the homepage.
+
+        The leaderboards are also re-calculated whenever a module version is published or deleted.
+        Leaderboards are held in memory by each Terrareg process, so only the process that publishes/deletes
+        the module version re-calculates them immediately - other processes are updated once this interval has elapsed.
+
+        Value of `0` disables caching and leaderboards are calculated on each request.
+        """
+        return int(os.environ.get('MODULE_LEADERBOARD_REFRESH_INTERVAL', '300'))
+
     @property
     def MODULE_VERSION_USE_GIT_COMMIT(self):
         """
@@ -401,6 +557,17 @@ class Config:
         """
         return ModuleHostingMode(os.environ.get('ALLOW_MODULE_HOSTING', 'True').lower())
 
+    @property
+    def MODULE_UPLOAD_MAX_SIZE(self):
+        """
+        Maximum size (in MB) of module archives uploaded via the module version upload API.
+
+        Uploads are written to disk whilst being received and are rejected once this size is exceeded.
+
+        Set to `0` to disable the limit.
+        """
+        return int(os.environ.get('MODULE_UPLOAD_MAX_SIZE', '0'))
+
     @property
     def REQUIRED_MODULE_METADATA_ATTRIBUTES(self):
         """
@@ -560,6 +727,138 @@ class Config:
         """
         return os.environ.get('EXAMPLES_DIRECTORY', 'examples')
 
+    @property
+    def SUBMODULE_EXTRACTION_CONCURRENCY(self):
+        """
+        Maximum number of submodules and examples that are analysed concurrently whilst extracting a module version.
+
+        When set to greater than 1, each submodule/example is analysed using a separate copy of its source
+        and the local modules that it references, which increases disk usage during extraction.
+
+        By default, submodules and examples are analysed sequentially.
+        """
+        return int(os.environ.get('SUBMODULE_EXTRACTION_CONCURRENCY', '1'))
+
+    @property
+    def SINGLE_PASS_SUBMODULE_ANALYSIS(self):
+        """
+        Whether to run tfsec and terraform-docs once for the whole module, rather than separately for the root module and each submodule/example.
+
+        tfsec is run against the root module and the results are split by the path of each submodule/example.
+
+        terraform-docs is run in recursive mode against the modules and examples directories.
+        Submodules/examples that are nested deeper than the direct sub-directories of these directories are still analysed individually.
+
+        When enabled, the security results of an example only contain issues found in files within the example,
+        rather than also including issues from the modules that the example uses.
+        """
+        return self.convert_boolean(os.environ.get('SINGLE_PASS_SUBMODULE_ANALYSIS', 'False'))
+
+    @property
+    def ENABLE_EXTRACTION_RESULT_CACHE(self):
+        """
+        Whether to cache the results of analysing modules (terraform-docs, tfsec, README, Terraform graph, modules and version) in the data directory.
+
+        Results are stored against a hash of the contents of the module (and any local modules that it references),
+        the versions of the analysis tools and the extraction version of Terrareg.
+        When a module version, submodule or example is indexed with identical contents (e.g. when re-indexing a module version,
+        or when multiple tags refer to the same source), the results are restored from the cache, rather than re-running the analysis.
+
+        Infracost results are not cached by this option, as costs may change over time (see `INFRACOST_CACHE_TTL`).
+
+        Since Terraform graph and modules data depend on external modules, which are not included in the hash,
+        these may be stale if external modules referenced by the module have changed.
+
+        Cached results are removed once they are older than `EXTRACTION_RESULT_CACHE_TTL`
+        or when the cache is larger than `EXTRACTION_RESULT_CACHE_MAX_SIZE`.
+        """
+        return self.convert_boolean(os.environ.get('ENABLE_EXTRACTION_RESULT_CACHE', 'False'))
+
+    @property
+    def EXTRACTION_RESULT_CACHE_TTL(self):
+        """
+        Number of seconds after which cached analysis results (see `ENABLE_EXTRACTION_RESULT_CACHE`) and Infracost results (see `INFRACOST_CACHE_TTL`)
+        are removed from the data directory.
+
+        Expired results are removed, at most once an hour in each process, after a module version has been indexed.
+
+        Set to `0` to retain results, regardless of their age.
+        """
+        return int(os.environ.get('EXTRACTION_RESULT_CACHE_TTL', str(30 * 24 * 60 * 60)))
+
+    @property
+    def EXTRACTION_RESULT_CACHE_MAX_SIZE(self):
+        """
+        Maximum total size, in MB, of cached analysis results and Infracost results stored in the data directory.
+
+        When the cache exceeds this size, the oldest results are removed.
+
+        Set to `0` to disable the size limit.
+        """
+        return int(os.environ.get('EXTRACTION_RESULT_CACHE_MAX_SIZE', '1024'))
+
+    @property
+    def ENABLE_IMPORT_JOB_QUEUE(self):
+        """
+        Whether module version imports from git, triggered by the module version import API and repository webhooks, are queued as background jobs.
+
+        When enabled, these endpoints return a 202 response, containing the ID of the import job, rather than waiting for the import to complete.
+        This must be enabled to use the module version bulk import API.
+        The status of the job can be obtained from `/v1/terrareg/import_jobs/<job_id>`, which requires permission to index module versions in the namespace of the job.
+
+        Import jobs are processed by worker threads, started with the server (see `IMPORT_JOB_WORKER_THREADS`),
+        and/or by separate worker processes, started using `python ./terrareg.py worker`.
+        """
+        return self.convert_boolean(os.environ.get('ENABLE_IMPORT_JOB_QUEUE', 'False'))
+
+    @property
+    def IMPORT_JOB_WORKER_THREADS(self):
+        """
+        Number of import job worker threads started with the server, or by each worker process.
+
+        Set to 0 to disable starting worker threads with the server, when using separate worker processes.
+        """
+        return int(os.environ.get('IMPORT_JOB_WORKER_THREADS', '1'))
+
+    @property
+    def IMPORT_JOB_MAX_ATTEMPTS(self):
+        """
+        Maximum number of attempts to process an import job, before it is marked as failed.
+        """
+        return int(os.environ.get('IMPORT_JOB_MAX_ATTEMPTS', '3'))
+
+    @property
+    def IMPORT_JOB_LEASE_SECONDS(self):
+        """
+        Duration, in seconds, that a worker holds the lease of an import job.
+
+        Whilst processing a job, workers periodically extend the lease.
+        If a worker stops without completing a job, the job is retried by another worker once the lease has expired.
+        """
+        return int(os.environ.get('IMPORT_JOB_LEASE_SECONDS', '300'))
+
+    @property
+    def IMPORT_JOB_RETRY_BACKOFF_SECONDS(self):
+        """
+        Delay, in seconds, before retrying a failed import job.
+
+        The delay is doubled for each subsequent attempt.
+        """
+        return int(os.environ.get('IMPORT_JOB_RETRY_BACKOFF_SECONDS', '60'))
+
+    @property
+    def BULK_IMPORT_MAX_CONCURRENCY(self):
+        """
+        Maximum number of module versions imported concurrently by the bulk import command, `python ./terrareg.py bulk-import`.
+
+        This is also the default concurrency, if the command does not specify one.
+
+        This has no effect when `ENABLE_IMPORT_JOB_QUEUE` is enabled, as bulk imports create import jobs, which are processed by import job workers.
+
+        Bulk imports using the API require `ENABLE_IMPORT_JOB_QUEUE` to be enabled.
+        """
+        return int(os.environ.get('BULK_IMPORT_MAX_CONCURRENCY', '4'))
+
     @property
     def GIT_CLONE_TIMEOUT(self):
         """
@@ -572,6 +871,47 @@ class Config:
         val = os.environ.get('GIT_CLONE_TIMEOUT', '300')
         return None if val is None else int(val)
 
+    @property
+    def GIT_MIRROR_CACHE_DIRECTORY(self):
+        """
+        Directory to store bare mirrors of git repositories, used when importing module versions from git.
+
+        When set, a mirror of each repository is maintained and module versions are cloned from the local mirror.
+        The mirror is only updated from the upstream repository when the git tag being imported is not present in the mirror,
+        meaning repeated imports of tags from the same repository avoid re-downloading the repository.
+
+        Leave empty to disable the mirror cache and clone directly from the upstream repository.
+
+        The directory must be persistent and is safe to share between Terrareg processes on the same host.
+        """
+        return os.environ.get('GIT_MIRROR_CACHE_DIRECTORY', '')
+
+    @property
+    def GIT_MIRROR_CACHE_MAX_SIZE(self):
+        """
+        Maximum total size, in MB, of git repository mirrors (see `GIT_MIRROR_CACHE_DIRECTORY`).
+
+        When exceeded, the least recently used mirrors are removed.
+
+        Set to 0 to disable removal of mirrors.
+        """
+        return int(os.environ.get('GIT_MIRROR_CACHE_MAX_SIZE', '10240'))
+
+    @property
+    def GIT_SHALLOW_CLONE(self):
+        """
+        Whether to perform a shallow clone of the git tag when importing module versions from git.
+
+        Only the commit of the tag is cloned, rather than the history of the tag.
+        If the module provider is configured to only archive the git path (`archive_git_path`), a partial clone is performed,
+        which only downloads the files within the git path and the root of the repository.
+
+        If the shallow clone fails (for example, if the git server does not support shallow clones), a full clone is performed.
+
+        This configuration has no effect when `GIT_MIRROR_CACHE_DIRECTORY` is set.
+        """
+        return self.convert_boolean(os.environ.get('GIT_SHALLOW_CLONE', 'True'))
+
     @property
     def GIT_PROVIDER_CONFIG(self):
         """
@@ -713,6 +1053,24 @@ class Config:
         """
         return self.convert_boolean(os.environ.get('INFRACOST_TLS_INSECURE_SKIP_VERIFY', 'False'))
 
+    @property
+    def INFRACOST_CACHE_TTL(self):
+        """
+        Number of seconds that Infracost results for examples are cached for.
+
+        Results are stored in the data directory against a hash of the contents of the example,
+        the local modules that it uses (including sources referencing the module itself, which are replaced with local paths)
+        and `INFRACOST_PRICING_API_ENDPOINT`.
+        When an example with identical contents is indexed within this time (e.g. when re-indexing a module version,
+        or when importing a patch release that does not modify the example), the cached costs are used,
+        rather than performing requests to the pricing API.
+
+        As external modules and prices may change over time, the results are not used once they are older than this value.
+
+        Set to `0` to disable caching of Infracost results.
+        """
+        return int(os.environ.get('INFRACOST_CACHE_TTL', '0'))
+
     @property
     def ADDITIONAL_MODULE_TABS(self):
         """
@@ -938,6 +1296,15 @@ class Config:
         """
         return os.environ.get("TERRAFORM_ARCHIVE_MIRROR", "")
 
+    @property
+    def TERRAFORM_BINARY_CACHE_DIRECTORY(self):
+        """
+        Directory to install Terraform/OpenTofu binaries used during module extraction.
+
+        Each version required by modules is installed into a separate sub-directory, once, and re-used by subsequent extractions.
+        """
+        return os.environ.get("TERRAFORM_BINARY_CACHE_DIRECTORY", os.path.join(tempfile.gettempdir(), "terrareg-terraform-binaries"))
+
     @property
     def MANAGE_TERRAFORM_RC_FILE(self):
         """
@@ -952,6 +1319,34 @@ class Config:
         """
         return self.convert_boolean(os.environ.get("MANAGE_TERRAFORM_RC_FILE", "False"))
 
+    @property
+    def TERRAFORM_PROVIDER_MIRROR_DIRECTORY(self):
+        """
+        Directory of filesystem provider mirror, used when running Terraform init during module extraction.
+
+        When set, Terraform is configured, using a terraform.rc file created for each extraction, to install providers from this directory,
+        rather than using the terraform.rc file in the user's home directory (see `MANAGE_TERRAFORM_RC_FILE`).
+
+        Provider binaries hosted by Terrareg are added to the mirror when they are indexed.
+        Existing binaries can be added to the mirror using `python ./terrareg.py populate-provider-mirror`.
+        Additional providers (e.g. from the public registry) can be added using `terraform providers mirror <directory>`.
+
+        When a provider mirror is not used, providers are downloaded into a plugin cache created for each extraction,
+        as the Terraform plugin cache does not support concurrent use.
+
+        Leave empty to disable the use of a provider mirror.
+        """
+        return os.environ.get("TERRAFORM_PROVIDER_MIRROR_DIRECTORY", "")
+
+    @property
+    def TERRAFORM_PROVIDER_MIRROR_DIRECT_FALLBACK(self):
+        """
+        Whether Terraform may download providers that are not present in the provider mirror (see `TERRAFORM_PROVIDER_MIRROR_DIRECTORY`) from their origin registry.
+
+        When disabled, Terraform init only installs providers from the mirror, allowing extraction to be performed without internet access.
+        """
+        return self.convert_boolean(os.environ.get("TERRAFORM_PROVIDER_MIRROR_DIRECT_FALLBACK", "False"))
+
     @property
     def SENTRY_DSN(self):
         """DSN Integration URL for sentry"""
@@ -1,6 +1,8 @@
 """Provide database class."""
 
 from contextlib import contextmanager
+import threading
+
 import sqlalchemy
 import sqlalchemy.dialects.mysql
 
@@ -14,6 +16,7 @@ from terrareg.provider_tier import ProviderTier
 from terrareg.user_group_namespace_permission_type import UserGroupNamespacePermissionType
 from terrareg.namespace_type import NamespaceType
 from terrareg.provider_source_type import ProviderSourceType
+from terrareg.import_job_status import ImportJobStatus
 import terrareg.provider_documentation_type
 import terrareg.provider_binary_types
 
@@ -76,9 +79,24 @@ class Database():
         self._provider_version_binary = None
         self._analytics = None
         self._provider_analytics = None
+        self._module_provider_name_usage = None
+        self._import_job = None
+        self._file_blob = None
         self._example_file = None
         self._module_version_file = None
-        self.transaction_connection = None
+        # Store transaction connection, used outside of request context, per thread,
+        # so that background threads do not share transactions
+        self._thread_local = threading.local()
+
+    @property
+    def transaction_connection(self):
+        """Return transaction connection for current thread."""
+        return getattr(self._thread_local, 'transaction_connection', None)
+
+    @transaction_connection.setter
+    def transaction_connection(self, value):
+        """Set transaction connection for current thread."""
+        self._thread_local.transaction_connection = value
 
     @property
     def session(self):
@@ -192,6 +210,27 @@ class Database():
             raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
         return self._provider_analytics
 
+    @property
+    def module_provider_name_usage(self):
+        """Return module_provider_name_usage table."""
+        if self._module_provider_name_usage is None:
+            raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
+        return self._module_provider_name_usage
+
+    @property
+    def import_job(self):
+        """Return import_job table."""
+        if self._import_job is None:
+            raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
+        return self._import_job
+
+    @property
+    def file_blob(self):
+        """Return file_blob table."""
+        if self._file_blob is None:
+            raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
+        return self._file_blob
+
     @property
     def example_file(self):
         """Return example_file table."""
@@ -527,7 +566,14 @@ class Database():
             sqlalchemy.Column('variable_template', Database.medium_blob()),
             sqlalchemy.Column('internal', sqlalchemy.Boolean, nullable=False),
             sqlalchemy.Column('published', sqlalchemy.Boolean),
-            sqlalchemy.Column('extraction_version', sqlalchemy.Integer)
+            sqlalchemy.Column('extraction_version', sqlalchemy.Integer),
+            # SHA-256 checksum of archive, for module versions uploaded via API
+            sqlalchemy.Column('upload_sha256', sqlalchemy.String(GENERAL_COLUMN_SIZE), nullable=True),
+            # SHA-256 checksum and size of generated zip archive
+            sqlalchemy.Column('archive_sha256', sqlalchemy.String(GENERAL_COLUMN_SIZE), nullable=True),
+            sqlalchemy.Column('archive_size', sqlalchemy.BigInteger, nullable=True),
+            # JSON report of duration and resource usage of extraction stages
+            sqlalchemy.Column('extraction_report', Database.medium_blob(), nullable=True)
         )
 
         self._sub_module = sqlalchemy.Table(
@@ -585,6 +631,78 @@ class Database():
             sqlalchemy.Column('provider_name', sqlalchemy.String(GENERAL_COLUMN_SIZE)),
         )
 
+        # Latest names used by each analytics token to download a module provider,
+        # used for providing redirect deletion protection without scanning analytics
+        self._module_provider_name_usage = sqlalchemy.Table(
+            'module_provider_name_usage', meta,
+            sqlalchemy.Column('id', sqlalchemy.Integer, primary_key = True),
+            sqlalchemy.Column(
+                'module_provider_id',
+                sqlalchemy.ForeignKey(
+                    'module_provider.id',
+                    name='fk_module_provider_name_usage_module_provider_id_module_provider_id',
+                    onupdate='CASCADE',
+                    ondelete='CASCADE'),
+                index=True,
+                nullable=False
+            ),
+            # Downloads without an analytics token are stored with an empty analytics token
+            # (see AnalyticsEngine.NAME_USAGE_EMPTY_ANALYTICS_TOKEN)
+            sqlalchemy.Column('analytics_token', sqlalchemy.String(GENERAL_COLUMN_SIZE), nullable=False),
+            sqlalchemy.Column('namespace_name', sqlalchemy.String(GENERAL_COLUMN_SIZE)),
+            sqlalchemy.Column('module_name', sqlalchemy.String(GENERAL_COLUMN_SIZE)),
+            sqlalchemy.Column('provider_name', sqlalchemy.String(GENERAL_COLUMN_SIZE)),
+            sqlalchemy.Column('timestamp', sqlalchemy.DateTime),
+            sqlalchemy.Index(
+                'ix_module_provider_name_usage_module_provider_id_analytics_token',
+                'module_provider_id', 'analytics_token',
+                unique=True
+            ),
+        )
+
+        self._import_job = sqlalchemy.Table(
+            'import_job', meta,
+            sqlalchemy.Column('id', sqlalchemy.Integer, primary_key = True),
+            sqlalchemy.Column(
+                'module_provider_id',
+                sqlalchemy.ForeignKey(
+                    'module_provider.id',
+                    name='fk_import_job_module_provider_id_module_provider_id',
+                    onupdate='CASCADE',
+                    ondelete='CASCADE'),
+                index=True,
+                nullable=False
+            ),
+            sqlalchemy.Column('version', sqlalchemy.String(GENERAL_COLUMN_SIZE), nullable=False),
+            # Version of job, whilst the job is pending or running, used to ensure
+            # that only one active job exists for each version
+            sqlalchemy.Column('active_version', sqlalchemy.String(GENERAL_COLUMN_SIZE), nullable=True),
+            sqlalchemy.Column('git_tag', sqlalchemy.String(GENERAL_COLUMN_SIZE), nullable=True),
+            sqlalchemy.Column('status', sqlalchemy.Enum(ImportJobStatus), nullable=False, default=ImportJobStatus.PENDING, index=True),
+            sqlalchemy.Column('attempts', sqlalchemy.Integer, nullable=False, default=0),
+            sqlalchemy.Column('username', sqlalchemy.String(GENERAL_COLUMN_SIZE), nullable=True),
+            sqlalchemy.Column('worker_id', sqlalchemy.String(GENERAL_COLUMN_SIZE), nullable=True),
+            sqlalchemy.Column('message', sqlalchemy.String(LARGE_COLUMN_SIZE), nullable=True),
+            sqlalchemy.Column('created_at', sqlalchemy.DateTime, nullable=False),
+            sqlalchemy.Column('available_at', sqlalchemy.DateTime, nullable=False),
+            sqlalchemy.Column('lease_expires_at', sqlalchemy.DateTime, nullable=True),
+            sqlalchemy.Column('started_at', sqlalchemy.DateTime, nullable=True),
+            sqlalchemy.Column('completed_at', sqlalchemy.DateTime, nullable=True),
+            sqlalchemy.Index(
+                'ix_import_job_module_provider_id_active_version',
+                'module_provider_id', 'active_version',
+                unique=True
+            ),
+        )
+
+        # Content of example and module version files, stored once per unique content
+        self._file_blob = sqlalchemy.Table(
+            'file_blob', meta,
+            sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True),
+            sqlalchemy.Column('sha256', sqlalchemy.String(64), nullable=False, unique=True),
+            sqlalchemy.Column('content', Database.medium_blob())
+        )
+
         self._example_file = sqlalchemy.Table(
             'example_file', meta,
             sqlalchemy.Column('id', sqlalchemy.Integer, primary_key = True),
@@ -598,7 +716,14 @@ class Database():
                 nullable=False
             ),
             sqlalchemy.Column('path', sqlalchemy.String(GENERAL_COLUMN_SIZE), nullable=False),
-            sqlalchemy.Column('content', Database.medium_blob())
+            sqlalchemy.Column(
+                'file_blob_id',
+                sqlalchemy.ForeignKey(
+                    'file_blob.id',
+                    name='fk_example_file_file_blob_id_file_blob_id',
+                    onupdate='CASCADE'),
+                nullable=True
+            )
         )
 
         # Additional files for module provider (e.g. additional README files)
@@ -615,7 +740,14 @@ class Database():
                 nullable=False
             ),
             sqlalchemy.Column('path', sqlalchemy.String(GENERAL_COLUMN_SIZE), nullable=False),
-            sqlalchemy.Column('content', Database.medium_blob())
+            sqlalchemy.Column(
+                'file_blob_id',
+                sqlalchemy.ForeignKey(
+                    'file_blob.id',
+                    name='fk_module_version_file_file_blob_id_file_blob_id',
+                    onupdate='CASCADE'),
+                nullable=True
+            )
         )
 
         self._gpg_key = sqlalchemy.Table(
@@ -42,6 +42,12 @@ class UploadError(TerraregError):
     pass
 
 
+class UploadTooLargeError(UploadError):
+    """Uploaded file exceeds maximum upload size."""
+
+    pass
+
+
 class NoSessionSetError(TerraregError):
     """No session has been setup and required."""
 
@@ -442,3 +448,15 @@ class UnableToObtainReleaseError(TerraregError):
     """Unable to find Release metadata from provider"""
 
     pass
+
+
+class ImportJobModuleProviderDoesNotExistError(TerraregError):
+    """Module provider of import job no longer exists"""
+
+    pass
+
+
+class ImportJobLeaseLostError(TerraregError):
+    """Lease of import job has been lost to another worker"""
+
+    pass
@@ -0,0 +1,124 @@
+"""Provide recording of duration and resource usage of module extraction stages."""
+
+import contextlib
+import resource
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class ExtractionReport:
+    """
+    Record wall time and resource usage of each stage of a module extraction.
+
+    Resource usage is obtained using getrusage:
+     * cpu_time - CPU time (user and system) of the thread running the stage, if supported by the platform.
+       This does not include CPU time of child processes (e.g. terraform, tfsec) run by the stage.
+
+    Stages may be nested, for example a stage recorded within an extraction stage,
+    and each nested stage inherits the submodule of the stage that it is recorded within.
+
+    The duration of each stage is also observed into a histogram for the stage name,
+    containing all stages completed since the process started, which is exported as a Prometheus metric.
+    """
+
+    # Upper bounds, in seconds, of buckets of histogram of stage durations
+    DURATION_BUCKETS = [0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600]
+
+    _METRICS_LOCK = threading.Lock()
+    _DURATION_HISTOGRAMS = {}
+
+    def __init__(self):
+        """Store member variables."""
+        self._start_time = time.monotonic()
+        self._stages: List[Dict[str, Optional[float]]] = []
+        self._lock = threading.Lock()
+        self._thread_local = threading.local()
+
+    @classmethod
+    def get_duration_histograms(cls) -> Dict[str, dict]:
+        """
+        Return histogram of durations for each stage name, completed since the process started.
+
+        Each histogram contains cumulative counts of stages within each bucket, along with the sum and count of durations.
+        """
+        with cls._METRICS_LOCK:
+            return {
+                name: {
+                    'buckets': dict(histogram['buckets']),
+                    'sum': histogram['sum'],
+                    'count': histogram['count'],
+                }
+                for name, histogram in cls._DURATION_HISTOGRAMS.items()
+            }
+
+    @classmethod
+    def _observe_duration(cls, name: str, duration: float) -> None:
+        """Add duration of stage to histogram for stage name."""
+        with cls._METRICS_LOCK:
+            if name not in cls._DURATION_HISTOGRAMS:
+                cls._DURATION_HISTOGRAMS[name] = {
+                    'buckets': {bucket: 0 for bucket in cls.DURATION_BUCKETS},
+                    'sum': 0.0,
+                    'count': 0,
+                }
+            histogram = cls._DURATION_HISTOGRAMS[name]
+            for bucket in cls.DURATION_BUCKETS:
+                if duration <= bucket:
+                    histogram['buckets'][bucket] += 1
+            histogram['sum'] += duration
+            histogram['count'] += 1
+
+    @staticmethod
+    def _get_thread_cpu_time() -> Optional[float]:
+        """Return CPU time of current thread, if supported by the platform."""
+        if not hasattr(resource, 'RUSAGE_THREAD'):
+            return None
+        usage = resource.getrusage(resource.RUSAGE_THREAD)
+        return usage.ru_utime + usage.ru_stime
+
+    @contextlib.contextmanager
+    def record(self, name: str, submodule: Optional[str]=None):
+        """
+        Record duration and resource usage of stage, whilst in context.
+
+        If submodule is not provided, the submodule of any stage that this stage is nested within is used.
+        """
+        parent_submodule = getattr(self._thread_local, 'submodule', None)
+        if submodule is None:
+            submodule = parent_submodule
+        self._thread_local.submodule = submodule
+
+        start_time = time.monotonic()
+        start_thread_cpu_time = self._get_thread_cpu_time()
+        try:
+            yield
+        finally:
+            self._thread_local.submodule = parent_submodule
+
+            end_thread_cpu_time = self._get_thread_cpu_time()
+            stage = {
+                'name': name,
+                'submodule': submodule,
+                'duration': time.monotonic() - start_time,
+                'cpu_time': (
+                    end_thread_cpu_time - start_thread_cpu_time
+                    if start_thread_cpu_time is not None else None
+                ),
+            }
+            with self._lock:
+                self._stages.append(stage)
+            self._observe_duration(name, stage['duration'])
+
+    @property
+    def stages(self) -> List[Dict[str, Optional[float]]]:
+        """Return recorded stages, in order of completion."""
+        with self._lock:
+            return list(self._stages)
+
+    def to_dict(self) -> dict:
+        """Return report, containing total duration and recorded stages."""
+        return {
+            'duration': time.monotonic() - self._start_time,
+            'stages': self.stages,
+        }
@@ -0,0 +1,244 @@
+"""Provide content-addressed cache of module analysis results."""
+
+import hashlib
+import json
+import os
+import re
+import subprocess
+import threading
+import time
+from typing import Dict, Optional, Set
+
+from terrareg.config import Config
+from terrareg.constants import EXTRACTION_VERSION
+import terrareg.file_storage
+
+
+class ExtractionResultCache:
+    """
+    Cache results of analysing modules in file storage, keyed by a hash of the module contents.
+
+    The contents of the extracted source are hashed when the cache is created,
+    before any extraction stages modify the source.
+    The hash of a module covers all files within the module directory
+    and the directories of any local modules that it references,
+    so that changes to a local module cause the results for modules using it to be regenerated.
+    """
+
+    CACHE_DIRECTORY = 'extraction_cache'
+
+    # Directories that are not part of the module source
+    IGNORED_DIRECTORIES = ['.git', '.terraform']
+
+    # Match local module sources, e.g. source = "../../"
+    _LOCAL_SOURCE_RE = re.compile(r'''source\s*=\s*"(\.{1,2}(?:/[^"]*)?)"''')
+
+    # Minimum interval, in seconds, between removing expired and excess results
+    PRUNE_INTERVAL = 60 * 60
+
+    _TOOL_VERSIONS = None
+    _TOOL_VERSIONS_LOCK = threading.Lock()
+
+    _PRUNE_LOCK = threading.Lock()
+    _LAST_PRUNED_AT = None
+
+    def __init__(self, source_directory: str):
+        """Hash contents of source directory."""
+        self._source_directory = source_directory
+        # Digest of each file, keyed by path relative to the source directory
+        self._file_digests: Dict[str, str] = {}
+        # Local module directories referenced by each directory
+        self._local_sources: Dict[str, Set[str]] = {}
+        self._tree_hashes: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._hash_source_directory()
+
+    @classmethod
+    def _get_tool_version(cls, command: list) -> Optional[str]:
+        """Return version output of tool, returning None if it cannot be obtained."""
+        try:
+            return subprocess.check_output(command, stderr=subprocess.STDOUT).decode('utf-8').strip()
+        except (OSError, subprocess.CalledProcessError) as exc:
+            print(f"Unable to obtain version of {command[0]}: {exc}")
+            return None
+
+    @classmethod
+    def get_tool_versions(cls) -> dict:
+        """Return versions of tools used for analysis, which are obtained once per process."""
+        with cls._TOOL_VERSIONS_LOCK:
+            if cls._TOOL_VERSIONS is None:
+                config = Config()
+                cls._TOOL_VERSIONS = {
+                    'terraform-docs': cls._get_tool_version(['terraform-docs', '--version']),
+                    'tfsec': cls._get_tool_version(['tfsec', '--version']),
+                    'product': config.PRODUCT.value,
+                    'default_terraform_version': config.DEFAULT_TERRAFORM_VERSION,
+                }
+            return dict(cls._TOOL_VERSIONS)
+
+    def _hash_source_directory(self):
+        """Calculate digest of all files in source directory and find references to local modules."""
+        for directory, sub_directories, files in os.walk(self._source_directory):
+            sub_directories[:] = [
+                sub_directory
+                for sub_directory in sorted(sub_directories)
+                if sub_directory not in self.IGNORED_DIRECTORIES
+            ]
+            relative_directory = os.path.relpath(directory, self._source_directory)
+
+            for file_name in files:
+                file_path = os.path.join(directory, file_name)
+                relative_path = os.path.normpath(os.path.join(relative_directory, file_name))
+
+                # Hash the target of symlinks, rather than following them
+                if os.path.islink(file_path):
+                    self._file_digests[relative_path] = hashlib.sha256(
+                        f"symlink:{os.readlink(file_path)}".encode('utf-8')
+                    ).hexdigest()
+                    continue
+
+                with open(file_path, 'rb') as file_fh:
+                    content = file_fh.read()
+                self._file_digests[relative_path] = hashlib.sha256(content).hexdigest()
+
+                if file_name.endswith('.tf'):
+                    for local_source in self._LOCAL_SOURCE_RE.findall(content.decode('utf-8', errors='ignore')):
+                        source_directory = os.path.normpath(os.path.join(relative_directory, local_source))
+                        # Ignore sources outside of the extracted source,
+                        # which are only identified by the path in the referencing file
+                        if source_directory == '..' or source_directory.startswith(f'..{os.path.sep}'):
+                            continue
+                        self._local_sources.setdefault(relative_directory, set()).add(source_directory)
+
+    def _get_tree_hash(self, relative_directory: str) -> str:
+        """Return hash of all files within directory."""
+        with self._lock:
+            if relative_directory not in self._tree_hashes:
+                prefix = '' if relative_directory == '.' else f'{relative_directory}{os.path.sep}'
+                tree_hash = hashlib.sha256()
+                for file_path in sorted(self._file_digests):
+                    if file_path.startswith(prefix):
+                        tree_hash.update(f"{file_path[len(prefix):]}\0{self._file_digests[file_path]}\n".encode('utf-8'))
+                self._tree_hashes[relative_directory] = tree_hash.hexdigest()
+            return self._tree_hashes[relative_directory]
+
+    def _get_module_directories(self, relative_directory: str) -> Set[str]:
+        """Return module directory and all local module directories that it references, recursively."""
+        directories = set()
+        pending = [relative_directory]
+        while pending:
+            directory = pending.pop()
+            if directory in directories:
+                continue
+            directories.add(directory)
+            pending.extend(self._local_sources.get(directory, set()))
+        return directories
+
+    def get_local_source_hashes(self, module_path: str, content: str) -> Dict[str, str]:
+        """
+        Return hashes of local modules referenced by Terraform content of module at path,
+        including any local modules that they reference.
+
+        This allows references that differ from the hashed source
+        (e.g. registry sources that have been rewritten to local paths) to be included in cache keys.
+        """
+        relative_directory = os.path.normpath(os.path.relpath(module_path, self._source_directory))
+        directories = set()
+        for local_source in self._LOCAL_SOURCE_RE.findall(content):
+            source_directory = os.path.normpath(os.path.join(relative_directory, local_source))
+            if source_directory == '..' or source_directory.startswith(f'..{os.path.sep}'):
+                continue
+            directories.update(self._get_module_directories(source_directory))
+        return {
+            directory: self._get_tree_hash(directory)
+            for directory in sorted(directories)
+        }
+
+    def get_cache_key(self, module_path: str, **attributes) -> str:
+        """
+        Return cache key for module at path.
+
+        Additional attributes, which affect the analysis of the module, are included in the key.
+        """
+        relative_directory = os.path.normpath(os.path.relpath(module_path, self._source_directory))
+        key_data = {
+            'path': relative_directory,
+            'extraction_version': EXTRACTION_VERSION,
+            'tool_versions': self.get_tool_versions(),
+            'sources': {
+                directory: self._get_tree_hash(directory)
+                for directory in sorted(self._get_module_directories(relative_directory))
+            },
+            'attributes': attributes,
+        }
+        return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode('utf-8')).hexdigest()
+
+    @classmethod
+    def _get_cache_path(cls, cache_key: str) -> str:
+        """Return path of cache file in file storage."""
+        return os.path.join('/', cls.CACHE_DIRECTORY, cache_key[:2], f'{cache_key}.json')
+
+    @classmethod
+    def get(cls, cache_key: str) -> Optional[dict]:
+        """Return cached results, returning None if the results are not cached."""
+        file_storage = terrareg.file_storage.FileStorageFactory().get_file_storage()
+        path = cls._get_cache_path(cache_key)
+        try:
+            if not file_storage.file_exists(path):
+                return None
+            cache_fh = file_storage.read_file(path, bytes_mode=True)
+            if cache_fh is None:
+                return None
+            with cache_fh:
+                return json.loads(cache_fh.read())
+        except Exception as exc:
+            print(f"Failed to read cached extraction results: {exc}")
+            return None
+
+    @classmethod
+    def set(cls, cache_key: str, results: dict) -> None:
+        """Store results in cache."""
+        file_storage = terrareg.file_storage.FileStorageFactory().get_file_storage()
+        try:
+            file_storage.write_file(cls._get_cache_path(cache_key), json.dumps(results).encode('utf-8'), binary=True)
+        except Exception as exc:
+            print(f"Failed to store extraction results in cache: {exc}")
+
+    @classmethod
+    def prune(cls) -> None:
+        """Remove cached results older than the TTL and the oldest results, until the cache is within the maximum size."""
+        config = Config()
+        ttl = config.EXTRACTION_RESULT_CACHE_TTL
+        max_size = config.EXTRACTION_RESULT_CACHE_MAX_SIZE * 1024 * 1024
+        if ttl <= 0 and max_size <= 0:
+            return
+
+        file_storage = terrareg.file_storage.FileStorageFactory().get_file_storage()
+        cached_files = sorted(
+            file_storage.list_files(os.path.join('/', cls.CACHE_DIRECTORY)),
+            key=lambda cached_file: cached_file[2]
+        )
+        total_size = sum(size for _, size, _ in cached_files)
+        now = time.time()
+        for path, size, modified in cached_files:
+            if (ttl <= 0 or now - modified <= ttl) and (max_size <= 0 or total_size <= max_size):
+                break
+            try:
+                file_storage.delete_file(path)
+            except Exception as exc:
+                print(f"Failed to remove cached extraction results: {exc}")
+                continue
+            total_size -= size
+
+    @classmethod
+    def prune_if_due(cls) -> None:
+        """Remove expired and excess results, if they have not been removed by this process within the prune interval."""
+        with cls._PRUNE_LOCK:
+            if cls._LAST_PRUNED_AT is not None and time.time() - cls._LAST_PRUNED_AT < cls.PRUNE_INTERVAL:
+                return
+            cls._LAST_PRUNED_AT = time.time()
+
+        try:
+            cls.prune()
+        except Exception as exc:
+            print(f"Failed to prune extraction result cache: {exc}")
@@ -0,0 +1,97 @@
+"""Provide concurrent execution of module extraction stages."""
+
+import concurrent.futures
+import contextlib
+from typing import Any, Callable, Dict, List, Optional
+
+import terrareg.extraction_report
+
+
+class ExtractionStage:
+    """Stage of module extraction, with dependencies on other stages."""
+
+    def __init__(self, name: str, func: Callable[[], Any], depends_on: Optional[List[str]]=None):
+        """Store member variables."""
+        self.name = name
+        self.func = func
+        self.depends_on = list(depends_on or [])
+
+
+class ExtractionStageRunner:
+    """
+    Execute extraction stages using a thread pool.
+
+    Each stage is started as soon as all of the stages that it depends on have completed,
+    so that independent stages (which generally run external processes) are executed concurrently.
+
+    Stages must not access the database, as database connections are not shared between threads.
+    """
+
+    def __init__(self, report: Optional['terrareg.extraction_report.ExtractionReport']=None,
+                 submodule: Optional[str]=None):
+        """
+        Store member variables.
+
+        If report is provided, the duration and resource usage of each stage is recorded
+        in the report, against the provided submodule path.
+        """
+        self._report = report
+        self._submodule = submodule
+        self._stages: Dict[str, ExtractionStage] = {}
+
+    def add_stage(self, name: str, func: Callable[[], Any], depends_on: Optional[List[str]]=None) -> None:
+        """Add stage to be executed."""
+        if name in self._stages:
+            raise ValueError(f"Extraction stage already exists: {name}")
+        for dependency in (depends_on or []):
+            if dependency not in self._stages:
+                raise ValueError(f"Extraction stage {name} depends on unknown stage: {dependency}")
+        self._stages[name] = ExtractionStage(name=name, func=func, depends_on=depends_on)
+
+    def _run_stage(self, stage: ExtractionStage) -> Any:
+        """Run stage, recording duration in extraction report."""
+        with (self._report.record(stage.name, submodule=self._submodule)
+              if self._report is not None else contextlib.nullcontext()):
+            return stage.func()
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run all stages and return dictionary of results for each stage.
+
+        If a stage raises an exception, no further stages are started and,
+        once running stages have completed, the first exception is raised.
+        """
+        results = {}
+        pending = dict(self._stages)
+        running = {}
+        error = None
+
+        if not pending:
+            return results
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(pending),
+                                                   thread_name_prefix='extraction-stage') as executor:
+            while pending or running:
+                # Start all stages whose dependencies have completed
+                if error is None:
+                    for stage in list(pending.values()):
+                        if all(dependency in results for dependency in stage.depends_on):
+                            del pending[stage.name]
+                            running[executor.submit(self._run_stage, stage)] = stage.name
+
+                if not running:
+                    break
+
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    stage_name = running.pop(future)
+                    try:
+                        results[stage_name] = future.result()
+                    except Exception as exc:
+                        if error is None:
+                            error = exc
+
+        if error is not None:
+            raise error
+
+        return results
@@ -1,18 +1,67 @@
 
 import re
-from typing import TextIO, Tuple
+from typing import BinaryIO, ContextManager, List, Optional, TextIO, Tuple
 import abc
+import contextlib
+import glob
+import hashlib
+import io
 from io import BytesIO, TextIOWrapper
 import os
 import shutil
+import tempfile
+import threading
+import time
+import uuid
 
 import boto3
+import boto3.s3.transfer
 import botocore.exceptions
 
 import terrareg.config
 from terrareg.errors import FileUploadError, InvalidDataDirectoryError
 
 
+class StreamReader(io.RawIOBase):
+    """
+    Readable binary stream, reading from an underlying stream
+    (e.g. file handle or S3 object body) as content is consumed.
+
+    Reads are limited to the provided size, allowing a range of a file to be read.
+    """
+
+    def __init__(self, stream, size: int):
+        """Store member variables."""
+        super().__init__()
+        self._stream = stream
+        self._size = size
+        self._remaining = size
+
+    @property
+    def size(self) -> int:
+        """Return size of content provided by stream."""
+        return self._size
+
+    def readable(self) -> bool:
+        """Return whether stream is readable."""
+        return True
+
+    def readinto(self, buffer) -> int:
+        """Read content from underlying stream into buffer."""
+        if self._remaining <= 0:
+            return 0
+        data = self._stream.read(min(len(buffer), self._remaining))
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+    def close(self):
+        """Close underlying stream."""
+        if not self.closed:
+            self._stream.close()
+        super().close()
+
+
 class BaseFileStorage(abc.ABC):
 
     @abc.abstractmethod
@@ -41,8 +90,12 @@ class BaseFileStorage(abc.ABC):
         ...
 
     @abc.abstractmethod
-    def read_file(self, path: str, bytes_mode: bool=False) -> TextIOWrapper:
-        """Obtain file handle of file from storage"""
+    def read_file(self, path: str, bytes_mode: bool=False, byte_range: Optional[Tuple[int, int]]=None) -> TextIOWrapper:
+        """
+        Obtain file handle of file from storage.
+
+        If byte_range is provided, a StreamReader is returned, containing the inclusive range of bytes of the file.
+        """
         ...
 
     @abc.abstractmethod
@@ -55,6 +108,49 @@ class BaseFileStorage(abc.ABC):
         """Write file to file storage from content"""
         ...
 
+    def get_presigned_url(self, path: str, expiry: int, download_name: str, mimetype: str) -> Optional[str]:
+        """
+        Return short-lived URL, allowing file to be downloaded directly from storage.
+
+        Returns None if the storage does not support presigned URLs.
+        """
+        return None
+
+    def get_local_path(self, path: str) -> Optional[str]:
+        """
+        Return absolute path of file on the local filesystem.
+
+        Returns None if the storage does not store files on the local filesystem.
+        """
+        return None
+
+    @abc.abstractmethod
+    def open_write(self, path: str) -> ContextManager[BinaryIO]:
+        """
+        Return context manager providing binary file handle to write file to storage.
+
+        The file is only stored once the context manager exits without error.
+        """
+        ...
+
+    @abc.abstractmethod
+    def get_file_version(self, path: str) -> Optional[str]:
+        """
+        Return identifier of the current content of file, which changes whenever the file is modified.
+
+        Returns None if the file does not exist.
+        """
+        ...
+
+    @abc.abstractmethod
+    def list_files(self, directory: str) -> List[Tuple[str, int, float]]:
+        """
+        Return all files within directory, recursively.
+
+        Each file is returned as a tuple of path, size in bytes and modification time, as a UNIX timestamp.
+        """
+        ...
+
 
 class LocalFileStorage(BaseFileStorage):
     """Handle local file storage."""
@@ -122,6 +218,17 @@ class LocalFileStorage(BaseFileStorage):
         path = self._generate_path(path)
         return os.path.isdir(path)
 
+    def get_file_version(self, path: str) -> Optional[str]:
+        """Return size and modification time of file, identifying the current content of the file."""
+        path = self._generate_path(path)
+        if not os.path.isfile(path):
+            return None
+        try:
+            file_stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return f"{file_stat.st_size}-{file_stat.st_mtime_ns}"
+
     def delete_file(self, path: str) -> None:
         """Delete path"""
         path = self._generate_path(path)
@@ -132,14 +239,46 @@ class LocalFileStorage(BaseFileStorage):
         path = self._generate_path(path)
         os.rmdir(path)
 
-    def read_file(self, path: str, bytes_mode: bool=False) -> TextIOWrapper:
+    def read_file(self, path: str, bytes_mode: bool=False, byte_range: Optional[Tuple[int, int]]=None) -> TextIOWrapper:
         """Return file handler for file"""
         path = self._generate_path(path)
         mode = "r"
         if bytes_mode:
             mode += "b"
+
+        if byte_range is not None:
+            if not bytes_mode:
+                raise NotImplementedError("Byte ranges can only be read in bytes mode")
+            start, end = byte_range
+            fh = open(path, mode)
+            fh.seek(start)
+            return StreamReader(fh, size=end - start + 1)
+
         return open(path, mode)
 
+    def get_local_path(self, path: str) -> Optional[str]:
+        """Return absolute path of file on the local filesystem."""
+        return os.path.abspath(self._generate_path(path))
+
+    def list_files(self, directory: str) -> List[Tuple[str, int, float]]:
+        """Return path, size and modification time of all files within directory, recursively."""
+        base_path = self._generate_path(directory)
+        files = []
+        for file_directory, _, file_names in os.walk(base_path):
+            for file_name in file_names:
+                file_path = os.path.join(file_directory, file_name)
+                # Files may be removed whilst listing
+                try:
+                    file_stat = os.stat(file_path)
+                except FileNotFoundError:
+                    continue
+                files.append((
+                    os.path.join(directory, os.path.relpath(file_path, base_path)),
+                    file_stat.st_size,
+                    file_stat.st_mtime
+                ))
+        return files
+
     def write_file(self, path: str, content: any, binary: bool):
         """Write file to file storage from content"""
         # Ensure destination is not a directory
@@ -156,10 +295,40 @@ class LocalFileStorage(BaseFileStorage):
         with open(path, mode) as fh:
             fh.write(content)
 
+    @contextlib.contextmanager
+    def open_write(self, path: str):
+        """
+        Return context manager providing binary file handle to write file to storage.
+
+        Content is written to a temporary file in the destination directory,
+        which is moved into place once writing has completed.
+        """
+        # Ensure destination is not a directory
+        self._check_not_directory(path)
+
+        path = self._generate_path(path)
+
+        # Create directory to store file
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        temp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(temp_path, 'xb') as fh:
+                yield fh
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
 
 class S3FileStorage(BaseFileStorage):
     """Handle file storage in s3"""
 
+    # Maximum size of content written using open_write
+    # that is held in memory, before being written to disk
+    SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
     def __init__(self, s3_url) -> None:
         """Store member variables"""
         self._s3_url = s3_url
@@ -191,6 +360,17 @@ class S3FileStorage(BaseFileStorage):
         """Get bucket object"""
         return self._s3_resource.Bucket(self._bucket_name)
 
+    @staticmethod
+    def _get_transfer_config() -> boto3.s3.transfer.TransferConfig:
+        """Return configuration for managed transfers, using multipart transfers for large files."""
+        config = terrareg.config.Config()
+        part_size = config.S3_TRANSFER_PART_SIZE * 1024 * 1024
+        return boto3.s3.transfer.TransferConfig(
+            multipart_threshold=part_size,
+            multipart_chunksize=part_size,
+            max_concurrency=config.S3_TRANSFER_MAX_CONCURRENCY
+        )
+
     def _generate_key(self, *paths):
         """Generate s3 key"""
         path = "/".join([self._base_s3_path, *paths])
@@ -204,9 +384,26 @@ class S3FileStorage(BaseFileStorage):
 
     def upload_file(self, source_path: str, dest_directory: str, dest_filename: str) -> None:
         """Upload file to s3"""
-        with open(source_path, 'rb') as fh:
-            content = fh.read()
-        self.write_file(path=f'{dest_directory}/{dest_filename}', content=content, binary=True)
+        # Upload from file, rather than reading the file into memory,
+        # using multipart uploads for large files
+        self._get_bucket().upload_file(
+            Filename=source_path,
+            Key=self._generate_key(f'{dest_directory}/{dest_filename}'),
+            Config=self._get_transfer_config()
+        )
+
+    @contextlib.contextmanager
+    def open_write(self, path: str):
+        """
+        Return context manager providing binary file handle to write file to storage.
+
+        Content is spooled to a temporary file, which is uploaded once writing has completed.
+        """
+        key = self._generate_key(path)
+        with tempfile.SpooledTemporaryFile(max_size=self.SPOOL_MAX_SIZE, suffix='s3-upload') as fh:
+            yield fh
+            fh.seek(0)
+            self._get_bucket().upload_fileobj(Fileobj=fh, Key=key, Config=self._get_transfer_config())
 
     def write_file(self, path: str, content: any, binary: bool):
         """Write file to file storage from content"""
@@ -227,22 +424,53 @@ class S3FileStorage(BaseFileStorage):
         path = self._generate_key(path)
         self._s3_client.delete_object(Bucket=self._bucket_name, Key=path)
 
-    def read_file(self, path: str, bytes_mode: bool = False) -> TextIOWrapper:
-        """Obtain FH containing contents of file from s3"""
+    def read_file(self, path: str, bytes_mode: bool = False, byte_range: Optional[Tuple[int, int]]=None) -> TextIOWrapper:
+        """
+        Obtain stream of contents of file from s3.
+
+        The content is streamed from s3 as it is read, rather than downloading the file before returning.
+        """
         if bytes_mode is False:
             raise NotImplementedError("S3 storage does not support text-based read_file")
 
-        content = BytesIO()
-
         key = self._generate_key(path)
+        get_object_kwargs = {}
+        if byte_range is not None:
+            get_object_kwargs['Range'] = f'bytes={byte_range[0]}-{byte_range[1]}'
 
         try:
-            self._get_bucket().download_fileobj(Key=key, Fileobj=content)
+            res = self._s3_client.get_object(Bucket=self._bucket_name, Key=key, **get_object_kwargs)
         except botocore.exceptions.ClientError:
             return None
 
-        content.seek(0)
-        return content
+        return StreamReader(res['Body'], size=res['ContentLength'])
+
+    def get_presigned_url(self, path: str, expiry: int, download_name: str, mimetype: str) -> Optional[str]:
+        """Return presigned URL for downloading object from s3, valid for expiry seconds."""
+        return self._s3_client.generate_presigned_url(
+            'get_object',
+            Params={
+                'Bucket': self._bucket_name,
+                'Key': self._generate_key(path),
+                'ResponseContentType': mimetype,
+                'ResponseContentDisposition': f'attachment; filename="{download_name}"',
+            },
+            ExpiresIn=expiry
+        )
+
+    def list_files(self, directory: str) -> List[Tuple[str, int, float]]:
+        """Return path, size and modification time of all objects within directory."""
+        base_key = self._generate_key()
+        files = []
+        paginator = self._s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self._bucket_name, Prefix=f"{self._generate_key(directory)}/"):
+            for s3_object in page.get('Contents', []):
+                files.append((
+                    s3_object['Key'][len(base_key):],
+                    s3_object['Size'],
+                    s3_object['LastModified'].timestamp()
+                ))
+        return files
 
     def file_exists(self, path: str) -> bool:
         """Check if object exists in s3"""
@@ -255,6 +483,17 @@ class S3FileStorage(BaseFileStorage):
                 return False
             raise
 
+    def get_file_version(self, path: str) -> Optional[str]:
+        """Return ETag of object, identifying the current content of the object."""
+        path = self._generate_key(path)
+        try:
+            res = self._s3_client.head_object(Bucket=self._bucket_name, Key=path)
+        except botocore.exceptions.ClientError as exc:
+            if "Not Found" in str(exc):
+                return None
+            raise
+        return res['ETag']
+
     def directory_exists(self, path: str) -> bool:
         """Check if directory exists"""
         # Always return True.
@@ -269,12 +508,392 @@ class S3FileStorage(BaseFileStorage):
         pass
 
 
+class CachedFileStorage(BaseFileStorage):
+    """
+    Read-through cache of files from another file storage, stored on local disk.
+
+    Files are cached when they are first read,
+    with the least recently read files removed when the total size of the cache exceeds the maximum size.
+    The total size is tracked as files are cached and removed, and is periodically recalculated from the
+    cache directory, to account for files cached or removed by other processes.
+    Cached files are stored against the version of the file in storage (e.g. the ETag of s3 objects).
+    Cached files are read without checking the version of the file in storage, until the revalidation interval has passed,
+    after which the version is obtained from storage, so files modified by other processes or hosts are not read from the cache.
+    Files are written to the cache atomically, so the cache directory is safe to share between processes,
+    and concurrent reads of the same uncached file within a process only download the file once.
+
+    Writes and deletions are performed against the underlying storage,
+    removing any cached copies of the file.
+    """
+
+    # Suffix of temporary files, created whilst files are being written to the cache
+    TEMPORARY_FILE_SUFFIX = '.tmp'
+
+    # Separator between path of file and digest of file version, in paths of cached files
+    VERSION_SEPARATOR = '@'
+
+    # Interval between recalculating the total size of the cache from the cache directory
+    PRUNE_INTERVAL = 60 * 5
+
+    # Proportion of the maximum size that the cache is reduced to, when files are removed,
+    # so that files are not removed each time a file is cached
+    PRUNE_TARGET_RATIO = 0.9
+
+    _LOCK = threading.Lock()
+    _FILL_LOCKS = {}
+    # Time that the version of each cached file was last checked against storage
+    _VALIDATED_AT = {}
+    _PRUNE_LOCK = threading.Lock()
+    # Total size of cached files and time that the size was last calculated, for each cache directory
+    _CACHE_SIZES = {}
+    _LAST_PRUNED_AT = {}
+
+    _METRICS_LOCK = threading.Lock()
+    _METRICS = {
+        'hits': 0,
+        'misses': 0,
+        'deduplicated_fills': 0,
+        'evictions': 0,
+        'evicted_bytes': 0,
+    }
+
+    def __init__(self, storage: BaseFileStorage, cache_directory: str, max_size: int, revalidate_interval: int=0):
+        """Store member variables."""
+        self._storage = storage
+        self._cache_directory = cache_directory
+        self._cache_storage = LocalFileStorage(cache_directory)
+        self._max_size = max_size
+        self._revalidate_interval = revalidate_interval
+        super().__init__()
+
+    @classmethod
+    def get_metrics(cls) -> dict:
+        """Return counts of cache hits, misses and evictions in the current process."""
+        with cls._METRICS_LOCK:
+            return dict(cls._METRICS)
+
+    @classmethod
+    def _increment_metric(cls, name: str, value: int=1) -> None:
+        """Increment metric."""
+        with cls._METRICS_LOCK:
+            cls._METRICS[name] += value
+
+    @classmethod
+    @contextlib.contextmanager
+    def _fill_lock(cls, cache_path: str):
+        """Hold lock for caching file, removing the lock once it is no longer in use."""
+        with cls._LOCK:
+            lock, user_count = cls._FILL_LOCKS.get(cache_path, (None, 0))
+            if lock is None:
+                lock = threading.Lock()
+            cls._FILL_LOCKS[cache_path] = (lock, user_count + 1)
+
+        try:
+            with lock:
+                yield
+        finally:
+            with cls._LOCK:
+                _, user_count = cls._FILL_LOCKS[cache_path]
+                if user_count == 1:
+                    del cls._FILL_LOCKS[cache_path]
+                else:
+                    cls._FILL_LOCKS[cache_path] = (lock, user_count - 1)
+
+    def _get_cache_path(self, path: str, version: str) -> str:
+        """Return path of cached copy of version of file."""
+        return f"{path}{self.VERSION_SEPARATOR}{hashlib.sha256(version.encode('utf-8')).hexdigest()}"
+
+    def _get_cached_paths(self, path: str) -> List[str]:
+        """Return local paths of cached copies of all versions of file."""
+        local_path = self._cache_storage.get_local_path(path)
+        return [
+            cached_path
+            for cached_path in glob.glob(f"{glob.escape(local_path)}{self.VERSION_SEPARATOR}*")
+            if not cached_path.endswith(self.TEMPORARY_FILE_SUFFIX)
+        ]
+
+    def _set_validated(self, cache_path: str) -> None:
+        """Record that version of cached file has been checked against storage."""
+        with self._LOCK:
+            self._VALIDATED_AT[self._cache_storage.get_local_path(cache_path)] = time.time()
+
+    def _get_validated_cache_path(self, path: str) -> Optional[str]:
+        """Return path of cached copy of file whose version has been checked against storage within the revalidation interval."""
+        if not self._revalidate_interval:
+            return None
+
+        local_path = self._cache_storage.get_local_path(path)
+        cached_paths = self._get_cached_paths(path)
+        with self._LOCK:
+            validated_at = {
+                cached_path: self._VALIDATED_AT.get(cached_path)
+                for cached_path in cached_paths
+            }
+        for cached_path, cached_path_validated_at in validated_at.items():
+            if cached_path_validated_at is not None and (time.time() - cached_path_validated_at) < self._revalidate_interval:
+                # Convert to path of cached file, relative to cache directory
+                return path + cached_path[len(local_path):]
+        return None
+
+    def _read_cached_file(self, cache_path: str, byte_range: Optional[Tuple[int, int]]) -> Optional[BinaryIO]:
+        """Return file handle of cached file, returning None if the file is not cached."""
+        try:
+            # Update modification time, to record last use of the file
+            os.utime(self._cache_storage.get_local_path(cache_path))
+            return self._cache_storage.read_file(cache_path, bytes_mode=True, byte_range=byte_range)
+        except (FileNotFoundError, IsADirectoryError):
+            return None
+
+    def _fill(self, path: str, cache_path: str, version: str) -> bool:
+        """Copy version of file from storage into cache, returning whether the file has been cached."""
+        source_fh = self._storage.read_file(path, bytes_mode=True)
+        if source_fh is None:
+            return False
+
+        with source_fh:
+            # Do not cache files that would not fit in the cache
+            size = getattr(source_fh, 'size', None)
+            if self._max_size and size is not None and size > self._max_size:
+                return False
+
+            with self._cache_storage.open_write(cache_path) as cache_fh:
+                shutil.copyfileobj(source_fh, cache_fh)
+
+        # Remove cached file if the file was modified whilst it was being copied,
+        # as the cached content may not match the version
+        local_path = self._cache_storage.get_local_path(cache_path)
+        if self._storage.get_file_version(path) != version:
+            self._remove_cached_file(local_path)
+            return False
+
+        try:
+            self._update_cache_size(os.path.getsize(local_path))
+        except FileNotFoundError:
+            pass
+        self.prune_if_required()
+        return True
+
+    def _update_cache_size(self, size_difference: int) -> None:
+        """Update total size of cache, if it has been calculated."""
+        with self._LOCK:
+            if self._cache_directory in self._CACHE_SIZES:
+                self._CACHE_SIZES[self._cache_directory] += size_difference
+
+    def _remove_cached_file(self, local_path: str) -> None:
+        """Remove cached file, which may have been removed by another process."""
+        with self._LOCK:
+            self._VALIDATED_AT.pop(local_path, None)
+        try:
+            size = os.path.getsize(local_path)
+            os.unlink(local_path)
+        except (FileNotFoundError, IsADirectoryError):
+            return
+        self._update_cache_size(-size)
+
+    def _invalidate(self, path: str, keep_cache_path: Optional[str]=None) -> None:
+        """Remove cached copies of all versions of file, optionally retaining a single version."""
+        keep_local_path = self._cache_storage.get_local_path(keep_cache_path) if keep_cache_path else None
+        for cached_path in self._get_cached_paths(path):
+            if cached_path != keep_local_path:
+                self._remove_cached_file(cached_path)
+
+    def prune_if_required(self) -> None:
+        """
+        Remove least recently used files, if the total size of the cache exceeds the maximum size,
+        or the total size has not been calculated within the prune interval.
+
+        Pruning is skipped if the cache is already being pruned by another thread.
+        """
+        if not self._max_size:
+            return
+
+        with self._LOCK:
+            cache_size = self._CACHE_SIZES.get(self._cache_directory)
+            last_pruned_at = self._LAST_PRUNED_AT.get(self._cache_directory, 0)
+        if cache_size is not None and cache_size <= self._max_size and (time.time() - last_pruned_at) < self.PRUNE_INTERVAL:
+            return
+
+        if not self._PRUNE_LOCK.acquire(blocking=False):
+            return
+        try:
+            self._prune()
+        finally:
+            self._PRUNE_LOCK.release()
+
+    def prune(self) -> None:
+        """Remove least recently used files, until the cache is within the maximum size."""
+        if not self._max_size:
+            return
+
+        with self._PRUNE_LOCK:
+            self._prune()
+
+    def _prune(self) -> None:
+        """Calculate total size of cache, removing least recently used files if it exceeds the maximum size."""
+        if not os.path.isdir(self._cache_directory):
+            return
+
+        cached_files = []
+        for directory, _, files in os.walk(self._cache_directory):
+            for file_name in files:
+                if file_name.endswith(self.TEMPORARY_FILE_SUFFIX):
+                    continue
+                file_path = os.path.join(directory, file_name)
+                try:
+                    file_stat = os.stat(file_path)
+                except FileNotFoundError:
+                    continue
+                cached_files.append((file_stat.st_mtime, file_path, file_stat.st_size))
+
+        total_size = sum(size for _, _, size in cached_files)
+        if total_size > self._max_size:
+            for _, file_path, size in sorted(cached_files):
+                if total_size <= self._max_size * self.PRUNE_TARGET_RATIO:
+                    break
+
+                with self._LOCK:
+                    self._VALIDATED_AT.pop(file_path, None)
+                # Files may have been removed by another process.
+                # Files that are being read remain readable after being removed.
+                try:
+                    os.unlink(file_path)
+                except FileNotFoundError:
+                    continue
+                total_size -= size
+                self._increment_metric('evictions')
+                self._increment_metric('evicted_bytes', size)
+
+        with self._LOCK:
+            self._CACHE_SIZES[self._cache_directory] = total_size
+            self._LAST_PRUNED_AT[self._cache_directory] = time.time()
+
+    def read_file(self, path: str, bytes_mode: bool=False, byte_range: Optional[Tuple[int, int]]=None) -> TextIOWrapper:
+        """
+        Return file handle of file from cache, caching the file from storage if it is not cached.
+
+        Only binary reads are cached.
+        """
+        if not bytes_mode:
+            return self._storage.read_file(path, bytes_mode=bytes_mode, byte_range=byte_range)
+
+        # Read cached copy of file, without checking the version in storage,
+        # if the version has been checked within the revalidation interval
+        cache_path = self._get_validated_cache_path(path)
+        if cache_path is not None:
+            cache_fh = self._read_cached_file(cache_path, byte_range)
+            if cache_fh is not None:
+                self._increment_metric('hits')
+                return cache_fh
+
+        version = self._storage.get_file_version(path)
+        if version is None:
+            self._invalidate(path)
+            return None
+
+        cache_path = self._get_cache_path(path, version)
+        # Remove cached copies of previous versions of the file
+        self._invalidate(path, keep_cache_path=cache_path)
+        cache_fh = self._read_cached_file(cache_path, byte_range)
+        if cache_fh is not None:
+            self._set_validated(cache_path)
+            self._increment_metric('hits')
+            return cache_fh
+
+        with self._fill_lock(cache_path):
+            # Check cache again, as the file may have been cached
+            # by another thread whilst waiting for the lock
+            cache_fh = self._read_cached_file(cache_path, byte_range)
+            if cache_fh is not None:
+                self._increment_metric('deduplicated_fills')
+                return cache_fh
+
+            self._increment_metric('misses')
+            if self._fill(path, cache_path, version):
+                self._set_validated(cache_path)
+                cache_fh = self._read_cached_file(cache_path, byte_range)
+                if cache_fh is not None:
+                    return cache_fh
+
+        # Fall back to reading from storage, if the file could not be cached
+        return self._storage.read_file(path, bytes_mode=bytes_mode, byte_range=byte_range)
+
+    def file_exists(self, path: str) -> bool:
+        """
+        Return whether file exists, using the cache if the file has been cached.
+
+        Files deleted from storage by other processes are removed from the cache when the cached copy is next revalidated.
+        """
+        if self._get_cached_paths(path):
+            return True
+        return self._storage.file_exists(path)
+
+    def directory_exists(self, path: str) -> bool:
+        """Return whether directory exists in storage."""
+        return self._storage.directory_exists(path)
+
+    def make_directory(self, directory: str) -> None:
+        """Create directory in storage."""
+        self._storage.make_directory(directory)
+
+    def upload_file(self, source_path: str, dest_directory: str, dest_filename: str) -> None:
+        """Upload file to storage, removing cached copy of file."""
+        self._storage.upload_file(source_path, dest_directory, dest_filename)
+        self._invalidate(os.path.join(dest_directory, dest_filename))
+
+    def write_file(self, path: str, content: any, binary: bool):
+        """Write file to storage, removing cached copy of file."""
+        self._storage.write_file(path, content, binary)
+        self._invalidate(path)
+
+    @contextlib.contextmanager
+    def open_write(self, path: str):
+        """Return context manager providing binary file handle to write file to storage, removing cached copy of file."""
+        with self._storage.open_write(path) as fh:
+            yield fh
+        self._invalidate(path)
+
+    def delete_file(self, path: str) -> None:
+        """Delete file from storage and cache."""
+        self._storage.delete_file(path)
+        self._invalidate(path)
+
+    def delete_directory(self, path: str) -> None:
+        """Delete directory from storage and cache."""
+        self._storage.delete_directory(path)
+        if self._cache_storage.directory_exists(path):
+            shutil.rmtree(self._cache_storage.get_local_path(path), ignore_errors=True)
+            # Recalculate total size of cache when a file is next cached
+            with self._LOCK:
+                self._CACHE_SIZES.pop(self._cache_directory, None)
+
+    def get_presigned_url(self, path: str, expiry: int, download_name: str, mimetype: str) -> Optional[str]:
+        """Return presigned URL for downloading file from storage."""
+        return self._storage.get_presigned_url(path, expiry=expiry, download_name=download_name, mimetype=mimetype)
+
+    def get_file_version(self, path: str) -> Optional[str]:
+        """Return version of file in storage."""
+        return self._storage.get_file_version(path)
+
+    def list_files(self, directory: str) -> List[Tuple[str, int, float]]:
+        """Return files within directory in storage."""
+        return self._storage.list_files(directory)
+
+
 class FileStorageFactory:
 
     def get_file_storage(self) -> 'BaseFileStorage':
         """Generate file storage instance"""
         config = terrareg.config.Config()
         if config.DATA_DIRECTORY.startswith("s3://"):
-            return S3FileStorage(config.DATA_DIRECTORY)
+            file_storage = S3FileStorage(config.DATA_DIRECTORY)
+            # Cache files from s3 on local disk, if configured
+            if config.S3_CACHE_DIRECTORY:
+                file_storage = CachedFileStorage(
+                    storage=file_storage,
+                    cache_directory=config.S3_CACHE_DIRECTORY,
+                    max_size=config.S3_CACHE_MAX_SIZE * 1024 * 1024,
+                    revalidate_interval=config.S3_CACHE_REVALIDATE_INTERVAL
+                )
+            return file_storage
         else:
             return LocalFileStorage(config.DATA_DIRECTORY)
@@ -0,0 +1,170 @@
+"""Provide cache of bare git repository mirrors, used when importing module versions from git."""
+
+import contextlib
+import fcntl
+import hashlib
+import os
+import shutil
+import subprocess
+from typing import Dict, Optional
+
+from terrareg.config import Config
+
+
+class GitMirrorCache:
+    """
+    Bare mirrors of git repositories, stored in a directory per repository URL.
+
+    Tags are cloned from the local mirror, which is only fetched from the upstream
+    repository when the requested tag is not present.
+    Each mirror is locked using a file lock, allowing concurrent use by multiple
+    threads and processes, and the least recently used mirrors are removed when
+    the total size of the cache exceeds the configured maximum size.
+    """
+
+    @classmethod
+    def get(cls) -> Optional['GitMirrorCache']:
+        """Return mirror cache, if a cache directory has been configured."""
+        config = Config()
+        if not config.GIT_MIRROR_CACHE_DIRECTORY:
+            return None
+        return cls(
+            directory=config.GIT_MIRROR_CACHE_DIRECTORY,
+            max_size=config.GIT_MIRROR_CACHE_MAX_SIZE * 1024 * 1024
+        )
+
+    def __init__(self, directory: str, max_size: int):
+        """Store member variables."""
+        self._directory = directory
+        self._max_size = max_size
+
+    def get_mirror_path(self, repository_url: str) -> str:
+        """Return path of mirror for repository URL."""
+        return os.path.join(self._directory, hashlib.sha256(repository_url.encode('utf-8')).hexdigest())
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _lock(mirror_path: str, blocking: bool=True, shared: bool=False):
+        """
+        Obtain lock for mirror, yielding whether the lock was obtained.
+
+        Shared locks are used whilst cloning from the mirror, allowing concurrent clones,
+        and exclusive locks are used whilst updating or removing the mirror.
+        """
+        with open(f"{mirror_path}.lock", "a") as lock_fh:
+            try:
+                fcntl.flock(lock_fh, (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_fh, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _has_tag(mirror_path: str, tag: str) -> bool:
+        """Return whether mirror contains tag."""
+        if not os.path.isdir(mirror_path):
+            return False
+        return subprocess.call(
+            ['git', 'rev-parse', '--verify', '--quiet', f'refs/tags/{tag}^{{commit}}'],
+            cwd=mirror_path,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        ) == 0
+
+    @staticmethod
+    def _update_mirror(mirror_path: str, fetch_url: str, env: Dict[str, str], timeout: Optional[int]) -> None:
+        """Create mirror, if it does not exist, and fetch all branches and tags from upstream repository."""
+        if not os.path.isdir(mirror_path):
+            subprocess.check_output(['git', 'init', '--bare', '--quiet', mirror_path], stderr=subprocess.STDOUT)
+
+        # Pass URL to fetch, rather than configuring a remote,
+        # to avoid storing credentials in the mirror
+        subprocess.check_output(
+            ['git', 'fetch', '--prune', '--tags', '--force', fetch_url, '+refs/heads/*:refs/heads/*'],
+            cwd=mirror_path,
+            stderr=subprocess.STDOUT,
+            env=env,
+            timeout=timeout
+        )
+
+    @staticmethod
+    def _clone_from_mirror(mirror_path: str, tag: str, destination: str, timeout: Optional[int]) -> None:
+        """Clone tag from mirror into destination directory."""
+        # Perform shallow clone from mirror, to only copy objects for the tag
+        subprocess.check_output(
+            ['git', 'clone', '--single-branch', '--depth', '1', '--branch', tag, f'file://{mirror_path}', destination],
+            stderr=subprocess.STDOUT,
+            timeout=timeout
+        )
+
+        # Update modification time of lock file, to record last use of mirror
+        os.utime(f"{mirror_path}.lock")
+
+    def clone_tag(self, repository_url: str, fetch_url: str, tag: str, destination: str,
+                  env: Dict[str, str], timeout: Optional[int]) -> None:
+        """
+        Clone tag of repository into destination directory, via the local mirror.
+
+        repository_url is used to identify the mirror, whereas fetch_url, which may contain credentials,
+        is used to fetch from the upstream repository.
+        """
+        os.makedirs(self._directory, exist_ok=True)
+        mirror_path = self.get_mirror_path(repository_url)
+
+        # Clone from the mirror, if it already contains the tag
+        with self._lock(mirror_path, shared=True):
+            cloned = self._has_tag(mirror_path, tag)
+            if cloned:
+                self._clone_from_mirror(mirror_path=mirror_path, tag=tag, destination=destination, timeout=timeout)
+
+        if not cloned:
+            with self._lock(mirror_path):
+                # Check for tag again, as the mirror may have been updated
+                # whilst waiting for the lock
+                if not self._has_tag(mirror_path, tag):
+                    print(f"Updating git mirror for {repository_url}")
+                    self._update_mirror(mirror_path=mirror_path, fetch_url=fetch_url, env=env, timeout=timeout)
+                self._clone_from_mirror(mirror_path=mirror_path, tag=tag, destination=destination, timeout=timeout)
+
+        self.prune()
+
+    @staticmethod
+    def _get_directory_size(path: str) -> int:
+        """Return total size of files in directory."""
+        total_size = 0
+        for directory, _, files in os.walk(path):
+            for file_name in files:
+                try:
+                    total_size += os.lstat(os.path.join(directory, file_name)).st_size
+                except FileNotFoundError:
+                    pass
+        return total_size
+
+    def prune(self) -> None:
+        """Remove least recently used mirrors, until the cache is within the maximum size."""
+        if not self._max_size or not os.path.isdir(self._directory):
+            return
+
+        mirrors = []
+        for name in os.listdir(self._directory):
+            mirror_path = os.path.join(self._directory, name)
+            lock_path = f"{mirror_path}.lock"
+            if not os.path.isdir(mirror_path) or not os.path.isfile(lock_path):
+                continue
+            mirrors.append((os.path.getmtime(lock_path), mirror_path, self._get_directory_size(mirror_path)))
+
+        total_size = sum(size for _, _, size in mirrors)
+        for _, mirror_path, size in sorted(mirrors):
+            if total_size <= self._max_size:
+                break
+
+            # Skip mirrors that are currently in use
+            with self._lock(mirror_path, blocking=False) as locked:
+                if not locked:
+                    continue
+                print(f"Removing least recently used git mirror: {mirror_path}")
+                shutil.rmtree(mirror_path, ignore_errors=True)
+                total_size -= size
@@ -0,0 +1,315 @@
+
+import datetime
+from typing import Optional, Union
+
+import sqlalchemy
+
+import terrareg.auth
+import terrareg.config
+import terrareg.database
+import terrareg.models
+from terrareg.import_job_status import ImportJobStatus
+
+
+class ImportJob:
+    """Queued import of module version from git, processed by background workers."""
+
+    @classmethod
+    def create(cls, module_provider: 'terrareg.models.ModuleProvider', version: str, git_tag: Optional[str]=None) -> 'ImportJob':
+        """
+        Create import job for module version.
+
+        If an import job for the version is already pending or running,
+        the existing job is returned, to avoid duplicate imports from repeated webhook requests.
+        Only one active job can exist for each version, which is enforced by a unique index,
+        so that concurrent requests cannot create duplicate jobs.
+        """
+        if (existing_job := cls.get_active_by_module_provider_and_version(module_provider=module_provider, version=version)):
+            return existing_job
+
+        now = datetime.datetime.now()
+        db = terrareg.database.Database.get()
+        insert = db.import_job.insert().values(
+            module_provider_id=module_provider.pk,
+            version=version,
+            active_version=version,
+            git_tag=git_tag,
+            status=ImportJobStatus.PENDING,
+            attempts=0,
+            username=terrareg.auth.AuthFactory().get_current_auth_method().get_username(),
+            created_at=now,
+            available_at=now,
+        )
+        # Insert in nested transaction, so that a failure, due to a job being
+        # created by a concurrent request, does not abort any outer transaction
+        try:
+            with terrareg.database.Database.get_new_transaction_or_nested():
+                with db.get_connection() as conn:
+                    res = conn.execute(insert)
+                    return cls(pk=res.lastrowid)
+        except sqlalchemy.exc.IntegrityError:
+            if (existing_job := cls.get_active_by_module_provider_and_version(module_provider=module_provider, version=version)):
+                return existing_job
+            raise
+
+    @classmethod
+    def get_by_pk(cls, pk: int) -> Union[None, 'ImportJob']:
+        """Get import job by ID"""
+        db = terrareg.database.Database.get()
+        select = db.import_job.select().where(
+            db.import_job.c.id==pk
+        )
+        with db.get_connection() as conn:
+            row = conn.execute(select).fetchone()
+
+        if row:
+            return cls(pk=row['id'])
+        return None
+
+    @classmethod
+    def get_active_by_module_provider_and_version(cls, module_provider: 'terrareg.models.ModuleProvider', version: str) -> Union[None, 'ImportJob']:
+        """Get pending or running import job for module version"""
+        db = terrareg.database.Database.get()
+        select = db.import_job.select().where(
+            db.import_job.c.module_provider_id==module_provider.pk,
+            db.import_job.c.version==version,
+            db.import_job.c.status.in_([ImportJobStatus.PENDING, ImportJobStatus.RUNNING])
+        ).order_by(db.import_job.c.id.desc())
+        with db.get_connection() as conn:
+            row = conn.execute(select).fetchone()
+
+        if row:
+            return cls(pk=row['id'])
+        return None
+
+    @classmethod
+    def _fail_expired_jobs(cls):
+        """Mark running jobs, whose lease has expired and have no remaining attempts, as failed."""
+        now = datetime.datetime.now()
+        db = terrareg.database.Database.get()
+        update = sqlalchemy.update(
+            db.import_job
+        ).where(
+            db.import_job.c.status==ImportJobStatus.RUNNING,
+            db.import_job.c.lease_expires_at < now,
+            db.import_job.c.attempts >= terrareg.config.Config().IMPORT_JOB_MAX_ATTEMPTS
+        ).values(
+            status=ImportJobStatus.FAILED,
+            active_version=None,
+            message='Import job was not completed by worker',
+            worker_id=None,
+            lease_expires_at=None,
+            completed_at=now,
+        )
+        with db.get_connection() as conn:
+            conn.execute(update)
+
+    @classmethod
+    def claim_next(cls, worker_id: str) -> Union[None, 'ImportJob']:
+        """
+        Claim next available import job for worker, returning None if no jobs are available.
+
+        Pending jobs and running jobs, whose lease has expired, are available to be claimed.
+        Jobs are claimed using a conditional update, so that a job can only be claimed by a single worker.
+        """
+        cls._fail_expired_jobs()
+
+        config = terrareg.config.Config()
+        now = datetime.datetime.now()
+        db = terrareg.database.Database.get()
+        claimable_condition = sqlalchemy.or_(
+            sqlalchemy.and_(
+                db.import_job.c.status==ImportJobStatus.PENDING,
+                db.import_job.c.available_at <= now
+            ),
+            sqlalchemy.and_(
+                db.import_job.c.status==ImportJobStatus.RUNNING,
+                db.import_job.c.lease_expires_at < now
+            )
+        )
+        select = sqlalchemy.select(
+            db.import_job.c.id
+        ).where(
+            claimable_condition
+        ).order_by(
+            db.import_job.c.available_at,
+            db.import_job.c.id
+        ).limit(10)
+
+        with db.get_connection() as conn:
+            candidate_ids = [row['id'] for row in conn.execute(select).all()]
+
+            for candidate_id in candidate_ids:
+                update = sqlalchemy.update(
+                    db.import_job
+                ).where(
+                    db.import_job.c.id==candidate_id,
+                    claimable_condition
+                ).values(
+                    status=ImportJobStatus.RUNNING,
+                    worker_id=worker_id,
+                    attempts=db.import_job.c.attempts + 1,
+                    lease_expires_at=now + datetime.timedelta(seconds=config.IMPORT_JOB_LEASE_SECONDS),
+                    started_at=now,
+                )
+                # If another worker has claimed the job, no rows will be updated
+                if conn.execute(update).rowcount == 1:
+                    return cls(pk=candidate_id)
+
+        return None
+
+    @property
+    def pk(self) -> int:
+        """Return DB ID"""
+        return self._pk
+
+    @property
+    def module_provider(self) -> Union[None, 'terrareg.models.ModuleProvider']:
+        """Return module provider for import job"""
+        db = terrareg.database.Database.get()
+        select = sqlalchemy.select(
+            db.namespace.c.namespace,
+            db.module_provider.c.module,
+            db.module_provider.c.provider
+        ).select_from(
+            db.module_provider
+        ).join(
+            db.namespace,
+            db.module_provider.c.namespace_id==db.namespace.c.id
+        ).where(
+            db.module_provider.c.id==self._get_db_row()['module_provider_id']
+        )
+        with db.get_connection() as conn:
+            row = conn.execute(select).fetchone()
+
+        if not row:
+            return None
+
+        namespace = terrareg.models.Namespace(name=row['namespace'])
+        module = terrareg.models.Module(namespace=namespace, name=row['module'])
+        return terrareg.models.ModuleProvider(module=module, name=row['provider'])
+
+    @property
+    def version(self) -> str:
+        """Return version to be imported"""
+        return self._get_db_row()['version']
+
+    @property
+    def git_tag(self) -> Optional[str]:
+        """Return git tag to be imported"""
+        return self._get_db_row()['git_tag']
+
+    @property
+    def status(self) -> ImportJobStatus:
+        """Return status of import job"""
+        return self._get_db_row()['status']
+
+    @property
+    def attempts(self) -> int:
+        """Return number of attempts made to process job"""
+        return self._get_db_row()['attempts']
+
+    @property
+    def username(self) -> Optional[str]:
+        """Return username of user that created job"""
+        return self._get_db_row()['username']
+
+    @property
+    def message(self) -> Optional[str]:
+        """Return message from last attempt of job"""
+        return self._get_db_row()['message']
+
+    def __init__(self, pk: int):
+        """Store member variables"""
+        self._pk = pk
+        self._row_cache = None
+
+    def _get_db_row(self):
+        """Return DB row for import job."""
+        if self._row_cache is None:
+            db = terrareg.database.Database.get()
+            select = db.import_job.select().where(
+                db.import_job.c.id==self.pk
+            )
+            with db.get_connection() as conn:
+                res = conn.execute(select)
+                self._row_cache = res.fetchone()
+        return self._row_cache
+
+    def _update_running_job(self, worker_id: str, values: dict) -> bool:
+        """Update job, if it is still leased by the worker, returning whether the job was updated."""
+        db = terrareg.database.Database.get()
+        update = sqlalchemy.update(
+            db.import_job
+        ).where(
+            db.import_job.c.id==self.pk,
+            db.import_job.c.status==ImportJobStatus.RUNNING,
+            db.import_job.c.worker_id==worker_id
+        ).values(**values)
+        with db.get_connection() as conn:
+            res = conn.execute(update)
+
+        # Remove cached DB row
+        self._row_cache = None
+        return res.rowcount == 1
+
+    def heartbeat(self, worker_id: str) -> bool:
+        """Extend lease of job for worker, returning whether the worker still holds the lease."""
+        return self._update_running_job(worker_id=worker_id, values={
+            'lease_expires_at': datetime.datetime.now() + datetime.timedelta(seconds=terrareg.config.Config().IMPORT_JOB_LEASE_SECONDS),
+        })
+
+    def mark_succeeded(self, worker_id: str) -> bool:
+        """Mark job as successfully completed"""
+        return self._update_running_job(worker_id=worker_id, values={
+            'status': ImportJobStatus.SUCCEEDED,
+            'active_version': None,
+            'message': None,
+            'lease_expires_at': None,
+            'completed_at': datetime.datetime.now(),
+        })
+
+    def mark_failed(self, worker_id: str, message: str) -> bool:
+        """
+        Record failed attempt of job.
+
+        If the job has remaining attempts, it is re-queued, with an exponential backoff,
+        otherwise it is marked as failed.
+        """
+        config = terrareg.config.Config()
+        now = datetime.datetime.now()
+        message = message[:1024]
+        if self.attempts >= config.IMPORT_JOB_MAX_ATTEMPTS:
+            return self._update_running_job(worker_id=worker_id, values={
+                'status': ImportJobStatus.FAILED,
+                'active_version': None,
+                'message': message,
+                'lease_expires_at': None,
+                'completed_at': now,
+            })
+
+        backoff = config.IMPORT_JOB_RETRY_BACKOFF_SECONDS * (2 ** max(self.attempts - 1, 0))
+        return self._update_running_job(worker_id=worker_id, values={
+            'status': ImportJobStatus.PENDING,
+            'message': message,
+            'worker_id': None,
+            'lease_expires_at': None,
+            'available_at': now + datetime.timedelta(seconds=backoff),
+        })
+
+    def get_api_outline(self) -> dict:
+        """Return API details of import job"""
+        row = self._get_db_row()
+        module_provider = self.module_provider
+        return {
+            'id': self.pk,
+            'status': row['status'].value,
+            'module_provider_id': module_provider.id if module_provider else None,
+            'version': row['version'],
+            'git_tag': row['git_tag'],
+            'attempts': row['attempts'],
+            'message': row['message'],
+            'created_at': row['created_at'].isoformat(),
+            'started_at': row['started_at'].isoformat() if row['started_at'] else None,
+            'completed_at': row['completed_at'].isoformat() if row['completed_at'] else None,
+        }
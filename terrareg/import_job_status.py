@@ -0,0 +1,11 @@
+
+from enum import Enum
+
+
+class ImportJobStatus(Enum):
+    """Status of module version import job."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
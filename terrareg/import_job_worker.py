@@ -0,0 +1,152 @@
+"""Provide background processing of import jobs."""
+
+import os
+import socket
+import threading
+import traceback
+import uuid
+from typing import List
+
+import flask
+
+import terrareg.auth
+import terrareg.config
+import terrareg.database
+import terrareg.errors
+import terrareg.models
+import terrareg.module_extractor
+from terrareg.import_job_model import ImportJob
+
+
+class ImportJobWorker:
+    """
+    Claim and process queued import jobs.
+
+    Multiple workers, in the same or separate processes, can process jobs from the same queue,
+    as each job is leased by a single worker, which periodically extends the lease whilst processing the job.
+    """
+
+    # Interval to check for new jobs, when no jobs are available
+    POLL_INTERVAL = 5
+
+    def __init__(self, app: flask.Flask):
+        """Store member variables."""
+        self._app = app
+        self._worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._stop_event = threading.Event()
+
+    @property
+    def worker_id(self) -> str:
+        """Return ID of worker, used for leasing jobs."""
+        return self._worker_id
+
+    def stop(self):
+        """Stop worker, after processing current job."""
+        self._stop_event.set()
+
+    def _heartbeat_loop(self, job: ImportJob, stop_event: threading.Event, lease_lost_event: threading.Event):
+        """Periodically extend lease of job, until stop event is set, setting lease lost event if the lease is lost."""
+        interval = max(terrareg.config.Config().IMPORT_JOB_LEASE_SECONDS / 3, 1)
+        while not stop_event.wait(interval):
+            try:
+                if not job.heartbeat(worker_id=self._worker_id):
+                    # Ignore lease being released by job completing
+                    if not stop_event.is_set():
+                        print(f"Import job {job.pk}: lease has been lost by worker {self._worker_id}")
+                        lease_lost_event.set()
+                    return
+            except Exception as exc:
+                print(f"Import job {job.pk}: failed to extend lease: {exc}")
+
+    def _process_job(self, job: ImportJob, lease_lost_event: threading.Event):
+        """
+        Import module version for job.
+
+        The job is marked as succeeded within the transaction of the import,
+        so that the import is rolled back if the lease of the job has been lost to another worker.
+        """
+        with self._app.app_context():
+            # Perform actions as the user that created the job, for audit events
+            setattr(
+                flask.g, terrareg.auth.AuthFactory.FLASK_GLOBALS_AUTH_KEY,
+                terrareg.auth.ImportJobAuthMethod(username=job.username)
+            )
+
+            module_provider = job.module_provider
+            if module_provider is None:
+                raise terrareg.errors.ImportJobModuleProviderDoesNotExistError('Module provider no longer exists')
+
+            with terrareg.database.Database.start_transaction():
+                module_version = terrareg.models.ModuleVersion(module_provider=module_provider, version=job.version)
+                with module_version.module_create_extraction_wrapper():
+                    with terrareg.module_extractor.GitModuleExtractor(module_version=module_version) as me:
+                        me.process_upload()
+
+                if lease_lost_event.is_set() or not job.mark_succeeded(worker_id=self._worker_id):
+                    raise terrareg.errors.ImportJobLeaseLostError('Lease of import job has been lost')
+
+    def process_next_job(self) -> bool:
+        """Claim and process next available job, returning whether a job was processed."""
+        job = ImportJob.claim_next(worker_id=self._worker_id)
+        if job is None:
+            return False
+
+        print(f"Import job {job.pk}: processing import of version {job.version} (attempt {job.attempts})")
+
+        heartbeat_stop_event = threading.Event()
+        lease_lost_event = threading.Event()
+        heartbeat_thread = threading.Thread(
+            target=self._heartbeat_loop,
+            args=(job, heartbeat_stop_event, lease_lost_event),
+            daemon=True,
+            name=f'import-job-heartbeat-{job.pk}'
+        )
+        heartbeat_thread.start()
+        try:
+            self._process_job(job, lease_lost_event=lease_lost_event)
+        except terrareg.errors.ImportJobLeaseLostError:
+            # The job is now leased by another worker, so do not update it
+            print(f"Import job {job.pk}: lease was lost whilst importing, so import has been rolled back")
+        except terrareg.errors.TerraregError as exc:
+            print(f"Import job {job.pk}: import failed: {exc}")
+            self._mark_failed(job, message=str(exc))
+        except Exception as exc:
+            print(f"Import job {job.pk}: unexpected error whilst importing: {exc}")
+            traceback.print_exc()
+            self._mark_failed(job, message='An unexpected error occurred whilst importing module version')
+        else:
+            print(f"Import job {job.pk}: import succeeded")
+        finally:
+            heartbeat_stop_event.set()
+            heartbeat_thread.join()
+
+        return True
+
+    def _mark_failed(self, job: ImportJob, message: str):
+        """Record failed attempt of job, if the job is still leased by the worker."""
+        if not job.mark_failed(worker_id=self._worker_id, message=message):
+            print(f"Import job {job.pk}: unable to record failure, as lease has been lost by worker {self._worker_id}")
+
+    def run(self):
+        """Process jobs until worker is stopped."""
+        while not self._stop_event.is_set():
+            try:
+                processed_job = self.process_next_job()
+            except Exception as exc:
+                print(f"Import job worker {self._worker_id}: error whilst processing jobs: {exc}")
+                processed_job = False
+
+            # Wait before checking for jobs, if there were none available
+            if not processed_job:
+                self._stop_event.wait(self.POLL_INTERVAL)
+
+    @classmethod
+    def start_worker_threads(cls, app: flask.Flask, count: int) -> List[threading.Thread]:
+        """Start worker threads, returning list of threads."""
+        threads = []
+        for index in range(count):
+            worker = cls(app=app)
+            thread = threading.Thread(target=worker.run, daemon=True, name=f'import-job-worker-{index}')
+            thread.start()
+            threads.append(thread)
+        return threads
@@ -1,6 +1,7 @@
 
 import contextlib
 import datetime
+import hashlib
 from typing import Optional
 from enum import Enum
 import os
@@ -10,6 +11,7 @@ import secrets
 from tempfile import mkdtemp
 import tempfile
 import urllib.parse
+import zlib
 import gnupg
 from typing import List, Union
 
@@ -49,6 +51,7 @@ import terrareg.provider_model
 import terrareg.provider_version_model
 import terrareg.registry_resource_type
 import terrareg.file_storage
+import terrareg.module_leaderboard
 
 
 class Session:
@@ -1167,6 +1170,10 @@ class Namespace(object):
         # Remove cached DB row
         self._cache_db_row = None
 
+        # Leaderboards contain namespace names, so must be re-calculated
+        if 'namespace' in kwargs:
+            terrareg.module_leaderboard.ModuleLeaderboard.invalidate()
+
     def get_view_url(self, resource_type: 'terrareg.registry_resource_type.RegistryResourceType'):
         """Return view URL"""
         if resource_type is terrareg.registry_resource_type.RegistryResourceType.MODULE:
@@ -2581,6 +2588,8 @@ class ModuleProvider(object):
         for redirect in ModuleProviderRedirect.get_by_module_provider(self):
             redirect.delete(internal_force=True, create_audit_event=False)
 
+        terrareg.analytics.AnalyticsEngine.delete_name_usage_for_module_provider(self)
+
         db = Database.get()
 
         file_storage = terrareg.file_storage.FileStorageFactory().get_file_storage()
@@ -2661,6 +2670,10 @@ class ModuleProvider(object):
         # Remove cached DB row
         self._cache_db_row = None
 
+        # Re-calculate leaderboards if the name or latest version has changed
+        if set(kwargs) & {'namespace_id', 'module', 'provider', 'latest_version_id'}:
+            terrareg.module_leaderboard.ModuleLeaderboard.invalidate()
+
     def update_verified(self, verified):
         """Update verified flag of module provider."""
         if verified in [True, False] and verified != self.verified:
@@ -3576,6 +3589,11 @@ class ModuleVersion(TerraformSpecsObject):
         """Whether object is submodule."""
         return False
 
+    @property
+    def published_at(self) -> Optional[datetime.datetime]:
+        """Return date that module version was published."""
+        return self._get_db_row()['published_at']
+
     @property
     def publish_date_display(self):
         """Return display view of date of module published."""
@@ -3609,6 +3627,29 @@ class ModuleVersion(TerraformSpecsObject):
         """Return git SHA of tag"""
         return self._get_db_row()["git_sha"]
 
+    @property
+    def upload_sha256(self) -> Optional[str]:
+        """Return SHA-256 checksum of uploaded module archive, if module version was uploaded via API"""
+        return self._get_db_row()["upload_sha256"]
+
+    @property
+    def archive_sha256(self) -> Optional[str]:
+        """Return SHA-256 checksum of generated zip archive, if available"""
+        return self._get_db_row()["archive_sha256"]
+
+    @property
+    def archive_size(self) -> Optional[int]:
+        """Return size of generated zip archive, if available"""
+        return self._get_db_row()["archive_size"]
+
+    @property
+    def extraction_report(self) -> Optional[dict]:
+        """Return report of duration and resource usage of extraction stages, if available"""
+        raw_json = Database.decode_blob(self._get_db_row()["extraction_report"])
+        if not raw_json:
+            return None
+        return json.loads(raw_json)
+
     @property
     def source_git_tag(self):
         """Return git tag used for extraction clone"""
@@ -3762,7 +3803,7 @@ class ModuleVersion(TerraformSpecsObject):
     def module_version_files(self):
         """Return list of module version files for module version"""
         db = Database.get()
-        select = db.module_version_file.select().join(
+        select = ModuleVersionFile._select_with_content().join(
             db.module_version, db.module_version_file.c.module_version_id==db.module_version.c.id
         ).where(
             db.module_version.c.id==self.pk
@@ -4195,7 +4236,7 @@ class ModuleVersion(TerraformSpecsObject):
         """Update attributes of module version in database row."""
         # Check for any blob and encode the values
         for kwarg in kwargs:
-            if kwarg in ['variable_template']:
+            if kwarg in ['variable_template', 'extraction_report']:
                 kwargs[kwarg] = Database.encode_blob(kwargs[kwarg])
 
         db = Database.get()
@@ -4208,6 +4249,10 @@ class ModuleVersion(TerraformSpecsObject):
         # Clear cached DB row
         self._cache_db_row = None
 
+        # Re-calculate leaderboards if the visibility of the module version has changed
+        if set(kwargs) & {'published', 'published_at', 'beta', 'internal'}:
+            terrareg.module_leaderboard.ModuleLeaderboard.invalidate()
+
     def delete(self, delete_related_analytics=True):
         """Delete module version and all associated submodules."""
         for example in self.get_examples():
@@ -4216,6 +4261,8 @@ class ModuleVersion(TerraformSpecsObject):
         for submodule in self.get_submodules():
             submodule.delete()
 
+        ModuleVersionFile.delete_by_module_version(self)
+
         if delete_related_analytics:
             terrareg.analytics.AnalyticsEngine.delete_analytics_for_module_version(self)
 
@@ -4564,6 +4611,108 @@ class Example(BaseSubmodule):
         return api_details
 
 
+class FileBlob:
+    """
+    Content of example and module version files, stored once per unique content.
+
+    Content is compressed and stored against the SHA-256 digest of the uncompressed content.
+    Blobs are removed once they are no longer referenced by any file.
+    """
+
+    # Number of attempts to obtain blobs, if a blob is created
+    # by another import whilst blobs are being created
+    GET_OR_CREATE_ATTEMPTS = 3
+
+    @staticmethod
+    def get_digest(content: bytes) -> str:
+        """Return digest used to identify content."""
+        return hashlib.sha256(content).hexdigest()
+
+    @staticmethod
+    def compress(content: bytes) -> bytes:
+        """Compress content for storage."""
+        return zlib.compress(content)
+
+    @staticmethod
+    def decompress(content: Optional[bytes]) -> Optional[bytes]:
+        """Decompress stored content."""
+        if content is None:
+            return None
+        return zlib.decompress(content)
+
+    @classmethod
+    def get_or_create(cls, contents: List[bytes]) -> List[int]:
+        """
+        Obtain the blob of each of the provided contents,
+        creating blobs for any content that is not already stored.
+
+        Returns IDs of the blobs, in the order of the provided contents.
+        """
+        digests = [cls.get_digest(content) for content in contents]
+        if not digests:
+            return []
+
+        for attempt in range(cls.GET_OR_CREATE_ATTEMPTS):
+            try:
+                blob_ids = cls._get_or_create(dict(zip(digests, contents)))
+                break
+            except sqlalchemy.exc.IntegrityError:
+                # Blob has been created by a concurrent import,
+                # so retry, using the existing blob
+                if attempt == cls.GET_OR_CREATE_ATTEMPTS - 1:
+                    raise
+
+        return [blob_ids[digest] for digest in digests]
+
+    @classmethod
+    def _get_or_create(cls, contents: dict) -> dict:
+        """Obtain blobs, inserting any new blobs, returning blob IDs by digest."""
+        db = Database.get()
+        # Insert blobs within a nested transaction, so that, if a blob has been created
+        # by a concurrent import, only the insert is rolled back
+        with Database.get_new_transaction_or_nested(), db.get_connection() as conn:
+            # Lock existing blobs for share, so that they cannot be removed whilst the
+            # files referencing them are being created, without blocking other imports
+            blob_ids = {
+                row['sha256']: row['id']
+                for row in conn.execute(
+                    sqlalchemy.select(db.file_blob.c.id, db.file_blob.c.sha256).where(
+                        db.file_blob.c.sha256.in_(list(contents))
+                    ).with_for_update(read=True)
+                )
+            }
+
+            # Insert all new blobs in a single statement
+            new_digests = [digest for digest in contents if digest not in blob_ids]
+            if new_digests:
+                conn.execute(db.file_blob.insert(), [
+                    {'sha256': digest, 'content': cls.compress(contents[digest])}
+                    for digest in new_digests
+                ])
+                for row in conn.execute(
+                        sqlalchemy.select(db.file_blob.c.id, db.file_blob.c.sha256).where(
+                            db.file_blob.c.sha256.in_(new_digests)
+                        )):
+                    blob_ids[row['sha256']] = row['id']
+
+        return blob_ids
+
+    @classmethod
+    def delete_unreferenced(cls, blob_ids: List[Optional[int]]):
+        """Delete any of the blobs that are no longer referenced by example or module version files."""
+        blob_ids = list(set(blob_id for blob_id in blob_ids if blob_id is not None))
+        if not blob_ids:
+            return
+
+        db = Database.get()
+        with db.get_connection() as conn:
+            conn.execute(db.file_blob.delete().where(
+                db.file_blob.c.id.in_(blob_ids),
+                ~sqlalchemy.exists().where(db.example_file.c.file_blob_id == db.file_blob.c.id),
+                ~sqlalchemy.exists().where(db.module_version_file.c.file_blob_id == db.file_blob.c.id)
+            ))
+
+
 class FileObject:
     """Base file object for example/module file in DB"""
 
@@ -4572,6 +4721,36 @@ class FileObject:
         """Return DB table for class"""
         raise NotImplementedError
 
+    @classmethod
+    def _select_with_content(cls):
+        """Return select for DB table, including content of the file from the file blob table."""
+        db = Database.get()
+        table = cls.get_db_table()
+        return sqlalchemy.select(
+            table, db.file_blob.c.content
+        ).select_from(
+            table.outerjoin(db.file_blob, table.c.file_blob_id == db.file_blob.c.id)
+        )
+
+    @classmethod
+    def _insert_files(cls, files: List[dict]):
+        """
+        Insert rows for files, storing content in file blobs.
+
+        Each file is a dict of column values, including 'content'.
+        All rows are inserted using a single statement.
+        """
+        if not files:
+            return
+
+        blob_ids = FileBlob.get_or_create([Database.encode_blob(file['content']) for file in files])
+        db = Database.get()
+        with db.get_connection() as conn:
+            conn.execute(cls.get_db_table().insert(), [
+                dict({column: value for column, value in file.items() if column != 'content'}, file_blob_id=blob_id)
+                for file, blob_id in zip(files, blob_ids)
+            ])
+
     @property
     def file_name(self):
         """Return name of file"""
@@ -4593,7 +4772,7 @@ class FileObject:
 
     def get_content(self, sanitise=True):
         """Return content of example file."""
-        content = Database.decode_blob(self._get_db_row()["content"])
+        content = Database.decode_blob(FileBlob.decompress(self._get_db_row()["content"]))
         if content and sanitise:
             # Add pre tags before/after to allow for broken tags
             # inside content, e.g. for heredocs
@@ -4615,10 +4794,12 @@ class FileObject:
 
     def update_attributes(self, **kwargs):
         """Update DB row."""
-        # Encode columns that are binary blobs in the database
-        for kwarg in kwargs:
-            if kwarg in ['content']:
-                kwargs[kwarg] = Database.encode_blob(kwargs[kwarg])
+        # Store content in file blob, removing the blob
+        # of the previous content, if it is no longer used
+        previous_blob_id = None
+        if 'content' in kwargs:
+            previous_blob_id = self._get_db_row()['file_blob_id']
+            kwargs['file_blob_id'] = FileBlob.get_or_create([Database.encode_blob(kwargs.pop('content'))])[0]
 
         db = Database.get()
         update = self.get_db_table().update().where(
@@ -4627,19 +4808,24 @@ class FileObject:
         with db.get_connection() as conn:
             conn.execute(update)
 
+        FileBlob.delete_unreferenced([previous_blob_id])
+
         # Remove cached DB row
         self._cache_db_row = None
 
     def delete(self):
-        """Delete example file from DB."""
+        """Delete file from DB."""
         db = Database.get()
+        blob_id = self._get_db_row()['file_blob_id']
 
         with db.get_connection() as conn:
-            delete_statement = db.example_file.delete().where(
-                db.example_file.c.id == self.pk
+            delete_statement = self.get_db_table().delete().where(
+                self.get_db_table().c.id == self.pk
             )
             conn.execute(delete_statement)
 
+        FileBlob.delete_unreferenced([blob_id])
+
         # Invalidate DB row cache
         self._cache_db_row = None
 
@@ -4667,6 +4853,15 @@ class ExampleFile(FileObject):
         # Return instance of object
         return cls(example=example, path=path)
 
+    @classmethod
+    def create_many(cls, example: Example, files: dict):
+        """Create example files in database, from dict of file contents, keyed by path."""
+        cls._insert_files([
+            {'submodule_id': example.pk, 'path': path, 'content': content}
+            for path, content in files.items()
+        ])
+        return [cls(example=example, path=path) for path in files]
+
     @staticmethod
     def get_by_path(module_version: ModuleVersion, file_path: str):
         """Return example file object by file path and module version"""
@@ -4718,7 +4913,7 @@ class ExampleFile(FileObject):
         if self._cache_db_row is None:
             db = Database.get()
             # Obtain row from git providers table for git provider.
-            select = db.example_file.select().where(
+            select = self._select_with_content().where(
                 db.example_file.c.submodule_id == self._example.pk,
                 db.example_file.c.path == self._path
             )
@@ -4767,6 +4962,34 @@ class ModuleVersionFile(FileObject):
         # Return instance of object
         return cls(module_version=module_version, path=path)
 
+    @classmethod
+    def create_many(cls, module_version: ModuleVersion, files: dict):
+        """Create module version files in database, from dict of file contents, keyed by path."""
+        cls._insert_files([
+            {'module_version_id': module_version.pk, 'path': path, 'content': content}
+            for path, content in files.items()
+        ])
+        return [cls(module_version=module_version, path=path) for path in files]
+
+    @classmethod
+    def delete_by_module_version(cls, module_version: ModuleVersion):
+        """Delete all files for module version."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            blob_ids = [
+                row['file_blob_id']
+                for row in conn.execute(
+                    sqlalchemy.select(db.module_version_file.c.file_blob_id).where(
+                        db.module_version_file.c.module_version_id == module_version.pk
+                    )
+                )
+            ]
+            conn.execute(db.module_version_file.delete().where(
+                db.module_version_file.c.module_version_id == module_version.pk
+            ))
+
+        FileBlob.delete_unreferenced(blob_ids)
+
     def __init__(self, module_version: ModuleVersion, path: str):
         """Store identifying data."""
         self._module_version = module_version
@@ -4776,7 +4999,7 @@ class ModuleVersionFile(FileObject):
         """Return DB row for git provider."""
         if self._cache_db_row is None:
             db = Database.get()
-            select = db.module_version_file.select().where(
+            select = self._select_with_content().where(
                 db.module_version_file.c.module_version_id == self._module_version.pk,
                 db.module_version_file.c.path == self._path
             )
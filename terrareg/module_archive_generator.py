@@ -0,0 +1,229 @@
+"""Provide generation of module source archives."""
+
+import gzip
+import hashlib
+import os
+import shutil
+import stat
+import tarfile
+import zipfile
+from typing import BinaryIO, Dict, List, Optional, Set, Tuple, Union
+
+from terrareg.utils import PathDoesNotExistError, PathIsNotWithinBaseDirectoryError, check_subdirectory_within_base_dir
+
+
+class _TeeReader:
+    """File-like object, which writes all data read from the source file to an output file."""
+
+    def __init__(self, source_fh: BinaryIO, output_fh: BinaryIO):
+        """Store member variables."""
+        self._source_fh = source_fh
+        self._output_fh = output_fh
+
+    def read(self, size: int=-1) -> bytes:
+        """Read data from source file, writing it to the output file."""
+        data = self._source_fh.read(size)
+        self._output_fh.write(data)
+        return data
+
+
+class _DigestWriter:
+    """
+    Sequential file-like object, which calculates the SHA-256 checksum and size of data written to an output file.
+
+    The writer is not seekable, so that zip archives are written in a single pass,
+    without re-writing member headers, allowing the checksum to be calculated whilst writing.
+    """
+
+    def __init__(self, output_fh: BinaryIO):
+        """Store member variables."""
+        self._output_fh = output_fh
+        self._sha256 = hashlib.sha256()
+        self._size = 0
+
+    @property
+    def sha256(self) -> str:
+        """Return hex digest of SHA-256 checksum of content written."""
+        return self._sha256.hexdigest()
+
+    @property
+    def size(self) -> int:
+        """Return number of bytes written."""
+        return self._size
+
+    def write(self, data: bytes) -> int:
+        """Write data to output file, updating checksum and size."""
+        self._sha256.update(data)
+        self._size += len(data)
+        return self._output_fh.write(data)
+
+    def tell(self) -> int:
+        """Return number of bytes written."""
+        return self._size
+
+    def flush(self) -> None:
+        """Flush output file."""
+        self._output_fh.flush()
+
+
+class ModuleArchiveGenerator:
+    """
+    Generate tar.gz and zip archives of a module source directory.
+
+    Both archives are generated during a single walk of the source directory,
+    reading each file once, and are written directly to the provided file objects.
+
+    Archives are reproducible: members are ordered by path and have fixed modification times,
+    ownership and permissions, so identical source directories produce identical archives.
+    """
+
+    # Modification time of all archive members.
+    # Zip archives do not support dates before 1980.
+    ARCHIVE_MTIME = 315532800
+    ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+    # Entries in the root of the source directory that are not added to archives
+    EXCLUDED_ROOT_ENTRIES = ['.git']
+
+    def __init__(self, source_directory: str):
+        """Store member variables."""
+        self._source_directory = source_directory
+
+    def _get_entries(self) -> List[Tuple[str, str]]:
+        """Return sorted list of relative path and full path of all entries in source directory."""
+        entries = []
+        for directory, sub_directories, files in os.walk(self._source_directory):
+            relative_directory = os.path.relpath(directory, self._source_directory)
+            if relative_directory == '.':
+                sub_directories[:] = [
+                    sub_directory
+                    for sub_directory in sub_directories
+                    if sub_directory not in self.EXCLUDED_ROOT_ENTRIES
+                ]
+                files = [file_name for file_name in files if file_name not in self.EXCLUDED_ROOT_ENTRIES]
+
+            # Symlinks to directories are returned as directories, but are not walked
+            for name in sub_directories + files:
+                relative_path = name if relative_directory == '.' else f"{relative_directory}/{name}"
+                entries.append((relative_path.replace(os.path.sep, '/'), os.path.join(directory, name)))
+
+        return sorted(entries)
+
+    def _create_tar_info(self, name: str, type_: bytes, mode: int, size: int=0, linkname: str='') -> tarfile.TarInfo:
+        """Create tar member with normalised attributes."""
+        tar_info = tarfile.TarInfo(name=name)
+        tar_info.type = type_
+        tar_info.mode = mode
+        tar_info.size = size
+        tar_info.linkname = linkname
+        tar_info.mtime = self.ARCHIVE_MTIME
+        tar_info.uid = tar_info.gid = 0
+        tar_info.uname = tar_info.gname = ''
+        return tar_info
+
+    def _create_zip_info(self, name: str, file_type: int, mode: int) -> zipfile.ZipInfo:
+        """Create zip member with normalised attributes."""
+        zip_info = zipfile.ZipInfo(filename=name, date_time=self.ZIP_DATE_TIME)
+        zip_info.create_system = 3
+        zip_info.external_attr = (file_type | mode) << 16
+        if file_type == stat.S_IFDIR:
+            # Set MS-DOS directory flag
+            zip_info.external_attr |= 0x10
+        else:
+            zip_info.compress_type = zipfile.ZIP_DEFLATED
+        return zip_info
+
+    @staticmethod
+    def _get_file_mode(path_stat: os.stat_result) -> int:
+        """Return normalised mode of regular file."""
+        return 0o755 if path_stat.st_mode & stat.S_IXUSR else 0o644
+
+    def _get_link_target(self, path: str) -> Optional[str]:
+        """
+        Return real path of target of symlink.
+
+        Returns None if the target does not exist or is not within the source directory.
+        """
+        try:
+            target_path = check_subdirectory_within_base_dir(base_dir=self._source_directory, sub_dir=path)
+        except (PathDoesNotExistError, PathIsNotWithinBaseDirectoryError):
+            return None
+        return target_path if os.path.exists(target_path) else None
+
+    def _add_zip_link_target(self, zip_file: zipfile.ZipFile, name: str, target_path: str, expanded_directories: Set[str]) -> None:
+        """
+        Add content of symlink target to zip archive.
+
+        Directories are added recursively, following symlinks within the source directory.
+        Directories that are already being added are skipped, to avoid symlink loops.
+        """
+        if os.path.isdir(target_path):
+            if target_path in expanded_directories:
+                return
+            expanded_directories = expanded_directories | {target_path}
+
+            zip_file.writestr(self._create_zip_info(f"{name}/", stat.S_IFDIR, 0o755), b'')
+            for entry_name in sorted(os.listdir(target_path)):
+                entry_path = os.path.join(target_path, entry_name)
+                if os.path.islink(entry_path):
+                    entry_path = self._get_link_target(entry_path)
+                    if entry_path is None:
+                        continue
+                self._add_zip_link_target(zip_file, f"{name}/{entry_name}", entry_path, expanded_directories)
+
+        elif os.path.isfile(target_path):
+            path_stat = os.stat(target_path)
+            zip_info = self._create_zip_info(name, stat.S_IFREG, self._get_file_mode(path_stat))
+            zip_info.file_size = path_stat.st_size
+            with open(target_path, 'rb') as source_fh, \
+                    zip_file.open(zip_info, mode='w', force_zip64=zip_info.file_size >= zipfile.ZIP64_LIMIT) as zip_member_fh:
+                shutil.copyfileobj(source_fh, zip_member_fh)
+
+    def generate(self, tar_gz_fh: BinaryIO, zip_fh: BinaryIO) -> Dict[str, Union[str, int]]:
+        """
+        Write tar.gz archive and zip archive of source directory to file objects.
+
+        Returns the SHA-256 checksum and size of the zip archive.
+        """
+        zip_digest_fh = _DigestWriter(zip_fh)
+        # Create gzip stream without filename or timestamp, so that the archive is reproducible
+        with gzip.GzipFile(filename='', mode='wb', fileobj=tar_gz_fh, mtime=0) as gzip_fh, \
+                tarfile.open(fileobj=gzip_fh, mode='w', format=tarfile.PAX_FORMAT) as tar, \
+                zipfile.ZipFile(zip_digest_fh, mode='w', compression=zipfile.ZIP_DEFLATED) as zip_file:
+
+            for name, path in self._get_entries():
+                path_stat = os.lstat(path)
+
+                if stat.S_ISLNK(path_stat.st_mode):
+                    # Do not add symlinks to files outside of the source directory
+                    target_path = self._get_link_target(path)
+                    if target_path is None:
+                        print(f"Not adding symlink to module archives, as target does not exist within module source: {name}")
+                        continue
+
+                    tar.addfile(self._create_tar_info(name, tarfile.SYMTYPE, 0o777, linkname=os.readlink(path)))
+                    # Symlinks are not consistently supported when extracting zip archives,
+                    # so add the content of the symlink target to the zip archive
+                    self._add_zip_link_target(zip_file, name, target_path, expanded_directories=set())
+
+                elif stat.S_ISDIR(path_stat.st_mode):
+                    tar.addfile(self._create_tar_info(name, tarfile.DIRTYPE, 0o755))
+                    zip_file.writestr(self._create_zip_info(f"{name}/", stat.S_IFDIR, 0o755), b'')
+
+                elif stat.S_ISREG(path_stat.st_mode):
+                    mode = self._get_file_mode(path_stat)
+                    tar_info = self._create_tar_info(name, tarfile.REGTYPE, mode, size=path_stat.st_size)
+                    zip_info = self._create_zip_info(name, stat.S_IFREG, mode)
+                    zip_info.file_size = path_stat.st_size
+
+                    # Read file once, writing the data to the zip member whilst it is added to the tar archive
+                    with open(path, 'rb') as source_fh, \
+                            zip_file.open(zip_info, mode='w', force_zip64=path_stat.st_size >= zipfile.ZIP64_LIMIT) as zip_member_fh:
+                        tar.addfile(tar_info, _TeeReader(source_fh, zip_member_fh))
+
+                # Other file types (e.g. sockets and FIFOs) are not added to archives
+
+        return {
+            'sha256': zip_digest_fh.sha256,
+            'size': zip_digest_fh.size,
+        }
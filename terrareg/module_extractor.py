@@ -1,9 +1,7 @@
 """Provide extraction method of modules."""
 
-from contextlib import contextmanager
 import os
-import threading
-from typing import Optional, Type
+from typing import Dict, List, Optional, Tuple, Type
 import tempfile
 import uuid
 import zipfile
@@ -15,6 +13,11 @@ import re
 import glob
 import pathlib
 import urllib.parse
+import shutil
+import time
+import concurrent.futures
+import threading
+from contextlib import contextmanager
 
 from werkzeug.utils import secure_filename
 import magic
@@ -28,34 +31,54 @@ from terrareg.errors import (
     UnknownFiletypeError,
     InvalidTerraregMetadataFileError,
     MetadataDoesNotContainRequiredAttributeError,
-    GitCloneError,
-    UnableToGetGlobalTerraformLockError,
-    TerraformVersionSwitchError
+    GitCloneError
+)
+import terrareg.terraform_binary_cache
+from terrareg.utils import (
+    PathDoesNotExistError, PathIsNotWithinBaseDirectoryError, check_subdirectory_within_base_dir,
+    get_public_url_details, safe_iglob, safe_join_paths
 )
-import terrareg.terraform_product
-from terrareg.utils import PathDoesNotExistError, get_public_url_details, safe_iglob, safe_join_paths
 from terrareg.config import Config
 from terrareg.constants import EXTRACTION_VERSION
 import terrareg.file_storage
+import terrareg.extraction_stage_runner
+import terrareg.extraction_report
+import terrareg.extraction_result_cache
+import terrareg.module_archive_generator
+import terrareg.git_mirror_cache
+import terrareg.upload_stream
 
 
 class ModuleExtractor:
     """Provide extraction method of modules."""
 
     TERRAREG_METADATA_FILES = ['terrareg.json', '.terrareg.json']
-    TERRAFORM_LOCK = threading.Lock()
+    TERRAFORM_DOCS_CONFIG_FILES = ['.terraform-docs.yml', '.terraform-docs.yaml']
+    # Output file written to each module by terraform-docs, when run recursively
+    TERRAFORM_DOCS_OUTPUT_FILE = '.terrareg-terraform-docs.json'
+    # Match start of module blocks and source/version attributes of module blocks
+    _MODULE_BLOCK_RE = re.compile(r'^[ \t]*module[ \t]+"[^"]*"[ \t]*\{', re.MULTILINE)
+    _MODULE_SOURCE_RE = re.compile(r'^([ \t]*source[ \t]*=[ \t]*)"([^"]*)"', re.MULTILINE)
+    _MODULE_VERSION_RE = re.compile(r'^[ \t]*version[ \t]*=.*(?:\n|$)', re.MULTILINE)
+    # Results of extraction stages that are stored in the extraction result cache
+    CACHED_ANALYSIS_STAGES = ['terraform_docs', 'tfsec', 'readme', 'terraform']
 
     def __init__(self, module_version: 'terrareg.models.ModuleVersion'):
         """Create temporary directories and store member variables."""
         self._module_version = module_version
         self._extract_directory = tempfile.TemporaryDirectory()  # noqa: R1732
         self._upload_directory = tempfile.TemporaryDirectory()  # noqa: R1732
-
-    @staticmethod
-    def terraform_binary() -> str:
-        """Return path of terraform binary"""
-        product = terrareg.terraform_product.ProductFactory.get_product()
-        return os.path.join(os.getcwd(), "bin", product.get_executable_name())
+        # Terraform plugin cache of extraction
+        self._plugin_cache_directory = tempfile.TemporaryDirectory()  # noqa: R1732
+        # Duration and resource usage of each stage of extraction
+        self._extraction_report = terrareg.extraction_report.ExtractionReport()
+        # Results of single-pass analysis of the root module, used for submodules
+        self._submodule_terraform_docs = None
+        self._root_tfsec = None
+        # Cache of analysis results, created before source is modified
+        self._extraction_result_cache = None
+        # Regex matching registry sources of the module provider being extracted
+        self._self_module_source_re = None
 
     @property
     def terraform_rc_file(self):
@@ -95,22 +118,29 @@ class ModuleExtractor:
         """Run enter of upstream context managers."""
         self._extract_directory.__enter__()
         self._upload_directory.__enter__()
+        self._plugin_cache_directory.__enter__()
         return self
 
     def __exit__(self, *args, **kwargs):
         """Run exit of upstream context managers."""
         self._extract_directory.__exit__(*args, **kwargs)
         self._upload_directory.__exit__(*args, **kwargs)
+        self._plugin_cache_directory.__exit__(*args, **kwargs)
 
-    @staticmethod
-    def _run_terraform_docs(module_path):
-        """Run terraform docs and return output."""
-        # Check if a terraform docs configuration file exists and remove it
-        for terraform_docs_config_file in ['.terraform-docs.yml', '.terraform-docs.yaml']:
+    @classmethod
+    def _remove_terraform_docs_config(cls, module_path):
+        """Remove any terraform-docs configuration files from module."""
+        for terraform_docs_config_file in cls.TERRAFORM_DOCS_CONFIG_FILES:
             terraform_docs_config_path = os.path.join(module_path, terraform_docs_config_file)
             if os.path.isfile(terraform_docs_config_path):
                 os.unlink(terraform_docs_config_path)
 
+    @classmethod
+    def _run_terraform_docs(cls, module_path):
+        """Run terraform docs and return output."""
+        # Check if a terraform docs configuration file exists and remove it
+        cls._remove_terraform_docs_config(module_path)
+
         try:
             terradocs_output = subprocess.check_output(['terraform-docs', 'json', module_path])
         except subprocess.CalledProcessError as exc:
@@ -122,51 +152,82 @@ class ModuleExtractor:
         return json.loads(terradocs_output)
 
     @classmethod
-    @contextmanager
-    def _switch_terraform_versions(cls, module_path):
-        """Switch terraform to required version for module"""
-        # Wait for global lock on terraform, so that only
-        # instance can run terraform at a time
-        if not ModuleExtractor.TERRAFORM_LOCK.acquire(blocking=True, timeout=60):
-            raise UnableToGetGlobalTerraformLockError(
-                "Unable to obtain global Terraform lock in 60 seconds"
-            )
-        try:
-            config = Config()
+    def _run_terraform_docs_recursive(cls, module_path) -> Dict[str, dict]:
+        """
+        Run terraform-docs recursively against module and each direct sub-directory of the modules and examples directories.
+
+        Return dictionary of terraform-docs output, keyed by path relative to the module,
+        using an empty string for the root module.
+        """
+        recursive_directories = []
+        for recursive_directory in [Config().MODULES_DIRECTORY, Config().EXAMPLES_DIRECTORY]:
+            try:
+                recursive_directory_path = safe_join_paths(module_path, recursive_directory, is_dir=True)
+            except PathDoesNotExistError:
+                continue
+            recursive_directories.append((recursive_directory, recursive_directory_path))
+
+        # Remove terraform-docs configuration from all modules,
+        # as terraform-docs uses the configuration of each module
+        cls._remove_terraform_docs_config(module_path)
+        for _, recursive_directory_path in recursive_directories:
+            for entry in os.scandir(recursive_directory_path):
+                if entry.is_dir():
+                    cls._remove_terraform_docs_config(entry.path)
+
+        results = {}
+        for index, (recursive_directory, recursive_directory_path) in enumerate(recursive_directories):
+            try:
+                subprocess.check_output([
+                    'terraform-docs', 'json',
+                    '--recursive', '--recursive-path', recursive_directory,
+                    # Only include the root module in the first execution
+                    f"--recursive-include-main={'true' if index == 0 else 'false'}",
+                    '--output-file', cls.TERRAFORM_DOCS_OUTPUT_FILE,
+                    '--output-mode', 'replace',
+                    '--output-template', '{{ .Content }}',
+                    module_path
+                ])
+            except subprocess.CalledProcessError as exc:
+                raise UnableToProcessTerraformError(
+                    'An error occurred whilst processing the terraform code.' +
+                    (f": {str(exc)}: {exc.output.decode('utf-8')}" if Config().DEBUG else "")
+                )
 
-            default_terraform_version = config.DEFAULT_TERRAFORM_VERSION
-            tfswitch_env = os.environ.copy()
+            output_directories = [entry.path for entry in os.scandir(recursive_directory_path) if entry.is_dir()]
+            if index == 0:
+                output_directories.append(module_path)
 
-            if default_terraform_version:
-                tfswitch_env["TF_DEFAULT_VERSION"] = default_terraform_version
+            # Read output of each module and remove output file, so that it is not
+            # included in the stored example files
+            for output_directory in output_directories:
+                output_file = os.path.join(output_directory, cls.TERRAFORM_DOCS_OUTPUT_FILE)
+                if not os.path.isfile(output_file):
+                    continue
+                with open(output_file, 'r') as output_fh:
+                    output = json.load(output_fh)
+                os.unlink(output_file)
 
-            product = terrareg.terraform_product.ProductFactory.get_product()
-            tfswitch_env["TF_PRODUCT"] = product.get_tfswitch_product_arg()
+                relative_path = os.path.relpath(output_directory, module_path)
+                results['' if relative_path == '.' else relative_path] = output
 
-            tfswitch_args = []
-            if config.TERRAFORM_ARCHIVE_MIRROR:
-                tfswitch_args += ["--mirror", config.TERRAFORM_ARCHIVE_MIRROR]
+        # Fallback to running terraform-docs against root module,
+        # if it was not included in recursive execution
+        if '' not in results:
+            results[''] = cls._run_terraform_docs(module_path)
 
-            # Run tfswitch
-            try:
-                subprocess.check_output(
-                    ["tfswitch", "--bin", cls.terraform_binary(), *tfswitch_args],
-                    env=tfswitch_env,
-                    cwd=module_path
-                )
-            except subprocess.CalledProcessError as exc:
-                print("An error occured whilst running tfswitch:", str(exc))
-                raise TerraformVersionSwitchError(
-                    "An error occurred whilst initialising Terraform version" +
-                    (f": {str(exc)}: {exc.output.decode('utf-8')}" if Config().DEBUG else "")
-                )
+        return results
 
-            yield
-        finally:
-            ModuleExtractor.TERRAFORM_LOCK.release()
+    @staticmethod
+    def _install_terraform_version(module_path) -> str:
+        """Install terraform version required by module and return path to binary"""
+        return terrareg.terraform_binary_cache.TerraformBinaryCache.get_binary_for_module(module_path)
 
-    def _run_tfsec(self, module_path):
+    def _run_tfsec(self, module_path, extract_directory=None):
         """Run tfsec and return output."""
+        if extract_directory is None:
+            extract_directory = self.extract_directory
+
         try:
             raw_output = subprocess.check_output([
                 'tfsec',
@@ -185,40 +246,114 @@ class ModuleExtractor:
         # Strip the extraction directory from all paths in results
         if tfsec_results['results']:
             for result in tfsec_results['results']:
-                result['location']['filename'] = result['location']['filename'].replace(self._extract_directory.name, '')
+                result['location']['filename'] = result['location']['filename'].replace(extract_directory, '')
                 # Replace leading slash if it exists in filename
                 if result['location']['filename'].startswith('/'):
                     result['location']['filename'] = result['location']['filename'][1:]
 
         return tfsec_results
 
+    @staticmethod
+    def _get_tfsec_results_for_path(tfsec: dict, path: str) -> dict:
+        """Return tfsec output, only containing results for files within path, relative to the extract directory."""
+        path_prefix = f"{path.rstrip('/')}/"
+        path_tfsec = dict(tfsec)
+        if tfsec.get('results') is not None:
+            path_tfsec['results'] = [
+                result
+                for result in tfsec['results']
+                if result['location']['filename'].startswith(path_prefix)
+            ]
+        return path_tfsec
+
+    @property
+    def extraction_terraform_rc_file(self):
+        """Return path to terraformrc file created for this extraction, when using a provider mirror"""
+        return os.path.join(self.upload_directory, ".terraformrc")
+
+    @staticmethod
+    def _get_terraform_rc_credentials_block():
+        """Return credentials block for authenticating to the registry, if the domain name is configured"""
+        _, domain_name, _ = get_public_url_details()
+        if not domain_name:
+            return ""
+        return f"""
+credentials "{domain_name}" {{
+  token = "{Config().INTERNAL_EXTRACTION_ANALYTICS_TOKEN}"
+}}
+"""
+
+    @staticmethod
+    def _write_terraform_rc_file(path, content):
+        """Write terraformrc file"""
+        # Write to temporary file and move into place, as the file
+        # may be read by concurrent extractions whilst being replaced
+        temporary_rc_file = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temporary_rc_file, "w") as terraform_rc_fh:
+            terraform_rc_fh.write(content)
+        os.replace(temporary_rc_file, path)
+
+    def _create_extraction_terraform_rc_file(self):
+        """Create terraform RC file for extraction, configuring Terraform to install providers from the provider mirror"""
+        config = Config()
+        terraform_rc_file_content = f"""
+disable_checkpoint = true
+
+provider_installation {{
+  filesystem_mirror {{
+    path = "{config.TERRAFORM_PROVIDER_MIRROR_DIRECTORY}"
+  }}
+"""
+        if config.TERRAFORM_PROVIDER_MIRROR_DIRECT_FALLBACK:
+            terraform_rc_file_content += """  direct {}
+"""
+        terraform_rc_file_content += """}
+"""
+        terraform_rc_file_content += self._get_terraform_rc_credentials_block()
+        self._write_terraform_rc_file(self.extraction_terraform_rc_file, terraform_rc_file_content)
+
     def _create_terraform_rc_file(self):
         """Create terraform RC file, if enabled"""
-        # Create .terraformrc file, if configured to do so
         config = Config()
+
+        # When using a provider mirror, create terraform RC file for extraction,
+        # rather than modifying the user's terraform RC file
+        if config.TERRAFORM_PROVIDER_MIRROR_DIRECTORY:
+            self._create_extraction_terraform_rc_file()
+            return
+
+        # Create .terraformrc file, if configured to do so
         if config.MANAGE_TERRAFORM_RC_FILE:
+            # Plugin cache directory is provided for each extraction (see _get_plugin_cache_directory)
             terraform_rc_file_content = """
-# Cache plugins
-plugin_cache_dir   = "$HOME/.terraform.d/plugin-cache"
 disable_checkpoint = true
 
 """
 
-            # Create .terraform.d/plugin-cache directory tree,
-            # allowing directory to already exist.
-            plugin_cache_directory = os.path.join(os.path.expanduser('~'), '.terraform.d', 'plugin-cache')
-            os.makedirs(plugin_cache_directory, exist_ok=True)
-
-            _, domain_name, _ = get_public_url_details()
-
-            if domain_name:
-                terraform_rc_file_content += f"""
-credentials "{domain_name}" {{
-  token = "{config.INTERNAL_EXTRACTION_ANALYTICS_TOKEN}"
-}}
-"""
-            with open(self.terraform_rc_file, "w") as terraform_rc_fh:
-                terraform_rc_fh.write(terraform_rc_file_content)
+            terraform_rc_file_content += self._get_terraform_rc_credentials_block()
+            self._write_terraform_rc_file(self.terraform_rc_file, terraform_rc_file_content)
+
+    def _get_plugin_cache_directory(self):
+        """
+        Return Terraform plugin cache directory for current thread of extraction.
+
+        The plugin cache does not support concurrent use, so each thread analysing modules
+        of the extraction uses a separate cache, which is re-used for the modules it analyses.
+        """
+        plugin_cache_directory = os.path.join(self._plugin_cache_directory.name, str(threading.get_ident()))
+        os.makedirs(plugin_cache_directory, exist_ok=True)
+        return plugin_cache_directory
+
+    def _get_terraform_init_env(self):
+        """Return environment for running terraform init"""
+        init_env = dict(os.environ)
+        if Config().TERRAFORM_PROVIDER_MIRROR_DIRECTORY:
+            init_env["TF_CLI_CONFIG_FILE"] = self.extraction_terraform_rc_file
+        else:
+            # Override any plugin cache configured in the user's terraform RC file,
+            # which would be shared with concurrent extractions
+            init_env["TF_PLUGIN_CACHE_DIR"] = self._get_plugin_cache_directory()
+        return init_env
 
     def _override_tf_backend(self, module_path):
         """Attempt to find any files that set terraform backend and create override"""
@@ -249,22 +384,22 @@ terraform {{
     """)
         return override_filename
 
-    def _run_tf_init(self, module_path):
+    def _run_tf_init(self, module_path, terraform_binary):
         """Perform terraform init"""
         self._create_terraform_rc_file()
         self._override_tf_backend(module_path=module_path)
 
         try:
-            subprocess.check_call([self.terraform_binary(), "init"], cwd=module_path)
+            subprocess.check_call([terraform_binary, "init"], cwd=module_path, env=self._get_terraform_init_env())
         except subprocess.CalledProcessError:
             return False
         return True
 
-    def _get_graph_data(self, module_path):
+    def _get_graph_data(self, module_path, terraform_binary):
         """Run inframap and generate graphiz"""
         try:
             terraform_graph_data = subprocess.check_output(
-                [self.terraform_binary(), "graph"],
+                [terraform_binary, "graph"],
                 cwd=module_path
             )
         except subprocess.CalledProcessError as exc:
@@ -289,11 +424,11 @@ terraform {{
 
         return None
 
-    def _get_terraform_version(self, module_path):
+    def _get_terraform_version(self, module_path, terraform_binary):
         """Run terraform -version and return output"""
         try:
             terraform_version_data = subprocess.check_output(
-                [self.terraform_binary(), "-version", "-json"],
+                [terraform_binary, "-version", "-json"],
                 cwd=module_path
             )
         except subprocess.CalledProcessError as exc:
@@ -305,6 +440,22 @@ terraform {{
 
         return terraform_version_data
 
+    def _get_terraform_details(self, module_path):
+        """Run terraform init and obtain graph, modules and version data for module."""
+        terraform_graph = None
+        terraform_modules = None
+        terraform_version = None
+        with self._extraction_report.record('terraform_install'):
+            terraform_binary = self._install_terraform_version(module_path)
+        with self._extraction_report.record('terraform_init'):
+            terraform_initialised = self._run_tf_init(module_path, terraform_binary=terraform_binary)
+        if terraform_initialised:
+            with self._extraction_report.record('terraform_graph'):
+                terraform_graph = self._get_graph_data(module_path, terraform_binary=terraform_binary)
+            terraform_modules = self._get_terraform_modules(module_path)
+            terraform_version = self._get_terraform_version(module_path, terraform_binary=terraform_binary)
+        return terraform_graph, terraform_modules, terraform_version
+
     @staticmethod
     def _get_readme_content(module_path):
         """Obtain README contents for given module."""
@@ -352,7 +503,7 @@ terraform {{
         """Extract addition files for populating tabs in UI"""
         config = Config()
 
-        files_extracted = []
+        files_extracted = {}
         # Iterate through all files of all additionally defined tabs
         for tab_config in json.loads(config.ADDITIONAL_MODULE_TABS):
             for file_name in tab_config[1]:
@@ -361,15 +512,15 @@ terraform {{
                 if file_name in files_extracted or not os.path.exists(path):
                     continue
 
-                # Read file contents and create DB record
+                # Read file contents
                 with open(path, 'r') as fh:
-                    file_content = ''.join(fh.readlines())
+                    files_extracted[file_name] = ''.join(fh.readlines())
 
-                module_version_file = terrareg.models.ModuleVersionFile.create(module_version=self._module_version, path=file_name)
-                module_version_file.update_attributes(content=file_content)
+        # Create DB records for all files
+        terrareg.models.ModuleVersionFile.create_many(module_version=self._module_version, files=files_extracted)
 
-    def _generate_archive(self):
-        """Generate archive of extracted module"""
+    def _generate_archive(self) -> dict:
+        """Generate archive of extracted module, returning the checksum and size of the zip archive"""
         # Create data directory path.
         # This should have been created during namespace, module, version creation,
         # however, in situations where the users do not use/care about generated archives
@@ -380,35 +531,13 @@ terraform {{
 
         file_storage.make_directory(self._module_version.base_directory)
 
-        def tar_filter(tarinfo):
-            """Filter files being added to tar archive"""
-            # Do not include .git directory in archive
-            if tarinfo.name == ".git":
-                return None
-            return tarinfo
-
-        # Create tar.gz
-        with tempfile.TemporaryDirectory(suffix='generate-archive') as temp_dir:
-            tar_file_path = os.path.join(temp_dir, self._module_version.archive_name_tar_gz)
-            with tarfile.open(tar_file_path, "w:gz") as tar:
-                tar.add(self.archive_source_directory, arcname='', recursive=True, filter=tar_filter)
-
-            # Add tar file to file storage
-            file_storage.upload_file(tar_file_path, self._module_version.base_directory, self._module_version.archive_name_tar_gz)
-
-            # Create zip
-            # Use 'cwd' to ensure zip file is generated with directory structure
-            # from the root of the module.
-            # Use subprocess to execute zip, rather than shutil.make_archive,
-            # as make_archive is not thread-safe and changes the CWD of the main
-            # process.
-            # Exclude .git directory from archive
-            zip_file_path = os.path.join(temp_dir, self._module_version.archive_name_zip)
-            subprocess.call(
-                ['zip', '-r', zip_file_path, '--exclude=./.git/*', '.'],
-                cwd=self.archive_source_directory
-            )
-            file_storage.upload_file(zip_file_path, self._module_version.base_directory, self._module_version.archive_name_zip)
+        # Generate tar.gz and zip archives in a single pass of the source directory,
+        # streaming each archive to file storage
+        with file_storage.open_write(os.path.join(self._module_version.base_directory, self._module_version.archive_name_tar_gz)) as tar_gz_fh, \
+                file_storage.open_write(os.path.join(self._module_version.base_directory, self._module_version.archive_name_zip)) as zip_fh:
+            return terrareg.module_archive_generator.ModuleArchiveGenerator(
+                source_directory=self.archive_source_directory
+            ).generate(tar_gz_fh=tar_gz_fh, zip_fh=zip_fh)
 
     def _get_git_commit_sha(self, module_directory: str):
         """Obtain git commit hash for module version"""
@@ -472,57 +601,472 @@ terraform {{
             archive_git_path=self._module_version.module_provider.archive_git_path,
         )
 
-    def _process_submodule(self, submodule: 'terrareg.models.BaseSubmodule'):
-        """Process submodule."""
-        submodule_dir = safe_join_paths(self.module_directory, submodule.path)
+    def _get_submodule_source_directories(self, submodule_dir: str, module_directory: str) -> List[str]:
+        """
+        Return directories, relative to the extract directory, of submodule
+        and the local modules that it references, recursively.
+
+        Sources that reference the module provider being extracted are included,
+        as they are rewritten to local paths during analysis.
+        """
+        extract_directory = os.path.normpath(self.extract_directory)
+        directories = set()
+        pending = [os.path.normpath(submodule_dir)]
+        while pending:
+            directory = pending.pop()
+            relative_directory = os.path.relpath(directory, extract_directory)
+            if (relative_directory in directories or relative_directory == '..' or
+                    relative_directory.startswith(f'..{os.path.sep}') or not os.path.isdir(directory)):
+                continue
+            directories.add(relative_directory)
 
-        # Extract example files before performing
-        # any other analysis, as the analysis may modify
-        # files in the repository, which should not
-        # be present in the stored files in the database
-        if isinstance(submodule, terrareg.models.Example):
-            self._extract_example_files(example=submodule)
+            for tf_file_path in glob.glob(os.path.join(glob.escape(directory), '*.tf')):
+                with open(tf_file_path, 'r', errors='ignore') as tf_file_fh:
+                    content = tf_file_fh.read()
+                for _, source in self._MODULE_SOURCE_RE.findall(content):
+                    if source in ['.', '..'] or source.startswith('./') or source.startswith('../'):
+                        pending.append(os.path.normpath(os.path.join(directory, source)))
+                        continue
+                    source_path_match = self._self_module_source_re.match(source) if self._self_module_source_re else None
+                    if source_path_match:
+                        pending.append(os.path.normpath(os.path.join(module_directory, source_path_match.group(1) or '')))
 
-        tf_docs = self._run_terraform_docs(submodule_dir)
-        tfsec = self._run_tfsec(submodule_dir)
-        readme_content = self._get_readme_content(submodule_dir)
+        return sorted(directories)
 
-        terraform_graph = None
-        terraform_modules = None
-        terraform_version = None
-        with self._switch_terraform_versions(submodule_dir):
-            if self._run_tf_init(submodule_dir):
-                terraform_graph = self._get_graph_data(submodule_dir)
-                terraform_modules = self._get_terraform_modules(submodule_dir)
-                terraform_version = self._get_terraform_version(submodule_dir)
-
-        infracost = None
-        # Run Infracost on examples, if API key is set
-        if isinstance(submodule, terrareg.models.Example) and Config().INFRACOST_API_KEY:
-            try:
-                infracost = self._run_infracost(example=submodule)
-            except UnableToProcessTerraformError as exc:
-                print('An error occured whilst running infracost against example')
+    @staticmethod
+    def _copy_source_directory(source_directory: str, destination_directory: str):
+        """
+        Copy files of module directory and its sub-directories,
+        excluding sub-directories that contain other Terraform modules.
+        """
+        for directory, sub_directories, files in os.walk(source_directory):
+            destination = os.path.join(destination_directory, os.path.relpath(directory, source_directory))
+            os.makedirs(destination, exist_ok=True)
+
+            for sub_directory in list(sub_directories):
+                sub_directory_path = os.path.join(directory, sub_directory)
+                if os.path.islink(sub_directory_path):
+                    os.symlink(os.readlink(sub_directory_path), os.path.join(destination, sub_directory))
+                    sub_directories.remove(sub_directory)
+                elif (sub_directory in ['.git', '.terraform'] or
+                        glob.glob(os.path.join(glob.escape(sub_directory_path), '*.tf'))):
+                    sub_directories.remove(sub_directory)
+
+            for file_name in files:
+                destination_file = os.path.join(destination, file_name)
+                if not os.path.lexists(destination_file):
+                    shutil.copy2(os.path.join(directory, file_name), destination_file, follow_symlinks=False)
 
-        # Create module details row
-        module_details = self._create_module_details(
-            terraform_docs=tf_docs,
-            readme_content=readme_content,
-            tfsec=tfsec,
-            infracost=infracost,
-            terraform_graph=terraform_graph,
-            terraform_modules=terraform_modules,
-            terraform_version=terraform_version
+    @contextmanager
+    def _submodule_working_copy(self, submodule_path: str):
+        """
+        Yield extract directory and module directory to be used for analysing a submodule.
+
+        When submodules are analysed concurrently, a copy of the submodule and the local modules
+        that it references is used, so that modifications made during analysis
+        (e.g. backend overrides and terraform init) do not affect the analysis of other submodules.
+        """
+        if Config().SUBMODULE_EXTRACTION_CONCURRENCY <= 1:
+            yield self.extract_directory, self.module_directory
+            return
+
+        # Determine path of module within extracted source, which
+        # may be in a sub-directory, if the module provider has a git_path
+        module_relative_path = os.path.relpath(self.module_directory, self.extract_directory)
+
+        with tempfile.TemporaryDirectory() as working_directory:
+            extract_directory = os.path.join(working_directory, 'source')
+            source_directories = self._get_submodule_source_directories(
+                safe_join_paths(self.module_directory, submodule_path),
+                self.module_directory
+            )
+            for relative_directory in source_directories:
+                self._copy_source_directory(
+                    os.path.join(self.extract_directory, relative_directory),
+                    os.path.normpath(os.path.join(extract_directory, relative_directory))
+                )
+            yield extract_directory, os.path.normpath(os.path.join(extract_directory, module_relative_path))
+
+    def _analyse_submodule(self, submodule_path: str, is_example: bool,
+                           terraform_docs: Optional[dict]=None, tfsec: Optional[dict]=None) -> dict:
+        """
+        Run analysis of submodule and return results of each extraction stage.
+
+        terraform-docs and tfsec are only run if their results have not been provided
+        from single-pass analysis of the root module.
+        If the results of the submodule are in the extraction result cache,
+        only Infracost is run.
+
+        This is run in worker threads, so must not access the database.
+        """
+        run_infracost = is_example and Config().INFRACOST_API_KEY
+        cache_key, cached_results = self._get_cached_analysis_results(
+            safe_join_paths(self.module_directory, submodule_path), is_root=False
         )
+        infracost_cache_key, cached_infracost = None, None
+        if run_infracost:
+            infracost_cache_key, cached_infracost = self._get_cached_infracost_results(
+                safe_join_paths(self.module_directory, submodule_path)
+            )
+            if cached_infracost is not None:
+                run_infracost = False
+
+        if cached_results is not None and not run_infracost:
+            if cached_infracost is not None:
+                cached_results['infracost'] = cached_infracost
+            return cached_results
 
-        submodule.update_attributes(
-            module_details_id=module_details.pk
+        with self._submodule_working_copy(submodule_path) as (extract_directory, module_directory):
+            submodule_dir = safe_join_paths(module_directory, submodule_path)
+
+            stage_runner = terrareg.extraction_stage_runner.ExtractionStageRunner(
+                report=self._extraction_report, submodule=submodule_path
+            )
+            infracost_dependency = []
+            if cached_results is None:
+                # Run analysis that only reads the submodule source concurrently,
+                # before performing terraform init, which modifies the submodule directory
+                stage_runner.add_stage(
+                    'terraform_docs',
+                    (lambda: terraform_docs) if terraform_docs is not None else (lambda: self._run_terraform_docs(submodule_dir))
+                )
+                stage_runner.add_stage(
+                    'tfsec',
+                    (lambda: tfsec) if tfsec is not None else (lambda: self._run_tfsec(submodule_dir, extract_directory=extract_directory))
+                )
+                stage_runner.add_stage('readme', lambda: self._get_readme_content(submodule_dir))
+                stage_runner.add_stage(
+                    'terraform', lambda: self._get_submodule_terraform_details(submodule_dir, module_directory),
+                    depends_on=['terraform_docs', 'tfsec']
+                )
+                infracost_dependency = ['terraform']
+
+            # Run Infracost on examples, if API key is set
+            if run_infracost:
+                stage_runner.add_stage(
+                    'infracost',
+                    lambda: self._run_submodule_infracost(submodule_dir, example_path=submodule_path, module_directory=module_directory),
+                    depends_on=infracost_dependency
+                )
+
+            results = stage_runner.run()
+
+        if cached_results is None:
+            self._store_cached_analysis_results(cache_key, results)
+        else:
+            results.update(cached_results)
+
+        if cached_infracost is not None:
+            results['infracost'] = cached_infracost
+        else:
+            self._store_cached_infracost_results(infracost_cache_key, results.get('infracost'))
+        return results
+
+    def _get_self_module_source_re(self) -> Optional[re.Pattern]:
+        """Return regex matching registry sources that reference the module provider being extracted."""
+        _, domain_name, port = get_public_url_details()
+        if not domain_name:
+            return None
+
+        module_provider = self._module_version.module_provider
+        hostnames = [domain_name, f"{domain_name}:{port}"]
+        return re.compile(
+            r'^(?:{hostnames})/{namespace}/{module}/{provider}(?://(.*))?$'.format(
+                hostnames='|'.join(re.escape(hostname) for hostname in hostnames),
+                namespace=re.escape(module_provider.module.namespace.name),
+                module=re.escape(module_provider.module.name),
+                provider=re.escape(module_provider.name)
+            ),
+            re.IGNORECASE
+        )
+
+    def _rewrite_module_sources(self, content: str, submodule_dir: str, module_directory: str) -> str:
+        """
+        Rewrite sources of module blocks that reference the module provider being extracted
+        to local paths within the extracted source, removing any version constraints.
+        """
+        new_content = ''
+        position = 0
+        for block_match in self._MODULE_BLOCK_RE.finditer(content):
+            if block_match.start() < position:
+                continue
+
+            # Find end of module block, by matching braces,
+            # recording the start of each line that is directly within the module block
+            depth = 0
+            block_end = len(content)
+            top_level_line_starts = set()
+            for index in range(block_match.end() - 1, len(content)):
+                if content[index] == '{':
+                    depth += 1
+                elif content[index] == '}':
+                    depth -= 1
+                    if depth == 0:
+                        block_end = index + 1
+                        break
+                elif content[index] == '\n' and depth == 1:
+                    top_level_line_starts.add(index + 1 - block_match.start())
+
+            block = content[block_match.start():block_end]
+            # Only match attributes of the module block, rather than attributes
+            # of nested objects passed as variables to the module
+            source_match = next((
+                match for match in self._MODULE_SOURCE_RE.finditer(block)
+                if match.start() in top_level_line_starts
+            ), None)
+            source_path_match = self._self_module_source_re.match(source_match.group(2)) if source_match else None
+            if source_path_match:
+                try:
+                    target_directory = safe_join_paths(
+                        module_directory, source_path_match.group(1) or '',
+                        is_dir=True, allow_same_directory=True
+                    )
+                except (PathDoesNotExistError, PathIsNotWithinBaseDirectoryError):
+                    target_directory = None
+
+                if target_directory:
+                    local_path = os.path.relpath(target_directory, os.path.realpath(submodule_dir))
+                    if not local_path.startswith('..'):
+                        local_path = f'./{local_path}'
+                    replacements = [(source_match.start(), source_match.end(), f'{source_match.group(1)}"{local_path}"')]
+                    # Local module sources do not support version constraints
+                    replacements += [
+                        (match.start(), match.end(), '')
+                        for match in self._MODULE_VERSION_RE.finditer(block)
+                        if match.start() in top_level_line_starts
+                    ]
+                    for start, end, replacement in sorted(replacements, reverse=True):
+                        block = block[:start] + replacement + block[end:]
+
+            new_content += content[position:block_match.start()] + block
+            position = block_end
+
+        return new_content + content[position:]
+
+    def _rewrite_self_referencing_module_sources(self, submodule_dir: str, module_directory: str):
+        """
+        Rewrite module sources in submodule that reference the module provider being extracted to local paths.
+
+        This avoids Terraform and Infracost downloading the module from the registry,
+        which would perform requests to the registry from within the extraction.
+        """
+        if self._self_module_source_re is None:
+            return
+
+        for tf_file_path in glob.glob(os.path.join(glob.escape(submodule_dir), '*.tf')):
+            # Do not modify files outside of the submodule via symlinks
+            if os.path.islink(tf_file_path) or not os.path.isfile(tf_file_path):
+                continue
+
+            with open(tf_file_path, 'r') as tf_file_fh:
+                content = tf_file_fh.read()
+
+            new_content = self._rewrite_module_sources(content, submodule_dir=submodule_dir, module_directory=module_directory)
+            if new_content != content:
+                with open(tf_file_path, 'w') as tf_file_fh:
+                    tf_file_fh.write(new_content)
+
+    def _get_submodule_terraform_details(self, submodule_dir: str, module_directory: str):
+        """Obtain terraform details for submodule, using local paths for modules sources that reference the module."""
+        # Sources are rewritten after terraform-docs has obtained the original module sources
+        self._rewrite_self_referencing_module_sources(submodule_dir, module_directory)
+        return self._get_terraform_details(submodule_dir)
+
+    def _run_submodule_infracost(self, submodule_dir: str, example_path: str, module_directory: str):
+        """Run Infracost against example, using local paths for modules sources that reference the module."""
+        self._rewrite_self_referencing_module_sources(submodule_dir, module_directory)
+        return self._run_infracost_safe(example_path=example_path, module_directory=module_directory)
+
+    def _get_rewritten_local_source_hashes(self, module_path: str) -> Dict[str, str]:
+        """
+        Return hashes of local modules used by module,
+        with sources that reference the module provider being extracted rewritten to local paths.
+        """
+        module_sources = {}
+        for tf_file_path in sorted(glob.glob(os.path.join(glob.escape(module_path), '*.tf'))):
+            if os.path.islink(tf_file_path) or not os.path.isfile(tf_file_path):
+                continue
+            with open(tf_file_path, 'r') as tf_file_fh:
+                content = tf_file_fh.read()
+            if self._self_module_source_re is not None:
+                content = self._rewrite_module_sources(content, submodule_dir=module_path, module_directory=self.module_directory)
+            module_sources.update(self._extraction_result_cache.get_local_source_hashes(module_path, content))
+        return module_sources
+
+    def _get_cached_analysis_results(self, module_path: str, is_root: bool) -> Tuple[Optional[str], Optional[dict]]:
+        """
+        Return cache key and cached analysis results for module.
+
+        The cache key is None if the extraction result cache is disabled
+        and the results are None if the module has not been cached.
+        """
+        if self._extraction_result_cache is None or not Config().ENABLE_EXTRACTION_RESULT_CACHE:
+            return None, None
+
+        attributes = {}
+        if not is_root and self._self_module_source_re is not None:
+            # Terraform details of submodules are obtained after sources that reference
+            # the module provider being extracted have been rewritten to local paths,
+            # so include the local modules that these sources are rewritten to
+            attributes['module_sources'] = self._get_rewritten_local_source_hashes(module_path)
+
+        cache_key = self._extraction_result_cache.get_cache_key(
+            module_path,
+            root=is_root,
+            single_pass=Config().SINGLE_PASS_SUBMODULE_ANALYSIS,
+            **attributes
+        )
+        cached_results = terrareg.extraction_result_cache.ExtractionResultCache.get(cache_key)
+        if cached_results is None or any(stage not in cached_results for stage in self.CACHED_ANALYSIS_STAGES):
+            return cache_key, None
+
+        print(f"Using cached analysis results for {os.path.relpath(module_path, self.extract_directory)}")
+        # Terraform details are stored as a JSON list
+        cached_results['terraform'] = tuple(cached_results['terraform'])
+        return cache_key, cached_results
+
+    def _store_cached_analysis_results(self, cache_key: Optional[str], results: dict):
+        """Store results of analysis stages in the extraction result cache, if enabled."""
+        if cache_key is None:
+            return
+        terrareg.extraction_result_cache.ExtractionResultCache.set(cache_key, {
+            stage: results[stage]
+            for stage in self.CACHED_ANALYSIS_STAGES
+        })
+
+    def _get_cached_infracost_results(self, example_dir: str) -> Tuple[Optional[str], Optional[dict]]:
+        """
+        Return cache key and cached Infracost results for example.
+
+        The cache key is None if Infracost caching is disabled
+        and the results are None if the example has not been cached or the cached results have expired.
+        """
+        if self._extraction_result_cache is None or Config().INFRACOST_CACHE_TTL <= 0:
+            return None, None
+
+        # Include the modules used by the example, as they are passed to Infracost,
+        # with sources that reference this module rewritten to local paths
+        cache_key = self._extraction_result_cache.get_cache_key(
+            example_dir,
+            infracost=True,
+            module_sources=self._get_rewritten_local_source_hashes(example_dir),
+            pricing_api_endpoint=Config().INFRACOST_PRICING_API_ENDPOINT
         )
+        cached_results = terrareg.extraction_result_cache.ExtractionResultCache.get(cache_key)
+        if (cached_results is None or cached_results.get('infracost') is None or
+                time.time() - cached_results.get('timestamp', 0) > Config().INFRACOST_CACHE_TTL):
+            return cache_key, None
 
-    def _run_infracost(self, example: 'terrareg.models.Example'):
+        print(f"Using cached Infracost results for {os.path.relpath(example_dir, self.extract_directory)}")
+        return cache_key, cached_results['infracost']
+
+    def _store_cached_infracost_results(self, cache_key: Optional[str], infracost: Optional[dict]):
+        """Store Infracost results in the extraction result cache, if enabled and Infracost was successful."""
+        if cache_key is None or infracost is None:
+            return
+        terrareg.extraction_result_cache.ExtractionResultCache.set(cache_key, {
+            'timestamp': time.time(),
+            'infracost': infracost,
+        })
+
+    def _get_single_pass_submodule_results(self, submodule_path: str) -> dict:
+        """Return terraform-docs and tfsec results for submodule, obtained from single-pass analysis of the root module."""
+        results = {}
+        if self._submodule_terraform_docs is not None:
+            terraform_docs = self._submodule_terraform_docs.get(os.path.normpath(submodule_path))
+            if terraform_docs is not None:
+                results['terraform_docs'] = terraform_docs
+
+        if self._root_tfsec is not None:
+            # Convert submodule path to be relative to extract directory,
+            # matching the paths in the tfsec results
+            tfsec_path = os.path.relpath(
+                os.path.join(self.module_directory, submodule_path),
+                self.extract_directory
+            )
+            results['tfsec'] = self._get_tfsec_results_for_path(self._root_tfsec, tfsec_path)
+        return results
+
+    def _analyse_submodules(self, submodules: List['terrareg.models.BaseSubmodule']) -> Dict[str, dict]:
+        """
+        Analyse submodules, using a pool of worker threads, and return results for each submodule path.
+
+        If analysis of any submodule fails, submodules that have not yet started are cancelled
+        and the error is raised.
+        """
+        results = {}
+        if not submodules:
+            return results
+
+        max_workers = max(Config().SUBMODULE_EXTRACTION_CONCURRENCY, 1)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers,
+                                                   thread_name_prefix='submodule-extraction') as executor:
+            futures = {
+                executor.submit(
+                    self._analyse_submodule,
+                    submodule_path=submodule.path,
+                    is_example=isinstance(submodule, terrareg.models.Example),
+                    **self._get_single_pass_submodule_results(submodule_path=submodule.path)
+                ): submodule.path
+                for submodule in submodules
+            }
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    results[futures[future]] = future.result()
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        return results
+
+    def _process_submodules(self, submodules: List['terrareg.models.BaseSubmodule']):
+        """Process submodules, analysing concurrently and storing results in database."""
+        # Extract example files before performing
+        # any other analysis, as the analysis may modify
+        # files in the repository, which should not
+        # be present in the stored files in the database
+        for submodule in submodules:
+            if isinstance(submodule, terrareg.models.Example):
+                self._extract_example_files(example=submodule)
+
+        results = self._analyse_submodules(submodules)
+
+        # Create module details for each submodule, in the original order
+        with self._extraction_report.record('database'):
+            for submodule in submodules:
+                submodule_results = results[submodule.path]
+                terraform_graph, terraform_modules, terraform_version = submodule_results['terraform']
+
+                module_details = self._create_module_details(
+                    terraform_docs=submodule_results['terraform_docs'],
+                    readme_content=submodule_results['readme'],
+                    tfsec=submodule_results['tfsec'],
+                    infracost=submodule_results.get('infracost'),
+                    terraform_graph=terraform_graph,
+                    terraform_modules=terraform_modules,
+                    terraform_version=terraform_version
+                )
+
+                submodule.update_attributes(
+                    module_details_id=module_details.pk
+                )
+
+    def _run_infracost_safe(self, example_path: str, module_directory: Optional[str]=None):
+        """Run Infracost against example, returning None if an error occurs."""
+        try:
+            return self._run_infracost(example_path=example_path, module_directory=module_directory)
+        except UnableToProcessTerraformError as exc:
+            print('An error occured whilst running infracost against example')
+        return None
+
+    def _run_infracost(self, example_path: str, module_directory: Optional[str]=None):
         """Run Infracost to obtain cost of examples."""
+        if module_directory is None:
+            module_directory = self.module_directory
+
         # Ensure example path is within root module
-        safe_join_paths(self.module_directory, example.path)
+        safe_join_paths(module_directory, example_path)
 
         infracost_env = dict(os.environ)
         _, domain_name, _ = get_public_url_details()
@@ -536,9 +1080,9 @@ terraform {{
             output_file.close()
             try:
                 subprocess.check_output(
-                    ['infracost', 'breakdown', '--path', example.path,
+                    ['infracost', 'breakdown', '--path', example_path,
                      '--format', 'json', '--out-file', output_file.name],
-                    cwd=self.module_directory,
+                    cwd=module_directory,
                     env=infracost_env
                 )
             except subprocess.CalledProcessError as exc:
@@ -557,6 +1101,7 @@ terraform {{
     def _extract_example_files(self, example: 'terrareg.models.Example'):
         """Extract all terraform files in example and insert into DB"""
         example_base_dir = safe_join_paths(self.module_directory, example.path)
+        example_files = {}
         for extension in Config().EXAMPLE_FILE_EXTENSIONS:
             for tf_file_path in safe_iglob(base_dir=example_base_dir,
                                         pattern=f'*.{extension}',
@@ -567,13 +1112,11 @@ terraform {{
 
                 # Obtain contents of file
                 with open(tf_file_path, 'r') as file_fd:
-                    content = ''.join(file_fd.readlines())
+                    example_files[tf_file] = ''.join(file_fd.readlines())
 
-                # Create example file and update content attribute
-                example_file = terrareg.models.ExampleFile.create(example=example, path=tf_file)
-                example_file.update_attributes(
-                    content=content
-                )
+        # Create example files, storing content of files that are
+        # identical to those in other module versions only once
+        terrareg.models.ExampleFile.create_many(example=example, files=example_files)
 
     def _scan_submodules(self, subdirectory: str, submodule_class: Type['terrareg.models.BaseSubmodule']):
         """Scan for submodules and extract details."""
@@ -611,12 +1154,14 @@ terraform {{
             if submodule_name not in submodules:
                 submodules.append(submodule_name)
 
-        # Extract all submodules
-        for submodule_path in submodules:
-            obj = submodule_class.create(
+        # Create all submodules and extract details
+        submodule_objs = [
+            submodule_class.create(
                 module_version=self._module_version,
                 module_path=submodule_path)
-            self._process_submodule(submodule=obj)
+            for submodule_path in submodules
+        ]
+        self._process_submodules(submodules=submodule_objs)
 
     def _extract_description(self, readme_content):
         """Extract description from README"""
@@ -689,29 +1234,88 @@ terraform {{
         if not os.path.isdir(self.module_directory):
             raise PathDoesNotExistError(f"Base module could not be found (git path: {self._module_version.module_provider.git_path})")
 
+        # Hash the module source, before any stages modify it,
+        # to obtain any analysis results from the extraction result cache
+        # and Infracost results of examples from the Infracost cache
+        config = Config()
+        if config.ENABLE_EXTRACTION_RESULT_CACHE or (config.INFRACOST_API_KEY and config.INFRACOST_CACHE_TTL > 0):
+            self._extraction_result_cache = terrareg.extraction_result_cache.ExtractionResultCache(self.extract_directory)
+        cache_key, cached_results = self._get_cached_analysis_results(self.module_directory, is_root=True)
+
+        # Sources of examples/submodules that reference this module are
+        # replaced with local paths before performing terraform init
+        self._self_module_source_re = self._get_self_module_source_re()
+
+        # Run each stage of extraction, running stages that do not
+        # depend on one another concurrently.
+        # The module provider database row has been cached whilst
+        # obtaining the module directory, so stages do not access the database.
+        stage_runner = terrareg.extraction_stage_runner.ExtractionStageRunner(
+            report=self._extraction_report
+        )
+
         # Generate the archive, unless the module has a git clone URL and
         # the config for deleting externally hosted artifacts is enabled.
-        # Always perform this first before making any modifications to the repo
+        # The archive must be generated before any stages that make
+        # any modifications to the repo.
+        archive_dependency = []
         if not (self._module_version.get_git_clone_url() and
                 Config().DELETE_EXTERNALLY_HOSTED_ARTIFACTS):
-            self._generate_archive()
+            stage_runner.add_stage('archive', self._generate_archive)
+            archive_dependency = ['archive']
 
-        # Run terraform-docs on module content and obtain README
-        terraform_docs = self._run_terraform_docs(self.module_directory)
-        tfsec = self._run_tfsec(self.module_directory)
-        readme_content = self._get_readme_content(self.module_directory)
+        # Obtain git commit, which does not modify the repo
+        stage_runner.add_stage('git_sha', lambda: self._get_git_commit_sha(self.module_directory))
 
-        terraform_graph = None
-        terraform_modules = None
-        terraform_version = None
-        with self._switch_terraform_versions(self.module_directory):
-            if self._run_tf_init(self.module_directory):
-                terraform_graph = self._get_graph_data(self.module_directory)
-                terraform_modules = self._get_terraform_modules(self.module_directory)
-                terraform_version = self._get_terraform_version(self.module_directory)
+        # Check for any terrareg metadata files, which are removed from the repo
+        stage_runner.add_stage(
+            'terrareg_metadata', lambda: self._get_terrareg_metadata(self.module_directory),
+            depends_on=archive_dependency
+        )
 
-        # Check for any terrareg metadata files
-        terrareg_metadata = self._get_terrareg_metadata(self.module_directory)
+        single_pass_analysis = Config().SINGLE_PASS_SUBMODULE_ANALYSIS
+        if cached_results is None:
+            # Run tfsec and obtain README, which do not modify the repo
+            stage_runner.add_stage('tfsec', lambda: self._run_tfsec(self.module_directory))
+            stage_runner.add_stage('readme', lambda: self._get_readme_content(self.module_directory))
+
+            # Run terraform-docs on module content, which removes any terraform-docs config.
+            # In single-pass mode, run terraform-docs recursively, obtaining results for submodules.
+            if single_pass_analysis:
+                stage_runner.add_stage(
+                    'terraform_docs', lambda: self._run_terraform_docs_recursive(self.module_directory),
+                    depends_on=archive_dependency
+                )
+            else:
+                stage_runner.add_stage(
+                    'terraform_docs', lambda: self._run_terraform_docs(self.module_directory),
+                    depends_on=archive_dependency
+                )
+            # Terraform init modifies the module directory, so must be performed
+            # after all stages that analyse the source code
+            stage_runner.add_stage(
+                'terraform', lambda: self._get_terraform_details(self.module_directory),
+                depends_on=archive_dependency + ['tfsec', 'terraform_docs']
+            )
+
+        results = stage_runner.run()
+
+        if cached_results is None:
+            self._store_cached_analysis_results(cache_key, results)
+        else:
+            results.update(cached_results)
+
+        terraform_docs = results['terraform_docs']
+        tfsec = results['tfsec']
+        if single_pass_analysis:
+            # Retain results of recursive analysis for use with submodules
+            self._submodule_terraform_docs = terraform_docs
+            terraform_docs = self._submodule_terraform_docs.pop('')
+            self._root_tfsec = tfsec
+        readme_content = results['readme']
+        terrareg_metadata = results['terrareg_metadata']
+        git_sha = results['git_sha']
+        terraform_graph, terraform_modules, terraform_version = results['terraform']
 
         # Check if description is available in metadata
         description = terrareg_metadata.get('description', None)
@@ -719,19 +1323,25 @@ terraform {{
             # Otherwise, attempt to extract description from README
             description = self._extract_description(readme_content)
 
-        git_sha = self._get_git_commit_sha(self.module_directory)
+        with self._extraction_report.record('database'):
+            self._insert_database(
+                description=description,
+                readme_content=readme_content,
+                tfsec=tfsec,
+                terraform_docs=terraform_docs,
+                terrareg_metadata=terrareg_metadata,
+                terraform_graph=terraform_graph,
+                terraform_modules=terraform_modules,
+                terraform_version=terraform_version,
+                git_sha=git_sha,
+            )
 
-        self._insert_database(
-            description=description,
-            readme_content=readme_content,
-            tfsec=tfsec,
-            terraform_docs=terraform_docs,
-            terrareg_metadata=terrareg_metadata,
-            terraform_graph=terraform_graph,
-            terraform_modules=terraform_modules,
-            terraform_version=terraform_version,
-            git_sha=git_sha,
-        )
+            # Store checksum of generated archive, used to validate conditional downloads
+            if archive_dependency:
+                self._module_version.update_attributes(
+                    archive_sha256=results['archive']['sha256'],
+                    archive_size=results['archive']['size'],
+                )
 
         self._extract_additional_tab_files()
 
@@ -742,15 +1352,36 @@ terraform {{
             submodule_class=terrareg.models.Example,
             subdirectory=Config().EXAMPLES_DIRECTORY)
 
+        # Store report of extraction stages against module version
+        self._module_version.update_attributes(
+            extraction_report=json.dumps(self._extraction_report.to_dict())
+        )
+
+        # Remove expired and excess results from the extraction result cache
+        if self._extraction_result_cache is not None:
+            terrareg.extraction_result_cache.ExtractionResultCache.prune_if_due()
+
 
 class ApiUploadModuleExtractor(ModuleExtractor):
     """Extraction of module uploaded via API."""
 
+    ARCHIVE_TYPE_ZIP = 'zip'
+    ARCHIVE_TYPE_TAR_GZ = 'tar.gz'
+
+    # Mapping of mime-types, detected from the content of uploaded files, to archive types
+    MIME_TYPE_ARCHIVE_TYPES = {
+        'application/zip': ARCHIVE_TYPE_ZIP,
+        'application/gzip': ARCHIVE_TYPE_TAR_GZ,
+        'application/x-gzip': ARCHIVE_TYPE_TAR_GZ,
+    }
+
     def __init__(self, upload_file, *args, **kwargs):
         """Store member variables."""
         super(ApiUploadModuleExtractor, self).__init__(*args, **kwargs)
         self._upload_file = upload_file
         self._source_file = None
+        self._upload_stream = None
+        self._archive_type = None
 
     @property
     def source_file(self):
@@ -761,31 +1392,78 @@ class ApiUploadModuleExtractor(ModuleExtractor):
         return self._source_file
 
     def _save_upload_file(self):
-        """Save uploaded file to uploads directory."""
-        filename = secure_filename(self._upload_file.filename)
-        source_file = safe_join_paths(self.upload_directory, filename)
-        self._upload_file.save(source_file)
+        """
+        Save uploaded file to uploads directory, calculating checksum of upload.
+
+        If the upload has already been written to disk whilst the request was received,
+        the file is moved into the uploads directory.
+        """
+        if isinstance(getattr(self._upload_file, 'stream', None), terrareg.upload_stream.UploadStream):
+            self._upload_stream = self._upload_file.stream
+            self._upload_stream.close()
+            shutil.move(self._upload_stream.path, self.source_file)
+        else:
+            max_size = Config().MODULE_UPLOAD_MAX_SIZE * 1024 * 1024 or None
+            with terrareg.upload_stream.UploadStream(path=self.source_file, max_size=max_size) as upload_stream:
+                self._upload_file.save(upload_stream)
+            self._upload_stream = upload_stream
 
     def _check_file_type(self):
-        """Check file-type"""
-        file_type = magic.from_file(self.source_file, mime=True)
-        if file_type == 'application/zip':
-            pass
-        else:
+        """Check file-type, using the leading bytes of the uploaded file"""
+        file_type = magic.from_buffer(self._upload_stream.header, mime=True)
+        self._archive_type = self.MIME_TYPE_ARCHIVE_TYPES.get(file_type)
+        if self._archive_type is None:
             raise UnknownFiletypeError('Upload file is of unknown file-type. Must by zip, tar.gz')
 
-    def _extract_archive(self):
-        """Extract uploaded archive into extract directory."""
+    def _extract_zip_archive(self):
+        """Extract uploaded zip archive into extract directory."""
         with zipfile.ZipFile(self.source_file, 'r') as zip_ref:
             for name in zip_ref.namelist():
                 safe_join_paths(self.extract_directory, name)
             zip_ref.extractall(self.extract_directory)
 
+    def _extract_tar_archive(self):
+        """
+        Extract uploaded tar.gz archive into extract directory.
+
+        The archive is read as a stream, extracting each member as it is read.
+        Members are checked to be within the extract directory before being extracted,
+        including the targets of links, and members that are not files, directories or links are ignored.
+        """
+        with tarfile.open(self.source_file, mode='r|gz') as tar_ref:
+            for member in tar_ref:
+                if os.path.isabs(member.name):
+                    raise PathIsNotWithinBaseDirectoryError('Archive member has absolute path')
+                member_path = safe_join_paths(self.extract_directory, member.name, allow_same_directory=member.isdir())
+                if member.issym():
+                    check_subdirectory_within_base_dir(
+                        base_dir=self.extract_directory,
+                        sub_dir=os.path.join(os.path.dirname(member_path), member.linkname),
+                        allow_same_directory=True
+                    )
+                elif member.islnk():
+                    safe_join_paths(self.extract_directory, member.linkname)
+                elif not (member.isfile() or member.isdir()):
+                    continue
+
+                tar_ref.extract(member, self.extract_directory, set_attrs=False)
+
+    def _extract_archive(self):
+        """Extract uploaded archive into extract directory."""
+        if self._archive_type == self.ARCHIVE_TYPE_TAR_GZ:
+            self._extract_tar_archive()
+        else:
+            self._extract_zip_archive()
+
     def process_upload(self):
         """Extract archive and perform data extraction from module source."""
-        self._save_upload_file()
-        self._check_file_type()
-        self._extract_archive()
+        with self._extraction_report.record('upload'):
+            self._save_upload_file()
+            self._check_file_type()
+            self._extract_archive()
+
+        # Store checksum of uploaded archive against module version
+        self._module_version.update_attributes(upload_sha256=self._upload_stream.sha256)
 
         super(ApiUploadModuleExtractor, self).process_upload()
 
@@ -793,24 +1471,89 @@ class ApiUploadModuleExtractor(ModuleExtractor):
 class GitModuleExtractor(ModuleExtractor):
     """Extraction of module via git."""
 
-    def __init__(self, *args, **kwargs):
-        """Store member variables."""
+    def __init__(self, *args, git_mirror_cache: Optional['terrareg.git_mirror_cache.GitMirrorCache']=None, **kwargs):
+        """
+        Store member variables.
+
+        If git_mirror_cache is provided, it is used in place of the configured git mirror cache.
+        """
         super(GitModuleExtractor, self).__init__(*args, **kwargs)
+        self._git_mirror_cache = git_mirror_cache
         # # Sanitise URL and tag name
         # self._git_url = urllib.parse.quote(git_url, safe='/:@%?=')
         # self._tag_name = urllib.parse.quote(tag_name, safe='/')
 
-    def _clone_repository(self):
-        """Extract uploaded archive into extract directory."""
+    def _run_git_clone(self, clone_args: List[str], git_url: str, env: Dict[str, str]) -> None:
+        """Clone tag of repository into extract directory."""
+        subprocess.check_output([
+                'git', 'clone', *clone_args,
+                '--branch', self._module_version.source_git_tag,
+                git_url,
+                self.extract_directory
+            ],
+            stderr=subprocess.STDOUT,
+            env=env,
+            timeout=Config().GIT_CLONE_TIMEOUT
+        )
+
+    def _shallow_clone_repository(self, git_url: str, env: Dict[str, str]) -> bool:
+        """
+        Perform shallow clone of tag, returning whether the clone was successful.
+
+        If the module provider only archives the git_path, a partial clone is performed,
+        with only the git_path (and files in the root of the repository) checked out.
+        """
+        module_provider = self._module_version.module_provider
+        sparse_checkout_path = module_provider.git_path if module_provider.archive_git_path else None
+
+        clone_args = ['--single-branch', '--depth', '1']
+        if sparse_checkout_path:
+            clone_args += ['--filter=blob:none', '--sparse']
+
+        try:
+            self._run_git_clone(clone_args=clone_args, git_url=git_url, env=env)
+
+            if sparse_checkout_path:
+                subprocess.check_output(
+                    ['git', 'sparse-checkout', 'set', '--', sparse_checkout_path],
+                    cwd=self.extract_directory,
+                    stderr=subprocess.STDOUT,
+                    env=env,
+                    timeout=Config().GIT_CLONE_TIMEOUT
+                )
+
+            # Ensure commit of tag can be obtained from the clone
+            subprocess.check_output(
+                ['git', 'rev-parse', '--verify', 'HEAD'],
+                cwd=self.extract_directory,
+                stderr=subprocess.STDOUT
+            )
+        except subprocess.CalledProcessError as exc:
+            print(f"Shallow clone failed, falling back to full clone: {exc}: {exc.output.decode('utf-8') if exc.output else ''}")
+
+            # Remove any partially cloned repository from the extract directory
+            for name in os.listdir(self.extract_directory):
+                path = os.path.join(self.extract_directory, name)
+                if os.path.isdir(path) and not os.path.islink(path):
+                    shutil.rmtree(path)
+                else:
+                    os.unlink(path)
+            return False
+
+        return True
+
+    @staticmethod
+    def get_git_environment() -> Dict[str, str]:
+        """Return environment variables for running git commands against upstream repositories."""
         # Copy current environment variables to add GIT SSH option
         env = os.environ.copy()
         # Set SSH to auto-accept new host keys
         env['GIT_SSH_COMMAND'] = 'ssh -o StrictHostKeyChecking=accept-new'
+        return env
 
-        git_url = self._module_version._module_provider.get_git_clone_url()
-
-        # Add credentials to URL, if using http(s) and configured in
-        # config
+    @staticmethod
+    def get_authenticated_git_url(git_url: str) -> str:
+        """Return git URL with credentials injected, if using http(s) and configured in config."""
         config = Config()
         if config.UPSTREAM_GIT_CREDENTIALS_USERNAME or config.UPSTREAM_GIT_CREDENTIALS_PASSWORD:
             parsed_url = urllib.parse.urlparse(git_url)
@@ -821,18 +1564,29 @@ class GitModuleExtractor(ModuleExtractor):
                 # Replace netloc with username/password prepended authentication
                 parsed_url = parsed_url._replace(netloc=f'{config.UPSTREAM_GIT_CREDENTIALS_USERNAME or ""}:{config.UPSTREAM_GIT_CREDENTIALS_PASSWORD or ""}@' + domain)
                 git_url = urllib.parse.urlunparse(parsed_url)
+        return git_url
 
+    def _clone_repository(self):
+        """Extract uploaded archive into extract directory."""
+        env = self.get_git_environment()
+
+        config = Config()
+        repository_url = self._module_version._module_provider.get_git_clone_url()
+        git_url = self.get_authenticated_git_url(repository_url)
+
+        git_mirror_cache = self._git_mirror_cache or terrareg.git_mirror_cache.GitMirrorCache.get()
         try:
-            subprocess.check_output([
-                    'git', 'clone', '--single-branch',
-                    '--branch', self._module_version.source_git_tag,
-                    git_url,
-                    self.extract_directory
-                ],
-                stderr=subprocess.STDOUT,
-                env=env,
-                timeout=Config().GIT_CLONE_TIMEOUT
-            )
+            if git_mirror_cache:
+                git_mirror_cache.clone_tag(
+                    repository_url=repository_url,
+                    fetch_url=git_url,
+                    tag=self._module_version.source_git_tag,
+                    destination=self.extract_directory,
+                    env=env,
+                    timeout=Config().GIT_CLONE_TIMEOUT
+                )
+            elif not config.GIT_SHALLOW_CLONE or not self._shallow_clone_repository(git_url=git_url, env=env):
+                self._run_git_clone(clone_args=['--single-branch'], git_url=git_url, env=env)
         except subprocess.CalledProcessError as exc:
             error = 'Unknown error occurred during git clone'
             for line in exc.output.decode('utf-8').split('\n'):
@@ -857,6 +1611,7 @@ class GitModuleExtractor(ModuleExtractor):
 
     def process_upload(self):
         """Extract archive and perform data extraction from module source."""
-        self._clone_repository()
+        with self._extraction_report.record('clone'):
+            self._clone_repository()
 
         super(GitModuleExtractor, self).process_upload()
@@ -0,0 +1,228 @@
+"""Provide cached leaderboards of module providers."""
+
+import datetime
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import sqlalchemy
+
+from terrareg.database import Database
+import terrareg.config
+import terrareg.models
+
+
+class ModuleLeaderboard:
+    """
+    Maintain top-N module providers by downloads and most recently published module versions.
+
+    The leaderboards are calculated using a single query per leaderboard type
+    and are held in memory, being refreshed after MODULE_LEADERBOARD_REFRESH_INTERVAL
+    or when module versions are published/removed.
+    Only the names of module providers/versions are cached, so that details (such as
+    verified/trusted labels) are always obtained from the module objects themselves.
+    """
+
+    # Rolling windows of download leaderboards, mapped to number of days
+    WINDOWS = {
+        'day': 1,
+        'week': 7,
+        'month': 31,
+    }
+
+    _LOCK = threading.Lock()
+    # Held whilst re-calculating leaderboards, so only one thread re-calculates them at a time
+    _REFRESH_LOCK = threading.Lock()
+    _DATA = None
+    _REFRESHED_AT = None
+    # Incremented on invalidation, to detect invalidations whilst re-calculating
+    _GENERATION = 0
+    _REFRESH_THREAD = None
+
+    @classmethod
+    def get_datetime_now(cls):
+        """Return datetime now"""
+        return datetime.datetime.now()
+
+    @classmethod
+    def invalidate(cls):
+        """Mark leaderboards as out-of-date, so they are re-calculated on next use."""
+        with cls._LOCK:
+            cls._REFRESHED_AT = None
+            cls._GENERATION += 1
+
+    @classmethod
+    def _is_stale(cls) -> bool:
+        """Return whether the leaderboards require re-calculating."""
+        if cls._DATA is None or cls._REFRESHED_AT is None:
+            return True
+        return (time.monotonic() - cls._REFRESHED_AT) >= terrareg.config.Config().MODULE_LEADERBOARD_REFRESH_INTERVAL
+
+    @classmethod
+    def _calculate_most_downloaded(cls, db: Database, size: int):
+        """Return top module providers by number of downloads for each window."""
+        now = cls.get_datetime_now()
+        window_columns = [
+            sqlalchemy.func.sum(
+                sqlalchemy.case(
+                    (db.analytics.c.timestamp >= (now - datetime.timedelta(days=days)), 1),
+                    else_=0
+                )
+            ).label(window)
+            for window, days in cls.WINDOWS.items()
+        ]
+
+        # Obtain download counts for all windows in a single query,
+        # limited to downloads within the largest window
+        select = sqlalchemy.select(
+            db.namespace.c.namespace,
+            db.module_provider.c.module,
+            db.module_provider.c.provider,
+            *window_columns
+        ).select_from(
+            db.analytics
+        ).join(
+            db.module_version,
+            db.module_version.c.id == db.analytics.c.parent_module_version
+        ).join(
+            db.module_provider,
+            db.module_provider.c.id == db.module_version.c.module_provider_id
+        ).join(
+            db.namespace,
+            db.module_provider.c.namespace_id == db.namespace.c.id
+        ).where(
+            db.analytics.c.timestamp >= (now - datetime.timedelta(days=max(cls.WINDOWS.values()))),
+            db.module_version.c.published == True,
+            db.module_version.c.beta == False,
+            db.module_version.c.internal == False
+        ).group_by(
+            db.namespace.c.namespace,
+            db.module_provider.c.module,
+            db.module_provider.c.provider
+        )
+
+        with db.get_connection() as conn:
+            rows = conn.execute(select).fetchall()
+
+        most_downloaded = {}
+        for window in cls.WINDOWS:
+            window_rows = [
+                ((row['namespace'], row['module'], row['provider']), int(row[window] or 0))
+                for row in rows
+                if row[window]
+            ]
+            # Order by download count, using names to provide consistent ordering
+            window_rows.sort(key=lambda r: (-r[1], r[0]))
+            most_downloaded[window] = window_rows[:size]
+        return most_downloaded
+
+    @classmethod
+    def _calculate_most_recently_published(cls, db: Database, size: int):
+        """Return most recently published module versions."""
+        select = db.select_module_provider_joined_latest_module_version(
+            db.namespace.c.namespace,
+            db.module_provider.c.module,
+            db.module_provider.c.provider,
+            db.module_version.c.version
+        ).where(
+            db.module_version.c.published == True,
+            db.module_version.c.beta == False,
+            db.module_version.c.internal == False
+        ).order_by(
+            db.module_version.c.published_at.desc()
+        ).limit(size)
+
+        with db.get_connection() as conn:
+            rows = conn.execute(select).fetchall()
+
+        return [
+            (row['namespace'], row['module'], row['provider'], row['version'])
+            for row in rows
+        ]
+
+    @classmethod
+    def _refresh(cls):
+        """Re-calculate leaderboards, whilst holding refresh lock."""
+        with cls._LOCK:
+            generation = cls._GENERATION
+
+        db = Database.get()
+        size = terrareg.config.Config().MODULE_LEADERBOARD_SIZE
+        data = {
+            'most_downloaded': cls._calculate_most_downloaded(db=db, size=size),
+            'most_recently_published': cls._calculate_most_recently_published(db=db, size=size),
+        }
+        with cls._LOCK:
+            cls._DATA = data
+            # If the leaderboards were invalidated whilst being calculated,
+            # leave them marked as out-of-date, so they are re-calculated on next use
+            if generation == cls._GENERATION:
+                cls._REFRESHED_AT = time.monotonic()
+        return data
+
+    @classmethod
+    def refresh(cls):
+        """Re-calculate leaderboards."""
+        with cls._REFRESH_LOCK:
+            return cls._refresh()
+
+    @classmethod
+    def _get_data(cls):
+        """
+        Return leaderboard data, refreshing if out-of-date.
+
+        Only one thread re-calculates the leaderboards, with other threads
+        waiting for, and using, the re-calculated leaderboards.
+        """
+        if cls._is_stale():
+            with cls._REFRESH_LOCK:
+                # Leaderboards may have been re-calculated by another thread
+                # whilst waiting for the lock
+                if cls._is_stale():
+                    return cls._refresh()
+        return cls._DATA
+
+    @classmethod
+    def get_most_downloaded(cls, window: str='week', limit: Optional[int]=None) -> List[Tuple['terrareg.models.ModuleProvider', int]]:
+        """Return list of module providers with download counts for given window."""
+        module_providers = []
+        for (namespace_name, module_name, provider_name), download_count in cls._get_data()['most_downloaded'][window][:limit]:
+            namespace = terrareg.models.Namespace(name=namespace_name)
+            module = terrareg.models.Module(namespace=namespace, name=module_name)
+            module_providers.append((
+                terrareg.models.ModuleProvider(module=module, name=provider_name),
+                download_count
+            ))
+        return module_providers
+
+    @classmethod
+    def get_most_recently_published(cls, limit: Optional[int]=None) -> List['terrareg.models.ModuleVersion']:
+        """Return list of most recently published module versions."""
+        module_versions = []
+        for namespace_name, module_name, provider_name, version in cls._get_data()['most_recently_published'][:limit]:
+            namespace = terrareg.models.Namespace(name=namespace_name)
+            module = terrareg.models.Module(namespace=namespace, name=module_name)
+            module_provider = terrareg.models.ModuleProvider(module=module, name=provider_name)
+            module_versions.append(terrareg.models.ModuleVersion(module_provider=module_provider, version=version))
+        return module_versions
+
+    @classmethod
+    def _refresh_loop(cls):
+        """Periodically refresh leaderboards."""
+        while True:
+            try:
+                cls.refresh()
+            except Exception as exc:
+                print(f'Failed to refresh module leaderboards: {exc}')
+            time.sleep(terrareg.config.Config().MODULE_LEADERBOARD_REFRESH_INTERVAL)
+
+    @classmethod
+    def start_refresh_thread(cls):
+        """Start background thread to periodically refresh leaderboards."""
+        if not terrareg.config.Config().MODULE_LEADERBOARD_REFRESH_INTERVAL:
+            return
+        with cls._LOCK:
+            if cls._REFRESH_THREAD is not None:
+                return
+            cls._REFRESH_THREAD = threading.Thread(target=cls._refresh_loop, daemon=True, name='module-leaderboard-refresh')
+        cls._REFRESH_THREAD.start()
@@ -1,11 +1,11 @@
 
-import datetime
 
 import sqlalchemy
 from terrareg.config import Config
 
 from terrareg.database import Database
 import terrareg.models
+import terrareg.module_leaderboard
 from terrareg.filters import NamespaceTrustFilter
 import terrareg.result_data
 
@@ -251,86 +251,19 @@ class ModuleSearch(object):
     @staticmethod
     def get_most_recently_published():
         """Return module with most recent published date."""
-        db = Database.get()
-        select = db.select_module_provider_joined_latest_module_version(
-            db.module_version,
-            db.module_provider,
-            db.namespace
-        ).where(
-            db.module_version.c.published == True,
-            db.module_version.c.beta == False,
-            db.module_version.c.internal == False
-        ).order_by(db.module_version.c.published_at.desc(), 
-        ).limit(1)
-
-        with db.get_connection() as conn:
-            res = conn.execute(select)
-
-            row = res.fetchone()
+        module_versions = terrareg.module_leaderboard.ModuleLeaderboard.get_most_recently_published(limit=1)
 
-        # If there are no rows, return None
-        if not row:
+        # If there are no published module versions, return None
+        if not module_versions:
             return None
-
-        namespace = terrareg.models.Namespace(name=row['namespace'])
-        module = terrareg.models.Module(namespace=namespace,
-                                        name=row['module'])
-        module_provider = terrareg.models.ModuleProvider(module=module,
-                                                         name=row['provider'])
-        return terrareg.models.ModuleVersion(module_provider=module_provider,
-                                             version=row['version'])
+        return module_versions[0]
 
     @staticmethod
     def get_most_downloaded_module_provider_this_Week():
         """Obtain module provider with most downloads this week."""
-        db = Database.get()
-        counts = sqlalchemy.select(
-            [
-                sqlalchemy.func.count().label('download_count'),
-                db.namespace.c.namespace,
-                db.module_provider.c.module,
-                db.module_provider.c.provider
-            ]
-        ).select_from(
-            db.analytics
-        ).join(
-            db.module_version,
-            db.module_version.c.id == db.analytics.c.parent_module_version
-        ).join(
-            db.module_provider,
-            db.module_provider.c.id == db.module_version.c.module_provider_id
-        ).join(
-            db.namespace,
-            db.module_provider.c.namespace_id == db.namespace.c.id
-        ).where(
-            db.analytics.c.timestamp >= (
-                datetime.datetime.now() -
-                datetime.timedelta(days=7)
-            ),
-            db.module_version.c.published == True,
-            db.module_version.c.beta == False,
-            db.module_version.c.internal == False
-        ).group_by(
-            db.namespace.c.id,
-            db.module_provider.c.module,
-            db.module_provider.c.provider
-        ).subquery()
-
-        select = counts.select(
-        ).order_by(
-            counts.c.download_count.desc()
-        ).limit(1)
+        module_providers = terrareg.module_leaderboard.ModuleLeaderboard.get_most_downloaded(window='week', limit=1)
 
-        with db.get_connection() as conn:
-            res = conn.execute(select)
-            row = res.fetchone()
-
-        # If there are no rows, return None
-        if not row:
+        # If there are no downloads, return None
+        if not module_providers:
             return None
-
-        namespace = terrareg.models.Namespace(name=row['namespace'])
-        module = terrareg.models.Module(namespace=namespace,
-                                        name=row['module'])
-        return terrareg.models.ModuleProvider(module=module,
-                                              name=row['provider'])
+        return module_providers[0][0]
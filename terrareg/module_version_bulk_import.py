@@ -0,0 +1,169 @@
+"""Provide import of multiple module versions, from git tags of a module provider."""
+
+import concurrent.futures
+import contextlib
+import subprocess
+import tempfile
+import traceback
+from typing import Callable, Dict, List, Optional, Tuple
+
+import flask
+
+import terrareg.auth
+import terrareg.config
+import terrareg.database
+import terrareg.errors
+import terrareg.git_mirror_cache
+import terrareg.import_job_model
+import terrareg.models
+import terrareg.module_extractor
+from terrareg.loose_version import LooseVersion
+
+
+class ModuleVersionBulkImport:
+    """
+    Plan and import module versions for git tags of a module provider.
+
+    Versions that already exist are skipped and the remaining versions are imported concurrently,
+    with all imports cloning from a single git mirror of the repository.
+    If the import job queue is enabled, an import job is created for each version instead.
+    """
+
+    def __init__(self, module_provider: 'terrareg.models.ModuleProvider', git_tags: Optional[List[str]]=None):
+        """
+        Store member variables.
+
+        If git_tags is not provided, all tags of the repository matching the git tag format of the module provider are imported.
+        """
+        self._module_provider = module_provider
+        self._git_tags = git_tags
+
+    def get_remote_tags(self) -> List[str]:
+        """Return all tags in upstream repository."""
+        git_url = terrareg.module_extractor.GitModuleExtractor.get_authenticated_git_url(
+            self._module_provider.get_git_clone_url()
+        )
+        try:
+            output = subprocess.check_output(
+                ['git', 'ls-remote', '--tags', '--refs', git_url],
+                stderr=subprocess.STDOUT,
+                env=terrareg.module_extractor.GitModuleExtractor.get_git_environment(),
+                timeout=terrareg.config.Config().GIT_CLONE_TIMEOUT
+            )
+        except subprocess.CalledProcessError as exc:
+            error = 'Unknown error occurred whilst obtaining git tags'
+            for line in exc.output.decode('utf-8').split('\n'):
+                if line.startswith('fatal:'):
+                    error = 'Error occurred whilst obtaining git tags: {}'.format(line)
+            if terrareg.config.Config().DEBUG:
+                error += f'\n{str(exc)}\n{exc.output.decode("utf-8")}'
+            raise terrareg.errors.GitCloneError(error)
+
+        tags = []
+        for line in output.decode('utf-8').splitlines():
+            # Each line is in the format: <commit>\trefs/tags/<tag>
+            ref = line.split('\t')[-1]
+            if ref.startswith('refs/tags/'):
+                tags.append(ref[len('refs/tags/'):])
+        return tags
+
+    def plan(self) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+        """
+        Return list of versions to be imported and list of skipped tags.
+
+        Versions to be imported are ordered by version.
+        """
+        git_tags = self._git_tags if self._git_tags is not None else self.get_remote_tags()
+        existing_versions = set(
+            module_version.version
+            for module_version in self._module_provider.get_versions(include_beta=True, include_unpublished=True)
+        )
+
+        planned = {}
+        skipped = []
+        for git_tag in git_tags:
+            version = self._module_provider.get_version_from_tag(tag=git_tag)
+            if not version:
+                # Only report non-matching tags if they were explicitly provided
+                if self._git_tags is not None:
+                    skipped.append({'git_tag': git_tag, 'version': None, 'reason': 'Git tag does not match git tag format of module provider'})
+            elif version in existing_versions:
+                skipped.append({'git_tag': git_tag, 'version': version, 'reason': 'Module version already exists'})
+            elif version in planned:
+                skipped.append({'git_tag': git_tag, 'version': version, 'reason': 'Version is provided by another git tag'})
+            else:
+                planned[version] = {'git_tag': git_tag, 'version': version}
+
+        return [planned[version] for version in sorted(planned, key=LooseVersion)], skipped
+
+    @contextlib.contextmanager
+    def _get_git_mirror_cache(self):
+        """Return git mirror cache, using temporary mirror cache if one is not configured."""
+        if (git_mirror_cache := terrareg.git_mirror_cache.GitMirrorCache.get()):
+            yield git_mirror_cache
+            return
+        with tempfile.TemporaryDirectory(suffix='git-mirror') as temp_dir:
+            yield terrareg.git_mirror_cache.GitMirrorCache(directory=temp_dir, max_size=0)
+
+    def _import_version(self, app: flask.Flask, auth_method: 'terrareg.auth.BaseAuthMethod',
+                        git_mirror_cache: 'terrareg.git_mirror_cache.GitMirrorCache',
+                        planned_version: Dict[str, str]) -> Dict[str, str]:
+        """Import module version, returning result."""
+        result = dict(planned_version)
+        with app.app_context():
+            # Perform actions as the user that started the bulk import, for audit events
+            setattr(flask.g, terrareg.auth.AuthFactory.FLASK_GLOBALS_AUTH_KEY, auth_method)
+            try:
+                with terrareg.database.Database.start_transaction():
+                    module_version = terrareg.models.ModuleVersion(module_provider=self._module_provider, version=planned_version['version'])
+                    with module_version.module_create_extraction_wrapper():
+                        with terrareg.module_extractor.GitModuleExtractor(module_version=module_version, git_mirror_cache=git_mirror_cache) as me:
+                            me.process_upload()
+            except terrareg.errors.TerraregError as exc:
+                result.update(status='Failed', message=str(exc))
+            except Exception:
+                traceback.print_exc()
+                result.update(status='Failed', message='An unexpected error occurred whilst importing module version')
+            else:
+                result.update(status='Success')
+        return result
+
+    def run(self, app: flask.Flask, auth_method: 'terrareg.auth.BaseAuthMethod', concurrency: int,
+            progress_callback: Optional[Callable[[Dict[str, str], int, int], None]]=None) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Import all planned versions, returning summary of imported, failed, queued and skipped versions.
+
+        The progress callback is called with the result of each import, the number of completed imports and the total number of imports.
+        """
+        planned, skipped = self.plan()
+        summary = {'imported': [], 'failed': [], 'queued': [], 'skipped': skipped}
+
+        if terrareg.config.Config().ENABLE_IMPORT_JOB_QUEUE:
+            for planned_version in planned:
+                import_job = terrareg.import_job_model.ImportJob.create(
+                    module_provider=self._module_provider,
+                    version=planned_version['version'],
+                    git_tag=planned_version['git_tag']
+                )
+                result = dict(planned_version, status='Queued', job_id=import_job.pk)
+                summary['queued'].append(result)
+                if progress_callback:
+                    progress_callback(result, len(summary['queued']), len(planned))
+            return summary
+
+        with self._get_git_mirror_cache() as git_mirror_cache, \
+                concurrent.futures.ThreadPoolExecutor(max_workers=max(concurrency, 1)) as executor:
+            futures = [
+                executor.submit(self._import_version, app, auth_method, git_mirror_cache, planned_version)
+                for planned_version in planned
+            ]
+            for completed_count, future in enumerate(concurrent.futures.as_completed(futures), start=1):
+                result = future.result()
+                summary['imported' if result['status'] == 'Success' else 'failed'].append(result)
+                if progress_callback:
+                    progress_callback(result, completed_count, len(planned))
+
+        # Order results by version
+        for key in ['imported', 'failed']:
+            summary[key].sort(key=lambda result: LooseVersion(result['version']))
+        return summary
@@ -1,5 +1,12 @@
-
+import base64
+import binascii
+import collections
 import datetime
+import hashlib
+import hmac
+import struct
+import threading
+
 import jwt
 
 import terrareg.config
@@ -9,6 +16,15 @@ from terrareg.utils import get_datetime_now
 
 class TerraformSourcePresignedUrl:
 
+    # Number of bytes of HMAC used in compact pre-signed keys
+    SIGNATURE_SIZE = 16
+
+    # Maximum number of verified pre-signed keys to retain
+    VERIFIED_KEY_CACHE_SIZE = 1024
+
+    _VERIFIED_KEY_CACHE_LOCK = threading.Lock()
+    _VERIFIED_KEY_CACHE = collections.OrderedDict()
+
     @classmethod
     def is_enabled(cls):
         """Whether pre-signed URLs are available"""
@@ -25,6 +41,12 @@ class TerraformSourcePresignedUrl:
         expiry = terrareg.config.Config().TERRAFORM_PRESIGNED_URL_EXPIRY_SECONDS
         return (get_datetime_now() + datetime.timedelta(seconds=expiry)).isoformat()
 
+    @classmethod
+    def get_expiry_timestamp(cls):
+        """Get expiry as integer UNIX timestamp"""
+        expiry = terrareg.config.Config().TERRAFORM_PRESIGNED_URL_EXPIRY_SECONDS
+        return int(get_datetime_now().timestamp()) + expiry
+
     @classmethod
     def get_algorithm(cls):
         """Return JWT algorithms supported"""
@@ -41,7 +63,7 @@ class TerraformSourcePresignedUrl:
         except ValueError:
             # Handle invalid format
             return False
-        
+
         # If expiry is in the past, do not allow
         if expiry_dt < get_datetime_now():
             return False
@@ -49,29 +71,54 @@ class TerraformSourcePresignedUrl:
         # If all checks have passed, return False
         return True
 
+    @classmethod
+    def _get_signature(cls, url, expiry):
+        """Return signature of hash of URL and expiry timestamp"""
+        url_hash = hashlib.sha256(url.encode('utf-8')).digest()
+        return hmac.new(
+            cls.get_secret().encode('utf-8'),
+            url_hash + struct.pack('>Q', expiry),
+            hashlib.sha256
+        ).digest()[:cls.SIGNATURE_SIZE]
+
     @classmethod
     def generate_presigned_key(cls, url):
-        """Generate pre-signed key for URL"""
+        """
+        Generate pre-signed key for URL.
+
+        The key contains the expiry timestamp and signature of the URL and expiry, encoded using URL-safe base64.
+        """
         if not cls.is_enabled():
             raise PresignedUrlsNotConfiguredError("Presigned URL configurations are not present. Please see documentation")
 
-        payload = {
-            "expiry": cls.get_expiry(),
-            "url": url
-        }
-        return jwt.encode(payload=payload, key=cls.get_secret(), algorithm=cls.get_algorithm())
+        expiry = cls.get_expiry_timestamp()
+        key = struct.pack('>Q', expiry) + cls._get_signature(url=url, expiry=expiry)
+        return base64.urlsafe_b64encode(key).decode('utf-8').rstrip('=')
 
     @classmethod
-    def validate_presigned_key(cls, url, payload):
-        """Ensure provided pre-signed key is valid"""
-        if not cls.is_enabled():
-            raise PresignedUrlsNotConfiguredError("Presigned URL configurations are not present. Please see documentation")
+    def _validate_compact_presigned_key(cls, url, payload, generic_exception):
+        """Validate compact pre-signed key, returning expiry timestamp"""
+        try:
+            key = base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4))
+        except (binascii.Error, ValueError):
+            raise generic_exception
 
-        # Generate exception that is identical to end user,
-        # but can be raised multiple in multiple places to allow
-        # identification of specific problem to system maintainers 
-        generic_exception = InvalidPresignedUrlKeyError("Invalid pre-signed URL key")
+        if len(key) != 8 + cls.SIGNATURE_SIZE:
+            raise generic_exception
+
+        expiry, = struct.unpack('>Q', key[:8])
+        if not hmac.compare_digest(key[8:], cls._get_signature(url=url, expiry=expiry)):
+            raise generic_exception
 
+        # Ensure expiry is still valid
+        if expiry < get_datetime_now().timestamp():
+            raise generic_exception
+
+        return expiry
+
+    @classmethod
+    def _validate_jwt_presigned_key(cls, url, payload, generic_exception):
+        """Validate legacy JWT pre-signed key, returning expiry timestamp"""
         try:
             decrypted_payload = jwt.decode(jwt=payload, key=cls.get_secret(), algorithms=[cls.get_algorithm()])
 
@@ -84,7 +131,65 @@ class TerraformSourcePresignedUrl:
         # Ensure expiry is still valid
         if not cls.expiry_is_valid(decrypted_payload.get("expiry")):
             raise generic_exception
-        
+
         # Ensure URL in pre-signed token matches the actual URL
         if url != decrypted_payload.get("url"):
             raise generic_exception
+
+        return datetime.datetime.fromisoformat(decrypted_payload["expiry"]).timestamp()
+
+    @classmethod
+    def _is_verified(cls, cache_key):
+        """Return whether pre-signed key has been verified and has not expired"""
+        with cls._VERIFIED_KEY_CACHE_LOCK:
+            expiry = cls._VERIFIED_KEY_CACHE.get(cache_key)
+            if expiry is None:
+                return False
+            if expiry < get_datetime_now().timestamp():
+                del cls._VERIFIED_KEY_CACHE[cache_key]
+                return False
+            cls._VERIFIED_KEY_CACHE.move_to_end(cache_key)
+            return True
+
+    @classmethod
+    def _store_verified(cls, cache_key, expiry):
+        """Store verified pre-signed key, removing least recently used keys when the cache is full"""
+        with cls._VERIFIED_KEY_CACHE_LOCK:
+            cls._VERIFIED_KEY_CACHE[cache_key] = expiry
+            cls._VERIFIED_KEY_CACHE.move_to_end(cache_key)
+            while len(cls._VERIFIED_KEY_CACHE) > cls.VERIFIED_KEY_CACHE_SIZE:
+                cls._VERIFIED_KEY_CACHE.popitem(last=False)
+
+    @classmethod
+    def validate_presigned_key(cls, url, payload):
+        """
+        Ensure provided pre-signed key is valid
+
+        Both compact pre-signed keys and legacy JWT pre-signed keys are accepted.
+        Verified keys are cached until they expire, so repeated downloads using the same pre-signed URL
+        are not re-verified.
+        """
+        if not cls.is_enabled():
+            raise PresignedUrlsNotConfiguredError("Presigned URL configurations are not present. Please see documentation")
+
+        # Generate exception that is identical to end user,
+        # but can be raised multiple in multiple places to allow
+        # identification of specific problem to system maintainers
+        generic_exception = InvalidPresignedUrlKeyError("Invalid pre-signed URL key")
+
+        if not payload or type(payload) is not str:
+            raise generic_exception
+
+        # Include secret in cache key, so keys are no longer accepted if the secret is changed
+        cache_key = (cls.get_secret(), url, payload)
+        if cls._is_verified(cache_key):
+            return
+
+        # JWTs contain separators between the header, payload and signature,
+        # which are not present in URL-safe base64
+        if '.' in payload:
+            expiry = cls._validate_jwt_presigned_key(url=url, payload=payload, generic_exception=generic_exception)
+        else:
+            expiry = cls._validate_compact_presigned_key(url=url, payload=payload, generic_exception=generic_exception)
+
+        cls._store_verified(cache_key, expiry)
@@ -185,28 +185,31 @@ class ProviderExtractor:
                 if not os.path.isdir(documentation_directory):
                     os.mkdir(documentation_directory)
 
-                    with terrareg.module_extractor.ModuleExtractor._switch_terraform_versions(source_dir):
-                        go_env = os.environ.copy()
-                        go_env["GOROOT"] = "/usr/local/go"
-                        go_env["GOPATH"] = temp_go_package_cache
-
-                        # Create documentation directory, if it does not exist
-                        if not os.path.isdir(documentation_directory):
-                            os.mkdir(documentation_directory)
-
-                        # Run go module for extracting docs
-                        try:
-                            subprocess.call(
-                                ['tfplugindocs', 'generate'],
-                                cwd=source_dir,
-                                env=go_env,
-                            )
-                        except subprocess.CalledProcessError as exc:
-                            print(
-                                "An error occurred whilst extracting terraform provider docs: " +
-                                (f": {str(exc)}: {exc.output.decode('utf-8')}" if terrareg.config.Config().DEBUG else "")
-                            )
-                            return
+                    terraform_binary = terrareg.module_extractor.ModuleExtractor._install_terraform_version(source_dir)
+
+                    go_env = os.environ.copy()
+                    go_env["GOROOT"] = "/usr/local/go"
+                    go_env["GOPATH"] = temp_go_package_cache
+                    # Add installed Terraform binary to PATH
+                    go_env["PATH"] = os.pathsep.join([os.path.dirname(terraform_binary), go_env.get("PATH", "")])
+
+                    # Create documentation directory, if it does not exist
+                    if not os.path.isdir(documentation_directory):
+                        os.mkdir(documentation_directory)
+
+                    # Run go module for extracting docs
+                    try:
+                        subprocess.call(
+                            ['tfplugindocs', 'generate'],
+                            cwd=source_dir,
+                            env=go_env,
+                        )
+                    except subprocess.CalledProcessError as exc:
+                        print(
+                            "An error occurred whilst extracting terraform provider docs: " +
+                            (f": {str(exc)}: {exc.output.decode('utf-8')}" if terrareg.config.Config().DEBUG else "")
+                        )
+                        return
 
                 self._collect_markdown_documentation(
                     source_directory=source_dir,
@@ -0,0 +1,127 @@
+"""Provide filesystem mirror of providers hosted by Terrareg, used during module extraction."""
+
+import os
+import shutil
+import uuid
+from typing import Optional
+
+import sqlalchemy
+
+import terrareg.config
+import terrareg.database
+import terrareg.file_storage
+import terrareg.provider_version_binary_model
+from terrareg.utils import get_public_url_details
+
+
+class ProviderMirror:
+    """
+    Filesystem mirror, in the "packed" layout, of provider binaries hosted by Terrareg.
+
+    Binaries are stored in the layout expected by the filesystem_mirror provider installation method:
+    HOSTNAME/NAMESPACE/TYPE/terraform-provider-TYPE_VERSION_TARGET.zip
+    """
+
+    @classmethod
+    def get(cls) -> Optional['ProviderMirror']:
+        """Return provider mirror, if a mirror directory has been configured."""
+        directory = terrareg.config.Config().TERRAFORM_PROVIDER_MIRROR_DIRECTORY
+        if not directory:
+            return None
+        return cls(directory=directory)
+
+    @staticmethod
+    def get_hostname() -> Optional[str]:
+        """Return hostname of registry, as used in provider source addresses."""
+        protocol, domain, port = get_public_url_details()
+        if not domain:
+            return None
+        # Source addresses only contain the port if it is not the default port
+        if (protocol == 'https' and port == 443) or (protocol == 'http' and port == 80):
+            return domain
+        return f"{domain}:{port}"
+
+    def __init__(self, directory: str):
+        """Store member variables."""
+        self._directory = directory
+
+    @property
+    def directory(self) -> str:
+        """Return path of mirror directory."""
+        return self._directory
+
+    def get_binary_path(self, provider_version_binary: 'terrareg.provider_version_binary_model.ProviderVersionBinary') -> Optional[str]:
+        """Return path of binary in mirror, returning None if the registry hostname is not configured."""
+        hostname = self.get_hostname()
+        if not hostname:
+            return None
+        provider = provider_version_binary.provider_version.provider
+        return os.path.join(
+            self._directory,
+            hostname,
+            provider.namespace.name,
+            provider.name,
+            provider_version_binary.name
+        )
+
+    def add_provider_version_binary(self,
+                                    provider_version_binary: 'terrareg.provider_version_binary_model.ProviderVersionBinary',
+                                    content: Optional[bytes]=None) -> bool:
+        """
+        Add provider binary to mirror, returning whether the binary was added.
+
+        If content is not provided, the binary is read from file storage.
+        """
+        binary_path = self.get_binary_path(provider_version_binary)
+        if binary_path is None:
+            print("Unable to add provider to mirror, as the public URL/domain name of the registry is not configured")
+            return False
+
+        if os.path.isfile(binary_path):
+            return False
+
+        binary_fh = None
+        if content is None:
+            file_storage = terrareg.file_storage.FileStorageFactory().get_file_storage()
+            binary_fh = file_storage.read_file(provider_version_binary.local_file_path, bytes_mode=True)
+            if binary_fh is None:
+                print(f"Unable to read provider binary from storage: {provider_version_binary.local_file_path}")
+                return False
+
+        # Write to temporary file and move into place,
+        # as the mirror may be read by concurrent extractions
+        os.makedirs(os.path.dirname(binary_path), exist_ok=True)
+        temporary_path = f"{binary_path}.{uuid.uuid4().hex}.tmp"
+        with open(temporary_path, 'wb') as temporary_fh:
+            if binary_fh is not None:
+                # Stream binary from storage, rather than reading it into memory
+                with binary_fh:
+                    shutil.copyfileobj(binary_fh, temporary_fh)
+            else:
+                temporary_fh.write(content)
+        os.replace(temporary_path, binary_path)
+        return True
+
+    def populate(self) -> int:
+        """Add all provider binaries hosted by the registry to the mirror, returning number of binaries added."""
+        db = terrareg.database.Database.get()
+        select = sqlalchemy.select(
+            db.provider_version_binary.c.id
+        ).select_from(
+            db.provider_version_binary
+        ).order_by(
+            db.provider_version_binary.c.id
+        )
+        with db.get_connection() as conn:
+            rows = conn.execute(select).all()
+
+        added_count = 0
+        for row in rows:
+            provider_version_binary = terrareg.provider_version_binary_model.ProviderVersionBinary(pk=row['id'])
+            try:
+                if self.add_provider_version_binary(provider_version_binary):
+                    print(f"Added provider binary to mirror: {provider_version_binary.name}")
+                    added_count += 1
+            except Exception as exc:
+                print(f"Failed to add provider binary to mirror: {provider_version_binary.name}: {exc}")
+        return added_count
@@ -12,6 +12,7 @@ import terrareg.provider_documentation_type
 import terrareg.database
 import terrareg.provider_binary_types
 import terrareg.file_storage
+import terrareg.provider_mirror
 
 
 class ProviderVersionBinary:
@@ -66,6 +67,13 @@ class ProviderVersionBinary:
         obj = cls(pk=pk)
         obj.create_local_binary(content=content)
 
+        # Add binary to provider mirror used by module extraction, if enabled
+        if (provider_mirror := terrareg.provider_mirror.ProviderMirror.get()):
+            try:
+                provider_mirror.add_provider_version_binary(obj, content=content)
+            except Exception as exc:
+                print(f"Failed to add provider binary to mirror: {exc}")
+
         return obj
 
     @classmethod
@@ -1,6 +1,7 @@
 
 import os
 from functools import wraps
+from typing import List, Optional
 
 from flask import Flask, session, redirect, request
 from flask_restful import Api
@@ -11,6 +12,9 @@ from waitress import serve
 import terrareg.config
 import terrareg.database
 import terrareg.models
+import terrareg.module_leaderboard
+import terrareg.import_job_worker
+import terrareg.module_version_bulk_import
 import terrareg.errors
 import terrareg.auth
 import terrareg.provider_source.factory
@@ -18,6 +22,7 @@ import terrareg.provider_category_model
 import terrareg.provider_model
 from terrareg.server.api.terrareg_module_providers import ApiTerraregModuleProviders
 from .base_handler import BaseHandler
+from .upload_streaming_request import UploadStreamingRequest
 from terrareg.server.api import *
 import terrareg.server.api.terraform_oauth
 
@@ -132,6 +137,7 @@ class Server(BaseHandler):
             static_folder=os.path.join('..', 'static'),
             template_folder=os.path.join('..', 'templates')
         )
+        self._app.request_class = UploadStreamingRequest
         self._api = Api(
             self._app,
             #prefix='v1'
@@ -520,6 +526,21 @@ class Server(BaseHandler):
             ApiTerraregMostDownloadedModuleProviderThisWeek,
             '/v1/terrareg/analytics/global/most_downloaded_module_provider_this_week'
         )
+        self._api.add_resource(
+            ApiTerraregTopModuleProviders,
+            '/v1/terrareg/analytics/global/top_module_providers'
+        )
+        self._api.add_resource(
+            ApiTerraregAnalyticsExport,
+            '/v1/terrareg/analytics/<string:namespace>/export',
+            '/v1/terrareg/analytics/<string:namespace>/<string:name>/<string:provider>/export'
+        )
+
+        # Import jobs
+        self._api.add_resource(
+            ApiTerraregImportJob,
+            '/v1/terrareg/import_jobs/<int:job_id>'
+        )
 
         # Initial setup
         self._api.add_resource(
@@ -591,6 +612,10 @@ class Server(BaseHandler):
             ApiTerraregModuleVersionVariableTemplate,
             '/v1/terrareg/modules/<string:namespace>/<string:name>/<string:provider>/<string:version>/variable_template'
         )
+        self._api.add_resource(
+            ApiTerraregModuleVersionExtractionReport,
+            '/v1/terrareg/modules/<string:namespace>/<string:name>/<string:provider>/<string:version>/extraction_report'
+        )
         self._api.add_resource(
             ApiTerraregModuleVersionFile,
             '/v1/terrareg/modules/<string:namespace>/<string:name>/<string:provider>/<string:version>/files/<string:path>'
@@ -611,6 +636,10 @@ class Server(BaseHandler):
             ApiModuleVersionImport,
             '/v1/terrareg/modules/<string:namespace>/<string:name>/<string:provider>/import'
         )
+        self._api.add_resource(
+            ApiModuleVersionBulkImport,
+            '/v1/terrareg/modules/<string:namespace>/<string:name>/<string:provider>/import/bulk'
+        )
         self._api.add_resource(
             ApiModuleVersionSourceDownload,
             '/v1/terrareg/modules/<string:namespace>/<string:name>/<string:provider>/<string:version>/source.zip',
@@ -722,14 +751,80 @@ class Server(BaseHandler):
 
         self._app.secret_key = terrareg.config.Config().SECRET_KEY
 
+        terrareg.module_leaderboard.ModuleLeaderboard.start_refresh_thread()
+        self._start_import_job_workers()
+
         self._app.run(**kwargs)
 
     def run_waitress(self):
         """Run waitress server"""
         self._app.secret_key = terrareg.config.Config().SECRET_KEY
 
+        terrareg.module_leaderboard.ModuleLeaderboard.start_refresh_thread()
+        self._start_import_job_workers()
+
         serve(self._app, host=self.host, port=self.port)
 
+    def _start_import_job_workers(self):
+        """Start import job worker threads, if import job queue is enabled"""
+        config = terrareg.config.Config()
+        if config.ENABLE_IMPORT_JOB_QUEUE and config.IMPORT_JOB_WORKER_THREADS > 0:
+            terrareg.import_job_worker.ImportJobWorker.start_worker_threads(
+                app=self._app, count=config.IMPORT_JOB_WORKER_THREADS
+            )
+
+    def run_import_job_workers(self):
+        """Run import job workers, without web server, until interrupted"""
+        self._app.secret_key = terrareg.config.Config().SECRET_KEY
+
+        threads = terrareg.import_job_worker.ImportJobWorker.start_worker_threads(
+            app=self._app, count=max(terrareg.config.Config().IMPORT_JOB_WORKER_THREADS, 1)
+        )
+        for thread in threads:
+            thread.join()
+
+    def run_bulk_module_version_import(self, namespace: str, module: str, provider: str,
+                                       git_tags: Optional[List[str]], concurrency: int) -> bool:
+        """Import module versions for git tags of module provider, printing progress, returning whether all imports succeeded"""
+        self._app.secret_key = terrareg.config.Config().SECRET_KEY
+
+        namespace_obj = terrareg.models.Namespace.get(namespace)
+        module_provider = None
+        if namespace_obj:
+            module_provider = terrareg.models.ModuleProvider.get(
+                module=terrareg.models.Module(namespace=namespace_obj, name=module),
+                name=provider
+            )
+        if module_provider is None:
+            print(f"Module provider does not exist: {namespace}/{module}/{provider}")
+            return False
+        if not module_provider.get_git_clone_url():
+            print("Module provider is not configured with a repository")
+            return False
+
+        def print_progress(result, completed_count, total_count):
+            print(f"[{completed_count}/{total_count}] {result['git_tag']} ({result['version']}): {result['status']}" +
+                  (f": {result['message']}" if result.get('message') else ""))
+
+        bulk_import = terrareg.module_version_bulk_import.ModuleVersionBulkImport(
+            module_provider=module_provider,
+            git_tags=git_tags
+        )
+        summary = bulk_import.run(
+            app=self._app,
+            auth_method=terrareg.auth.ImportJobAuthMethod(),
+            concurrency=concurrency,
+            progress_callback=print_progress
+        )
+
+        for skipped in summary['skipped']:
+            print(f"Skipped {skipped['git_tag']}: {skipped['reason']}")
+        print(
+            f"Imported: {len(summary['imported'])}, Failed: {len(summary['failed'])}, "
+            f"Queued: {len(summary['queued'])}, Skipped: {len(summary['skipped'])}"
+        )
+        return not summary['failed']
+
     def _namespace_404(self, namespace_name: str):
         """Return 404 page for non-existent namespace"""
         return self._render_template(
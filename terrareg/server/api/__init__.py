@@ -7,6 +7,7 @@ from .module_version_create_bitbucket_hook import ApiModuleVersionCreateBitBucke
 from .module_version_create_github_hook import ApiModuleVersionCreateGitHubHook
 from .module_version_create import ApiModuleVersionCreate
 from .module_version_import import ApiModuleVersionImport
+from .module_version_bulk_import import ApiModuleVersionBulkImport
 from .module_version_details import ApiModuleVersionDetails
 from .module_version_download import ApiModuleVersionDownload
 from .module_version_source_download import ApiModuleVersionSourceDownload
@@ -20,6 +21,7 @@ from .saml_initiate import ApiSamlInitiate
 from .saml_metadata import ApiSamlMetadata
 from .terraform_well_known import ApiTerraformWellKnown
 from .terrareg_admin_authenticate import ApiTerraregAdminAuthenticate
+from .terrareg_analytics_export import ApiTerraregAnalyticsExport
 from .terrareg_audit_history import ApiTerraregAuditHistory
 from .terrareg_auth_user_groups import ApiTerraregAuthUserGroups
 from .terrareg_config import ApiTerraregConfig
@@ -49,8 +51,11 @@ from .terrareg_module_version_publish import ApiTerraregModuleVersionPublish
 from .terrareg_module_version_readme_html import ApiTerraregModuleVersionReadmeHtml
 from .terrareg_module_version_submodules import ApiTerraregModuleVerisonSubmodules
 from .terrareg_module_version_variable_template import ApiTerraregModuleVersionVariableTemplate
+from .terrareg_module_version_extraction_report import ApiTerraregModuleVersionExtractionReport
 from .terrareg_most_downloaded_module_this_week import ApiTerraregMostDownloadedModuleProviderThisWeek
 from .terrareg_most_recently_published_module_version import ApiTerraregMostRecentlyPublishedModuleVersion
+from .terrareg_top_module_providers import ApiTerraregTopModuleProviders
+from .terrareg_import_job import ApiTerraregImportJob
 from .terrareg_namespace_details import ApiTerraregNamespaceDetails
 from .terrareg_namespace_modules import ApiTerraregNamespaceModules
 from .terrareg_namespaces import ApiTerraregNamespaces
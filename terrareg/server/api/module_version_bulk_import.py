@@ -0,0 +1,71 @@
+
+import flask
+from flask_restful import reqparse
+
+from terrareg.server.error_catching_resource import ErrorCatchingResource
+import terrareg.auth
+import terrareg.auth_wrapper
+import terrareg.config
+import terrareg.database
+import terrareg.module_version_bulk_import
+
+
+class ApiModuleVersionBulkImport(ErrorCatchingResource):
+    """
+    Provide interface to import/index multiple versions for git-backed modules.
+    """
+
+    method_decorators = [terrareg.auth_wrapper.auth_wrapper('can_upload_module_version', request_kwarg_map={'namespace': 'namespace'})]
+
+    def _post_arg_parser(self):
+        """Obtain argument parser for post request"""
+        parser = reqparse.RequestParser()
+        parser.add_argument(
+            'git_tags',
+            type=str,
+            action='append',
+            required=False,
+            default=None,
+            location='json',
+            help=(
+                'List of git tags to be imported.'
+                ' If not provided, all tags in the repository that match the git tag format of the module provider are imported.'
+            )
+        )
+        return parser
+
+    def _post(self, namespace, name, provider):
+        """
+        Create import jobs for all module versions for git tags that have not already been imported.
+
+        Imports are performed by import job workers, so this requires the import job queue to be enabled.
+        """
+        # Importing many module versions can take longer than the request timeout,
+        # so module versions are only imported synchronously by the bulk-import command
+        if not terrareg.config.Config().ENABLE_IMPORT_JOB_QUEUE:
+            return {
+                'status': 'Error',
+                'message': 'Bulk import requires the import job queue to be enabled. Use the bulk-import command to import without the queue.'
+            }, 400
+
+        args = self._post_arg_parser().parse_args()
+
+        _, _, module_provider, error = self.get_module_provider_by_names(namespace, name, provider)
+        if error:
+            return error[0], 400
+
+        # Ensure that the module provider has a repository url configured.
+        if not module_provider.get_git_clone_url():
+            return {'status': 'Error', 'message': 'Module provider is not configured with a repository'}, 400
+
+        bulk_import = terrareg.module_version_bulk_import.ModuleVersionBulkImport(
+            module_provider=module_provider,
+            git_tags=args.git_tags
+        )
+        summary = bulk_import.run(
+            app=flask.current_app._get_current_object(),
+            auth_method=terrareg.auth.AuthFactory().get_current_auth_method(),
+            concurrency=1
+        )
+
+        return dict(summary, status='Queued'), 202
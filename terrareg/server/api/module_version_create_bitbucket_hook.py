@@ -11,6 +11,7 @@ import terrareg.config
 import terrareg.models
 import terrareg.module_extractor
 import terrareg.errors
+import terrareg.import_job_model
 
 
 class ApiModuleVersionCreateBitBucketHook(ErrorCatchingResource):
@@ -52,6 +53,7 @@ class ApiModuleVersionCreateBitBucketHook(ErrorCatchingResource):
 
             imported_versions = {}
             error = False
+            queue_imports = terrareg.config.Config().ENABLE_IMPORT_JOB_QUEUE
 
             for change in bitbucket_data['changes']:
 
@@ -82,6 +84,18 @@ class ApiModuleVersionCreateBitBucketHook(ErrorCatchingResource):
                 if not version:
                     continue
 
+                # Queue import from git, if import job queue is enabled
+                if queue_imports:
+                    import_job = terrareg.import_job_model.ImportJob.create(
+                        module_provider=module_provider, version=version,
+                        git_tag=re.sub(r'^refs/tags/', '', tag_ref)
+                    )
+                    imported_versions[version] = {
+                        'status': 'Queued',
+                        'job': import_job.get_api_outline()
+                    }
+                    continue
+
                 # Create module version
                 module_version = terrareg.models.ModuleVersion(module_provider=module_provider, version=version)
 
@@ -114,6 +128,12 @@ class ApiModuleVersionCreateBitBucketHook(ErrorCatchingResource):
                     'message': 'One or more tags failed to import',
                     'tags': imported_versions
                 }, 500
+            if queue_imports:
+                return {
+                    'status': 'Queued',
+                    'message': 'Queued import of all provided tags',
+                    'tags': imported_versions
+                }, 202
             return {
                 'status': 'Success',
                 'message': 'Imported all provided tags',
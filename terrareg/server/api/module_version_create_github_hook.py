@@ -11,6 +11,7 @@ import terrareg.config
 import terrareg.models
 import terrareg.module_extractor
 import terrareg.errors
+import terrareg.import_job_model
 
 
 class ApiModuleVersionCreateGitHubHook(ErrorCatchingResource):
@@ -82,6 +83,17 @@ class ApiModuleVersionCreateGitHubHook(ErrorCatchingResource):
                 return {
                     'status': 'Success'
                 }
+            elif terrareg.config.Config().ENABLE_IMPORT_JOB_QUEUE:
+                # Queue import from git
+                import_job = terrareg.import_job_model.ImportJob.create(
+                    module_provider=module_provider, version=version, git_tag=tag_ref
+                )
+                return {
+                    'status': 'Queued',
+                    'message': 'Queued import of provided tag',
+                    'tag': tag_ref,
+                    'job': import_job.get_api_outline()
+                }, 202
             else:
                 # Perform import from git
                 try:
@@ -6,6 +6,8 @@ import terrareg.auth_wrapper
 import terrareg.models
 import terrareg.database
 import terrareg.module_extractor
+import terrareg.config
+import terrareg.import_job_model
 
 
 class ApiModuleVersionImport(ErrorCatchingResource):
@@ -76,6 +78,16 @@ class ApiModuleVersionImport(ErrorCatchingResource):
                                 'Ensure it matches the git_tag_format template for this module provider'
                     }, 400
 
+            # Queue import, if import job queue is enabled
+            if terrareg.config.Config().ENABLE_IMPORT_JOB_QUEUE:
+                import_job = terrareg.import_job_model.ImportJob.create(
+                    module_provider=module_provider, version=version, git_tag=args.git_tag
+                )
+                return {
+                    'status': 'Queued',
+                    'job': import_job.get_api_outline()
+                }, 202
+
             module_version = terrareg.models.ModuleVersion(module_provider=module_provider, version=version)
 
             with module_version.module_create_extraction_wrapper():
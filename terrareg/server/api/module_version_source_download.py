@@ -1,7 +1,13 @@
 
 
 import os
+import urllib.parse
+
 import flask
+import werkzeug.datastructures
+import werkzeug.exceptions
+import werkzeug.http
+import werkzeug.wsgi
 
 from terrareg.errors import InvalidPresignedUrlKeyError
 import terrareg.presigned_url
@@ -42,9 +48,137 @@ class ApiModuleVersionSourceDownload(ErrorCatchingResource):
         if error:
             return error
 
+        # Return not modified response, if the client has the current archive
+        if not werkzeug.http.is_resource_modified(
+                flask.request.environ,
+                etag=module_version.archive_sha256,
+                last_modified=module_version.published_at):
+            response = flask.Response(status=304)
+            self._add_cache_headers(response, module_version)
+            return response
+
         file_storage = terrareg.file_storage.FileStorageFactory().get_file_storage()
-        return flask.send_file(
-            file_storage.read_file(os.path.join(module_version.base_directory, module_version.archive_name_zip), bytes_mode=True),
+        archive_path = os.path.join(module_version.base_directory, module_version.archive_name_zip)
+
+        # Redirect to storage, if supported, so that the archive is not proxied
+        if config.S3_DOWNLOAD_REDIRECT:
+            presigned_url = file_storage.get_presigned_url(
+                archive_path,
+                expiry=config.S3_DOWNLOAD_REDIRECT_EXPIRY,
+                download_name=module_version.archive_name_zip,
+                mimetype='application/zip'
+            )
+            if presigned_url:
+                response = flask.redirect(presigned_url, code=302)
+                # Presigned URLs expire, so must not be cached
+                response.cache_control.no_store = True
+                return response
+
+        # Offload serving of local archives to reverse proxy, if configured
+        if config.LOCAL_STORAGE_DOWNLOAD_OFFLOAD is not terrareg.config.DownloadOffloadMode.NONE:
+            local_path = file_storage.get_local_path(archive_path)
+            if local_path:
+                return self._send_offload_response(archive_path, local_path, module_version)
+
+        byte_range = self._get_byte_range(module_version)
+        if byte_range is not None:
+            return self._send_partial_content(file_storage, archive_path, module_version, byte_range)
+
+        archive_fh = file_storage.read_file(archive_path, bytes_mode=True)
+        response = flask.send_file(
+            archive_fh,
             download_name=module_version.archive_name_zip,
             mimetype='application/zip'
         )
+        # Provide length of archives that are streamed from storage
+        if isinstance(archive_fh, terrareg.file_storage.StreamReader):
+            response.content_length = archive_fh.size
+        self._add_cache_headers(response, module_version)
+        return response
+
+    def _add_cache_headers(self, response, module_version):
+        """Add validators and cache control headers for archive to response."""
+        config = terrareg.config.Config()
+
+        if module_version.archive_sha256:
+            response.set_etag(module_version.archive_sha256)
+        if module_version.published_at:
+            response.last_modified = module_version.published_at
+
+        # Ranges can only be served when the size of the archive is known
+        if module_version.archive_size:
+            response.accept_ranges = 'bytes'
+
+        if config.MODULE_ARCHIVE_CACHE_MAX_AGE > 0:
+            response.cache_control.no_cache = None
+            response.cache_control.max_age = config.MODULE_ARCHIVE_CACHE_MAX_AGE
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+
+        # Avoid shared caches storing archives that require authentication
+        if config.ALLOW_UNAUTHENTICATED_ACCESS:
+            response.cache_control.public = True
+        else:
+            response.cache_control.public = None
+            response.cache_control.private = True
+
+    def _send_offload_response(self, archive_path, local_path, module_version):
+        """Return response without content, containing header for reverse proxy to serve archive."""
+        config = terrareg.config.Config()
+        response = flask.Response(status=200, mimetype='application/zip')
+        if config.LOCAL_STORAGE_DOWNLOAD_OFFLOAD is terrareg.config.DownloadOffloadMode.X_ACCEL_REDIRECT:
+            response.headers['X-Accel-Redirect'] = urllib.parse.quote(
+                f"{config.LOCAL_STORAGE_DOWNLOAD_OFFLOAD_PREFIX.rstrip('/')}/{archive_path.lstrip('/')}"
+            )
+        else:
+            response.headers['X-Sendfile'] = local_path
+        response.headers['Content-Disposition'] = f'attachment; filename={module_version.archive_name_zip}'
+        self._add_cache_headers(response, module_version)
+        return response
+
+    def _get_byte_range(self, module_version):
+        """
+        Return inclusive byte range requested by client, if a single range of the current archive has been requested.
+
+        Returns None if the full archive should be returned.
+        Raises RequestedRangeNotSatisfiable if the range is not within the archive.
+        """
+        request_range = flask.request.range
+        if request_range is None or not module_version.archive_size:
+            return None
+
+        # Ignore requests with multiple ranges, returning the full archive
+        if len(request_range.ranges) != 1:
+            return None
+
+        # Ignore range if If-Range does not match the current archive
+        if 'HTTP_IF_RANGE' in flask.request.environ and werkzeug.http.is_resource_modified(
+                flask.request.environ,
+                etag=module_version.archive_sha256,
+                last_modified=module_version.published_at,
+                ignore_if_range=False):
+            return None
+
+        range_tuple = request_range.range_for_length(module_version.archive_size)
+        if range_tuple is None:
+            raise werkzeug.exceptions.RequestedRangeNotSatisfiable(length=module_version.archive_size)
+
+        return range_tuple[0], range_tuple[1] - 1
+
+    def _send_partial_content(self, file_storage, archive_path, module_version, byte_range):
+        """Return response containing range of archive."""
+        archive_fh = file_storage.read_file(archive_path, bytes_mode=True, byte_range=byte_range)
+        response = flask.Response(
+            werkzeug.wsgi.wrap_file(flask.request.environ, archive_fh),
+            status=206,
+            mimetype='application/zip',
+            direct_passthrough=True
+        )
+        response.content_length = archive_fh.size
+        response.content_range = werkzeug.datastructures.ContentRange(
+            'bytes', byte_range[0], byte_range[1] + 1, module_version.archive_size
+        )
+        response.headers['Content-Disposition'] = f'attachment; filename={module_version.archive_name_zip}'
+        self._add_cache_headers(response, module_version)
+        return response
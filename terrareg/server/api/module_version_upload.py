@@ -1,4 +1,8 @@
 
+import os
+import tempfile
+import uuid
+
 from flask import request
 
 from terrareg.server.error_catching_resource import ErrorCatchingResource
@@ -8,18 +12,21 @@ import terrareg.models
 import terrareg.database
 import terrareg.errors
 import terrareg.module_extractor
+import terrareg.upload_stream
 
 
 class ApiModuleVersionUpload(ErrorCatchingResource):
 
-    ALLOWED_EXTENSIONS = ['zip']
+    ALLOWED_EXTENSIONS = ['zip', 'tar.gz', 'tgz']
 
     method_decorators = [terrareg.auth_wrapper.auth_wrapper('can_upload_module_version', request_kwarg_map={'namespace': 'namespace'})]
 
     def allowed_file(self, filename):
         """Check if file has allowed file-extension"""
-        return '.' in filename and \
-               filename.rsplit('.', 1)[1].lower() in self.ALLOWED_EXTENSIONS
+        return any(
+            filename.lower().endswith(f'.{extension}')
+            for extension in self.ALLOWED_EXTENSIONS
+        )
 
     def _post(self, namespace, name, provider, version):
         """Handle module version upload."""
@@ -29,7 +36,10 @@ class ApiModuleVersionUpload(ErrorCatchingResource):
         if terrareg.config.Config().ALLOW_MODULE_HOSTING is terrareg.config.ModuleHostingMode.DISALLOW:
             return {'message': 'Module upload is disabled.'}, 400
 
-        with terrareg.database.Database.start_transaction():
+        max_size = terrareg.config.Config().MODULE_UPLOAD_MAX_SIZE * 1024 * 1024 or None
+
+        with tempfile.TemporaryDirectory(suffix='module-upload') as upload_directory, \
+                terrareg.database.Database.start_transaction():
 
             # Get module provider and, optionally create, if it doesn't exist
             _, _, module_provider, error = self.get_module_provider_by_names(namespace, name, provider, create=True)
@@ -38,10 +48,23 @@ class ApiModuleVersionUpload(ErrorCatchingResource):
 
             module_version = terrareg.models.ModuleVersion(module_provider=module_provider, version=version)
 
-            if len(request.files) != 1:
+            # Write uploaded files directly to disk, whilst the request is being received,
+            # rather than buffering the upload in memory/temporary files.
+            # The request body is only parsed when files are first accessed.
+            request.upload_max_content_length = max_size
+            request.upload_stream_factory = lambda filename: terrareg.upload_stream.UploadStream(
+                path=os.path.join(upload_directory, str(uuid.uuid4())),
+                max_size=max_size
+            )
+            try:
+                files = request.files
+            except terrareg.errors.UploadTooLargeError as exc:
+                return {'status': 'Error', 'message': str(exc)}, 413
+
+            if len(files) != 1:
                 raise terrareg.errors.UploadError('One file can be uploaded')
 
-            file = request.files[[f for f in request.files.keys()][0]]
+            file = files[[f for f in files.keys()][0]]
 
             # If the user does not select a file, the browser submits an
             # empty file without a filename.
@@ -0,0 +1,133 @@
+
+import csv
+import datetime
+import io
+import json
+
+import flask
+from flask_restful import reqparse
+
+from terrareg.server.error_catching_resource import ErrorCatchingResource
+import terrareg.analytics
+import terrareg.auth_wrapper
+import terrareg.models
+import terrareg.user_group_namespace_permission_type
+
+
+class ApiTerraregAnalyticsExport(ErrorCatchingResource):
+    """
+    Provide streaming export of module analytics for a namespace or module provider.
+
+    The export is streamed as either newline-delimited JSON or CSV.
+    The `X-Terrareg-Analytics-Watermark` response header contains the highest analytics ID included in the export,
+    which can be provided as the `since` argument of a subsequent request to only obtain newer analytics.
+    """
+
+    method_decorators = [
+        terrareg.auth_wrapper.auth_wrapper(
+            'check_namespace_access',
+            terrareg.user_group_namespace_permission_type.UserGroupNamespacePermissionType.MODIFY,
+            request_kwarg_map={'namespace': 'namespace'}
+        )
+    ]
+
+    def _get_arg_parser(self):
+        """Return arg parser for GET request"""
+        parser = reqparse.RequestParser()
+        parser.add_argument(
+            'format', type=str, location='args',
+            default='ndjson', choices=['ndjson', 'csv'],
+            help='Output format of export.'
+        )
+        parser.add_argument(
+            'granularity', type=str, location='args',
+            default='raw', choices=['raw', 'daily'],
+            help='Whether to export each download (raw) or download counts per day (daily).'
+        )
+        parser.add_argument(
+            'from', type=str, location='args', dest='from_timestamp',
+            default=None, help='ISO-8601 timestamp to export analytics from (inclusive).'
+        )
+        parser.add_argument(
+            'to', type=str, location='args', dest='to_timestamp',
+            default=None, help='ISO-8601 timestamp to export analytics until (exclusive).'
+        )
+        parser.add_argument(
+            'since', type=int, location='args',
+            default=None, help='Watermark from a previous export. Only analytics recorded after the watermark are exported.'
+        )
+        return parser
+
+    @staticmethod
+    def _generate_ndjson(rows):
+        """Generate newline-delimited JSON lines from rows."""
+        for row in rows:
+            yield json.dumps(row) + '\n'
+
+    @staticmethod
+    def _generate_csv(rows, fields):
+        """Generate CSV lines from rows, starting with a header line."""
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fields)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+        # Yield header, if no rows were written
+        if buffer.getvalue():
+            yield buffer.getvalue()
+
+    def _get(self, namespace, name=None, provider=None):
+        """Stream export of analytics for namespace or module provider."""
+        args = self._get_arg_parser().parse_args()
+
+        module_provider = None
+        if name is not None:
+            namespace_obj, _, module_provider, error = self.get_module_provider_by_names(namespace, name, provider)
+            if error:
+                return error
+        else:
+            namespace_obj = terrareg.models.Namespace.get(namespace)
+            if namespace_obj is None:
+                return {'message': 'Namespace does not exist'}, 400
+
+        timestamps = {}
+        for arg_name in ['from_timestamp', 'to_timestamp']:
+            timestamps[arg_name] = None
+            if args[arg_name]:
+                try:
+                    timestamps[arg_name] = datetime.datetime.fromisoformat(args[arg_name])
+                except ValueError:
+                    return {'message': 'Invalid timestamp. Must be in ISO-8601 format, e.g. 2024-01-31T00:00:00'}, 400
+
+        filter_kwargs = dict(
+            namespace=namespace_obj,
+            module_provider=module_provider,
+            since=args.since,
+            **timestamps
+        )
+
+        watermark = terrareg.analytics.AnalyticsEngine.get_analytics_export_watermark(**filter_kwargs)
+
+        daily_summary = args.granularity == 'daily'
+        rows = terrareg.analytics.AnalyticsEngine.iterate_analytics_export(
+            watermark=watermark,
+            daily_summary=daily_summary,
+            **filter_kwargs
+        )
+
+        if args.format == 'csv':
+            fields = (terrareg.analytics.AnalyticsEngine.DAILY_SUMMARY_EXPORT_FIELDS
+                      if daily_summary else
+                      terrareg.analytics.AnalyticsEngine.RAW_EXPORT_FIELDS)
+            content = self._generate_csv(rows, fields)
+            mimetype = 'text/csv'
+        else:
+            content = self._generate_ndjson(rows)
+            mimetype = 'application/x-ndjson'
+
+        response = flask.Response(flask.stream_with_context(content), mimetype=mimetype)
+        response.headers['X-Terrareg-Analytics-Watermark'] = '' if watermark is None else str(watermark)
+        return response
@@ -0,0 +1,29 @@
+
+from terrareg.server.error_catching_resource import ErrorCatchingResource
+import terrareg.auth_wrapper
+import terrareg.import_job_model
+
+
+def _get_import_job_namespace(job_id):
+    """Return name of namespace of import job, returning None if the job does not exist."""
+    import_job = terrareg.import_job_model.ImportJob.get_by_pk(job_id)
+    module_provider = import_job.module_provider if import_job else None
+    return module_provider.module.namespace.name if module_provider else None
+
+
+class ApiTerraregImportJob(ErrorCatchingResource):
+    """Interface to obtain status of module version import job."""
+
+    # Require the same permission as creating import jobs for the namespace of the job
+    method_decorators = [terrareg.auth_wrapper.auth_wrapper(
+        'can_upload_module_version',
+        kwarg_values={'namespace': lambda job_id: _get_import_job_namespace(job_id)}
+    )]
+
+    def _get(self, job_id):
+        """Return details of import job."""
+        import_job = terrareg.import_job_model.ImportJob.get_by_pk(job_id)
+        if import_job is None:
+            return self._get_404_response()
+
+        return import_job.get_api_outline()
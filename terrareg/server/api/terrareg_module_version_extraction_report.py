@@ -0,0 +1,32 @@
+
+from terrareg.server.error_catching_resource import ErrorCatchingResource
+import terrareg.auth_wrapper
+import terrareg.user_group_namespace_permission_type
+
+
+class ApiTerraregModuleVersionExtractionReport(ErrorCatchingResource):
+    """
+    Provide report of duration and resource usage of each stage of the extraction of a module version.
+
+    The report is only available for module versions that have been indexed since extraction reports were introduced.
+    """
+
+    method_decorators = [
+        terrareg.auth_wrapper.auth_wrapper(
+            'check_namespace_access',
+            terrareg.user_group_namespace_permission_type.UserGroupNamespacePermissionType.MODIFY,
+            request_kwarg_map={'namespace': 'namespace'}
+        )
+    ]
+
+    def _get(self, namespace, name, provider, version):
+        """Return extraction report for module version."""
+        _, _, _, module_version, error = self.get_module_version_by_name(
+            namespace, name, provider, version)
+        if error:
+            return error
+
+        extraction_report = module_version.extraction_report
+        if extraction_report is None:
+            return {'message': 'No extraction report is available for module version'}, 404
+        return extraction_report
@@ -0,0 +1,50 @@
+
+from flask_restful import reqparse
+
+from terrareg.server.error_catching_resource import ErrorCatchingResource
+import terrareg.auth_wrapper
+import terrareg.config
+import terrareg.module_leaderboard
+
+
+class ApiTerraregTopModuleProviders(ErrorCatchingResource):
+    """Return most downloaded module providers for a given time window."""
+
+    method_decorators = [terrareg.auth_wrapper.auth_wrapper('can_access_read_api')]
+
+    def _get_arg_parser(self):
+        """Return arg parser for GET request"""
+        parser = reqparse.RequestParser()
+        parser.add_argument(
+            'window', type=str, location='args',
+            default='week', choices=list(terrareg.module_leaderboard.ModuleLeaderboard.WINDOWS),
+            help='Time window to obtain download counts for.'
+        )
+        parser.add_argument(
+            'limit', type=int, location='args',
+            default=None,
+            help='Maximum number of module providers to return. Limited to the configured leaderboard size.'
+        )
+        return parser
+
+    def _get(self):
+        """Return latest version details of most downloaded module providers, with download counts."""
+        args = self._get_arg_parser().parse_args()
+
+        limit = terrareg.config.Config().MODULE_LEADERBOARD_SIZE
+        if args.limit is not None:
+            if args.limit < 1:
+                return {'message': 'Limit must be greater than 0'}, 400
+            limit = min(args.limit, limit)
+
+        results = []
+        for module_provider, download_count in terrareg.module_leaderboard.ModuleLeaderboard.get_most_downloaded(
+                window=args.window, limit=limit):
+            latest_version = module_provider.get_latest_version()
+            if latest_version is None:
+                continue
+            api_outline = latest_version.get_api_outline()
+            api_outline['download_count'] = download_count
+            results.append(api_outline)
+
+        return results
@@ -0,0 +1,33 @@
+
+from typing import Callable, IO, Optional
+
+import flask
+
+
+class UploadStreamingRequest(flask.Request):
+    """
+    Flask request, allowing the storage of uploaded files and
+    maximum content length to be overridden by the handling resource.
+    """
+
+    # Factory, called with the filename of each uploaded file,
+    # returning writable file-like object to store the upload.
+    upload_stream_factory: Optional[Callable[[Optional[str]], IO[bytes]]] = None
+
+    # Maximum content length of request, overriding MAX_CONTENT_LENGTH.
+    upload_max_content_length: Optional[int] = None
+
+    @property
+    def max_content_length(self) -> Optional[int]:
+        """Return maximum content length of request."""
+        if self.upload_max_content_length is not None:
+            return self.upload_max_content_length
+        return super(UploadStreamingRequest, self).max_content_length
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        """Return stream for uploaded file, using upload stream factory, if set."""
+        if self.upload_stream_factory is not None:
+            return self.upload_stream_factory(filename)
+        return super(UploadStreamingRequest, self)._get_file_stream(
+            total_content_length, content_type, filename=filename, content_length=content_length
+        )
@@ -992,6 +992,11 @@ class SettingsTab extends ModuleDetailsTab {
                 });
             });
 
+            // Obtain extraction report for module version
+            if (this._moduleDetails.version) {
+                this.populateExtractionReport();
+            }
+
             // Bind module provider delete button
             let moduleProviderDeleteButton = $('#module-provider-delete-button');
             moduleProviderDeleteButton.bind('click', () => {
@@ -1061,6 +1066,31 @@ class SettingsTab extends ModuleDetailsTab {
         });
     }
 
+    /*
+     * Populate table of extraction stages for module version
+     */
+    populateExtractionReport() {
+        $.get(`/v1/terrareg/modules/${this._moduleDetails.namespace}/${this._moduleDetails.name}/${this._moduleDetails.provider}/${this._moduleDetails.version}/extraction_report`).then((report) => {
+            let formatNumber = (value) => {
+                return (value === null || value === undefined) ? '-' : value.toFixed(2);
+            };
+
+            $('#settings-extraction-report-duration').text(`${formatNumber(report.duration)}s`);
+
+            let tableBody = $('#settings-extraction-report-table-body');
+            report.stages.forEach((stage) => {
+                let stageTr = $('<tr></tr>');
+                stageTr.append($('<td></td>').text(stage.name));
+                stageTr.append($('<td></td>').text(stage.submodule || ''));
+                stageTr.append($('<td></td>').text(formatNumber(stage.duration)));
+                stageTr.append($('<td></td>').text(formatNumber(stage.cpu_time)));
+                tableBody.append(stageTr);
+            });
+
+            $('#settings-extraction-report-card').removeClass('default-hidden');
+        });
+    }
+
     deleteRedirect(redirectId, additionalArgs={}) {
         $.ajax({
             url: `/v1/terrareg/modules/${this._moduleDetails.namespace}/${this._moduleDetails.name}/${this._moduleDetails.provider}/redirects/${redirectId}`,
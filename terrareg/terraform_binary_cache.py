@@ -0,0 +1,186 @@
+"""Provide cache of installed Terraform/OpenTofu binaries, keyed by version."""
+
+import json
+import os
+import re
+import subprocess
+import tempfile
+import threading
+
+from terrareg.config import Config
+from terrareg.errors import TerraformVersionSwitchError, UnableToGetGlobalTerraformLockError
+import terrareg.terraform_product
+
+
+class TerraformBinaryCache:
+    """
+    Install Terraform/OpenTofu binaries into a directory per product and version.
+
+    The version required by a module is resolved by tfswitch, without installing it,
+    and the cached binary is used if the version has already been installed.
+    Otherwise, the version is installed by tfswitch into a temporary path and moved into the cache,
+    whilst holding a lock for the version, allowing extractions requiring the same or
+    different versions to run concurrently.
+    """
+
+    # Timeout for waiting for another thread to install the same version
+    INSTALL_LOCK_TIMEOUT = 300
+
+    _LOCK = threading.Lock()
+    _VERSION_LOCKS = {}
+
+    # Match version output by tfswitch when performing dry-run
+    _DRY_RUN_VERSION_RE = re.compile(r'install version "([^"]+)"')
+
+    @classmethod
+    def _get_version_lock(cls, product_name: str, version: str) -> threading.Lock:
+        """Return lock for installing product version."""
+        with cls._LOCK:
+            key = (product_name, version)
+            if key not in cls._VERSION_LOCKS:
+                cls._VERSION_LOCKS[key] = threading.Lock()
+            return cls._VERSION_LOCKS[key]
+
+    @staticmethod
+    def _acquire_lock(lock: threading.Lock, description: str):
+        """Acquire lock, raising exception if it cannot be obtained within the timeout."""
+        if not lock.acquire(blocking=True, timeout=TerraformBinaryCache.INSTALL_LOCK_TIMEOUT):
+            raise UnableToGetGlobalTerraformLockError(
+                f"Unable to obtain lock for {description} in {TerraformBinaryCache.INSTALL_LOCK_TIMEOUT} seconds"
+            )
+
+    @staticmethod
+    def _get_tfswitch_env():
+        """Return environment variables for running tfswitch."""
+        tfswitch_env = os.environ.copy()
+
+        default_terraform_version = Config().DEFAULT_TERRAFORM_VERSION
+        if default_terraform_version:
+            tfswitch_env["TF_DEFAULT_VERSION"] = default_terraform_version
+
+        product = terrareg.terraform_product.ProductFactory.get_product()
+        tfswitch_env["TF_PRODUCT"] = product.get_tfswitch_product_arg()
+        return tfswitch_env
+
+    @staticmethod
+    def _get_tfswitch_args():
+        """Return additional arguments for tfswitch."""
+        tfswitch_args = []
+        mirror = Config().TERRAFORM_ARCHIVE_MIRROR
+        if mirror:
+            tfswitch_args += ["--mirror", mirror]
+        return tfswitch_args
+
+    @staticmethod
+    def _run_tfswitch(args, cwd=None) -> str:
+        """Run tfswitch, returning output."""
+        try:
+            return subprocess.check_output(
+                ["tfswitch", *args],
+                env=TerraformBinaryCache._get_tfswitch_env(),
+                cwd=cwd,
+                stderr=subprocess.STDOUT
+            ).decode('utf-8')
+        except subprocess.CalledProcessError as exc:
+            print("An error occured whilst running tfswitch:", str(exc))
+            raise TerraformVersionSwitchError(
+                "An error occurred whilst initialising Terraform version" +
+                (f": {str(exc)}: {exc.output.decode('utf-8')}" if Config().DEBUG else "")
+            )
+
+    @staticmethod
+    def get_binary_version(binary_path: str) -> str:
+        """Return version of binary, obtained from its JSON version output."""
+        try:
+            version_data = json.loads(subprocess.check_output([binary_path, "-version", "-json"]).decode('utf-8'))
+        except (subprocess.CalledProcessError, OSError, ValueError) as exc:
+            print("Failed to obtain version of Terraform binary:", str(exc))
+            version_data = None
+
+        version = version_data.get("terraform_version") if isinstance(version_data, dict) else None
+        if not version or not isinstance(version, str) or os.path.sep in version:
+            raise TerraformVersionSwitchError(
+                "Unable to determine installed Terraform version" +
+                (f": {version_data}" if Config().DEBUG else "")
+            )
+        return version
+
+    @classmethod
+    def get_binary_path(cls, version: str) -> str:
+        """Return path of binary for version of current product."""
+        product = terrareg.terraform_product.ProductFactory.get_product()
+        return os.path.join(
+            Config().TERRAFORM_BINARY_CACHE_DIRECTORY,
+            product.get_tfswitch_product_arg(),
+            version,
+            product.get_executable_name()
+        )
+
+    @classmethod
+    def get_required_version(cls, module_path: str) -> str:
+        """
+        Return version of Terraform required by module.
+
+        The version is resolved by tfswitch, from the required_version constraint of the module
+        and the default version, without installing it.
+        """
+        output = cls._run_tfswitch(["--dry-run", *cls._get_tfswitch_args()], cwd=module_path)
+        version_match = cls._DRY_RUN_VERSION_RE.search(output)
+        version = version_match.group(1) if version_match else None
+        if not version or os.path.sep in version:
+            raise TerraformVersionSwitchError(
+                "Unable to determine required Terraform version" +
+                (f": {output}" if Config().DEBUG else "")
+            )
+        return version
+
+    @classmethod
+    def _install_binary(cls, version: str, binary_path: str) -> None:
+        """Install version using tfswitch and move binary into place in the cache."""
+        product = terrareg.terraform_product.ProductFactory.get_product()
+        cache_directory = Config().TERRAFORM_BINARY_CACHE_DIRECTORY
+        os.makedirs(cache_directory, exist_ok=True)
+
+        # Install into temporary directory within the cache directory,
+        # so that the binary can be atomically moved into place.
+        # tfswitch downloads versions into the install directory, so
+        # the temporary directory is also used to avoid sharing it between installs.
+        with tempfile.TemporaryDirectory(dir=cache_directory, prefix=".install-") as temp_dir:
+            temporary_binary_path = os.path.join(temp_dir, product.get_executable_name())
+            cls._run_tfswitch([
+                "--bin", temporary_binary_path,
+                "--install", temp_dir,
+                *cls._get_tfswitch_args(),
+                version
+            ])
+
+            installed_version = cls.get_binary_version(temporary_binary_path)
+            if installed_version != version:
+                raise TerraformVersionSwitchError(
+                    "Installed Terraform version does not match required version" +
+                    (f": {installed_version} != {version}" if Config().DEBUG else "")
+                )
+
+            os.makedirs(os.path.dirname(binary_path), exist_ok=True)
+            # Move into place, so that a partially installed binary is never used
+            os.replace(temporary_binary_path, binary_path)
+
+    @classmethod
+    def get_binary_for_module(cls, module_path: str) -> str:
+        """Install Terraform version required by module, if not already cached, and return path to binary."""
+        version = cls.get_required_version(module_path)
+        binary_path = cls.get_binary_path(version)
+        if os.path.isfile(binary_path):
+            return binary_path
+
+        product = terrareg.terraform_product.ProductFactory.get_product()
+        version_lock = cls._get_version_lock(product.get_tfswitch_product_arg(), version)
+        cls._acquire_lock(version_lock, f"installing Terraform {version}")
+        try:
+            # Check whether the version was installed whilst waiting for lock
+            if not os.path.isfile(binary_path):
+                cls._install_binary(version, binary_path)
+        finally:
+            version_lock.release()
+
+        return binary_path
@@ -0,0 +1,83 @@
+"""Provide writing of uploaded files to disk, whilst the upload is received."""
+
+import hashlib
+from typing import Optional
+
+from terrareg.errors import UploadTooLargeError
+
+
+class UploadStream:
+    """
+    Writable file, used to store an uploaded file on disk as it is received.
+
+    The SHA-256 checksum and size of the file are calculated whilst writing,
+    and the leading bytes of the file are retained, allowing the file-type to be
+    determined without re-reading the file.
+
+    Reads, seeks and other file operations are passed to the underlying file,
+    allowing the stream to be used as the file stream for Werkzeug file uploads.
+    """
+
+    HEADER_SIZE = 2048
+
+    def __init__(self, path: str, max_size: Optional[int]=None):
+        """
+        Create file and store member variables.
+
+        If max_size is provided, an UploadTooLargeError is raised if more than max_size bytes are written.
+        """
+        self._path = path
+        self._max_size = max_size
+        self._fh = open(path, 'w+b')  # noqa: R1732
+        self._sha256 = hashlib.sha256()
+        self._size = 0
+        self._header = b''
+
+    @property
+    def path(self) -> str:
+        """Return path of file."""
+        return self._path
+
+    @property
+    def sha256(self) -> str:
+        """Return hex digest of SHA-256 checksum of content written."""
+        return self._sha256.hexdigest()
+
+    @property
+    def size(self) -> int:
+        """Return number of bytes written."""
+        return self._size
+
+    @property
+    def header(self) -> bytes:
+        """Return leading bytes of content written."""
+        return self._header
+
+    def write(self, data: bytes) -> int:
+        """Write data to file, updating checksum and size."""
+        self._size += len(data)
+        if self._max_size and self._size > self._max_size:
+            raise UploadTooLargeError(
+                f'Uploaded file exceeds maximum upload size of {self._max_size} bytes'
+            )
+
+        if len(self._header) < self.HEADER_SIZE:
+            self._header += bytes(data[:self.HEADER_SIZE - len(self._header)])
+        self._sha256.update(data)
+        return self._fh.write(data)
+
+    def __getattr__(self, name):
+        """Pass remaining file operations to the underlying file."""
+        return getattr(self._fh, name)
+
+    def __iter__(self):
+        """Iterate over lines of the underlying file."""
+        return iter(self._fh)
+
+    def __enter__(self):
+        """Return self when used as a context manager."""
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        """Close underlying file."""
+        self._fh.close()
@@ -15,6 +15,7 @@ from terrareg.models import (
 from terrareg.database import Database
 from terrareg.server import Server
 import terrareg.config
+import terrareg.module_leaderboard
 from terrareg.user_group_namespace_permission_type import UserGroupNamespacePermissionType
 from terrareg.constants import EXTRACTION_VERSION
 import terrareg.provider_category_model
@@ -155,8 +156,11 @@ class BaseTest:
             conn.execute(db.sub_module.delete())
             conn.execute(db.module_version_file.delete())
             conn.execute(db.module_version.delete())
+            conn.execute(db.module_provider_name_usage.delete())
+            conn.execute(db.import_job.delete())
             conn.execute(db.module_provider.delete())
             conn.execute(db.example_file.delete())
+            conn.execute(db.file_blob.delete())
             conn.execute(db.module_details.delete())
             conn.execute(db.git_provider.delete())
             conn.execute(db.analytics.delete())
@@ -170,6 +174,9 @@ class BaseTest:
             conn.execute(db.session.delete())
             conn.execute(db.namespace.delete())
 
+        # Remove any cached leaderboards from previous test data
+        terrareg.module_leaderboard.ModuleLeaderboard.invalidate()
+
         with cls._patch_audit_event_creation():
 
             # Setup test git providers
@@ -0,0 +1,177 @@
+
+from datetime import datetime
+import json
+from unittest import mock
+
+import pytest
+
+import terrareg.analytics
+from terrareg.database import Database
+from terrareg.models import Module, Namespace, ModuleProvider, ModuleVersion
+from test.integration.terrareg import TerraregIntegrationTest
+from test import client
+
+
+class TestAnalyticsExport(TerraregIntegrationTest):
+    """Test analytics export methods and endpoint"""
+
+    def _create_analytics(self, version, token, timestamp, auth_token=None):
+        """Create analytics entry"""
+        mock_get_datetime_now = mock.MagicMock(return_value=timestamp)
+        with mock.patch('terrareg.analytics.AnalyticsEngine.get_datetime_now', mock_get_datetime_now):
+            terrareg.analytics.AnalyticsEngine.record_module_version_download(
+                namespace_name=version.module_provider.module.namespace.name,
+                module_name=version.module_provider.module.name,
+                provider_name=version.module_provider.name,
+                module_version=version,
+                analytics_token=token,
+                terraform_version='1.5.0',
+                user_agent='Terraform/1.5.0',
+                auth_token=auth_token
+            )
+
+    def setup_method(self, method):
+        """Setup namespace, module providers and analytics"""
+        super().setup_method(method)
+        with self._patch_audit_event_creation():
+            self._namespace = Namespace.create('testexport')
+            self._module_provider = ModuleProvider.create(Module(self._namespace, 'exportmodule'), 'aws')
+            self._other_module_provider = ModuleProvider.create(Module(self._namespace, 'othermodule'), 'aws')
+        self._version = ModuleVersion(self._module_provider, '1.0.0')
+        self._version.prepare_module()
+        self._other_version = ModuleVersion(self._other_module_provider, '2.0.0')
+        self._other_version.prepare_module()
+
+        self._create_analytics(self._version, 'first-token', datetime(2024, 1, 1, 10, 0, 0), auth_token='secret-auth-token')
+        self._create_analytics(self._version, 'first-token', datetime(2024, 1, 1, 11, 0, 0))
+        self._create_analytics(self._version, 'second-token', datetime(2024, 1, 2, 10, 0, 0))
+        self._create_analytics(self._other_version, 'first-token', datetime(2024, 1, 3, 10, 0, 0))
+
+    def teardown_method(self, method):
+        """Remove test data"""
+        db = Database.get()
+        with db.get_connection() as conn:
+            conn.execute(db.analytics.delete())
+        with self._patch_audit_event_creation():
+            self._module_provider.delete()
+            self._other_module_provider.delete()
+            self._namespace.delete()
+        super().teardown_method(method)
+
+    def test_iterate_raw_export(self):
+        """Test raw export of module provider analytics."""
+        rows = list(terrareg.analytics.AnalyticsEngine.iterate_analytics_export(
+            namespace=self._namespace,
+            module_provider=self._module_provider
+        ))
+        assert [(row['analytics_token'], row['timestamp']) for row in rows] == [
+            ('first-token', '2024-01-01T10:00:00'),
+            ('first-token', '2024-01-01T11:00:00'),
+            ('second-token', '2024-01-02T10:00:00'),
+        ]
+        assert sorted(rows[0].keys()) == sorted(terrareg.analytics.AnalyticsEngine.RAW_EXPORT_FIELDS)
+        assert rows[0]['namespace'] == 'testexport'
+        assert rows[0]['module'] == 'exportmodule'
+        assert rows[0]['version'] == '1.0.0'
+        assert 'auth_token' not in rows[0]
+
+    def test_iterate_daily_summary_export(self):
+        """Test daily summary export of namespace analytics."""
+        rows = list(terrareg.analytics.AnalyticsEngine.iterate_analytics_export(
+            namespace=self._namespace,
+            daily_summary=True
+        ))
+        assert [(row['date'], row['module'], row['analytics_token'], row['download_count']) for row in rows] == [
+            ('2024-01-01', 'exportmodule', 'first-token', 2),
+            ('2024-01-02', 'exportmodule', 'second-token', 1),
+            ('2024-01-03', 'othermodule', 'first-token', 1),
+        ]
+
+    def test_iterate_export_filters(self):
+        """Test time range, since and watermark filters."""
+        all_rows = list(terrareg.analytics.AnalyticsEngine.iterate_analytics_export(namespace=self._namespace))
+        assert len(all_rows) == 4
+
+        rows = list(terrareg.analytics.AnalyticsEngine.iterate_analytics_export(
+            namespace=self._namespace,
+            from_timestamp=datetime(2024, 1, 1, 11, 0, 0),
+            to_timestamp=datetime(2024, 1, 3, 0, 0, 0)
+        ))
+        assert [row['id'] for row in rows] == [all_rows[1]['id'], all_rows[2]['id']]
+
+        rows = list(terrareg.analytics.AnalyticsEngine.iterate_analytics_export(
+            namespace=self._namespace,
+            since=all_rows[1]['id'],
+            watermark=all_rows[2]['id']
+        ))
+        assert [row['id'] for row in rows] == [all_rows[2]['id']]
+
+    def test_get_analytics_export_watermark(self):
+        """Test obtaining watermark for export."""
+        all_rows = list(terrareg.analytics.AnalyticsEngine.iterate_analytics_export(namespace=self._namespace))
+
+        assert terrareg.analytics.AnalyticsEngine.get_analytics_export_watermark(
+            namespace=self._namespace) == all_rows[-1]['id']
+        assert terrareg.analytics.AnalyticsEngine.get_analytics_export_watermark(
+            namespace=self._namespace, module_provider=self._module_provider) == all_rows[2]['id']
+
+        # Ensure since is returned when there are no newer rows
+        assert terrareg.analytics.AnalyticsEngine.get_analytics_export_watermark(
+            namespace=self._namespace, since=all_rows[-1]['id']) == all_rows[-1]['id']
+        assert terrareg.analytics.AnalyticsEngine.get_analytics_export_watermark(
+            namespace=self._namespace, from_timestamp=datetime(2025, 1, 1)) is None
+
+    def test_export_endpoint_ndjson(self, client):
+        """Test export endpoint in NDJSON format"""
+        res = client.get('/v1/terrareg/analytics/testexport/exportmodule/aws/export')
+        assert res.status_code == 200
+        assert res.mimetype == 'application/x-ndjson'
+
+        rows = [json.loads(line) for line in res.data.decode('utf-8').splitlines()]
+        assert [row['analytics_token'] for row in rows] == ['first-token', 'first-token', 'second-token']
+        assert res.headers['X-Terrareg-Analytics-Watermark'] == str(rows[-1]['id'])
+
+        # Export using watermark, after recording a new download
+        self._create_analytics(self._version, 'third-token', datetime(2024, 1, 4, 10, 0, 0))
+        res = client.get(f'/v1/terrareg/analytics/testexport/exportmodule/aws/export?since={rows[-1]["id"]}')
+        assert res.status_code == 200
+        new_rows = [json.loads(line) for line in res.data.decode('utf-8').splitlines()]
+        assert [row['analytics_token'] for row in new_rows] == ['third-token']
+        assert res.headers['X-Terrareg-Analytics-Watermark'] == str(new_rows[0]['id'])
+
+    def test_export_endpoint_csv(self, client):
+        """Test export endpoint in CSV format"""
+        res = client.get('/v1/terrareg/analytics/testexport/export?format=csv&granularity=daily')
+        assert res.status_code == 200
+        assert res.mimetype == 'text/csv'
+        assert res.data.decode('utf-8').splitlines() == [
+            'date,namespace,module,provider,version,analytics_token,environment,download_count',
+            '2024-01-01,testexport,exportmodule,aws,1.0.0,first-token,Default,2',
+            '2024-01-02,testexport,exportmodule,aws,1.0.0,second-token,Default,1',
+            '2024-01-03,testexport,othermodule,aws,2.0.0,first-token,Default,1',
+        ]
+
+    def test_export_endpoint_csv_no_rows(self, client):
+        """Test export endpoint in CSV format without any matching analytics"""
+        res = client.get('/v1/terrareg/analytics/testexport/export?format=csv&from=2025-01-01')
+        assert res.status_code == 200
+        assert res.data.decode('utf-8').splitlines() == [','.join(terrareg.analytics.AnalyticsEngine.RAW_EXPORT_FIELDS)]
+        assert res.headers['X-Terrareg-Analytics-Watermark'] == ''
+
+    @pytest.mark.parametrize('url, expected_status', [
+        ('/v1/terrareg/analytics/doesnotexist/export', 400),
+        ('/v1/terrareg/analytics/testexport/doesnotexist/aws/export', 400),
+        ('/v1/terrareg/analytics/testexport/export?from=notadate', 400),
+        ('/v1/terrareg/analytics/testexport/export?format=xml', 400),
+    ])
+    def test_export_endpoint_invalid_request(self, url, expected_status, client):
+        """Test export endpoint with invalid requests"""
+        res = client.get(url)
+        assert res.status_code == expected_status
+
+    def test_export_endpoint_unauthenticated(self, client):
+        """Test export endpoint without namespace access"""
+        with mock.patch('terrareg.auth.AdminApiKeyAuthMethod.check_namespace_access', return_value=False), \
+                mock.patch('terrareg.auth.AdminApiKeyAuthMethod.is_authenticated', return_value=False):
+            res = client.get('/v1/terrareg/analytics/testexport/export')
+        assert res.status_code == 401
@@ -183,3 +183,150 @@ class TestCheckModuleProviderRedirectUsage(TerraregIntegrationTest):
             assert (expected_results[row[0]] - timedelta(minutes=1)) < row[1] < (expected_results[row[0]] + timedelta(minutes=1))
             del expected_results[row[0]]
 
+
+    def test_module_provider_name_usage(self):
+        """Test that name usage contains only the latest download of each analytics token."""
+        provider = self._setup_test_analytics()
+
+        db = Database.get()
+        select = sqlalchemy.select(
+            db.module_provider_name_usage.c.analytics_token,
+            db.module_provider_name_usage.c.module_name,
+            db.module_provider_name_usage.c.timestamp
+        ).where(
+            db.module_provider_name_usage.c.module_provider_id == provider.pk
+        ).order_by(db.module_provider_name_usage.c.analytics_token)
+        with db.get_connection() as conn:
+            rows = [tuple(row) for row in conn.execute(select).all()]
+
+        assert rows == [
+            ('beforemove', 'testredirectdelete', datetime(year=2023, month=3, day=5, hour=5, minute=5, second=0)),
+            ('oldnameaftermove', 'testredirectdelete', datetime(year=2023, month=3, day=7, hour=5, minute=5, second=0)),
+            ('onlynewname', 'newname', datetime(year=2023, month=3, day=13, hour=5, minute=5, second=0)),
+            ('testmigrate', 'newname', datetime(year=2023, month=3, day=11, hour=5, minute=5, second=0)),
+        ]
+
+        # Ensure name usage is removed when module provider is deleted
+        provider_pk = provider.pk
+        terrareg.analytics.AnalyticsEngine.delete_name_usage_for_module_provider(provider)
+        with db.get_connection() as conn:
+            assert conn.execute(select.where(db.module_provider_name_usage.c.module_provider_id == provider_pk)).all() == []
+
+    def test_module_provider_name_usage_concurrent_insert(self):
+        """Test that name usage is updated when row is inserted by a concurrent download."""
+        provider = self._setup_test_analytics()
+        version = ModuleVersion.get(provider, '1.1.1')
+
+        # Mock update row count to emulate row being
+        # inserted between update and insert
+        with mock.patch.object(sqlalchemy.engine.CursorResult, 'rowcount',
+                               new_callable=mock.PropertyMock, return_value=0):
+            self._create_analytics(
+                namespace='testredirect',
+                module='newname',
+                provider='testprovider',
+                version=version,
+                token='beforemove',
+                timestamp=datetime(year=2023, month=3, day=14, hour=5, minute=5, second=0)
+            )
+
+        db = Database.get()
+        select = sqlalchemy.select(
+            db.module_provider_name_usage.c.module_name,
+            db.module_provider_name_usage.c.timestamp
+        ).where(
+            db.module_provider_name_usage.c.module_provider_id == provider.pk,
+            db.module_provider_name_usage.c.analytics_token == 'beforemove'
+        )
+        with db.get_connection() as conn:
+            rows = [tuple(row) for row in conn.execute(select).all()]
+
+        assert rows == [('newname', datetime(year=2023, month=3, day=14, hour=5, minute=5, second=0))]
+
+        # Ensure duplicate rows cannot be inserted
+        with pytest.raises(sqlalchemy.exc.IntegrityError):
+            with db.get_connection() as conn:
+                conn.execute(db.module_provider_name_usage.insert().values(
+                    module_provider_id=provider.pk,
+                    analytics_token='beforemove',
+                ))
+
+    def test_module_provider_name_usage_delete_module_version_analytics(self):
+        """Test that name usage is removed for analytics tokens without remaining analytics when module version analytics are deleted."""
+        provider = self._setup_test_analytics()
+        version = ModuleVersion.get(provider, '1.1.1')
+
+        other_version = ModuleVersion(provider, '1.2.0')
+        other_version.prepare_module()
+        self._create_analytics(
+            namespace='testredirect',
+            module='newname',
+            provider='testprovider',
+            version=other_version,
+            token='testmigrate',
+            timestamp=datetime(year=2023, month=3, day=14, hour=5, minute=5, second=0)
+        )
+
+        terrareg.analytics.AnalyticsEngine.delete_analytics_for_module_version(version)
+
+        db = Database.get()
+        select = sqlalchemy.select(
+            db.module_provider_name_usage.c.analytics_token
+        ).where(
+            db.module_provider_name_usage.c.module_provider_id == provider.pk
+        )
+        with db.get_connection() as conn:
+            assert [row[0] for row in conn.execute(select).all()] == ['testmigrate']
+
+    def test_module_provider_name_usage_without_analytics_token(self):
+        """Test that downloads without an analytics token are stored in a single name usage row with an empty analytics token."""
+        provider = self._setup_test_analytics()
+        version = ModuleVersion.get(provider, '1.1.1')
+
+        for day in [14, 15]:
+            self._create_analytics(
+                namespace='testredirect',
+                module='newname',
+                provider='testprovider',
+                version=version,
+                token=None,
+                timestamp=datetime(year=2023, month=3, day=day, hour=5, minute=5, second=0)
+            )
+
+        db = Database.get()
+        select = sqlalchemy.select(
+            db.module_provider_name_usage.c.module_name,
+            db.module_provider_name_usage.c.timestamp
+        ).where(
+            db.module_provider_name_usage.c.module_provider_id == provider.pk,
+            db.module_provider_name_usage.c.analytics_token == terrareg.analytics.AnalyticsEngine.NAME_USAGE_EMPTY_ANALYTICS_TOKEN
+        )
+        with db.get_connection() as conn:
+            rows = [tuple(row) for row in conn.execute(select).all()]
+
+        assert rows == [('newname', datetime(year=2023, month=3, day=15, hour=5, minute=5, second=0))]
+
+        # Ensure duplicate rows without an analytics token cannot be inserted
+        with pytest.raises(sqlalchemy.exc.IntegrityError):
+            with db.get_connection() as conn:
+                conn.execute(db.module_provider_name_usage.insert().values(
+                    module_provider_id=provider.pk,
+                    analytics_token=terrareg.analytics.AnalyticsEngine.NAME_USAGE_EMPTY_ANALYTICS_TOKEN,
+                ))
+
+        # Ensure name usage is retained whilst analytics without an analytics token remain
+        other_version = ModuleVersion(provider, '1.2.0')
+        other_version.prepare_module()
+        self._create_analytics(
+            namespace='testredirect',
+            module='newname',
+            provider='testprovider',
+            version=other_version,
+            token=None,
+            timestamp=datetime(year=2023, month=3, day=16, hour=5, minute=5, second=0)
+        )
+        terrareg.analytics.AnalyticsEngine.delete_analytics_for_module_version(version)
+        with db.get_connection() as conn:
+            assert [tuple(row) for row in conn.execute(select).all()] == [
+                ('newname', datetime(year=2023, month=3, day=16, hour=5, minute=5, second=0))
+            ]
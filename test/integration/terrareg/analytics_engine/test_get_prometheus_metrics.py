@@ -1,7 +1,10 @@
 
 
 from unittest import mock
+
 from terrareg.analytics import AnalyticsEngine
+from terrareg.extraction_report import ExtractionReport
+from terrareg.models import Module, ModuleProvider, Namespace
 from . import AnalyticsIntegrationTest
 
 
@@ -13,7 +16,8 @@ class TestGetPrometheusMetrics(AnalyticsIntegrationTest):
         get_total_count_mock = mock.MagicMock(return_value=0)
         get_module_provider_version_statistics_mock = mock.MagicMock(return_value=(0, 0, 0))
         with mock.patch('terrareg.models.ModuleProvider.get_total_count', get_total_count_mock), \
-                mock.patch('terrareg.analytics.AnalyticsEngine.get_module_provider_version_statistics', get_module_provider_version_statistics_mock):
+                mock.patch('terrareg.analytics.AnalyticsEngine.get_module_provider_version_statistics', get_module_provider_version_statistics_mock), \
+                mock.patch('terrareg.extraction_report.ExtractionReport._DURATION_HISTOGRAMS', {}):
             assert AnalyticsEngine.get_prometheus_metrics() == """
 # HELP module_providers_count Total number of module providers with a published version
 # TYPE module_providers_count counter
@@ -29,11 +33,14 @@ module_version_minor_count 0
 module_version_patch_count 0
 # HELP module_provider_usage Analytics tokens used in a module provider
 # TYPE module_provider_usage counter
+# HELP module_extraction_stage_duration_seconds Duration of module extraction stages, completed since the process started
+# TYPE module_extraction_stage_duration_seconds histogram
 """.strip()
 
     def test_get_prometheus_with_no_analytics(self):
         """Test function with no analytics recorded."""
-        assert AnalyticsEngine.get_prometheus_metrics() == """
+        with mock.patch('terrareg.extraction_report.ExtractionReport._DURATION_HISTOGRAMS', {}):
+            assert AnalyticsEngine.get_prometheus_metrics() == """
 # HELP module_providers_count Total number of module providers with a published version
 # TYPE module_providers_count counter
 module_providers_count 6
@@ -48,6 +55,8 @@ module_version_minor_count 3
 module_version_patch_count 2
 # HELP module_provider_usage Analytics tokens used in a module provider
 # TYPE module_provider_usage counter
+# HELP module_extraction_stage_duration_seconds Duration of module extraction stages, completed since the process started
+# TYPE module_extraction_stage_duration_seconds histogram
 """.strip()
 
     def test_get_prometheus(self):
@@ -80,4 +89,85 @@ module_provider_usage{module_provider_id="testnamespace/secondmodule/testprovide
 module_provider_usage{module_provider_id="testnamespace/publishedmodule/testprovider", analytics_token="test-application"} 1
 module_provider_usage{module_provider_id="testnamespace/publishedmodule/testprovider", analytics_token="without-analytics-key"} 1
 module_provider_usage{module_provider_id="testnamespace/noanalyticstoken/testprovider", analytics_token="withoutanalytics"} 1
+# HELP module_extraction_stage_duration_seconds Duration of module extraction stages, completed since the process started
+# TYPE module_extraction_stage_duration_seconds histogram
 """.strip()
+
+    def test_get_prometheus_extraction_stage_durations(self):
+        """Test histogram of durations of extraction stages completed by the process."""
+        with mock.patch('terrareg.extraction_report.ExtractionReport._DURATION_HISTOGRAMS', {}):
+            for stage_name, duration in [('tfsec', 0.25), ('terraform', 11.0), ('tfsec', 2.0), ('tfsec', 0.0625)]:
+                ExtractionReport._observe_duration(stage_name, duration)
+
+            metrics = AnalyticsEngine.get_prometheus_metrics()
+
+        extraction_metrics = metrics[metrics.index('# HELP module_extraction_stage_duration_seconds'):]
+        assert extraction_metrics == """
+# HELP module_extraction_stage_duration_seconds Duration of module extraction stages, completed since the process started
+# TYPE module_extraction_stage_duration_seconds histogram
+module_extraction_stage_duration_seconds_bucket{stage="terraform", le="0.1"} 0
+module_extraction_stage_duration_seconds_bucket{stage="terraform", le="0.5"} 0
+module_extraction_stage_duration_seconds_bucket{stage="terraform", le="1"} 0
+module_extraction_stage_duration_seconds_bucket{stage="terraform", le="2.5"} 0
+module_extraction_stage_duration_seconds_bucket{stage="terraform", le="5"} 0
+module_extraction_stage_duration_seconds_bucket{stage="terraform", le="10"} 0
+module_extraction_stage_duration_seconds_bucket{stage="terraform", le="30"} 1
+module_extraction_stage_duration_seconds_bucket{stage="terraform", le="60"} 1
+module_extraction_stage_duration_seconds_bucket{stage="terraform", le="120"} 1
+module_extraction_stage_duration_seconds_bucket{stage="terraform", le="300"} 1
+module_extraction_stage_duration_seconds_bucket{stage="terraform", le="600"} 1
+module_extraction_stage_duration_seconds_bucket{stage="terraform", le="+Inf"} 1
+module_extraction_stage_duration_seconds_sum{stage="terraform"} 11.0
+module_extraction_stage_duration_seconds_count{stage="terraform"} 1
+module_extraction_stage_duration_seconds_bucket{stage="tfsec", le="0.1"} 1
+module_extraction_stage_duration_seconds_bucket{stage="tfsec", le="0.5"} 2
+module_extraction_stage_duration_seconds_bucket{stage="tfsec", le="1"} 2
+module_extraction_stage_duration_seconds_bucket{stage="tfsec", le="2.5"} 3
+module_extraction_stage_duration_seconds_bucket{stage="tfsec", le="5"} 3
+module_extraction_stage_duration_seconds_bucket{stage="tfsec", le="10"} 3
+module_extraction_stage_duration_seconds_bucket{stage="tfsec", le="30"} 3
+module_extraction_stage_duration_seconds_bucket{stage="tfsec", le="60"} 3
+module_extraction_stage_duration_seconds_bucket{stage="tfsec", le="120"} 3
+module_extraction_stage_duration_seconds_bucket{stage="tfsec", le="300"} 3
+module_extraction_stage_duration_seconds_bucket{stage="tfsec", le="600"} 3
+module_extraction_stage_duration_seconds_bucket{stage="tfsec", le="+Inf"} 3
+module_extraction_stage_duration_seconds_sum{stage="tfsec"} 2.3125
+module_extraction_stage_duration_seconds_count{stage="tfsec"} 3
+""".strip()
+
+    def test_get_prometheus_s3_cache_metrics(self):
+        """Test metrics of S3 cache are returned, when enabled."""
+        cache_metrics = {
+            'hits': 10,
+            'misses': 3,
+            'deduplicated_fills': 1,
+            'evictions': 2,
+            'evicted_bytes': 2048,
+        }
+        with mock.patch('terrareg.config.Config.S3_CACHE_DIRECTORY', '/tmp/s3-cache'), \
+                mock.patch('terrareg.file_storage.CachedFileStorage.get_metrics', mock.MagicMock(return_value=cache_metrics)):
+            metrics = AnalyticsEngine.get_prometheus_metrics()
+
+        cache_metrics_output = metrics[metrics.index('# HELP s3_cache_hits_total'):]
+        assert cache_metrics_output == """
+# HELP s3_cache_hits_total Reads of files from S3 that were served from the local cache, since the process started
+# TYPE s3_cache_hits_total counter
+s3_cache_hits_total 10
+# HELP s3_cache_misses_total Reads of files from S3 that were not present in the local cache, since the process started
+# TYPE s3_cache_misses_total counter
+s3_cache_misses_total 3
+# HELP s3_cache_deduplicated_fills_total Reads of files from S3 that waited for a concurrent read to cache the file, since the process started
+# TYPE s3_cache_deduplicated_fills_total counter
+s3_cache_deduplicated_fills_total 1
+# HELP s3_cache_evictions_total Files removed from the local cache of S3 files, since the process started
+# TYPE s3_cache_evictions_total counter
+s3_cache_evictions_total 2
+# HELP s3_cache_evicted_bytes_total Total size of files removed from the local cache of S3 files, since the process started
+# TYPE s3_cache_evicted_bytes_total counter
+s3_cache_evicted_bytes_total 2048
+""".strip()
+
+    def test_get_prometheus_s3_cache_metrics_disabled(self):
+        """Test metrics of S3 cache are not returned, when disabled."""
+        with mock.patch('terrareg.config.Config.S3_CACHE_DIRECTORY', ''):
+            assert 's3_cache' not in AnalyticsEngine.get_prometheus_metrics()
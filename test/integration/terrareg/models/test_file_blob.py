@@ -0,0 +1,120 @@
+import unittest.mock
+
+import sqlalchemy
+
+from terrareg.database import Database
+from terrareg.models import Example, ExampleFile, FileBlob, Module, ModuleVersion, ModuleVersionFile, Namespace, ModuleProvider
+from test.integration.terrareg import TerraregIntegrationTest
+
+
+class TestFileBlob(TerraregIntegrationTest):
+
+    @staticmethod
+    def _get_blob_rows():
+        """Return number of files referencing each file blob, keyed by ID."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            return {
+                row['id']: (
+                    conn.execute(sqlalchemy.select(sqlalchemy.func.count()).where(db.example_file.c.file_blob_id == row['id'])).scalar() +
+                    conn.execute(sqlalchemy.select(sqlalchemy.func.count()).where(db.module_version_file.c.file_blob_id == row['id'])).scalar()
+                )
+                for row in conn.execute(db.file_blob.select())
+            }
+
+    @staticmethod
+    def _create_module_version(version):
+        """Create module version for test."""
+        namespace = Namespace.get(name='testfileblob', create=True)
+        module = Module(namespace=namespace, name='test-file-blob')
+        module_provider = ModuleProvider.get(module=module, name='testprovider', create=True)
+        module_version = ModuleVersion(module_provider=module_provider, version=version)
+        module_version.prepare_module()
+        return module_version
+
+    def test_get_or_create_delete_unreferenced(self):
+        """Test obtaining and deleting unreferenced file blobs."""
+        existing_blobs = self._get_blob_rows()
+
+        blob_ids = FileBlob.get_or_create([b'content a', b'content b', b'content a'])
+        assert blob_ids[0] == blob_ids[2]
+        assert blob_ids[0] != blob_ids[1]
+        assert len(self._get_blob_rows()) == len(existing_blobs) + 2
+
+        # Obtaining existing content does not create new blob
+        assert FileBlob.get_or_create([b'content b']) == [blob_ids[1]]
+        assert len(self._get_blob_rows()) == len(existing_blobs) + 2
+
+        # Ensure blobs are deleted once they are no longer referenced
+        FileBlob.delete_unreferenced([blob_ids[0], blob_ids[1], None])
+        assert self._get_blob_rows() == existing_blobs
+
+    def test_get_or_create_concurrent_insert(self):
+        """Test obtaining blob that is created by a concurrent import, whilst blobs are being created."""
+        original_with_for_update = sqlalchemy.sql.Select.with_for_update
+        with_for_update_calls = []
+
+        def with_for_update(select, **kwargs):
+            """Do not obtain existing blob on first attempt, as if it had been created after being selected."""
+            with_for_update_calls.append(kwargs)
+            select = original_with_for_update(select, **kwargs)
+            return select.where(sqlalchemy.false()) if len(with_for_update_calls) == 1 else select
+
+        with Database.start_transaction() as transaction:
+            db = Database.get()
+            with db.get_connection() as conn:
+                existing_blob_id = conn.execute(db.file_blob.insert().values(
+                    sha256=FileBlob.get_digest(b'concurrent content'), content=FileBlob.compress(b'concurrent content')
+                )).inserted_primary_key[0]
+
+            with unittest.mock.patch.object(sqlalchemy.sql.Select, 'with_for_update', with_for_update):
+                assert FileBlob.get_or_create([b'concurrent content', b'new content'])[0] == existing_blob_id
+            assert with_for_update_calls == [{'read': True}, {'read': True}]
+
+            # Ensure the transaction is still usable, after the failed insert has been rolled back
+            with db.get_connection() as conn:
+                assert conn.execute(
+                    sqlalchemy.select(sqlalchemy.func.count()).where(db.file_blob.c.sha256.in_([
+                        FileBlob.get_digest(b'concurrent content'), FileBlob.get_digest(b'new content')
+                    ]))
+                ).scalar() == 2
+
+            transaction.transaction.rollback()
+
+    def test_identical_files_across_module_versions(self):
+        """Test files with identical content in multiple module versions share file blobs."""
+        existing_blobs = self._get_blob_rows()
+
+        module_versions = [self._create_module_version(version) for version in ['1.0.0', '1.1.0']]
+        for module_version in module_versions:
+            example = Example.create(module_version=module_version, module_path='examples/test')
+            ExampleFile.create_many(example=example, files={
+                'examples/test/main.tf': 'module "test" {\n  source = "../../"\n}',
+                'examples/test/variables.tf': f'# Version {module_version.version}',
+            })
+            ModuleVersionFile.create_many(module_version=module_version, files={'LICENSE': 'Test license'})
+
+        # Ensure one blob is created for shared content and one for each
+        # version-specific content
+        blob_rows = self._get_blob_rows()
+        new_blobs = {blob_id: count for blob_id, count in blob_rows.items() if blob_id not in existing_blobs}
+        assert sorted(new_blobs.values()) == [1, 1, 2, 2]
+
+        for module_version in module_versions:
+            example_file = ExampleFile.get_by_path(module_version=module_version, file_path='examples/test/variables.tf')
+            assert example_file.get_content(server_hostname='example.com') == f'# Version {module_version.version}'
+            assert ModuleVersionFile.get(module_version=module_version, path='LICENSE').get_content() == '<pre>Test license</pre>'
+
+        # Replace content of file and ensure reference to previous blob is removed
+        example_file = ExampleFile.get_by_path(module_version=module_versions[0], file_path='examples/test/variables.tf')
+        example_file.update_attributes(content='# Version 1.1.0')
+        blob_rows = self._get_blob_rows()
+        assert sorted(count for blob_id, count in blob_rows.items() if blob_id not in existing_blobs) == [2, 2, 2]
+
+        # Ensure blobs are removed once all module versions are deleted
+        module_versions[0].delete()
+        blob_rows = self._get_blob_rows()
+        assert sorted(count for blob_id, count in blob_rows.items() if blob_id not in existing_blobs) == [1, 1, 1]
+
+        module_versions[1].delete()
+        assert self._get_blob_rows() == existing_blobs
@@ -185,8 +185,7 @@ class TestModuleVersion(TerraregIntegrationTest):
                 conn.execute(db.example_file.insert().values(
                     id=10004,
                     submodule_id=10002,
-                    path='testfile.tf',
-                    content=None
+                    path='testfile.tf'
                 ))
 
                 # Create download analytics
@@ -1,20 +1,23 @@
 
+import hashlib
+import io
 import shutil
 import subprocess
 import json
 import os
 import tarfile
-from tempfile import TemporaryDirectory, mkdtemp
+from tempfile import mkdtemp
 import tempfile
 import platform
 
 from unittest import mock
 import zipfile
 import pytest
+import werkzeug.datastructures
 
 import terrareg.config
 import terrareg.errors
-from terrareg.models import GitProvider, Module, ModuleProvider, ModuleVersion, Namespace
+from terrareg.models import FileBlob, GitProvider, Module, ModuleProvider, ModuleVersion, Namespace
 from terrareg.module_extractor import ApiUploadModuleExtractor
 from test.integration.terrareg import TerraregIntegrationTest
 from test import client, skipif_unless_ci
@@ -1760,7 +1763,7 @@ resource "aws_s3_bucket" "test" {
             'unittest_file.md': b'\n# Unit test markdown file\n'
         }
         assert {
-            file.path: file.content
+            file.path: FileBlob.decompress(file.content)
             for file in module_version.module_version_files
         } == expected_files
 
@@ -1793,7 +1796,8 @@ resource "aws_s3_bucket" "test" {
                 self.filename = 'upload.zip'
             
             def save(self, dest):
-                shutil.copy(self._source, dest)
+                with open(self._source, 'rb') as source_fh:
+                    shutil.copyfileobj(source_fh, dest)
 
         mock_upload = MockUpload(os.path.join(temp_directory, 'upload.zip'))
 
@@ -1805,6 +1809,98 @@ resource "aws_s3_bucket" "test" {
                 # Perform base module upload
                 me.process_upload()
 
+    @staticmethod
+    def _create_tar_gz(tar_gz_path, members):
+        """Create tar.gz archive with members, from dict of tarfile.TarInfo to content."""
+        with tarfile.open(tar_gz_path, 'w:gz') as tar_fh:
+            for tar_info, content in members.items():
+                tar_info.size = len(content) if content is not None else 0
+                tar_fh.addfile(tar_info, io.BytesIO(content) if content is not None else None)
+
+    def test_upload_tar_gz(self):
+        """Test module upload of tar.gz archive, ensuring checksum of upload is stored."""
+        namespace = Namespace.get(name='testprocessupload', create=True)
+        module = Module(namespace=namespace, name='test-module')
+        module_provider = ModuleProvider.get(module=module, name='aws', create=True)
+        module_version = ModuleVersion(module_provider=module_provider, version='22.0.0')
+        module_version.prepare_module()
+
+        with tempfile.TemporaryDirectory() as temp_directory:
+            tar_gz_path = os.path.join(temp_directory, 'upload.tar.gz')
+            link_info = tarfile.TarInfo('outputs-link.tf')
+            link_info.type = tarfile.SYMTYPE
+            link_info.linkname = 'main.tf'
+            self._create_tar_gz(tar_gz_path, {
+                tarfile.TarInfo('./main.tf'): UploadTestModule.VALID_MAIN_TF_FILE.encode('utf-8'),
+                link_info: None,
+            })
+            with open(tar_gz_path, 'rb') as tar_gz_fh:
+                expected_sha256 = hashlib.sha256(tar_gz_fh.read()).hexdigest()
+
+            upload_file = werkzeug.datastructures.FileStorage(
+                stream=open(tar_gz_path, 'rb'), filename='upload.tar.gz'
+            )
+            with upload_file.stream, ApiUploadModuleExtractor(upload_file=upload_file, module_version=module_version) as me:
+                me.process_upload()
+
+                with open(os.path.join(me.extract_directory, 'main.tf'), 'r') as main_tf_fh:
+                    assert main_tf_fh.read() == UploadTestModule.VALID_MAIN_TF_FILE
+                assert os.readlink(os.path.join(me.extract_directory, 'outputs-link.tf')) == 'main.tf'
+
+        assert module_version.upload_sha256 == expected_sha256
+
+        # Ensure extraction report contains stages of extraction
+        recorded_stages = [stage['name'] for stage in module_version.extraction_report['stages']]
+        for expected_stage in ['upload', 'archive', 'tfsec', 'terraform_docs', 'terraform', 'terraform_init', 'database']:
+            assert expected_stage in recorded_stages
+
+    @pytest.mark.parametrize('member_name, link_type, link_name', [
+        ('../outside.tf', None, None),
+        ('/outside.tf', None, None),
+        ('link', tarfile.SYMTYPE, '../outside'),
+        ('link', tarfile.SYMTYPE, '/etc/passwd'),
+        ('link', tarfile.LNKTYPE, '../outside'),
+    ])
+    def test_upload_malicious_tar_gz(self, member_name, link_type, link_name):
+        """Test upload of tar.gz archive with members outside of the extract directory."""
+        namespace = Namespace.get(name='testprocessupload', create=True)
+        module = Module(namespace=namespace, name='test-module')
+        module_provider = ModuleProvider.get(module=module, name='aws', create=True)
+        module_version = ModuleVersion(module_provider=module_provider, version='23.0.0')
+        module_version.prepare_module()
+
+        with tempfile.TemporaryDirectory() as temp_directory:
+            tar_gz_path = os.path.join(temp_directory, 'upload.tar.gz')
+            member = tarfile.TarInfo(member_name)
+            if link_type:
+                member.type = link_type
+                member.linkname = link_name
+            self._create_tar_gz(tar_gz_path, {member: None if link_type else b'# Outside'})
+
+            upload_file = werkzeug.datastructures.FileStorage(
+                stream=open(tar_gz_path, 'rb'), filename='upload.tar.gz'
+            )
+            with upload_file.stream, ApiUploadModuleExtractor(upload_file=upload_file, module_version=module_version) as me:
+                with pytest.raises(terrareg.utils.PathIsNotWithinBaseDirectoryError):
+                    me.process_upload()
+
+                assert os.listdir(me.extract_directory) == []
+
+    def test_upload_unknown_file_type(self):
+        """Test upload of file that is not a zip or tar.gz archive."""
+        namespace = Namespace.get(name='testprocessupload', create=True)
+        module = Module(namespace=namespace, name='test-module')
+        module_provider = ModuleProvider.get(module=module, name='aws', create=True)
+        module_version = ModuleVersion(module_provider=module_provider, version='24.0.0')
+        module_version.prepare_module()
+
+        upload_file = werkzeug.datastructures.FileStorage(
+            stream=io.BytesIO(b'This is not an archive'), filename='upload.zip'
+        )
+        with ApiUploadModuleExtractor(upload_file=upload_file, module_version=module_version) as me:
+            with pytest.raises(terrareg.errors.UnknownFiletypeError):
+                me.process_upload()
+
     def test_generate_archive(self):
         """Test _generate_archive method during module extraction"""
         test_upload = UploadTestModule()
@@ -1843,22 +1939,12 @@ resource "aws_s3_bucket" "test" {
             temp_dir = tempfile.mkdtemp()
             os.mkdir(os.path.join(temp_dir, 'modules'))
 
-            # Mock tempfile to obtain temporary directory used for generating archives
-            generate_archive_temp_dir = None
-            def mock_temporary_directory(suffix=None, *args, **kwargs):
-                nonlocal generate_archive_temp_dir
-                temp_dir_ret = TemporaryDirectory(suffix=suffix, *args, **kwargs)
-                if suffix == "generate-archive":
-                    generate_archive_temp_dir = temp_dir_ret.name
-                return temp_dir_ret
-
             try:
                 local_storage = terrareg.file_storage.LocalFileStorage(base_directory=temp_dir)
                 mock_local_file_storage = mock.MagicMock(wraps=local_storage)
                 with mock.patch('terrareg.config.Config.DELETE_EXTERNALLY_HOSTED_ARTIFACTS', False), \
                         mock.patch('terrareg.config.Config.DATA_DIRECTORY', temp_dir), \
-                        mock.patch('terrareg.file_storage.FileStorageFactory.get_file_storage', return_value=mock_local_file_storage), \
-                        mock.patch('tempfile.TemporaryDirectory', side_effect=mock_temporary_directory):
+                        mock.patch('terrareg.file_storage.FileStorageFactory.get_file_storage', return_value=mock_local_file_storage):
 
                     UploadTestModule.upload_module_version(module_version=module_version, zip_file=zip_file)
 
@@ -1904,11 +1990,18 @@ resource "aws_s3_bucket" "test" {
                             'subdir/nested-file.tf': '# Nested file',
                         }
 
+                    # Ensure checksum and size of zip archive are stored against module version
+                    with open(full_zip_path, 'rb') as zip_fh:
+                        zip_content = zip_fh.read()
+                    assert module_version.archive_sha256 == hashlib.sha256(zip_content).hexdigest()
+                    assert module_version.archive_size == len(zip_content)
+
                     mock_local_file_storage.make_directory.assert_called_once_with("/modules/testprocessupload/test-module/aws/21.0.0")
-                    mock_local_file_storage.upload_file.assert_has_calls(calls=[
-                        mock.call(os.path.join(generate_archive_temp_dir, "source.tar.gz"), '/modules/testprocessupload/test-module/aws/21.0.0', 'source.tar.gz'),
-                        mock.call(os.path.join(generate_archive_temp_dir, "source.zip"), '/modules/testprocessupload/test-module/aws/21.0.0', 'source.zip')
+                    mock_local_file_storage.open_write.assert_has_calls(calls=[
+                        mock.call('/modules/testprocessupload/test-module/aws/21.0.0/source.tar.gz'),
+                        mock.call('/modules/testprocessupload/test-module/aws/21.0.0/source.zip')
                     ])
+                    mock_local_file_storage.upload_file.assert_not_called()
 
             finally:
                 shutil.rmtree(temp_dir)
@@ -0,0 +1,291 @@
+from datetime import datetime, timedelta
+import threading
+from unittest import mock
+
+import flask
+import pytest
+
+import terrareg.auth
+import terrareg.errors
+from terrareg.database import Database
+from terrareg.import_job_model import ImportJob
+from terrareg.import_job_status import ImportJobStatus
+from terrareg.import_job_worker import ImportJobWorker
+from terrareg.models import Module, Namespace, ModuleProvider, ModuleVersion
+from test.integration.terrareg import TerraregIntegrationTest
+from test import BaseTest
+
+
+class TestImportJob(TerraregIntegrationTest):
+    """Test import job queue and worker"""
+
+    _TEST_DATA = {}
+
+    def setup_method(self, method):
+        """Setup module provider"""
+        super().setup_method(method)
+        with self._patch_audit_event_creation():
+            self._namespace = Namespace.create('importjob')
+            self._module_provider = ModuleProvider.get(Module(self._namespace, 'test-module'), 'aws', create=True)
+        self._module_provider.update_attributes(
+            repo_clone_url_template='https://example.com/importjob/test-module.git'
+        )
+
+    def teardown_method(self, method):
+        """Remove test data"""
+        db = Database.get()
+        with db.get_connection() as conn:
+            conn.execute(db.import_job.delete())
+        with self._patch_audit_event_creation():
+            self._module_provider.delete()
+            self._namespace.delete()
+        super().teardown_method(method)
+
+    def _create_job(self, version='1.0.0', git_tag='v1.0.0'):
+        """Create import job as mock user"""
+        mock_auth_method = mock.MagicMock()
+        mock_auth_method.get_username.return_value = 'unittest-user'
+        with mock.patch('terrareg.auth.AuthFactory.get_current_auth_method', mock.MagicMock(return_value=mock_auth_method)):
+            return ImportJob.create(module_provider=self._module_provider, version=version, git_tag=git_tag)
+
+    def _set_job_attributes(self, job, **kwargs):
+        """Update database row of job"""
+        db = Database.get()
+        with db.get_connection() as conn:
+            conn.execute(db.import_job.update().where(db.import_job.c.id==job.pk).values(**kwargs))
+
+    def test_create(self):
+        """Test creating import job"""
+        job = self._create_job()
+
+        job = ImportJob.get_by_pk(job.pk)
+        assert job.status is ImportJobStatus.PENDING
+        assert job.version == '1.0.0'
+        assert job.git_tag == 'v1.0.0'
+        assert job.attempts == 0
+        assert job.username == 'unittest-user'
+        assert job.module_provider.id == 'importjob/test-module/aws'
+
+        outline = job.get_api_outline()
+        assert outline['id'] == job.pk
+        assert outline['status'] == 'pending'
+        assert outline['module_provider_id'] == 'importjob/test-module/aws'
+        assert outline['version'] == '1.0.0'
+        assert outline['started_at'] is None
+
+    def test_create_duplicate(self):
+        """Test creating job for version with an active job returns the existing job"""
+        first_job = self._create_job()
+        assert self._create_job().pk == first_job.pk
+
+        # Ensure job for other versions is created separately
+        assert self._create_job(version='1.0.1', git_tag='v1.0.1').pk != first_job.pk
+
+        # Ensure new job is created once the existing job has completed
+        assert ImportJob.claim_next(worker_id='worker-a').pk == first_job.pk
+        assert first_job.mark_succeeded(worker_id='worker-a') is True
+        assert self._create_job().pk != first_job.pk
+
+    @pytest.mark.parametrize('in_transaction', [False, True])
+    def test_create_duplicate_concurrent(self, in_transaction):
+        """Test creating job for version whilst a concurrent request creates a job returns the existing job"""
+        first_job = self._create_job()
+
+        # Mock check for existing job to emulate job being created
+        # by concurrent request after the check
+        original_get_active = ImportJob.get_active_by_module_provider_and_version
+        mock_get_active = mock.MagicMock(side_effect=[None, original_get_active(module_provider=self._module_provider, version='1.0.0')])
+        with mock.patch('terrareg.import_job_model.ImportJob.get_active_by_module_provider_and_version', mock_get_active):
+            if in_transaction:
+                with Database.start_transaction():
+                    assert self._create_job().pk == first_job.pk
+            else:
+                assert self._create_job().pk == first_job.pk
+
+        assert mock_get_active.call_count == 2
+        db = Database.get()
+        with db.get_connection() as conn:
+            assert len(conn.execute(db.import_job.select()).all()) == 1
+
+    def test_get_by_pk_non_existent(self):
+        """Test obtaining non-existent job"""
+        assert ImportJob.get_by_pk(123456) is None
+
+    def test_claim_next(self):
+        """Test claiming jobs by workers"""
+        first_job = self._create_job()
+        second_job = self._create_job(version='1.0.1', git_tag='v1.0.1')
+
+        claimed = ImportJob.claim_next(worker_id='worker-a')
+        assert claimed.pk == first_job.pk
+        assert claimed.status is ImportJobStatus.RUNNING
+        assert claimed.attempts == 1
+
+        # Ensure running job is not claimed by another worker
+        assert ImportJob.claim_next(worker_id='worker-b').pk == second_job.pk
+        assert ImportJob.claim_next(worker_id='worker-c') is None
+
+    def test_claim_next_unavailable(self):
+        """Test that jobs waiting for retry are not claimed"""
+        job = self._create_job()
+        self._set_job_attributes(job, available_at=datetime.now() + timedelta(minutes=5))
+
+        assert ImportJob.claim_next(worker_id='worker-a') is None
+
+    def test_claim_expired_lease(self):
+        """Test claiming running job whose lease has expired"""
+        job = self._create_job()
+        assert ImportJob.claim_next(worker_id='worker-a').pk == job.pk
+
+        self._set_job_attributes(job, lease_expires_at=datetime.now() - timedelta(seconds=1))
+
+        reclaimed = ImportJob.claim_next(worker_id='worker-b')
+        assert reclaimed.pk == job.pk
+        assert reclaimed.attempts == 2
+
+        # Ensure original worker can no longer update job
+        assert job.heartbeat(worker_id='worker-a') is False
+        assert job.mark_succeeded(worker_id='worker-a') is False
+        assert job.heartbeat(worker_id='worker-b') is True
+
+    def test_expired_lease_without_remaining_attempts(self):
+        """Test running job with expired lease, without remaining attempts, is marked as failed"""
+        job = self._create_job()
+        assert ImportJob.claim_next(worker_id='worker-a').pk == job.pk
+        self._set_job_attributes(job, lease_expires_at=datetime.now() - timedelta(seconds=1), attempts=3)
+
+        with mock.patch('terrareg.config.Config.IMPORT_JOB_MAX_ATTEMPTS', 3):
+            assert ImportJob.claim_next(worker_id='worker-b') is None
+
+        job = ImportJob.get_by_pk(job.pk)
+        assert job.status is ImportJobStatus.FAILED
+        assert job.message == 'Import job was not completed by worker'
+
+    def test_mark_failed_retry(self):
+        """Test failed job is re-queued with backoff"""
+        job = self._create_job()
+        job = ImportJob.claim_next(worker_id='worker-a')
+        self._set_job_attributes(job, attempts=2)
+
+        with mock.patch('terrareg.config.Config.IMPORT_JOB_MAX_ATTEMPTS', 3), \
+                mock.patch('terrareg.config.Config.IMPORT_JOB_RETRY_BACKOFF_SECONDS', 60):
+            before = datetime.now()
+            assert job.mark_failed(worker_id='worker-a', message='Clone failed') is True
+
+        row = job._get_db_row()
+        assert row['status'] is ImportJobStatus.PENDING
+        assert row['message'] == 'Clone failed'
+        assert row['worker_id'] is None
+        # Ensure backoff is doubled for second attempt
+        assert before + timedelta(seconds=119) <= row['available_at'] <= datetime.now() + timedelta(seconds=121)
+
+    def test_mark_failed_final_attempt(self):
+        """Test failed job is marked as failed once attempts are exhausted"""
+        self._create_job()
+        job = ImportJob.claim_next(worker_id='worker-a')
+
+        with mock.patch('terrareg.config.Config.IMPORT_JOB_MAX_ATTEMPTS', 1):
+            assert job.mark_failed(worker_id='worker-a', message='Clone failed') is True
+
+        assert job.status is ImportJobStatus.FAILED
+        assert job.message == 'Clone failed'
+        assert job.get_api_outline()['completed_at'] is not None
+
+    def test_worker_process_next_job(self):
+        """Test worker importing module version for job"""
+        job = self._create_job()
+
+        def process_upload():
+            # Ensure import is performed as the user that created the job
+            current_auth_method = getattr(flask.g, terrareg.auth.AuthFactory.FLASK_GLOBALS_AUTH_KEY)
+            assert isinstance(current_auth_method, terrareg.auth.ImportJobAuthMethod)
+            assert current_auth_method.get_username() == 'unittest-user (import job)'
+
+        mock_process_upload = mock.MagicMock(side_effect=process_upload)
+        worker = ImportJobWorker(app=BaseTest.get().SERVER._app)
+        with mock.patch('terrareg.module_extractor.GitModuleExtractor.process_upload', mock_process_upload):
+            assert worker.process_next_job() is True
+
+        mock_process_upload.assert_called_once()
+        job = ImportJob.get_by_pk(job.pk)
+        assert job.status is ImportJobStatus.SUCCEEDED
+
+        # Ensure module version has been created
+        assert ModuleVersion.get(module_provider=self._module_provider, version='1.0.0') is not None
+
+        # Ensure no further jobs are processed
+        assert worker.process_next_job() is False
+
+    def test_worker_process_job_error(self):
+        """Test worker handling error whilst importing module version"""
+        job = self._create_job()
+
+        def raise_error():
+            raise terrareg.errors.GitCloneError('Unable to clone repository')
+
+        worker = ImportJobWorker(app=BaseTest.get().SERVER._app)
+        with mock.patch('terrareg.module_extractor.GitModuleExtractor.process_upload', mock.MagicMock(side_effect=raise_error)), \
+                mock.patch('terrareg.config.Config.IMPORT_JOB_MAX_ATTEMPTS', 2):
+            assert worker.process_next_job() is True
+
+        job = ImportJob.get_by_pk(job.pk)
+        assert job.status is ImportJobStatus.PENDING
+        assert job.message == 'Unable to clone repository'
+
+        # Ensure module version creation was rolled back
+        assert ModuleVersion.get(module_provider=self._module_provider, version='1.0.0') is None
+
+    def test_worker_lease_lost_during_import(self):
+        """Test import is rolled back when the job is claimed by another worker whilst importing"""
+        job = self._create_job()
+
+        # Mock marking job as succeeded to emulate lease expiring
+        # and job being claimed by another worker during the import
+        mock_mark_succeeded = mock.MagicMock(return_value=False)
+        mock_mark_failed = mock.MagicMock()
+        worker = ImportJobWorker(app=BaseTest.get().SERVER._app)
+        with mock.patch('terrareg.module_extractor.GitModuleExtractor.process_upload', mock.MagicMock()), \
+                mock.patch('terrareg.import_job_model.ImportJob.mark_succeeded', mock_mark_succeeded), \
+                mock.patch('terrareg.import_job_model.ImportJob.mark_failed', mock_mark_failed):
+            assert worker.process_next_job() is True
+
+        mock_mark_succeeded.assert_called_once_with(worker_id=worker.worker_id)
+        # Ensure job is not updated by the worker that lost the lease
+        mock_mark_failed.assert_not_called()
+
+        # Ensure module version creation was rolled back
+        assert ModuleVersion.get(module_provider=self._module_provider, version='1.0.0') is None
+
+    def test_worker_lease_lost_by_heartbeat(self):
+        """Test import is rolled back when the heartbeat has lost the lease of the job"""
+        self._create_job()
+        worker = ImportJobWorker(app=BaseTest.get().SERVER._app)
+        job = ImportJob.claim_next(worker_id=worker.worker_id)
+
+        lease_lost_event = threading.Event()
+        lease_lost_event.set()
+        with mock.patch('terrareg.module_extractor.GitModuleExtractor.process_upload', mock.MagicMock()):
+            with pytest.raises(terrareg.errors.ImportJobLeaseLostError):
+                worker._process_job(job, lease_lost_event=lease_lost_event)
+
+        assert ImportJob.get_by_pk(job.pk).status is ImportJobStatus.RUNNING
+        assert ModuleVersion.get(module_provider=self._module_provider, version='1.0.0') is None
+
+    def test_heartbeat_loop_lease_lost(self):
+        """Test heartbeat sets lease lost event when the lease cannot be extended"""
+        self._create_job()
+        worker = ImportJobWorker(app=BaseTest.get().SERVER._app)
+        job = ImportJob.claim_next(worker_id=worker.worker_id)
+        self._set_job_attributes(job, worker_id='worker-b')
+
+        stop_event = threading.Event()
+        lease_lost_event = threading.Event()
+        with mock.patch('terrareg.config.Config.IMPORT_JOB_LEASE_SECONDS', 0):
+            # Run heartbeat loop in thread, to allow it to be stopped if the test fails
+            heartbeat_thread = threading.Thread(target=worker._heartbeat_loop, args=(job, stop_event, lease_lost_event), daemon=True)
+            heartbeat_thread.start()
+            assert lease_lost_event.wait(5)
+            stop_event.set()
+            heartbeat_thread.join(5)
+
+        assert not heartbeat_thread.is_alive()
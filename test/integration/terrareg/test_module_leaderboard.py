@@ -0,0 +1,183 @@
+
+from datetime import datetime, timedelta
+import threading
+from unittest import mock
+
+import terrareg.analytics
+from terrareg.database import Database
+from terrareg.models import Module, Namespace, ModuleProvider, ModuleVersion
+from terrareg.module_leaderboard import ModuleLeaderboard
+from test.integration.terrareg import TerraregIntegrationTest
+from test import client
+
+
+class TestModuleLeaderboard(TerraregIntegrationTest):
+    """Test module leaderboards"""
+
+    _TEST_DATA = {}
+
+    def _create_module_version(self, module_name, version, published_at):
+        """Create published module version"""
+        with self._patch_audit_event_creation():
+            module_provider = ModuleProvider.get(Module(self._namespace, module_name), 'aws', create=True)
+            module_version = ModuleVersion(module_provider, version)
+            module_version.prepare_module()
+            module_version.publish()
+        module_version.update_attributes(published_at=published_at)
+        return module_version
+
+    def _create_downloads(self, module_version, count, timestamp):
+        """Record module version downloads at given time"""
+        mock_get_datetime_now = mock.MagicMock(return_value=timestamp)
+        with mock.patch('terrareg.analytics.AnalyticsEngine.get_datetime_now', mock_get_datetime_now):
+            for itx in range(count):
+                terrareg.analytics.AnalyticsEngine.record_module_version_download(
+                    namespace_name=self._namespace.name,
+                    module_name=module_version.module_provider.module.name,
+                    provider_name=module_version.module_provider.name,
+                    module_version=module_version,
+                    analytics_token=f'token-{itx}',
+                    terraform_version='1.5.0',
+                    user_agent='Terraform/1.5.0',
+                    auth_token=None
+                )
+
+    def setup_method(self, method):
+        """Setup module versions and analytics"""
+        super().setup_method(method)
+        with self._patch_audit_event_creation():
+            self._namespace = Namespace.create('leaderboard')
+
+        now = datetime.now()
+        self._first = self._create_module_version('first', '1.0.0', now - timedelta(days=3))
+        self._second = self._create_module_version('second', '1.0.0', now - timedelta(days=2))
+        self._third = self._create_module_version('third', '1.0.0', now - timedelta(days=1))
+
+        # First module is most downloaded in the past month,
+        # second is most downloaded in the past week and
+        # third is most downloaded in the past day
+        self._create_downloads(self._first, 5, now - timedelta(days=20))
+        self._create_downloads(self._second, 3, now - timedelta(days=3))
+        self._create_downloads(self._third, 2, now - timedelta(hours=1))
+
+        ModuleLeaderboard.invalidate()
+
+    def teardown_method(self, method):
+        """Remove test data"""
+        db = Database.get()
+        with db.get_connection() as conn:
+            conn.execute(db.analytics.delete())
+        with self._patch_audit_event_creation():
+            for module_version in [self._first, self._second, self._third]:
+                module_version.module_provider.delete()
+            self._namespace.delete()
+        super().teardown_method(method)
+
+    def test_get_most_downloaded(self):
+        """Test obtaining most downloaded module providers for each window."""
+        def get_results(window):
+            return [
+                (module_provider.module.name, download_count)
+                for module_provider, download_count in ModuleLeaderboard.get_most_downloaded(window=window)
+            ]
+
+        assert get_results('day') == [('third', 2)]
+        assert get_results('week') == [('second', 3), ('third', 2)]
+        assert get_results('month') == [('first', 5), ('second', 3), ('third', 2)]
+
+        assert [module_provider.module.name for module_provider, _ in ModuleLeaderboard.get_most_downloaded(window='month', limit=2)] == ['first', 'second']
+
+    def test_get_most_recently_published(self):
+        """Test obtaining most recently published module versions."""
+        assert [
+            module_version.module_provider.module.name
+            for module_version in ModuleLeaderboard.get_most_recently_published()
+        ] == ['third', 'second', 'first']
+
+    def test_leaderboard_is_cached(self):
+        """Test leaderboards are cached between calls and re-calculated after publishing."""
+        with mock.patch('terrareg.config.Config.MODULE_LEADERBOARD_REFRESH_INTERVAL', 300):
+            assert ModuleLeaderboard.get_most_downloaded(window='day')[0][1] == 2
+
+            # Ensure new downloads are not reflected until leaderboard is refreshed
+            self._create_downloads(self._third, 1, datetime.now())
+            assert ModuleLeaderboard.get_most_downloaded(window='day')[0][1] == 2
+
+            # Publish a new module version, which should re-calculate leaderboards
+            self._create_module_version('first', '1.1.0', datetime.now())
+            assert ModuleLeaderboard.get_most_downloaded(window='day')[0][1] == 3
+            assert ModuleLeaderboard.get_most_recently_published(limit=1)[0].id == 'leaderboard/first/aws/1.1.0'
+
+    def test_concurrent_refresh(self):
+        """Test leaderboards are only re-calculated by a single thread when out-of-date"""
+        original_calculate = ModuleLeaderboard._calculate_most_downloaded
+        calculate_started = threading.Event()
+        continue_calculate = threading.Event()
+
+        def slow_calculate(*args, **kwargs):
+            calculate_started.set()
+            continue_calculate.wait(timeout=10)
+            return original_calculate(*args, **kwargs)
+
+        results = []
+        def get_results():
+            results.append(ModuleLeaderboard.get_most_downloaded(window='day')[0][1])
+
+        with mock.patch('terrareg.config.Config.MODULE_LEADERBOARD_REFRESH_INTERVAL', 300), \
+                mock.patch('terrareg.module_leaderboard.ModuleLeaderboard._calculate_most_downloaded',
+                           mock.MagicMock(side_effect=slow_calculate)) as mock_calculate:
+            threads = [threading.Thread(target=get_results) for _ in range(4)]
+            threads[0].start()
+            calculate_started.wait(timeout=10)
+            for thread in threads[1:]:
+                thread.start()
+            continue_calculate.set()
+            for thread in threads:
+                thread.join(timeout=10)
+
+        assert results == [2, 2, 2, 2]
+        mock_calculate.assert_called_once()
+
+    def test_invalidate_during_refresh(self):
+        """Test leaderboards remain out-of-date if invalidated whilst being re-calculated"""
+        original_calculate = ModuleLeaderboard._calculate_most_downloaded
+
+        def invalidating_calculate(*args, **kwargs):
+            ModuleLeaderboard.invalidate()
+            return original_calculate(*args, **kwargs)
+
+        with mock.patch('terrareg.config.Config.MODULE_LEADERBOARD_REFRESH_INTERVAL', 300):
+            with mock.patch('terrareg.module_leaderboard.ModuleLeaderboard._calculate_most_downloaded',
+                            mock.MagicMock(side_effect=invalidating_calculate)):
+                ModuleLeaderboard.refresh()
+            assert ModuleLeaderboard._is_stale()
+
+    def test_leaderboard_refresh_disabled(self):
+        """Test leaderboards are re-calculated on each call when refresh interval is 0"""
+        with mock.patch('terrareg.config.Config.MODULE_LEADERBOARD_REFRESH_INTERVAL', 0):
+            assert ModuleLeaderboard.get_most_downloaded(window='day')[0][1] == 2
+            self._create_downloads(self._third, 1, datetime.now())
+            assert ModuleLeaderboard.get_most_downloaded(window='day')[0][1] == 3
+
+    def test_top_module_providers_endpoint(self, client):
+        """Test top module providers endpoint"""
+        res = client.get('/v1/terrareg/analytics/global/top_module_providers?window=month&limit=2')
+        assert res.status_code == 200
+        assert [(row['id'], row['download_count']) for row in res.json] == [
+            ('leaderboard/first/aws/1.0.0', 5),
+            ('leaderboard/second/aws/1.0.0', 3),
+        ]
+
+        # Ensure window defaults to week
+        res = client.get('/v1/terrareg/analytics/global/top_module_providers')
+        assert res.status_code == 200
+        assert [row['id'] for row in res.json] == ['leaderboard/second/aws/1.0.0', 'leaderboard/third/aws/1.0.0']
+
+        res = client.get('/v1/terrareg/analytics/global/top_module_providers?window=year')
+        assert res.status_code == 400
+
+    def test_most_downloaded_this_week_endpoint(self, client):
+        """Test most downloaded module provider this week endpoint uses leaderboard"""
+        res = client.get('/v1/terrareg/analytics/global/most_downloaded_module_provider_this_week')
+        assert res.status_code == 200
+        assert res.json['id'] == 'leaderboard/second/aws/1.0.0'
@@ -550,7 +550,7 @@ aec01bca39c7f614bc263e299a1fcdd09da3073369756efa6bced80531a45657  ./requirements
 
             mock_obtain_source_code = unittest.mock.MagicMock(side_effect=mock_obtain_source_code_side_effect)
 
-            mock_switch_terraform_versions = unittest.mock.MagicMock()
+            mock_install_terraform_version = unittest.mock.MagicMock(return_value='/tmp/terraform-binaries/terraform/1.5.7/terraform')
 
             mock_subprocess = unittest.mock.MagicMock()
             mock_collect_markdown_documentation = unittest.mock.MagicMock()
@@ -560,7 +560,7 @@ aec01bca39c7f614bc263e299a1fcdd09da3073369756efa6bced80531a45657  ./requirements
                 os.mkdir(os.path.join(source_dir, "docs"))
 
             with unittest.mock.patch('terrareg.provider_extractor.ProviderExtractor._obtain_source_code', mock_obtain_source_code), \
-                    unittest.mock.patch('terrareg.module_extractor.ModuleExtractor._switch_terraform_versions', mock_switch_terraform_versions), \
+                    unittest.mock.patch('terrareg.module_extractor.ModuleExtractor._install_terraform_version', mock_install_terraform_version), \
                     unittest.mock.patch('terrareg.provider_extractor.subprocess', mock_subprocess), \
                     unittest.mock.patch('terrareg.provider_extractor.ProviderExtractor._collect_markdown_documentation', mock_collect_markdown_documentation), \
                     test_provider_version_wrapper() as provider_extractor:
@@ -585,6 +585,8 @@ aec01bca39c7f614bc263e299a1fcdd09da3073369756efa6bced80531a45657  ./requirements
                     assert env_vars["GOROOT"] == "/usr/local/go"
                     assert "GOPATH" in env_vars
                     assert env_vars["GOPATH"].startswith("/tmp/")
+                    # Ensure installed Terraform is added to PATH
+                    assert env_vars["PATH"].startswith("/tmp/terraform-binaries/terraform/1.5.7:")
 
                 else:
                     mock_subprocess.assert_not_called()
@@ -0,0 +1,94 @@
+from tempfile import TemporaryDirectory
+import unittest.mock
+import os
+
+import pytest
+
+from test.integration.terrareg.fixtures import (
+    test_provider_version, test_provider, test_repository,
+    test_gpg_key, test_namespace, mock_provider_source,
+    mock_provider_source_class, test_provider_category
+)
+import terrareg.provider_mirror
+import terrareg.provider_version_binary_model
+from test.integration.terrareg import TerraregIntegrationTest
+
+
+class TestProviderMirror(TerraregIntegrationTest):
+    """Test ProviderMirror"""
+
+    _BINARY_NAME = "terraform-provider-unittest-create-provider-name_6.4.1_linux_amd64.zip"
+
+    @pytest.mark.parametrize('public_url, expected_hostname', [
+        ('https://example.com', 'example.com'),
+        ('https://example.com:443', 'example.com'),
+        ('https://example.com:8443', 'example.com:8443'),
+        ('http://example.com', 'example.com'),
+        ('http://example.com:5000', 'example.com:5000'),
+        ('', None),
+    ])
+    def test_get_hostname(self, public_url, expected_hostname):
+        """Test obtaining hostname used in provider source addresses"""
+        with unittest.mock.patch('terrareg.config.Config.PUBLIC_URL', public_url), \
+                unittest.mock.patch('terrareg.config.Config.DOMAIN_NAME', None):
+            assert terrareg.provider_mirror.ProviderMirror.get_hostname() == expected_hostname
+
+    def test_get_without_directory(self):
+        """Test obtaining provider mirror when it is not configured"""
+        with unittest.mock.patch('terrareg.config.Config.TERRAFORM_PROVIDER_MIRROR_DIRECTORY', ''):
+            assert terrareg.provider_mirror.ProviderMirror.get() is None
+
+    def test_create_binary_adds_to_mirror(self, test_provider_version):
+        """Test creating provider binary adds binary to mirror"""
+        with TemporaryDirectory() as data_dir, TemporaryDirectory() as mirror_dir, \
+                unittest.mock.patch('terrareg.config.Config.DATA_DIRECTORY', data_dir), \
+                unittest.mock.patch('terrareg.config.Config.PUBLIC_URL', 'https://registry.example.com'), \
+                unittest.mock.patch('terrareg.config.Config.TERRAFORM_PROVIDER_MIRROR_DIRECTORY', mirror_dir):
+
+            terrareg.provider_version_binary_model.ProviderVersionBinary.create(
+                provider_version=test_provider_version,
+                name=self._BINARY_NAME,
+                checksum="c27f1263ae06f263d59eb1f172c7fe39f6d7a06771544d869cc272d94ed301d1",
+                content=b"Some test Content"
+            )
+
+            mirror_path = os.path.join(mirror_dir, "registry.example.com", "some-organisation", "unittest-create-provider-name", self._BINARY_NAME)
+            assert os.path.isfile(mirror_path)
+            with open(mirror_path, "rb") as fh:
+                assert fh.read() == b"Some test Content"
+            # Ensure no temporary files remain
+            assert os.listdir(os.path.dirname(mirror_path)) == [self._BINARY_NAME]
+
+    def test_populate(self, test_provider_version):
+        """Test populating mirror with existing provider binaries"""
+        with TemporaryDirectory() as data_dir, TemporaryDirectory() as mirror_dir, \
+                unittest.mock.patch('terrareg.config.Config.DATA_DIRECTORY', data_dir), \
+                unittest.mock.patch('terrareg.config.Config.PUBLIC_URL', 'https://registry.example.com'):
+
+            # Create binary, without mirror enabled
+            with unittest.mock.patch('terrareg.config.Config.TERRAFORM_PROVIDER_MIRROR_DIRECTORY', ''):
+                terrareg.provider_version_binary_model.ProviderVersionBinary.create(
+                    provider_version=test_provider_version,
+                    name=self._BINARY_NAME,
+                    checksum="c27f1263ae06f263d59eb1f172c7fe39f6d7a06771544d869cc272d94ed301d1",
+                    content=b"Some test Content"
+                )
+
+            provider_mirror = terrareg.provider_mirror.ProviderMirror(directory=mirror_dir)
+            # Binaries from test data, that do not exist in file storage, are skipped
+            assert provider_mirror.populate() == 1
+
+            mirror_path = os.path.join(mirror_dir, "registry.example.com", "some-organisation", "unittest-create-provider-name", self._BINARY_NAME)
+            with open(mirror_path, "rb") as fh:
+                assert fh.read() == b"Some test Content"
+
+            # Ensure binaries already present in mirror are not re-added
+            assert provider_mirror.populate() == 0
+
+    def test_populate_without_hostname(self, test_provider_version):
+        """Test populating mirror without public URL configured"""
+        with TemporaryDirectory() as mirror_dir, \
+                unittest.mock.patch('terrareg.config.Config.PUBLIC_URL', ''), \
+                unittest.mock.patch('terrareg.config.Config.DOMAIN_NAME', None):
+            assert terrareg.provider_mirror.ProviderMirror(directory=mirror_dir).populate() == 0
+            assert os.listdir(mirror_dir) == []
@@ -274,6 +274,13 @@ def mock_module_version(request):
             'extraction_version': unittest_data.get('extraction_version', EXTRACTION_VERSION),
             'git_path': unittest_data.get('git_path', None),
             'archive_git_path': unittest_data.get('archive_git_path', False),
+            'upload_sha256': unittest_data.get('upload_sha256', None),
+            'archive_sha256': unittest_data.get('archive_sha256', None),
+            'archive_size': unittest_data.get('archive_size', None),
+            'extraction_report': (
+                Database.encode_blob(unittest_data['extraction_report'])
+                if unittest_data.get('extraction_report') else None
+            ),
         }
     mock_method(request, 'terrareg.models.ModuleVersion._get_db_row', _get_db_row)
 
@@ -289,7 +296,7 @@ def mock_module_version_file(request):
         if data is None:
             return None
         return {
-            "content": Database.encode_blob(data),
+            "content": terrareg.models.FileBlob.compress(Database.encode_blob(data)),
             "path": self._path
         }
     mock_method(request, "terrareg.models.ModuleVersionFile._get_db_row", _get_db_row)
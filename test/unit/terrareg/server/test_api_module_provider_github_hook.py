@@ -605,3 +605,38 @@ class TestApiModuleVersionGithubHook(TerraregUnitTest):
             mocked_prepare_module.assert_called_once()
             mocked_process_upload.assert_called_once()
 
+
+    @setup_test_data()
+    def test_hook_with_import_job_queue(self, client, mock_models):
+        """Test hook call when import job queue is enabled."""
+        mock_import_job = unittest.mock.MagicMock()
+        mock_import_job.get_api_outline.return_value = {'id': 1, 'status': 'pending'}
+        with unittest.mock.patch(
+                    'terrareg.models.ModuleVersion.prepare_module', return_value=False) as mocked_prepare_module, \
+                unittest.mock.patch(
+                    'terrareg.module_extractor.GitModuleExtractor.process_upload') as mocked_process_upload, \
+                unittest.mock.patch('terrareg.config.Config.ENABLE_IMPORT_JOB_QUEUE', True), \
+                unittest.mock.patch('terrareg.import_job_model.ImportJob.create', return_value=mock_import_job) as mocked_create:
+
+            res = client.post(
+                '/v1/terrareg/modules/moduleextraction/githubexample/testprovider/hooks/github',
+                json={
+                    "action": "published",
+                    "release": {
+                        "tag_name": "v6.2.0"
+                    }
+                }
+            )
+
+            assert res.status_code == 202
+            assert res.json == {
+                'status': 'Queued',
+                'message': 'Queued import of provided tag',
+                'tag': 'v6.2.0',
+                'job': {'id': 1, 'status': 'pending'}
+            }
+
+            mocked_create.assert_called_once()
+            assert mocked_create.call_args.kwargs['version'] == '6.2.0'
+            mocked_prepare_module.assert_not_called()
+            mocked_process_upload.assert_not_called()
@@ -0,0 +1,171 @@
+
+import unittest.mock
+
+from test.unit.terrareg import (
+    mock_models,
+    setup_test_data, TerraregUnitTest
+)
+import terrareg.errors
+import terrareg.models
+from test import client
+
+
+class TestApiModuleVersionBulkImport(TerraregUnitTest):
+    """Test module version bulk import resource."""
+
+    def _get_mock_get_current_auth_method(self, allowed_to_create):
+        """Return mock auth method"""
+        mock_auth_method = unittest.mock.MagicMock()
+        mock_auth_method.can_upload_module_version = unittest.mock.MagicMock(return_value=allowed_to_create)
+        mock_get_current_auth_method = unittest.mock.MagicMock(return_value=mock_auth_method)
+        return mock_get_current_auth_method
+
+    @staticmethod
+    def _set_git_tag_format():
+        """Set git tag format of test module provider"""
+        terrareg.models.ModuleProvider.get(
+            module=terrareg.models.Module(
+                namespace=terrareg.models.Namespace.get(name='testnamespace'),
+                name='modulewithrepourl'
+            ),
+            name='testprovider'
+        ).update_attributes(git_tag_format='v{version}')
+
+    @setup_test_data()
+    def test_bulk_import_all_tags(self, client, mock_models):
+        """Test bulk import of all tags in repository"""
+        self._set_git_tag_format()
+        with unittest.mock.patch('terrareg.config.Config.ENABLE_IMPORT_JOB_QUEUE', True), \
+                unittest.mock.patch(
+                    'terrareg.import_job_model.ImportJob.create',
+                    side_effect=[unittest.mock.MagicMock(pk=5), unittest.mock.MagicMock(pk=6)]) as mocked_create, \
+                unittest.mock.patch(
+                    'terrareg.module_extractor.GitModuleExtractor.process_upload') as mocked_process_upload, \
+                unittest.mock.patch(
+                    'terrareg.module_version_bulk_import.ModuleVersionBulkImport.get_remote_tags',
+                    return_value=['v3.1.0', 'v2.1.0', 'not-a-version', 'v3.0.0']), \
+                unittest.mock.patch('terrareg.auth.AuthFactory.get_current_auth_method', self._get_mock_get_current_auth_method(True)):
+
+            res = client.post(
+                '/v1/terrareg/modules/testnamespace/modulewithrepourl/testprovider/import/bulk',
+                json={}
+            )
+            assert res.status_code == 202
+            assert res.json == {
+                'status': 'Queued',
+                'imported': [],
+                'failed': [],
+                'queued': [
+                    {'git_tag': 'v3.0.0', 'version': '3.0.0', 'status': 'Queued', 'job_id': 5},
+                    {'git_tag': 'v3.1.0', 'version': '3.1.0', 'status': 'Queued', 'job_id': 6},
+                ],
+                'skipped': [
+                    {'git_tag': 'v2.1.0', 'version': '2.1.0', 'reason': 'Module version already exists'},
+                ],
+            }
+
+            assert mocked_create.call_count == 2
+            mocked_process_upload.assert_not_called()
+
+    @setup_test_data()
+    def test_bulk_import_git_tags(self, client, mock_models):
+        """Test bulk import of list of git tags"""
+        self._set_git_tag_format()
+        mock_import_job = unittest.mock.MagicMock(pk=5)
+        with unittest.mock.patch('terrareg.config.Config.ENABLE_IMPORT_JOB_QUEUE', True), \
+                unittest.mock.patch(
+                    'terrareg.import_job_model.ImportJob.create', return_value=mock_import_job) as mocked_create, \
+                unittest.mock.patch(
+                    'terrareg.module_extractor.GitModuleExtractor.process_upload') as mocked_process_upload, \
+                unittest.mock.patch(
+                    'terrareg.module_version_bulk_import.ModuleVersionBulkImport.get_remote_tags') as mocked_get_remote_tags, \
+                unittest.mock.patch('terrareg.auth.AuthFactory.get_current_auth_method', self._get_mock_get_current_auth_method(True)):
+
+            res = client.post(
+                '/v1/terrareg/modules/testnamespace/modulewithrepourl/testprovider/import/bulk',
+                json={'git_tags': ['v3.0.0', 'invalid']}
+            )
+            assert res.status_code == 202
+            assert res.json == {
+                'status': 'Queued',
+                'imported': [],
+                'failed': [],
+                'queued': [
+                    {'git_tag': 'v3.0.0', 'version': '3.0.0', 'status': 'Queued', 'job_id': 5},
+                ],
+                'skipped': [
+                    {'git_tag': 'invalid', 'version': None, 'reason': 'Git tag does not match git tag format of module provider'},
+                ],
+            }
+
+            mocked_create.assert_called_once_with(module_provider=unittest.mock.ANY, version='3.0.0', git_tag='v3.0.0')
+            mocked_get_remote_tags.assert_not_called()
+            mocked_process_upload.assert_not_called()
+
+    @setup_test_data()
+    def test_bulk_import_queue_disabled(self, client, mock_models):
+        """Test bulk import is rejected when import job queue is disabled"""
+        with unittest.mock.patch('terrareg.config.Config.ENABLE_IMPORT_JOB_QUEUE', False), \
+                unittest.mock.patch(
+                    'terrareg.module_version_bulk_import.ModuleVersionBulkImport.run') as mocked_run, \
+                unittest.mock.patch('terrareg.auth.AuthFactory.get_current_auth_method', self._get_mock_get_current_auth_method(True)):
+
+            res = client.post(
+                '/v1/terrareg/modules/testnamespace/modulewithrepourl/testprovider/import/bulk',
+                json={'git_tags': ['v3.0.0']}
+            )
+            assert res.status_code == 400
+            assert res.json == {
+                'status': 'Error',
+                'message': 'Bulk import requires the import job queue to be enabled. Use the bulk-import command to import without the queue.'
+            }
+            mocked_run.assert_not_called()
+
+    @setup_test_data()
+    def test_bulk_import_with_no_module_provider_repository_url(self, client, mock_models):
+        """Test bulk import for module provider without a repository URL."""
+        with unittest.mock.patch('terrareg.config.Config.ENABLE_IMPORT_JOB_QUEUE', True), \
+                unittest.mock.patch(
+                    'terrareg.module_version_bulk_import.ModuleVersionBulkImport.run') as mocked_run, \
+                unittest.mock.patch('terrareg.auth.AuthFactory.get_current_auth_method', self._get_mock_get_current_auth_method(True)):
+
+            res = client.post(
+                '/v1/terrareg/modules/testnamespace/modulenorepourl/testprovider/import/bulk',
+                json={}
+            )
+            assert res.status_code == 400
+            assert res.json == {
+                'status': 'Error',
+                'message': 'Module provider is not configured with a repository'
+            }
+            mocked_run.assert_not_called()
+
+    @setup_test_data()
+    def test_bulk_import_with_non_existent_module_provider(self, client, mock_models):
+        """Test bulk import for non-existent module provider"""
+        with unittest.mock.patch('terrareg.config.Config.ENABLE_IMPORT_JOB_QUEUE', True), \
+                unittest.mock.patch(
+                    'terrareg.module_version_bulk_import.ModuleVersionBulkImport.run') as mocked_run, \
+                unittest.mock.patch('terrareg.auth.AuthFactory.get_current_auth_method', self._get_mock_get_current_auth_method(True)):
+
+            res = client.post(
+                '/v1/terrareg/modules/testnamespace/moduledoesnotexist/testprovider/import/bulk',
+                json={}
+            )
+            assert res.status_code == 400
+            assert res.json == {'message': 'Module provider does not exist'}
+            mocked_run.assert_not_called()
+
+    @setup_test_data()
+    def test_bulk_import_with_invalid_authentication(self, client, mock_models):
+        """Test bulk import with invalid API authentication."""
+        with unittest.mock.patch(
+                    'terrareg.module_version_bulk_import.ModuleVersionBulkImport.run') as mocked_run, \
+                unittest.mock.patch('terrareg.auth.AuthFactory.get_current_auth_method', self._get_mock_get_current_auth_method(False)):
+
+            res = client.post(
+                '/v1/terrareg/modules/testnamespace/modulewithrepourl/testprovider/import/bulk',
+                json={}
+            )
+            assert res.status_code == 403
+            mocked_run.assert_not_called()
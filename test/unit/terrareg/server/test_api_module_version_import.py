@@ -279,3 +279,29 @@ class TestApiModuleVersionImport(TerraregUnitTest):
 
             mocked_prepare_module.assert_not_called()
             mocked_process_upload.assert_not_called()
+
+    @setup_test_data()
+    def test_import_with_import_job_queue(self, client, mock_models):
+        """Test import when import job queue is enabled"""
+        mock_import_job = unittest.mock.MagicMock()
+        mock_import_job.get_api_outline.return_value = {'id': 1, 'status': 'pending'}
+        with unittest.mock.patch(
+                    'terrareg.models.ModuleVersion.prepare_module') as mocked_prepare_module, \
+                unittest.mock.patch(
+                    'terrareg.module_extractor.GitModuleExtractor.process_upload') as mocked_process_upload, \
+                unittest.mock.patch('terrareg.config.Config.ENABLE_IMPORT_JOB_QUEUE', True), \
+                unittest.mock.patch('terrareg.import_job_model.ImportJob.create', return_value=mock_import_job) as mocked_create, \
+                unittest.mock.patch('terrareg.auth.AuthFactory.get_current_auth_method', self._get_mock_get_current_auth_method(True)):
+
+            res = client.post(
+                '/v1/terrareg/modules/testnamespace/modulewithrepourl/testprovider/import',
+                json={'version': '5.5.4'}
+            )
+            assert res.json == {'status': 'Queued', 'job': {'id': 1, 'status': 'pending'}}
+            assert res.status_code == 202
+
+            mocked_create.assert_called_once()
+            assert mocked_create.call_args.kwargs['version'] == '5.5.4'
+            assert mocked_create.call_args.kwargs['git_tag'] is None
+            mocked_prepare_module.assert_not_called()
+            mocked_process_upload.assert_not_called()
@@ -1,6 +1,9 @@
 
+import hashlib
+import tempfile
 import unittest.mock
 
+import flask
 import pytest
 
 from terrareg.analytics import AnalyticsEngine
@@ -11,6 +14,7 @@ from test.unit.terrareg import (
 )
 import terrareg.models
 import terrareg.config
+import terrareg.file_storage
 from test import client, mock_create_audit_event
 from . import mock_record_module_version_download
 
@@ -85,7 +89,7 @@ class TestApiModuleVersionSourceDownload(TerraregUnitTest):
             raise terrareg.errors.InvalidPresignedUrlKeyError('Invalid pre-sign key')
 
         mock_get_file_storage = unittest.mock.MagicMock()
-        mock_send_file = unittest.mock.MagicMock(return_value="UNIT TEST BINARY OUTPUT")
+        mock_send_file = unittest.mock.MagicMock(side_effect=lambda *args, **kwargs: flask.Response(b"UNIT TEST BINARY OUTPUT"))
 
         mock_validate_presigned_key = unittest.mock.MagicMock(side_effect=raise_exception)
         with unittest.mock.patch('terrareg.config.Config.ALLOW_MODULE_HOSTING', terrareg.config.ModuleHostingMode.ALLOW), \
@@ -96,7 +100,7 @@ class TestApiModuleVersionSourceDownload(TerraregUnitTest):
             res = client.get(url)
 
         assert res.status_code == 200
-        assert res.json == "UNIT TEST BINARY OUTPUT"
+        assert res.data == b"UNIT TEST BINARY OUTPUT"
 
         mock_validate_presigned_key.assert_not_called()
 
@@ -122,7 +126,7 @@ class TestApiModuleVersionSourceDownload(TerraregUnitTest):
 
         mock_validate_presigned_key = unittest.mock.MagicMock()
 
-        mock_send_file = unittest.mock.MagicMock(return_value="UNIT TEST BINARY OUTPUT")
+        mock_send_file = unittest.mock.MagicMock(side_effect=lambda *args, **kwargs: flask.Response(b"UNIT TEST BINARY OUTPUT"))
 
         with unittest.mock.patch('terrareg.config.Config.ALLOW_MODULE_HOSTING', terrareg.config.ModuleHostingMode.ALLOW), \
                 unittest.mock.patch('terrareg.config.Config.ALLOW_UNAUTHENTICATED_ACCESS', allow_unauthenticated_access), \
@@ -132,7 +136,7 @@ class TestApiModuleVersionSourceDownload(TerraregUnitTest):
             res = client.get(url)
 
         assert res.status_code == 200
-        assert res.json == "UNIT TEST BINARY OUTPUT"
+        assert res.data == b"UNIT TEST BINARY OUTPUT"
 
         mock_get_file_storage.assert_called_once()
         mock_read_file.assert_called_once_with('/modules/testnamespace/testmodulename/testprovider/2.4.1/source.zip', bytes_mode=True)
@@ -142,3 +146,281 @@ class TestApiModuleVersionSourceDownload(TerraregUnitTest):
             mock_validate_presigned_key.assert_called_once_with(url='/v1/terrareg/modules/testnamespace/testmodulename/testprovider/2.4.1', payload='unittest-presign-key')
         else:
             mock_validate_presigned_key.assert_not_called()
+
+    @setup_test_data()
+    @pytest.mark.parametrize('s3_download_redirect, presigned_url, expect_redirect', [
+        (False, 'https://test-bucket.s3.amazonaws.com/source.zip?X-Amz-Signature=abc', False),
+        (True, 'https://test-bucket.s3.amazonaws.com/source.zip?X-Amz-Signature=abc', True),
+        # File storage that does not support presigned URLs
+        (True, None, False),
+    ])
+    def test_s3_download_redirect(self, s3_download_redirect, presigned_url, expect_redirect, client, mock_models):
+        """Ensure download is redirected to presigned URL, after validating pre-sign key"""
+        mock_file_storage = unittest.mock.MagicMock()
+        mock_file_storage.get_presigned_url = unittest.mock.MagicMock(return_value=presigned_url)
+        mock_get_file_storage = unittest.mock.MagicMock(return_value=mock_file_storage)
+        mock_validate_presigned_key = unittest.mock.MagicMock()
+        mock_send_file = unittest.mock.MagicMock(side_effect=lambda *args, **kwargs: flask.Response(b"UNIT TEST BINARY OUTPUT"))
+
+        with unittest.mock.patch('terrareg.config.Config.ALLOW_MODULE_HOSTING', terrareg.config.ModuleHostingMode.ALLOW), \
+                unittest.mock.patch('terrareg.config.Config.ALLOW_UNAUTHENTICATED_ACCESS', False), \
+                unittest.mock.patch('terrareg.config.Config.S3_DOWNLOAD_REDIRECT', s3_download_redirect), \
+                unittest.mock.patch('terrareg.config.Config.S3_DOWNLOAD_REDIRECT_EXPIRY', 30), \
+                unittest.mock.patch('flask.send_file', mock_send_file), \
+                unittest.mock.patch('terrareg.presigned_url.TerraformSourcePresignedUrl.validate_presigned_key', mock_validate_presigned_key), \
+                unittest.mock.patch('terrareg.file_storage.FileStorageFactory.get_file_storage', mock_get_file_storage):
+            res = client.get('/v1/terrareg/modules/testnamespace/testmodulename/testprovider/2.4.1/unittest-presign-key/source.zip')
+
+        mock_validate_presigned_key.assert_called_once_with(url='/v1/terrareg/modules/testnamespace/testmodulename/testprovider/2.4.1', payload='unittest-presign-key')
+
+        if expect_redirect:
+            assert res.status_code == 302
+            assert res.headers['Location'] == presigned_url
+            assert 'no-store' in res.headers['Cache-Control']
+            mock_send_file.assert_not_called()
+            mock_file_storage.read_file.assert_not_called()
+        else:
+            assert res.status_code == 200
+            assert res.data == b"UNIT TEST BINARY OUTPUT"
+
+        if s3_download_redirect:
+            mock_file_storage.get_presigned_url.assert_called_once_with(
+                '/modules/testnamespace/testmodulename/testprovider/2.4.1/source.zip',
+                expiry=30, download_name='source.zip', mimetype='application/zip'
+            )
+        else:
+            mock_file_storage.get_presigned_url.assert_not_called()
+
+    @setup_test_data()
+    def test_s3_download_redirect_invalid_presign_key(self, client, mock_models):
+        """Ensure download is not redirected when pre-sign key is invalid"""
+        def raise_exception(*args, **kwargs):
+            raise terrareg.errors.InvalidPresignedUrlKeyError('Invalid pre-sign key')
+
+        mock_file_storage = unittest.mock.MagicMock()
+        with unittest.mock.patch('terrareg.config.Config.ALLOW_MODULE_HOSTING', terrareg.config.ModuleHostingMode.ALLOW), \
+                unittest.mock.patch('terrareg.config.Config.ALLOW_UNAUTHENTICATED_ACCESS', False), \
+                unittest.mock.patch('terrareg.config.Config.S3_DOWNLOAD_REDIRECT', True), \
+                unittest.mock.patch('terrareg.presigned_url.TerraformSourcePresignedUrl.validate_presigned_key', raise_exception), \
+                unittest.mock.patch('terrareg.file_storage.FileStorageFactory.get_file_storage', unittest.mock.MagicMock(return_value=mock_file_storage)):
+            res = client.get('/v1/terrareg/modules/testnamespace/testmodulename/testprovider/2.4.1/unittest-presign-key/source.zip')
+
+        assert res.status_code == 403
+        mock_file_storage.get_presigned_url.assert_not_called()
+
+
+ARCHIVE_CONTENT = b'PK unit test archive content'
+
+test_data_with_archive = {
+    'testnamespace': {
+        'id': 1,
+        'modules': {
+            'testmodulename': {'testprovider': {
+                'id': 1,
+                'latest_version': '2.4.1',
+                'versions': {
+                    '2.4.1': {
+                        'published': True,
+                        'archive_sha256': hashlib.sha256(ARCHIVE_CONTENT).hexdigest(),
+                        'archive_size': len(ARCHIVE_CONTENT),
+                    },
+                    # Module version with archive generated before checksums were stored
+                    '1.0.0': {'published': True},
+                }
+            }},
+        }
+    }
+}
+
+
+class TestApiModuleVersionSourceDownloadConditional(TerraregUnitTest):
+    """Test conditional and ranged requests to ApiModuleVersionSourceDownload resource."""
+
+    @pytest.fixture
+    def local_file_storage(self):
+        """Provide local file storage containing archive of module versions."""
+        with tempfile.TemporaryDirectory() as data_directory:
+            file_storage = terrareg.file_storage.LocalFileStorage(data_directory)
+            for version in ['2.4.1', '1.0.0']:
+                file_storage.write_file(
+                    f'/modules/testnamespace/testmodulename/testprovider/{version}/source.zip',
+                    ARCHIVE_CONTENT, binary=True
+                )
+            with unittest.mock.patch('terrareg.config.Config.ALLOW_MODULE_HOSTING', terrareg.config.ModuleHostingMode.ALLOW), \
+                    unittest.mock.patch('terrareg.config.Config.ALLOW_UNAUTHENTICATED_ACCESS', True), \
+                    unittest.mock.patch('terrareg.file_storage.FileStorageFactory.get_file_storage', unittest.mock.MagicMock(return_value=file_storage)):
+                yield file_storage
+
+    @setup_test_data(test_data_with_archive)
+    def test_validator_headers(self, client, mock_models, local_file_storage):
+        """Test ETag, Last-Modified and cache headers are returned with archive."""
+        res = client.get('/v1/terrareg/modules/testnamespace/testmodulename/testprovider/2.4.1/source.zip')
+
+        assert res.status_code == 200
+        assert res.data == ARCHIVE_CONTENT
+        assert res.headers['ETag'] == f'"{hashlib.sha256(ARCHIVE_CONTENT).hexdigest()}"'
+        assert res.headers['Last-Modified'] == 'Wed, 01 Jan 2020 23:18:12 GMT'
+        assert res.headers['Accept-Ranges'] == 'bytes'
+        assert res.cache_control.max_age == 31536000
+        assert res.cache_control.immutable
+        assert res.cache_control.public
+
+    @setup_test_data(test_data_with_archive)
+    @pytest.mark.parametrize('max_age, allow_unauthenticated_access, expected_cache_control', [
+        (600, True, {'max-age=600', 'immutable', 'public'}),
+        (600, False, {'max-age=600', 'immutable', 'private'}),
+        (0, True, {'no-cache', 'public'}),
+    ])
+    def test_cache_control(self, max_age, allow_unauthenticated_access, expected_cache_control, client, mock_models, local_file_storage):
+        """Test cache control header is generated from config."""
+        with unittest.mock.patch('terrareg.config.Config.MODULE_ARCHIVE_CACHE_MAX_AGE', max_age), \
+                unittest.mock.patch('terrareg.config.Config.ALLOW_UNAUTHENTICATED_ACCESS', allow_unauthenticated_access), \
+                unittest.mock.patch('terrareg.presigned_url.TerraformSourcePresignedUrl.validate_presigned_key', unittest.mock.MagicMock()):
+            res = client.get('/v1/terrareg/modules/testnamespace/testmodulename/testprovider/2.4.1/source.zip?presign=unittest-presign-key')
+
+        assert res.status_code == 200
+        assert {value.strip() for value in res.headers['Cache-Control'].split(',')} == expected_cache_control
+
+    @setup_test_data(test_data_with_archive)
+    @pytest.mark.parametrize('headers, expected_status', [
+        ({'If-None-Match': f'"{hashlib.sha256(ARCHIVE_CONTENT).hexdigest()}"'}, 304),
+        ({'If-None-Match': f'W/"{hashlib.sha256(ARCHIVE_CONTENT).hexdigest()}"'}, 304),
+        ({'If-None-Match': '"abcdefg", *'}, 304),
+        ({'If-None-Match': '"abcdefg"'}, 200),
+        ({'If-Modified-Since': 'Wed, 01 Jan 2020 23:18:12 GMT'}, 304),
+        ({'If-Modified-Since': 'Thu, 02 Jan 2020 00:00:00 GMT'}, 304),
+        ({'If-Modified-Since': 'Tue, 31 Dec 2019 00:00:00 GMT'}, 200),
+        # If-None-Match takes precedence over If-Modified-Since
+        ({'If-None-Match': '"abcdefg"', 'If-Modified-Since': 'Thu, 02 Jan 2020 00:00:00 GMT'}, 200),
+    ])
+    def test_conditional_request(self, headers, expected_status, client, mock_models, local_file_storage):
+        """Test not modified responses for conditional requests."""
+        with unittest.mock.patch.object(local_file_storage, 'read_file', unittest.mock.MagicMock(wraps=local_file_storage.read_file)) as mock_read_file:
+            res = client.get('/v1/terrareg/modules/testnamespace/testmodulename/testprovider/2.4.1/source.zip', headers=headers)
+
+        assert res.status_code == expected_status
+        assert res.headers['ETag'] == f'"{hashlib.sha256(ARCHIVE_CONTENT).hexdigest()}"'
+        if expected_status == 304:
+            assert res.data == b''
+            mock_read_file.assert_not_called()
+        else:
+            assert res.data == ARCHIVE_CONTENT
+
+    @setup_test_data(test_data_with_archive)
+    @pytest.mark.parametrize('range_header, expected_content_range, expected_content', [
+        ('bytes=0-4', 'bytes 0-4/28', ARCHIVE_CONTENT[0:5]),
+        ('bytes=3-', 'bytes 3-27/28', ARCHIVE_CONTENT[3:]),
+        ('bytes=-4', 'bytes 24-27/28', ARCHIVE_CONTENT[24:]),
+        ('bytes=20-100', 'bytes 20-27/28', ARCHIVE_CONTENT[20:]),
+    ])
+    def test_range_request(self, range_header, expected_content_range, expected_content, client, mock_models, local_file_storage):
+        """Test partial content responses for range requests."""
+        res = client.get(
+            '/v1/terrareg/modules/testnamespace/testmodulename/testprovider/2.4.1/source.zip',
+            headers={'Range': range_header}
+        )
+
+        assert res.status_code == 206
+        assert res.data == expected_content
+        assert res.headers['Content-Range'] == expected_content_range
+        assert res.headers['Content-Length'] == str(len(expected_content))
+        assert res.headers['Content-Type'] == 'application/zip'
+        assert res.headers['Content-Disposition'] == 'attachment; filename=source.zip'
+        assert res.headers['ETag'] == f'"{hashlib.sha256(ARCHIVE_CONTENT).hexdigest()}"'
+
+    @setup_test_data(test_data_with_archive)
+    def test_unsatisfiable_range_request(self, client, mock_models, local_file_storage):
+        """Test range outside of archive returns range not satisfiable."""
+        res = client.get(
+            '/v1/terrareg/modules/testnamespace/testmodulename/testprovider/2.4.1/source.zip',
+            headers={'Range': 'bytes=100-200'}
+        )
+
+        assert res.status_code == 416
+        assert res.headers['Content-Range'] == 'bytes */28'
+
+    @setup_test_data(test_data_with_archive)
+    @pytest.mark.parametrize('version, headers', [
+        # Multiple ranges
+        ('2.4.1', {'Range': 'bytes=0-1,4-5'}),
+        # If-Range does not match current archive
+        ('2.4.1', {'Range': 'bytes=0-4', 'If-Range': '"abcdefg"'}),
+        # Size of archive is unknown
+        ('1.0.0', {'Range': 'bytes=0-4'}),
+    ])
+    def test_range_request_full_content(self, version, headers, client, mock_models, local_file_storage):
+        """Test full archive is returned for range requests that cannot be served."""
+        res = client.get(
+            f'/v1/terrareg/modules/testnamespace/testmodulename/testprovider/{version}/source.zip',
+            headers=headers
+        )
+
+        assert res.status_code == 200
+        assert res.data == ARCHIVE_CONTENT
+        assert 'Content-Range' not in res.headers
+
+    @setup_test_data(test_data_with_archive)
+    def test_range_request_matching_if_range(self, client, mock_models, local_file_storage):
+        """Test range is returned when If-Range matches current archive."""
+        res = client.get(
+            '/v1/terrareg/modules/testnamespace/testmodulename/testprovider/2.4.1/source.zip',
+            headers={'Range': 'bytes=0-4', 'If-Range': f'"{hashlib.sha256(ARCHIVE_CONTENT).hexdigest()}"'}
+        )
+
+        assert res.status_code == 206
+        assert res.data == ARCHIVE_CONTENT[0:5]
+
+    @setup_test_data(test_data_with_archive)
+    def test_archive_without_checksum(self, client, mock_models, local_file_storage):
+        """Test archive generated before checksums were stored is returned without ETag or ranges."""
+        res = client.get(
+            '/v1/terrareg/modules/testnamespace/testmodulename/testprovider/1.0.0/source.zip',
+            headers={'If-None-Match': '"abcdefg"'}
+        )
+
+        assert res.status_code == 200
+        assert res.data == ARCHIVE_CONTENT
+        assert 'ETag' not in res.headers
+        assert 'Accept-Ranges' not in res.headers
+        assert res.headers['Last-Modified'] == 'Wed, 01 Jan 2020 23:18:12 GMT'
+
+    @setup_test_data(test_data_with_archive)
+    @pytest.mark.parametrize('offload_mode, prefix, expected_header, expected_value', [
+        (terrareg.config.DownloadOffloadMode.X_ACCEL_REDIRECT, '/_terrareg_data', 'X-Accel-Redirect',
+         '/_terrareg_data/modules/testnamespace/testmodulename/testprovider/2.4.1/source.zip'),
+        (terrareg.config.DownloadOffloadMode.X_ACCEL_REDIRECT, '/internal/', 'X-Accel-Redirect',
+         '/internal/modules/testnamespace/testmodulename/testprovider/2.4.1/source.zip'),
+        (terrareg.config.DownloadOffloadMode.X_SENDFILE, '/_terrareg_data', 'X-Sendfile', None),
+    ])
+    def test_download_offload(self, offload_mode, prefix, expected_header, expected_value, client, mock_models, local_file_storage):
+        """Test serving of archive is offloaded to reverse proxy."""
+        with unittest.mock.patch('terrareg.config.Config.LOCAL_STORAGE_DOWNLOAD_OFFLOAD', offload_mode), \
+                unittest.mock.patch('terrareg.config.Config.LOCAL_STORAGE_DOWNLOAD_OFFLOAD_PREFIX', prefix), \
+                unittest.mock.patch.object(local_file_storage, 'read_file', unittest.mock.MagicMock()) as mock_read_file:
+            res = client.get(
+                '/v1/terrareg/modules/testnamespace/testmodulename/testprovider/2.4.1/source.zip',
+                headers={'Range': 'bytes=0-4'}
+            )
+
+        if expected_value is None:
+            expected_value = local_file_storage.get_local_path('/modules/testnamespace/testmodulename/testprovider/2.4.1/source.zip')
+
+        # Ensure range requests are handled by the reverse proxy
+        assert res.status_code == 200
+        assert res.data == b''
+        assert res.headers[expected_header] == expected_value
+        assert res.headers['Content-Type'] == 'application/zip'
+        assert res.headers['Content-Disposition'] == 'attachment; filename=source.zip'
+        assert res.headers['ETag'] == f'"{hashlib.sha256(ARCHIVE_CONTENT).hexdigest()}"'
+        mock_read_file.assert_not_called()
+
+    @setup_test_data(test_data_with_archive)
+    def test_download_offload_non_local_storage(self, client, mock_models, local_file_storage):
+        """Test archive is returned directly when file storage does not store files locally."""
+        with unittest.mock.patch('terrareg.config.Config.LOCAL_STORAGE_DOWNLOAD_OFFLOAD', terrareg.config.DownloadOffloadMode.X_ACCEL_REDIRECT), \
+                unittest.mock.patch.object(local_file_storage, 'get_local_path', unittest.mock.MagicMock(return_value=None)):
+            res = client.get('/v1/terrareg/modules/testnamespace/testmodulename/testprovider/2.4.1/source.zip')
+
+        assert res.status_code == 200
+        assert res.data == ARCHIVE_CONTENT
+        assert 'X-Accel-Redirect' not in res.headers
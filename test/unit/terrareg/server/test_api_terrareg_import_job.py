@@ -0,0 +1,75 @@
+
+import unittest.mock
+
+from test.unit.terrareg import (
+    mock_models,
+    setup_test_data, TerraregUnitTest
+)
+from test import client
+
+
+class TestApiTerraregImportJob(TerraregUnitTest):
+    """Test import job status endpoint"""
+
+    def _get_mock_get_current_auth_method(self, allowed):
+        """Return mock auth method"""
+        mock_auth_method = unittest.mock.MagicMock()
+        mock_auth_method.can_upload_module_version = unittest.mock.MagicMock(return_value=allowed)
+        mock_get_current_auth_method = unittest.mock.MagicMock(return_value=mock_auth_method)
+        return mock_get_current_auth_method, mock_auth_method
+
+    def _get_mock_import_job(self):
+        """Return mock import job"""
+        mock_import_job = unittest.mock.MagicMock()
+        mock_import_job.module_provider.module.namespace.name = 'testnamespace'
+        mock_import_job.get_api_outline.return_value = {'id': 5, 'status': 'running'}
+        return mock_import_job
+
+    @setup_test_data()
+    def test_get_import_job(self, client, mock_models):
+        """Test obtaining status of import job."""
+        mock_get_auth_method, mock_auth_method = self._get_mock_get_current_auth_method(True)
+        with unittest.mock.patch('terrareg.auth.AuthFactory.get_current_auth_method', mock_get_auth_method), \
+                unittest.mock.patch('terrareg.import_job_model.ImportJob.get_by_pk',
+                                    unittest.mock.MagicMock(return_value=self._get_mock_import_job())):
+            res = client.get('/v1/terrareg/import_jobs/5')
+
+        assert res.status_code == 200
+        assert res.json == {'id': 5, 'status': 'running'}
+        mock_auth_method.can_upload_module_version.assert_called_once_with(namespace='testnamespace')
+
+    @setup_test_data()
+    def test_non_existent_import_job(self, client, mock_models):
+        """Test obtaining status of non-existent import job."""
+        mock_get_auth_method, mock_auth_method = self._get_mock_get_current_auth_method(True)
+        with unittest.mock.patch('terrareg.auth.AuthFactory.get_current_auth_method', mock_get_auth_method), \
+                unittest.mock.patch('terrareg.import_job_model.ImportJob.get_by_pk', unittest.mock.MagicMock(return_value=None)):
+            res = client.get('/v1/terrareg/import_jobs/5')
+
+        assert res.status_code == 404
+        mock_auth_method.can_upload_module_version.assert_called_once_with(namespace=None)
+
+    @setup_test_data()
+    def test_unauthorised(self, client, mock_models):
+        """Test obtaining status of import job without permission to the namespace of the job."""
+        mock_get_auth_method, mock_auth_method = self._get_mock_get_current_auth_method(False)
+        mock_auth_method.is_authenticated.return_value = True
+        with unittest.mock.patch('terrareg.auth.AuthFactory.get_current_auth_method', mock_get_auth_method), \
+                unittest.mock.patch('terrareg.import_job_model.ImportJob.get_by_pk',
+                                    unittest.mock.MagicMock(return_value=self._get_mock_import_job())):
+            res = client.get('/v1/terrareg/import_jobs/5')
+
+        assert res.status_code == 403
+        mock_auth_method.can_upload_module_version.assert_called_once_with(namespace='testnamespace')
+
+    @setup_test_data()
+    def test_unauthenticated(self, client, mock_models):
+        """Test obtaining status of import job whilst unauthenticated."""
+        mock_get_auth_method, mock_auth_method = self._get_mock_get_current_auth_method(False)
+        mock_auth_method.is_authenticated.return_value = False
+        with unittest.mock.patch('terrareg.auth.AuthFactory.get_current_auth_method', mock_get_auth_method), \
+                unittest.mock.patch('terrareg.import_job_model.ImportJob.get_by_pk',
+                                    unittest.mock.MagicMock(return_value=self._get_mock_import_job())):
+            res = client.get('/v1/terrareg/import_jobs/5')
+
+        assert res.status_code == 401
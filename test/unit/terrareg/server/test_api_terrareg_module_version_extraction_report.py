@@ -0,0 +1,80 @@
+import json
+import unittest.mock
+
+import terrareg.models
+from terrareg.user_group_namespace_permission_type import UserGroupNamespacePermissionType
+from test.unit.terrareg import (
+    mock_models,
+    setup_test_data, TerraregUnitTest
+)
+from test import client
+
+
+class TestApiTerraregModuleVersionExtractionReport(TerraregUnitTest):
+    """Test module version extraction report endpoint"""
+
+    _EXTRACTION_REPORT = {
+        'duration': 5.5,
+        'stages': [
+            {
+                'name': 'tfsec', 'submodule': None, 'duration': 1.5, 'cpu_time': 0.01
+            },
+        ]
+    }
+
+    def _get_mock_get_current_auth_method(self, allowed):
+        """Return mock auth method"""
+        mock_auth_method = unittest.mock.MagicMock()
+        mock_auth_method.check_namespace_access = unittest.mock.MagicMock(return_value=allowed)
+        mock_get_current_auth_method = unittest.mock.MagicMock(return_value=mock_auth_method)
+        return mock_get_current_auth_method, mock_auth_method
+
+    @setup_test_data()
+    def test_extraction_report(self, client, mock_models):
+        """Test obtaining extraction report of module version."""
+        module_version = terrareg.models.ModuleVersion.get(
+            terrareg.models.ModuleProvider.get(
+                terrareg.models.Module(terrareg.models.Namespace.get('testnamespace'), 'testmodulename'),
+                'testprovider'
+            ),
+            '2.4.1'
+        )
+        module_version.update_attributes(extraction_report=json.dumps(self._EXTRACTION_REPORT))
+
+        mock_get_auth_method, mock_auth_method = self._get_mock_get_current_auth_method(True)
+        with unittest.mock.patch('terrareg.auth.AuthFactory.get_current_auth_method', mock_get_auth_method):
+            res = client.get('/v1/terrareg/modules/testnamespace/testmodulename/testprovider/2.4.1/extraction_report')
+
+        assert res.status_code == 200
+        assert res.json == self._EXTRACTION_REPORT
+        mock_auth_method.check_namespace_access.assert_called_once_with(
+            UserGroupNamespacePermissionType.MODIFY, namespace='testnamespace')
+
+    @setup_test_data()
+    def test_no_extraction_report(self, client, mock_models):
+        """Test obtaining extraction report of module version without a report."""
+        mock_get_auth_method, _ = self._get_mock_get_current_auth_method(True)
+        with unittest.mock.patch('terrareg.auth.AuthFactory.get_current_auth_method', mock_get_auth_method):
+            res = client.get('/v1/terrareg/modules/testnamespace/testmodulename/testprovider/1.0.0/extraction_report')
+
+        assert res.status_code == 404
+        assert res.json == {'message': 'No extraction report is available for module version'}
+
+    @setup_test_data()
+    def test_non_existent_module_version(self, client, mock_models):
+        """Test obtaining extraction report of non-existent module version."""
+        mock_get_auth_method, _ = self._get_mock_get_current_auth_method(True)
+        with unittest.mock.patch('terrareg.auth.AuthFactory.get_current_auth_method', mock_get_auth_method):
+            res = client.get('/v1/terrareg/modules/testnamespace/testmodulename/testprovider/9.9.9/extraction_report')
+
+        assert res.status_code == 400
+        assert res.json == {'message': 'Module version does not exist'}
+
+    @setup_test_data()
+    def test_unauthenticated(self, client, mock_models):
+        """Test obtaining extraction report without permission to the namespace."""
+        mock_get_auth_method, _ = self._get_mock_get_current_auth_method(False)
+        with unittest.mock.patch('terrareg.auth.AuthFactory.get_current_auth_method', mock_get_auth_method):
+            res = client.get('/v1/terrareg/modules/testnamespace/testmodulename/testprovider/2.4.1/extraction_report')
+
+        assert res.status_code == 403
@@ -1,5 +1,7 @@
 
+import contextlib
 from contextlib import contextmanager
+import hashlib
 import io
 import unittest.mock
 import zipfile
@@ -13,6 +15,7 @@ from test.unit.terrareg import (
 )
 import terrareg.models
 import terrareg.config
+import terrareg.upload_stream
 from test import client, mock_create_audit_event
 from . import mock_record_module_version_download
 
@@ -174,6 +177,88 @@ class TestApiModuleVersionUpload(TerraregUnitTest):
         mock_extractor_patch.assert_called_once()
         mock_extractor.process_upload.assert_called_once_with()
 
+    @setup_test_data()
+    def test_upload_streamed_to_disk(self, client, mock_models):
+        """Test uploaded file is written to disk whilst the request is received"""
+        zip_data = self._generate_zip_file().read()
+        data = {
+            'file': (io.BytesIO(zip_data), "test_file.tar.gz")
+        }
+        namespace = terrareg.models.Namespace.get("testnamespace")
+        module = terrareg.models.Module(namespace, "test-upload")
+        terrareg.models.ModuleProvider.create(module=module, name="test")
+
+        class MockExtractor:
+            process_upload = unittest.mock.MagicMock()
+        mock_extractor = MockExtractor()
+
+        def mock_extractor_constructor(upload_file, module_version):
+            assert isinstance(upload_file.stream, terrareg.upload_stream.UploadStream)
+            assert upload_file.filename == "test_file.tar.gz"
+            assert upload_file.stream.sha256 == hashlib.sha256(zip_data).hexdigest()
+            assert upload_file.stream.header == zip_data[:terrareg.upload_stream.UploadStream.HEADER_SIZE]
+            assert upload_file.read() == zip_data
+
+            @contextmanager
+            def return_context():
+                yield mock_extractor
+            return return_context()
+
+        with unittest.mock.patch('terrareg.config.Config.AUTO_CREATE_MODULE_PROVIDER', False), \
+                unittest.mock.patch('terrareg.config.Config.AUTO_CREATE_NAMESPACE', False), \
+                unittest.mock.patch('terrareg.module_extractor.ApiUploadModuleExtractor', unittest.mock.MagicMock(side_effect=mock_extractor_constructor)) as mock_extractor_patch:
+            res = client.post(
+                "/v1/terrareg/modules/testnamespace/test-upload/test/5.76.4/upload",
+                data=data,
+                headers={"content-type": "multipart/form-data"})
+
+        assert res.json == {'status': 'Success'}
+        assert res.status_code == 200
+        mock_extractor_patch.assert_called_once()
+        mock_extractor.process_upload.assert_called_once_with()
+
+    @pytest.mark.parametrize('max_size, file_size, check_content_length, expected_status_code', [
+        (0, 2 * 1024 * 1024, True, 200),
+        (1, 512 * 1024, True, 200),
+        # Request rejected due to content length of request
+        (1, 2 * 1024 * 1024, True, 413),
+        # Request rejected whilst writing uploaded file
+        (1, 2 * 1024 * 1024, False, 413),
+    ])
+    @setup_test_data()
+    def test_upload_max_size(self, max_size, file_size, check_content_length, expected_status_code, client, mock_models):
+        """Test maximum upload size"""
+        data = {
+            'file': (io.BytesIO(b'a' * file_size), "test_file.zip")
+        }
+        namespace = terrareg.models.Namespace.get("testnamespace")
+        module = terrareg.models.Module(namespace, "test-upload")
+        terrareg.models.ModuleProvider.create(module=module, name="test")
+
+        with unittest.mock.patch('terrareg.config.Config.AUTO_CREATE_MODULE_PROVIDER', False), \
+                unittest.mock.patch('terrareg.config.Config.AUTO_CREATE_NAMESPACE', False), \
+                unittest.mock.patch('terrareg.config.Config.MODULE_UPLOAD_MAX_SIZE', max_size), \
+                unittest.mock.patch('terrareg.module_extractor.ApiUploadModuleExtractor', unittest.mock.MagicMock()) as mock_extractor_patch:
+            if not check_content_length:
+                max_content_length_patch = unittest.mock.patch(
+                    'terrareg.server.upload_streaming_request.UploadStreamingRequest.max_content_length',
+                    new_callable=unittest.mock.PropertyMock, return_value=None)
+            else:
+                max_content_length_patch = contextlib.nullcontext()
+            with max_content_length_patch:
+                res = client.post(
+                    "/v1/terrareg/modules/testnamespace/test-upload/test/5.76.4/upload",
+                    data=data,
+                    headers={"content-type": "multipart/form-data"})
+
+        assert res.status_code == expected_status_code
+        if expected_status_code == 200:
+            mock_extractor_patch.assert_called_once()
+        else:
+            mock_extractor_patch.assert_not_called()
+        if not check_content_length:
+            assert res.json == {'status': 'Error', 'message': 'Uploaded file exceeds maximum upload size of 1048576 bytes'}
+
     @pytest.mark.parametrize('allow_module_hosting, allowed', [
         (terrareg.config.ModuleHostingMode.ALLOW, True),
         (terrareg.config.ModuleHostingMode.ENFORCE, True),
@@ -67,6 +67,8 @@ class TestConfig:
         ('VERIFIED_MODULE_LABEL', None),
         ('INFRACOST_API_KEY', None),
         ('INFRACOST_PRICING_API_ENDPOINT', None),
+        ('LOCAL_STORAGE_DOWNLOAD_OFFLOAD_PREFIX', None),
+        ('S3_CACHE_DIRECTORY', None),
         ('DOMAIN_NAME', None),
         ('PUBLIC_URL', None),
         ('ADDITIONAL_MODULE_TABS', None),
@@ -86,6 +88,9 @@ class TestConfig:
         ('MODULE_LINKS', None),
         ('DEFAULT_TERRAFORM_VERSION', None),
         ('TERRAFORM_ARCHIVE_MIRROR', None),
+        ('TERRAFORM_BINARY_CACHE_DIRECTORY', None),
+        ('TERRAFORM_PROVIDER_MIRROR_DIRECTORY', None),
+        ('GIT_MIRROR_CACHE_DIRECTORY', None),
         ('SENTRY_DSN', None),
         ('TERRAFORM_OIDC_IDP_SIGNING_KEY_PATH', None),
         ('TERRAFORM_OIDC_IDP_SUBJECT_ID_HASH_SALT', None),
@@ -136,7 +141,26 @@ class TestConfig:
         'ADMIN_SESSION_EXPIRY_MINS',
         'LISTEN_PORT',
         'GIT_CLONE_TIMEOUT',
+        'GIT_MIRROR_CACHE_MAX_SIZE',
         'REDIRECT_DELETION_LOOKBACK_DAYS',
+        'MODULE_LEADERBOARD_SIZE',
+        'MODULE_LEADERBOARD_REFRESH_INTERVAL',
+        'SUBMODULE_EXTRACTION_CONCURRENCY',
+        'EXTRACTION_RESULT_CACHE_TTL',
+        'EXTRACTION_RESULT_CACHE_MAX_SIZE',
+        'IMPORT_JOB_WORKER_THREADS',
+        'IMPORT_JOB_MAX_ATTEMPTS',
+        'IMPORT_JOB_LEASE_SECONDS',
+        'IMPORT_JOB_RETRY_BACKOFF_SECONDS',
+        'BULK_IMPORT_MAX_CONCURRENCY',
+        'MODULE_UPLOAD_MAX_SIZE',
+        'INFRACOST_CACHE_TTL',
+        'S3_DOWNLOAD_REDIRECT_EXPIRY',
+        'S3_TRANSFER_PART_SIZE',
+        'S3_TRANSFER_MAX_CONCURRENCY',
+        'MODULE_ARCHIVE_CACHE_MAX_AGE',
+        'S3_CACHE_MAX_SIZE',
+        'S3_CACHE_REVALIDATE_INTERVAL',
         'TERRAFORM_OIDC_IDP_SESSION_EXPIRY',
         'TERRAFORM_PRESIGNED_URL_EXPIRY_SECONDS',
     ])
@@ -183,6 +207,7 @@ class TestConfig:
         ('ALLOW_MODULE_HOSTING', terrareg.config.ModuleHostingMode, terrareg.config.ModuleHostingMode.ALLOW),
         ('DEFAULT_UI_DETAILS_VIEW', terrareg.config.DefaultUiInputOutputView, terrareg.config.DefaultUiInputOutputView.TABLE),
         ('PRODUCT', terrareg.config.Product, terrareg.config.Product.TERRAFORM),
+        ('LOCAL_STORAGE_DOWNLOAD_OFFLOAD', terrareg.config.DownloadOffloadMode, terrareg.config.DownloadOffloadMode.NONE),
     ])
     def test_enum_configs(self, config_name, enum, expected_default):
         """Test enum configs to ensure they are overridden with environment variables."""
@@ -234,6 +259,12 @@ class TestConfig:
         'ALLOW_UNAUTHENTICATED_ACCESS',
         'AUTO_GENERATE_GITHUB_ORGANISATION_NAMESPACES',
         'MODULE_VERSION_USE_GIT_COMMIT',
+        'SINGLE_PASS_SUBMODULE_ANALYSIS',
+        'ENABLE_EXTRACTION_RESULT_CACHE',
+        'ENABLE_IMPORT_JOB_QUEUE',
+        'TERRAFORM_PROVIDER_MIRROR_DIRECT_FALLBACK',
+        'GIT_SHALLOW_CLONE',
+        'S3_DOWNLOAD_REDIRECT',
     ])
     def test_boolean_configs(self, config_name, test_value, expected_value):
         """Test boolean configs to ensure they are overridden with environment variables."""
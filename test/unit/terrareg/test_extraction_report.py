@@ -0,0 +1,125 @@
+
+import subprocess
+import threading
+import unittest.mock
+
+import pytest
+
+from terrareg.extraction_report import ExtractionReport
+from test.unit.terrareg import TerraregUnitTest
+
+
+class TestExtractionReport(TerraregUnitTest):
+    """Test ExtractionReport class."""
+
+    def test_record(self):
+        """Test recording duration and resource usage of stage."""
+        report = ExtractionReport()
+        with report.record('unittest-stage'):
+            sum(range(1000000))
+
+        assert len(report.stages) == 1
+        stage = report.stages[0]
+        assert stage['name'] == 'unittest-stage'
+        assert stage['submodule'] is None
+        assert stage['duration'] > 0
+        assert stage['cpu_time'] is None or stage['cpu_time'] >= 0
+        assert set(stage) == {'name', 'submodule', 'duration', 'cpu_time'}
+
+    def test_record_duration_histogram(self):
+        """Test durations of recorded stages are observed into histogram for stage name."""
+        with unittest.mock.patch('terrareg.extraction_report.ExtractionReport._DURATION_HISTOGRAMS', {}):
+            report = ExtractionReport()
+            with report.record('unittest-stage'):
+                pass
+            with report.record('unittest-stage'):
+                pass
+
+            histograms = ExtractionReport.get_duration_histograms()
+
+        assert list(histograms) == ['unittest-stage']
+        assert histograms['unittest-stage']['count'] == 2
+        assert histograms['unittest-stage']['sum'] == sum(stage['duration'] for stage in report.stages)
+        assert histograms['unittest-stage']['buckets'][600] == 2
+
+    def test_observe_duration(self):
+        """Test observing durations into histogram buckets."""
+        with unittest.mock.patch('terrareg.extraction_report.ExtractionReport._DURATION_HISTOGRAMS', {}):
+            for name, duration in [('unittest-stage', 1), ('unittest-stage', 0.5), ('other-stage', 10)]:
+                ExtractionReport._observe_duration(name, duration)
+
+            histograms = ExtractionReport.get_duration_histograms()
+
+        assert histograms == {
+            'unittest-stage': {
+                'buckets': {0.1: 0, 0.5: 1, 1: 2, 2.5: 2, 5: 2, 10: 2, 30: 2, 60: 2, 120: 2, 300: 2, 600: 2},
+                'sum': 1.5,
+                'count': 2,
+            },
+            'other-stage': {
+                'buckets': {0.1: 0, 0.5: 0, 1: 0, 2.5: 0, 5: 0, 10: 1, 30: 1, 60: 1, 120: 1, 300: 1, 600: 1},
+                'sum': 10.0,
+                'count': 1,
+            },
+        }
+
+    def test_record_error(self):
+        """Test stage is recorded when an error is raised."""
+        report = ExtractionReport()
+        with pytest.raises(ValueError):
+            with report.record('unittest-stage'):
+                raise ValueError('Unittest error')
+
+        assert [stage['name'] for stage in report.stages] == ['unittest-stage']
+
+    def test_nested_record(self):
+        """Test nested stages inherit submodule of parent stage."""
+        report = ExtractionReport()
+        with report.record('parent', submodule='modules/example'):
+            with report.record('child'):
+                pass
+            with report.record('other-submodule', submodule='modules/other'):
+                pass
+        with report.record('root'):
+            pass
+
+        assert [(stage['name'], stage['submodule']) for stage in report.stages] == [
+            ('child', 'modules/example'),
+            ('other-submodule', 'modules/other'),
+            ('parent', 'modules/example'),
+            ('root', None),
+        ]
+
+    def test_record_concurrent(self):
+        """Test recording stages from multiple threads."""
+        report = ExtractionReport()
+        barrier = threading.Barrier(2, timeout=5)
+
+        def run_stage(submodule):
+            with report.record('stage', submodule=submodule):
+                barrier.wait()
+                with report.record('nested'):
+                    pass
+
+        threads = [threading.Thread(target=run_stage, args=(submodule,)) for submodule in ['first', 'second']]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted((stage['name'], stage['submodule']) for stage in report.stages) == [
+            ('nested', 'first'),
+            ('nested', 'second'),
+            ('stage', 'first'),
+            ('stage', 'second'),
+        ]
+
+    def test_to_dict(self):
+        """Test conversion of report to dictionary."""
+        report = ExtractionReport()
+        with report.record('unittest-stage'):
+            pass
+
+        report_dict = report.to_dict()
+        assert report_dict['duration'] >= report_dict['stages'][0]['duration']
+        assert report_dict['stages'] == report.stages
@@ -0,0 +1,212 @@
+
+import os
+import tempfile
+import unittest.mock
+
+import pytest
+
+from terrareg.extraction_result_cache import ExtractionResultCache
+from test.unit.terrareg import TerraregUnitTest
+
+
+class TestExtractionResultCache(TerraregUnitTest):
+    """Test ExtractionResultCache class."""
+
+    @pytest.fixture(autouse=True)
+    def mock_tool_versions(self):
+        """Mock versions of analysis tools."""
+        with unittest.mock.patch('terrareg.extraction_result_cache.ExtractionResultCache.get_tool_versions',
+                                 unittest.mock.MagicMock(return_value={'terraform-docs': '0.16.0', 'tfsec': '1.28.1'})):
+            yield
+
+    @staticmethod
+    def _write_files(base_directory, files):
+        """Write files to directory."""
+        for path, content in files.items():
+            file_path = os.path.join(base_directory, path)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, 'w') as fh:
+                fh.write(content)
+
+    def _get_cache_keys(self, files):
+        """Return cache keys for root module, submodule and example of source containing files."""
+        with tempfile.TemporaryDirectory() as source_directory:
+            self._write_files(source_directory, files)
+            cache = ExtractionResultCache(source_directory)
+            return {
+                path: cache.get_cache_key(os.path.join(source_directory, path))
+                for path in ['.', 'modules/submodule', 'examples/example']
+            }
+
+    _TEST_FILES = {
+        'main.tf': 'resource "null_resource" "test" {}',
+        'README.md': '# Test module',
+        'modules/submodule/main.tf': 'variable "test" {}',
+        'examples/example/main.tf': 'module "test" {\n  source = "../../"\n}',
+        '.git/HEAD': 'ref: refs/heads/main',
+        '.terraform/modules/modules.json': '{}',
+    }
+
+    def test_identical_source(self):
+        """Test cache keys are identical for identical source."""
+        assert self._get_cache_keys(self._TEST_FILES) == self._get_cache_keys(dict(self._TEST_FILES))
+
+    def test_cache_key_path(self):
+        """Test cache keys differ for modules with identical content at different paths."""
+        cache_keys = self._get_cache_keys(dict(self._TEST_FILES, **{'examples/example/main.tf': 'variable "test" {}'}))
+        assert cache_keys['modules/submodule'] != cache_keys['examples/example']
+
+    def test_submodule_change(self):
+        """Test change to submodule only changes cache key of root module and submodule."""
+        original_keys = self._get_cache_keys(self._TEST_FILES)
+        new_keys = self._get_cache_keys(dict(self._TEST_FILES, **{'modules/submodule/main.tf': 'variable "changed" {}'}))
+
+        assert new_keys['.'] != original_keys['.']
+        assert new_keys['modules/submodule'] != original_keys['modules/submodule']
+        assert new_keys['examples/example'] != original_keys['examples/example']
+
+    def test_root_module_change(self):
+        """Test change to root module changes cache key of example that references it."""
+        original_keys = self._get_cache_keys(self._TEST_FILES)
+        new_keys = self._get_cache_keys(dict(self._TEST_FILES, **{'main.tf': 'resource "null_resource" "changed" {}'}))
+
+        assert new_keys['.'] != original_keys['.']
+        assert new_keys['modules/submodule'] == original_keys['modules/submodule']
+        assert new_keys['examples/example'] != original_keys['examples/example']
+
+    def test_example_change(self):
+        """Test change to example does not change cache key of unrelated submodule."""
+        original_keys = self._get_cache_keys(self._TEST_FILES)
+        new_keys = self._get_cache_keys(dict(self._TEST_FILES, **{'examples/example/variables.tf': 'variable "new" {}'}))
+
+        assert new_keys['examples/example'] != original_keys['examples/example']
+        assert new_keys['modules/submodule'] == original_keys['modules/submodule']
+
+    def test_ignored_directories(self):
+        """Test changes to git and terraform directories do not change cache keys."""
+        original_keys = self._get_cache_keys(self._TEST_FILES)
+        new_keys = self._get_cache_keys(dict(self._TEST_FILES, **{
+            '.git/HEAD': 'ref: refs/heads/other',
+            '.terraform/modules/modules.json': '{"Modules": []}',
+        }))
+        assert new_keys == original_keys
+
+    def test_cache_key_attributes(self):
+        """Test cache key attributes and tool versions change cache key."""
+        with tempfile.TemporaryDirectory() as source_directory:
+            self._write_files(source_directory, self._TEST_FILES)
+            cache = ExtractionResultCache(source_directory)
+
+            cache_key = cache.get_cache_key(source_directory, root=True)
+            assert cache.get_cache_key(source_directory, root=True) == cache_key
+            assert cache.get_cache_key(source_directory, root=False) != cache_key
+
+            with unittest.mock.patch('terrareg.extraction_result_cache.ExtractionResultCache.get_tool_versions',
+                                     unittest.mock.MagicMock(return_value={'terraform-docs': '0.17.0', 'tfsec': '1.28.1'})):
+                assert cache.get_cache_key(source_directory, root=True) != cache_key
+
+            with unittest.mock.patch('terrareg.extraction_result_cache.EXTRACTION_VERSION', 1000):
+                assert cache.get_cache_key(source_directory, root=True) != cache_key
+
+    def test_get_local_source_hashes(self):
+        """Test obtaining hashes of local modules referenced by content that differs from the hashed source."""
+        with tempfile.TemporaryDirectory() as source_directory:
+            self._write_files(source_directory, dict(self._TEST_FILES, **{
+                'modules/submodule/main.tf': 'module "nested" {\n  source = "../nested"\n}',
+                'modules/nested/main.tf': 'variable "test" {}',
+            }))
+            cache = ExtractionResultCache(source_directory)
+            example_path = os.path.join(source_directory, 'examples', 'example')
+
+            source_hashes = cache.get_local_source_hashes(
+                example_path,
+                'module "test" {\n  source = "../../modules/submodule"\n}\n'
+                'module "outside" {\n  source = "../../../outside"\n}'
+            )
+            assert sorted(source_hashes) == ['modules/nested', 'modules/submodule']
+            assert source_hashes['modules/submodule'] == cache._get_tree_hash('modules/submodule')
+
+            assert cache.get_local_source_hashes(example_path, 'module "test" {\n  source = "hashicorp/test/aws"\n}') == {}
+
+    def test_get_set(self):
+        """Test storing and obtaining results from cache."""
+        with tempfile.TemporaryDirectory() as data_directory:
+            with unittest.mock.patch('terrareg.config.Config.DATA_DIRECTORY', data_directory):
+                assert ExtractionResultCache.get('a1b2c3') is None
+
+                ExtractionResultCache.set('a1b2c3', {'readme': '# Test', 'terraform': ['graph', None, '{}']})
+
+                assert os.path.isfile(os.path.join(data_directory, 'extraction_cache', 'a1', 'a1b2c3.json'))
+                assert ExtractionResultCache.get('a1b2c3') == {'readme': '# Test', 'terraform': ['graph', None, '{}']}
+
+    def test_get_invalid_cache_file(self):
+        """Test obtaining results from invalid cache file."""
+        with tempfile.TemporaryDirectory() as data_directory:
+            with unittest.mock.patch('terrareg.config.Config.DATA_DIRECTORY', data_directory):
+                self._write_files(data_directory, {'extraction_cache/a1/a1b2c3.json': '{"invalid'})
+                assert ExtractionResultCache.get('a1b2c3') is None
+
+    def _write_cache_files(self, data_directory, files):
+        """Write cache files with sizes and modification times."""
+        for path, (size, modified) in files.items():
+            self._write_files(data_directory, {path: 'a' * size})
+            os.utime(os.path.join(data_directory, path), (modified, modified))
+
+    @pytest.mark.parametrize('ttl, max_size, expected_files', [
+        # Disabled
+        (0, 0, ['a1/a1.json', 'b2/b2.json', 'c3/c3.json']),
+        # Results older than TTL removed
+        (150, 0, ['b2/b2.json', 'c3/c3.json']),
+        (50, 0, ['c3/c3.json']),
+        # Oldest results removed until cache is within maximum size
+        (0, 2, ['b2/b2.json', 'c3/c3.json']),
+        (0, 1, ['c3/c3.json']),
+        # Both limits applied
+        (50, 2, ['c3/c3.json']),
+    ])
+    def test_prune(self, ttl, max_size, expected_files):
+        """Test pruning expired and excess results from cache."""
+        with tempfile.TemporaryDirectory() as data_directory:
+            self._write_cache_files(data_directory, {
+                'extraction_cache/a1/a1.json': (1024 * 1024, 800),
+                'extraction_cache/c3/c3.json': (1024 * 1024, 1000),
+                'extraction_cache/b2/b2.json': (512 * 1024, 900),
+                'other/file': (4 * 1024 * 1024, 0),
+            })
+
+            with unittest.mock.patch('terrareg.config.Config.DATA_DIRECTORY', data_directory), \
+                    unittest.mock.patch('terrareg.config.Config.EXTRACTION_RESULT_CACHE_TTL', ttl), \
+                    unittest.mock.patch('terrareg.config.Config.EXTRACTION_RESULT_CACHE_MAX_SIZE', max_size), \
+                    unittest.mock.patch('terrareg.extraction_result_cache.time.time', unittest.mock.MagicMock(return_value=1010)):
+                ExtractionResultCache.prune()
+
+            assert sorted(
+                os.path.relpath(os.path.join(directory, file_name), os.path.join(data_directory, 'extraction_cache'))
+                for directory, _, file_names in os.walk(os.path.join(data_directory, 'extraction_cache'))
+                for file_name in file_names
+            ) == expected_files
+            assert os.path.isfile(os.path.join(data_directory, 'other', 'file'))
+
+    def test_prune_if_due(self):
+        """Test pruning is only performed once within prune interval."""
+        with unittest.mock.patch('terrareg.extraction_result_cache.ExtractionResultCache._LAST_PRUNED_AT', None), \
+                unittest.mock.patch('terrareg.extraction_result_cache.ExtractionResultCache.prune') as mock_prune, \
+                unittest.mock.patch('terrareg.extraction_result_cache.time.time') as mock_time:
+            mock_time.return_value = 1000
+            ExtractionResultCache.prune_if_due()
+            assert mock_prune.call_count == 1
+
+            mock_time.return_value = 1000 + ExtractionResultCache.PRUNE_INTERVAL - 1
+            ExtractionResultCache.prune_if_due()
+            assert mock_prune.call_count == 1
+
+            mock_time.return_value = 1000 + ExtractionResultCache.PRUNE_INTERVAL
+            ExtractionResultCache.prune_if_due()
+            assert mock_prune.call_count == 2
+
+    def test_prune_if_due_error(self):
+        """Test errors whilst pruning are not raised."""
+        with unittest.mock.patch('terrareg.extraction_result_cache.ExtractionResultCache._LAST_PRUNED_AT', None), \
+                unittest.mock.patch('terrareg.extraction_result_cache.ExtractionResultCache.prune',
+                                    unittest.mock.MagicMock(side_effect=Exception('Unittest error'))):
+            ExtractionResultCache.prune_if_due()
@@ -0,0 +1,92 @@
+
+import threading
+
+import pytest
+
+from terrareg.extraction_report import ExtractionReport
+from terrareg.extraction_stage_runner import ExtractionStageRunner
+from test.unit.terrareg import TerraregUnitTest
+
+
+class TestExtractionStageRunner(TerraregUnitTest):
+    """Test ExtractionStageRunner class."""
+
+    def test_run_returns_results(self):
+        """Test results of all stages are returned."""
+        runner = ExtractionStageRunner()
+        runner.add_stage('first', lambda: 'first-result')
+        runner.add_stage('second', lambda: None)
+
+        assert runner.run() == {'first': 'first-result', 'second': None}
+
+    def test_run_with_report(self):
+        """Test stages are recorded in extraction report."""
+        report = ExtractionReport()
+        runner = ExtractionStageRunner(report=report, submodule='modules/example')
+        runner.add_stage('first', lambda: None)
+        runner.add_stage('second', lambda: None, depends_on=['first'])
+        runner.run()
+
+        assert [(stage['name'], stage['submodule']) for stage in report.stages] == [
+            ('first', 'modules/example'),
+            ('second', 'modules/example'),
+        ]
+
+    def test_run_without_stages(self):
+        """Test running without any stages."""
+        assert ExtractionStageRunner().run() == {}
+
+    def test_independent_stages_run_concurrently(self):
+        """Test that stages without dependencies are run at the same time."""
+        # Barrier will only be passed if both stages are running concurrently
+        barrier = threading.Barrier(2, timeout=5)
+
+        runner = ExtractionStageRunner()
+        runner.add_stage('first', lambda: barrier.wait())
+        runner.add_stage('second', lambda: barrier.wait())
+
+        assert sorted(runner.run()) == ['first', 'second']
+
+    def test_dependencies_run_in_order(self):
+        """Test that stages are only started after the stages they depend on."""
+        calls = []
+        runner = ExtractionStageRunner()
+        runner.add_stage('first', lambda: calls.append('first'))
+        runner.add_stage('second', lambda: calls.append('second'), depends_on=['first'])
+        runner.add_stage('third', lambda: calls.append('third'), depends_on=['first', 'second'])
+
+        runner.run()
+        assert calls == ['first', 'second', 'third']
+
+    def test_add_stage_with_unknown_dependency(self):
+        """Test adding stage with dependency that does not exist."""
+        runner = ExtractionStageRunner()
+        with pytest.raises(ValueError):
+            runner.add_stage('first', lambda: None, depends_on=['doesnotexist'])
+
+    def test_add_duplicate_stage(self):
+        """Test adding stage with name of existing stage."""
+        runner = ExtractionStageRunner()
+        runner.add_stage('first', lambda: None)
+        with pytest.raises(ValueError):
+            runner.add_stage('first', lambda: None)
+
+    def test_stage_error(self):
+        """Test that stage errors are raised and dependant stages are not run."""
+        class StageError(Exception):
+            pass
+
+        def raise_error():
+            raise StageError('Stage failed')
+
+        calls = []
+        runner = ExtractionStageRunner()
+        runner.add_stage('first', raise_error)
+        runner.add_stage('independent', lambda: calls.append('independent'))
+        runner.add_stage('second', lambda: calls.append('second'), depends_on=['first'])
+
+        with pytest.raises(StageError):
+            runner.run()
+
+        # Ensure stage depending on failed stage was not run
+        assert 'second' not in calls
@@ -1,10 +1,15 @@
 import contextlib
+import datetime
+import glob
+import io
 import tempfile
+import threading
 import unittest.mock
 import os
 
 import pytest
 import boto3
+import boto3.s3.transfer
 import botocore.exceptions
 from test import skipif_unless_ci
 
@@ -37,6 +42,24 @@ class TestFileStorageFactory(TerraregUnitTest):
             else:
                 raise Exception('Unhandled storage type')
 
+    @pytest.mark.parametrize('data_directory_path, cache_directory, expected_class', [
+        ('s3://test-bucket', '', terrareg.file_storage.S3FileStorage),
+        ('s3://test-bucket', '/tmp/s3-cache', terrareg.file_storage.CachedFileStorage),
+        ('/tmp/some/directory', '/tmp/s3-cache', terrareg.file_storage.LocalFileStorage),
+    ])
+    def test_get_file_storage_s3_cache(self, data_directory_path, cache_directory, expected_class):
+        """Test get_file_storage wraps S3 storage with cache, when configured"""
+        with unittest.mock.patch('terrareg.config.Config.DATA_DIRECTORY', data_directory_path), \
+                unittest.mock.patch('terrareg.config.Config.S3_CACHE_DIRECTORY', cache_directory), \
+                unittest.mock.patch('terrareg.config.Config.S3_CACHE_MAX_SIZE', 5):
+            storage_instance = terrareg.file_storage.FileStorageFactory().get_file_storage()
+
+        assert type(storage_instance) is expected_class
+        if expected_class is terrareg.file_storage.CachedFileStorage:
+            assert isinstance(storage_instance._storage, terrareg.file_storage.S3FileStorage)
+            assert storage_instance._cache_directory == '/tmp/s3-cache'
+            assert storage_instance._max_size == 5 * 1024 * 1024
+
 class TestLocalFileStorage(TerraregUnitTest):
     """Handle local file storage."""
 
@@ -282,6 +305,75 @@ class TestLocalFileStorage(TerraregUnitTest):
                     expected_content = expected_content.encode('utf-8')
                 assert test_fh.read() == expected_content
 
+    @pytest.mark.parametrize('byte_range, expected_content', [
+        ((0, 3), b'Test'),
+        ((5, 11), b'content'),
+        ((5, 100), b'content'),
+    ])
+    def test_read_file_byte_range(self, byte_range, expected_content):
+        """Test reading range of bytes of file"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            instance = terrareg.file_storage.LocalFileStorage(temp_dir)
+
+            with open(os.path.join(temp_dir, 'test_file'), "w") as fh:
+                fh.write("Test content")
+
+            with instance.read_file('test_file', bytes_mode=True, byte_range=byte_range) as test_fh:
+                assert isinstance(test_fh, terrareg.file_storage.StreamReader)
+                assert test_fh.read() == expected_content
+
+            with pytest.raises(NotImplementedError):
+                instance.read_file('test_file', bytes_mode=False, byte_range=byte_range)
+
+    def test_list_files(self):
+        """Test list_files returns all files within directory"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            instance = terrareg.file_storage.LocalFileStorage(temp_dir)
+            os.makedirs(os.path.join(temp_dir, 'cache', 'a1'))
+            os.makedirs(os.path.join(temp_dir, 'other'))
+            for path, content in [('cache/a1/a1b2.json', 'test'), ('cache/root.json', 'content'), ('other/file', 'other')]:
+                with open(os.path.join(temp_dir, path), 'w') as fh:
+                    fh.write(content)
+            os.utime(os.path.join(temp_dir, 'cache/root.json'), (1000, 1000))
+
+            assert sorted(instance.list_files('/cache')) == [
+                ('/cache/a1/a1b2.json', 4, os.stat(os.path.join(temp_dir, 'cache/a1/a1b2.json')).st_mtime),
+                ('/cache/root.json', 7, 1000),
+            ]
+            assert instance.list_files('/does-not-exist') == []
+
+    def test_get_file_version(self):
+        """Test get_file_version changes when file is modified"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            instance = terrareg.file_storage.LocalFileStorage(temp_dir)
+            assert instance.get_file_version('/test/file') is None
+
+            instance.write_file('/test/file', b'Test Content', binary=True)
+            version = instance.get_file_version('/test/file')
+            assert version is not None
+            assert instance.get_file_version('/test/file') == version
+
+            instance.write_file('/test/file', b'Modified Content', binary=True)
+            assert instance.get_file_version('/test/file') != version
+
+            # Directories do not have a version
+            assert instance.get_file_version('/test') is None
+
+    def test_get_presigned_url(self):
+        """Test presigned URLs are not supported by local storage"""
+        instance = terrareg.file_storage.LocalFileStorage('/tmp/unittest-data')
+        assert instance.get_presigned_url('test_file', expiry=30, download_name='test_file', mimetype='application/zip') is None
+
+    @pytest.mark.parametrize('base_directory, path, expected_path', [
+        ('/tmp/unittest-data', '/modules/test/source.zip', '/tmp/unittest-data/modules/test/source.zip'),
+        ('/tmp/unittest-data/', 'modules/test/source.zip', '/tmp/unittest-data/modules/test/source.zip'),
+        ('/tmp/unittest-data', '/modules/test/../source.zip', '/tmp/unittest-data/modules/source.zip'),
+    ])
+    def test_get_local_path(self, base_directory, path, expected_path):
+        """Test get_local_path returns absolute path of file"""
+        instance = terrareg.file_storage.LocalFileStorage(base_directory)
+        assert instance.get_local_path(path) == expected_path
+
     @pytest.mark.parametrize('binary', [
         (False),
         (True)
@@ -302,6 +394,39 @@ class TestLocalFileStorage(TerraregUnitTest):
             with open(os.path.join(temp_dir, file), "r") as fh:
                 assert fh.read() == "Test write content"
 
+    def test_open_write(self):
+        """Test open_write method"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            instance = terrareg.file_storage.LocalFileStorage(temp_dir)
+
+            with instance.open_write(path='dest_directory/test_file') as fh:
+                fh.write(b"Test write ")
+                # Ensure file does not exist until writing has completed
+                assert not os.path.exists(os.path.join(temp_dir, "dest_directory", "test_file"))
+                fh.write(b"content")
+
+            assert os.listdir(os.path.join(temp_dir, "dest_directory")) == ["test_file"]
+            with open(os.path.join(temp_dir, "dest_directory", "test_file"), "r") as fh:
+                assert fh.read() == "Test write content"
+
+    def test_open_write_error(self):
+        """Test open_write method with error raised whilst writing file"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with open(os.path.join(temp_dir, "test_file"), "w") as fh:
+                fh.write("Original content")
+
+            instance = terrareg.file_storage.LocalFileStorage(temp_dir)
+
+            with pytest.raises(Exception, match="Test error"):
+                with instance.open_write(path='test_file') as fh:
+                    fh.write(b"New content")
+                    raise Exception("Test error")
+
+            # Ensure temporary file has been removed and original file is unmodified
+            assert os.listdir(temp_dir) == ["test_file"]
+            with open(os.path.join(temp_dir, "test_file"), "r") as fh:
+                assert fh.read() == "Original content"
+
 
 @contextlib.contextmanager
 def create_s3_file_storage_with_bucket(bucket_name, bucket_path):
@@ -444,6 +569,107 @@ class TestS3FileStorage(TerraregUnitTest):
             )
             assert res['Body'].read() == "Test Write content".encode('utf-8')
 
+    @skipif_unless_ci(not os.environ.get('AWS_ENDPOINT_URL'), reason="Skipping due to minio not configured")
+    def test_open_write(self):
+        """Test open_write method"""
+        with create_s3_file_storage_with_bucket(bucket_name="test-bucket", bucket_path="/test-base-dir/") as instance:
+            with instance.open_write(path="/test/directory/test_dest_file") as fh:
+                fh.write(b"Test Write content")
+
+            res = instance._s3_client.get_object(
+                Bucket="test-bucket",
+                Key="/test-base-dir/test/directory/test_dest_file"
+            )
+            assert res['Body'].read() == b"Test Write content"
+
+    def test__get_transfer_config(self):
+        """Test transfer configuration uses configured part size and concurrency"""
+        with unittest.mock.patch('terrareg.config.Config.S3_TRANSFER_PART_SIZE', 16), \
+                unittest.mock.patch('terrareg.config.Config.S3_TRANSFER_MAX_CONCURRENCY', 4):
+            transfer_config = terrareg.file_storage.S3FileStorage._get_transfer_config()
+
+        assert transfer_config.multipart_threshold == 16 * 1024 * 1024
+        assert transfer_config.multipart_chunksize == 16 * 1024 * 1024
+        assert transfer_config.max_concurrency == 4
+
+    def test_upload_file_transfer_config(self):
+        """Test upload_file streams file from disk using managed transfer"""
+        instance = terrareg.file_storage.S3FileStorage(s3_url='s3://test-bucket/base')
+        mock_bucket = unittest.mock.MagicMock()
+        with unittest.mock.patch.object(instance, '_get_bucket', unittest.mock.MagicMock(return_value=mock_bucket)):
+            instance.upload_file(source_path='/tmp/source.zip', dest_directory='/modules/test', dest_filename='source.zip')
+
+        mock_bucket.upload_file.assert_called_once_with(
+            Filename='/tmp/source.zip',
+            Key='/base/modules/test/source.zip',
+            Config=unittest.mock.ANY
+        )
+        assert isinstance(mock_bucket.upload_file.call_args.kwargs['Config'], boto3.s3.transfer.TransferConfig)
+
+    @pytest.mark.parametrize('byte_range, expected_range_kwargs', [
+        (None, {}),
+        ((10, 19), {'Range': 'bytes=10-19'}),
+    ])
+    def test_read_file_streaming(self, byte_range, expected_range_kwargs):
+        """Test read_file streams object body, rather than downloading the object"""
+        instance = terrareg.file_storage.S3FileStorage(s3_url='s3://test-bucket/base')
+        mock_body = unittest.mock.MagicMock()
+        mock_body.read.side_effect = [b'Test ', b'Content', b'']
+        mock_get_object = unittest.mock.MagicMock(return_value={'Body': mock_body, 'ContentLength': 12})
+
+        with unittest.mock.patch.object(instance._s3_client, 'get_object', mock_get_object):
+            file_handler = instance.read_file(path='/some-test/file-to-read', bytes_mode=True, byte_range=byte_range)
+
+        mock_get_object.assert_called_once_with(Bucket='test-bucket', Key='/base/some-test/file-to-read', **expected_range_kwargs)
+        # Ensure body is not read until the stream is read
+        mock_body.read.assert_not_called()
+
+        with file_handler:
+            assert file_handler.size == 12
+            assert file_handler.read() == b'Test Content'
+        mock_body.close.assert_called_once()
+
+    def test_get_presigned_url(self):
+        """Test generating presigned URL for object"""
+        instance = terrareg.file_storage.S3FileStorage(s3_url='s3://test-bucket/base')
+        mock_generate_presigned_url = unittest.mock.MagicMock(return_value='https://unittest-presigned-url')
+        with unittest.mock.patch.object(instance._s3_client, 'generate_presigned_url', mock_generate_presigned_url):
+            assert instance.get_presigned_url(
+                '/modules/test/source.zip', expiry=30, download_name='source.zip', mimetype='application/zip'
+            ) == 'https://unittest-presigned-url'
+
+        mock_generate_presigned_url.assert_called_once_with(
+            'get_object',
+            Params={
+                'Bucket': 'test-bucket',
+                'Key': '/base/modules/test/source.zip',
+                'ResponseContentType': 'application/zip',
+                'ResponseContentDisposition': 'attachment; filename="source.zip"',
+            },
+            ExpiresIn=30
+        )
+
+    @skipif_unless_ci(not os.environ.get('AWS_ENDPOINT_URL'), reason="Skipping due to minio not configured")
+    def test_multipart_upload_and_ranged_read(self):
+        """Test uploading file larger than part size and reading range of it"""
+        with create_s3_file_storage_with_bucket(bucket_name="test-bucket", bucket_path="/multipart-base-dir/") as instance, \
+                tempfile.TemporaryDirectory() as temp_dir, \
+                unittest.mock.patch('terrareg.config.Config.S3_TRANSFER_PART_SIZE', 5):
+            content = os.urandom(11 * 1024 * 1024)
+            source_file = os.path.join(temp_dir, "test_upload_file")
+            with open(source_file, "wb") as fh:
+                fh.write(content)
+
+            instance.upload_file(source_path=source_file, dest_directory="/test", dest_filename="large_file")
+
+            with instance.read_file(path="/test/large_file", bytes_mode=True) as file_handler:
+                assert file_handler.size == len(content)
+                assert file_handler.read() == content
+
+            with instance.read_file(path="/test/large_file", bytes_mode=True, byte_range=(6 * 1024 * 1024, 6 * 1024 * 1024 + 99)) as file_handler:
+                assert file_handler.size == 100
+                assert file_handler.read() == content[6 * 1024 * 1024:6 * 1024 * 1024 + 100]
+
     def test_delete_directory(self):
         """Test delete_directory method"""
         instance = terrareg.file_storage.S3FileStorage(s3_url='s3://test-bucket')
@@ -523,6 +749,46 @@ class TestS3FileStorage(TerraregUnitTest):
 
             assert instance.file_exists("/some-test/file-to-exist") is exists
 
+    def test_list_files(self):
+        """Test list_files returns all objects with directory prefix"""
+        instance = terrareg.file_storage.S3FileStorage(s3_url='s3://test-bucket/base')
+        mock_paginator = unittest.mock.MagicMock()
+        mock_paginator.paginate.return_value = [
+            {'Contents': [
+                {'Key': '/base/cache/a1/a1b2.json', 'Size': 4, 'LastModified': datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)},
+            ]},
+            {'Contents': [
+                {'Key': '/base/cache/root.json', 'Size': 7, 'LastModified': datetime.datetime(2024, 1, 2, tzinfo=datetime.timezone.utc)},
+            ]},
+            {},
+        ]
+        with unittest.mock.patch.object(instance._s3_client, 'get_paginator', unittest.mock.MagicMock(return_value=mock_paginator)) as mock_get_paginator:
+            assert instance.list_files('/cache') == [
+                ('/cache/a1/a1b2.json', 4, 1704067200.0),
+                ('/cache/root.json', 7, 1704153600.0),
+            ]
+
+        mock_get_paginator.assert_called_once_with('list_objects_v2')
+        mock_paginator.paginate.assert_called_once_with(Bucket='test-bucket', Prefix='/base/cache/')
+
+    def test_get_file_version(self):
+        """Test get_file_version returns ETag of object"""
+        instance = terrareg.file_storage.S3FileStorage(s3_url='s3://test-bucket/base')
+        mock_head_object = unittest.mock.MagicMock(return_value={'ETag': '"unittest-etag"', 'ContentLength': 12})
+        with unittest.mock.patch.object(instance._s3_client, 'head_object', mock_head_object):
+            assert instance.get_file_version('/modules/test/source.zip') == '"unittest-etag"'
+
+        mock_head_object.assert_called_once_with(Bucket='test-bucket', Key='/base/modules/test/source.zip')
+
+    def test_get_file_version_non_existent(self):
+        """Test get_file_version for non-existent object"""
+        instance = terrareg.file_storage.S3FileStorage(s3_url='s3://test-bucket/base')
+        mock_head_object = unittest.mock.MagicMock(side_effect=botocore.exceptions.ClientError(
+            {'Error': {'Code': '404', 'Message': 'Not Found'}}, 'HeadObject'
+        ))
+        with unittest.mock.patch.object(instance._s3_client, 'head_object', mock_head_object):
+            assert instance.get_file_version('/does/not/exist') is None
+
     def test_directory_exists(self):
         """Test test_directory_exists"""
         instance = terrareg.file_storage.S3FileStorage(s3_url='s3://test-bucket')
@@ -532,3 +798,351 @@ class TestS3FileStorage(TerraregUnitTest):
         """Test make_directory"""
         instance = terrareg.file_storage.S3FileStorage(s3_url='s3://test-bucket')
         instance.make_directory(directory="/test/dir")
+
+
+class TestCachedFileStorage(TerraregUnitTest):
+    """Test CachedFileStorage class"""
+
+    @contextlib.contextmanager
+    def _create_cached_file_storage(self, files, max_size=1024, revalidate_interval=0):
+        """Create cached file storage, backed by mocked local storage containing files."""
+        with tempfile.TemporaryDirectory() as storage_directory, tempfile.TemporaryDirectory() as cache_directory:
+            local_storage = terrareg.file_storage.LocalFileStorage(storage_directory)
+            for path, content in files.items():
+                local_storage.write_file(path, content, binary=True)
+
+            storage = unittest.mock.MagicMock(wraps=local_storage)
+            yield storage, cache_directory, terrareg.file_storage.CachedFileStorage(
+                storage=storage, cache_directory=cache_directory, max_size=max_size,
+                revalidate_interval=revalidate_interval
+            )
+
+    @staticmethod
+    def _get_cached_files(cache_directory, path):
+        """Return cached copies of all versions of file."""
+        return glob.glob(glob.escape(os.path.join(cache_directory, path)) + '@*')
+
+    @staticmethod
+    def _get_metrics_difference(previous_metrics):
+        """Return difference in metrics since previous metrics were obtained."""
+        return {
+            name: value - previous_metrics[name]
+            for name, value in terrareg.file_storage.CachedFileStorage.get_metrics().items()
+        }
+
+    def test_read_file(self):
+        """Test reading file caches file from storage"""
+        with self._create_cached_file_storage({'/modules/test/source.zip': b'Test Content'}) as (storage, cache_directory, instance):
+            previous_metrics = terrareg.file_storage.CachedFileStorage.get_metrics()
+
+            for _ in range(3):
+                with instance.read_file('/modules/test/source.zip', bytes_mode=True) as fh:
+                    assert fh.read() == b'Test Content'
+
+            # Ensure file is only read from storage once
+            storage.read_file.assert_called_once_with('/modules/test/source.zip', bytes_mode=True)
+            cached_files = self._get_cached_files(cache_directory, 'modules/test/source.zip')
+            assert len(cached_files) == 1
+            with open(cached_files[0], 'rb') as fh:
+                assert fh.read() == b'Test Content'
+
+            assert self._get_metrics_difference(previous_metrics) == {
+                'hits': 2,
+                'misses': 1,
+                'deduplicated_fills': 0,
+                'evictions': 0,
+                'evicted_bytes': 0,
+            }
+
+    def test_read_file_byte_range(self):
+        """Test reading range of file from cache"""
+        with self._create_cached_file_storage({'/test-file': b'0123456789'}) as (storage, _, instance):
+            with instance.read_file('/test-file', bytes_mode=True, byte_range=(2, 5)) as fh:
+                assert fh.read() == b'2345'
+            with instance.read_file('/test-file', bytes_mode=True, byte_range=(8, 9)) as fh:
+                assert fh.read() == b'89'
+
+            storage.read_file.assert_called_once_with('/test-file', bytes_mode=True)
+
+    def test_read_file_text_mode(self):
+        """Test text reads are not cached"""
+        with self._create_cached_file_storage({'/test-file': b'Test Content'}) as (storage, cache_directory, instance):
+            with instance.read_file('/test-file') as fh:
+                assert fh.read() == 'Test Content'
+
+            storage.read_file.assert_called_once_with('/test-file', bytes_mode=False, byte_range=None)
+            assert os.listdir(cache_directory) == []
+
+    def test_read_file_non_existent(self):
+        """Test reading non-existent file"""
+        with self._create_cached_file_storage({}) as (storage, cache_directory, instance):
+            storage.read_file = unittest.mock.MagicMock(return_value=None)
+
+            assert instance.read_file('/does-not-exist', bytes_mode=True) is None
+            assert os.listdir(cache_directory) == []
+
+    def test_read_file_larger_than_cache(self):
+        """Test files larger than the maximum size of the cache are read from storage"""
+        with self._create_cached_file_storage({}, max_size=5) as (storage, cache_directory, instance):
+            storage.get_file_version = unittest.mock.MagicMock(return_value='"unittest-etag"')
+            storage.read_file = unittest.mock.MagicMock(
+                side_effect=lambda *args, **kwargs: terrareg.file_storage.StreamReader(io.BytesIO(b'Test Content'), size=12)
+            )
+
+            with instance.read_file('/large-file', bytes_mode=True) as fh:
+                assert fh.read() == b'Test Content'
+
+            assert os.listdir(cache_directory) == []
+            storage.read_file.assert_has_calls([
+                unittest.mock.call('/large-file', bytes_mode=True),
+                unittest.mock.call('/large-file', bytes_mode=True, byte_range=None),
+            ])
+
+    def test_read_file_concurrent(self):
+        """Test concurrent reads of uncached file only read file from storage once"""
+        with self._create_cached_file_storage({'/test-file': b'Test Content'}) as (storage, _, instance):
+            original_read_file = storage.read_file
+            read_started = threading.Event()
+            continue_read = threading.Event()
+
+            def slow_read_file(*args, **kwargs):
+                read_started.set()
+                continue_read.wait(timeout=10)
+                return original_read_file(*args, **kwargs)
+            storage.read_file = unittest.mock.MagicMock(side_effect=slow_read_file)
+
+            previous_metrics = terrareg.file_storage.CachedFileStorage.get_metrics()
+            results = []
+
+            def read():
+                with instance.read_file('/test-file', bytes_mode=True) as fh:
+                    results.append(fh.read())
+
+            threads = [threading.Thread(target=read) for _ in range(4)]
+            threads[0].start()
+            read_started.wait(timeout=10)
+            for thread in threads[1:]:
+                thread.start()
+            continue_read.set()
+            for thread in threads:
+                thread.join(timeout=10)
+
+            assert results == [b'Test Content'] * 4
+            storage.read_file.assert_called_once_with('/test-file', bytes_mode=True)
+            metrics_difference = self._get_metrics_difference(previous_metrics)
+            assert metrics_difference['misses'] == 1
+            assert metrics_difference['hits'] + metrics_difference['deduplicated_fills'] == 3
+
+    def test_prune(self):
+        """Test least recently used files are removed when cache exceeds maximum size"""
+        files = {
+            '/first': b'a' * 10,
+            '/second': b'b' * 10,
+            '/third': b'c' * 10,
+        }
+        with self._create_cached_file_storage(files, max_size=25) as (storage, cache_directory, instance):
+            previous_metrics = terrareg.file_storage.CachedFileStorage.get_metrics()
+
+            instance.read_file('/first', bytes_mode=True).close()
+            instance.read_file('/second', bytes_mode=True).close()
+            os.utime(self._get_cached_files(cache_directory, 'first')[0], (1000, 1000))
+            os.utime(self._get_cached_files(cache_directory, 'second')[0], (2000, 2000))
+
+            # Read first file again, marking it as recently used
+            instance.read_file('/first', bytes_mode=True).close()
+
+            instance.read_file('/third', bytes_mode=True).close()
+            assert sorted(file_name.split('@')[0] for file_name in os.listdir(cache_directory)) == ['first', 'third']
+
+            metrics_difference = self._get_metrics_difference(previous_metrics)
+            assert metrics_difference['evictions'] == 1
+            assert metrics_difference['evicted_bytes'] == 10
+
+            # Ensure evicted file is read from storage again
+            with instance.read_file('/second', bytes_mode=True) as fh:
+                assert fh.read() == b'b' * 10
+            assert storage.read_file.call_count == 4
+
+    def test_prune_if_required(self):
+        """Test cache directory is only walked when the cache exceeds maximum size or the prune interval has passed"""
+        files = {
+            f'/file-{itx}': b'a' * 10
+            for itx in range(4)
+        }
+        with self._create_cached_file_storage(files, max_size=35) as (storage, cache_directory, instance), \
+                unittest.mock.patch('terrareg.file_storage.time.time', unittest.mock.MagicMock(return_value=1000)) as mock_time, \
+                unittest.mock.patch('terrareg.file_storage.os.walk', unittest.mock.MagicMock(wraps=os.walk)) as mock_walk:
+            # Ensure total size is calculated when the first file is cached
+            instance.read_file('/file-0', bytes_mode=True).close()
+            assert mock_walk.call_count == 1
+
+            # Ensure total size is tracked whilst the cache is within the maximum size
+            instance.read_file('/file-1', bytes_mode=True).close()
+            instance.read_file('/file-2', bytes_mode=True).close()
+            assert mock_walk.call_count == 1
+
+            # Ensure total size is recalculated once the prune interval has passed
+            mock_time.return_value = 1000 + terrareg.file_storage.CachedFileStorage.PRUNE_INTERVAL
+            instance.write_file('/file-2', b'b' * 10, binary=True)
+            instance.read_file('/file-2', bytes_mode=True).close()
+            assert mock_walk.call_count == 2
+
+            # Ensure files are removed once the tracked total size exceeds the maximum size
+            instance.read_file('/file-3', bytes_mode=True).close()
+            assert mock_walk.call_count == 3
+            assert len(os.listdir(cache_directory)) == 3
+
+    @pytest.mark.parametrize('method, args, invalidated_path', [
+        ('write_file', {'path': '/test/file', 'content': b'New Content', 'binary': True}, 'test/file'),
+        ('delete_file', {'path': '/test/file'}, 'test/file'),
+        ('delete_directory', {'path': '/test'}, 'test'),
+    ])
+    def test_invalidate(self, method, args, invalidated_path):
+        """Test writing and deleting files removes files from cache"""
+        with self._create_cached_file_storage({'/test/file': b'Test Content'}) as (storage, cache_directory, instance):
+            storage.delete_directory = unittest.mock.MagicMock()
+            instance.read_file('/test/file', bytes_mode=True).close()
+            assert glob.glob(os.path.join(cache_directory, invalidated_path) + '*')
+
+            getattr(instance, method)(**args)
+
+            getattr(storage, method).assert_called_once()
+            assert glob.glob(os.path.join(cache_directory, invalidated_path) + '*') == []
+
+    def test_open_write(self):
+        """Test writing file using open_write removes file from cache"""
+        with self._create_cached_file_storage({'/test/file': b'Test Content'}) as (storage, cache_directory, instance):
+            instance.read_file('/test/file', bytes_mode=True).close()
+
+            with instance.open_write('/test/file') as fh:
+                fh.write(b'New Content')
+
+            assert self._get_cached_files(cache_directory, 'test/file') == []
+            with instance.read_file('/test/file', bytes_mode=True) as fh:
+                assert fh.read() == b'New Content'
+
+    def test_upload_file(self):
+        """Test uploading file removes file from cache"""
+        with self._create_cached_file_storage({'/test/file': b'Test Content'}) as (storage, cache_directory, instance), \
+                tempfile.NamedTemporaryFile() as source_fh:
+            instance.read_file('/test/file', bytes_mode=True).close()
+            source_fh.write(b'New Content')
+            source_fh.flush()
+
+            instance.upload_file(source_fh.name, '/test', 'file')
+
+            storage.upload_file.assert_called_once_with(source_fh.name, '/test', 'file')
+            with instance.read_file('/test/file', bytes_mode=True) as fh:
+                assert fh.read() == b'New Content'
+
+    def test_file_exists(self):
+        """Test file_exists uses cached copies of files and checks storage for files that are not cached"""
+        with self._create_cached_file_storage({'/cached': b'Test Content', '/not-cached': b'Test Content'}) as (storage, _, instance):
+            instance.read_file('/cached', bytes_mode=True).close()
+
+            assert instance.file_exists('/cached') is True
+            storage.file_exists.assert_not_called()
+
+            assert instance.file_exists('/not-cached') is True
+            assert instance.file_exists('/does-not-exist') is False
+            assert storage.file_exists.call_count == 2
+
+            # Delete file from storage, as if by another process,
+            # which is detected when the cached file is next revalidated
+            storage.delete_file('/cached')
+            assert instance.read_file('/cached', bytes_mode=True) is None
+            assert instance.file_exists('/cached') is False
+
+    def test_read_file_modified_in_storage(self):
+        """Test files modified in storage by another process are not read from the cache"""
+        with self._create_cached_file_storage({'/test/file': b'Test Content'}) as (storage, cache_directory, instance):
+            with instance.read_file('/test/file', bytes_mode=True) as fh:
+                assert fh.read() == b'Test Content'
+
+            # Modify file in storage, without using the cached file storage
+            storage.write_file('/test/file', b'Modified Content', binary=True)
+
+            with instance.read_file('/test/file', bytes_mode=True) as fh:
+                assert fh.read() == b'Modified Content'
+            assert storage.read_file.call_count == 2
+            # Ensure previous version has been removed from the cache
+            assert len(self._get_cached_files(cache_directory, 'test/file')) == 1
+
+            # Delete file in storage, without using the cached file storage
+            storage.delete_file('/test/file')
+            assert instance.read_file('/test/file', bytes_mode=True) is None
+            assert self._get_cached_files(cache_directory, 'test/file') == []
+
+    def test_read_file_revalidate_interval(self):
+        """Test cached files are read without checking version in storage until revalidation interval has passed"""
+        with self._create_cached_file_storage({'/test/file': b'Test Content'}, revalidate_interval=60) as (storage, _, instance), \
+                unittest.mock.patch('terrareg.file_storage.time.time', unittest.mock.MagicMock(return_value=1000)) as mock_time:
+            for _ in range(3):
+                with instance.read_file('/test/file', bytes_mode=True) as fh:
+                    assert fh.read() == b'Test Content'
+
+            # Ensure version is only obtained when the file is cached
+            assert storage.get_file_version.call_count == 2
+
+            # Modify file in storage, without using the cached file storage
+            storage.write_file('/test/file', b'Modified Content', binary=True)
+
+            # Ensure cached file is read until the revalidation interval has passed
+            mock_time.return_value = 1059
+            with instance.read_file('/test/file', bytes_mode=True) as fh:
+                assert fh.read() == b'Test Content'
+            assert storage.get_file_version.call_count == 2
+
+            mock_time.return_value = 1060
+            with instance.read_file('/test/file', bytes_mode=True) as fh:
+                assert fh.read() == b'Modified Content'
+            assert storage.read_file.call_count == 2
+
+    def test_read_file_revalidate_unmodified(self):
+        """Test cached file is re-used once revalidation interval has passed, if the file is unmodified"""
+        with self._create_cached_file_storage({'/test/file': b'Test Content'}, revalidate_interval=60) as (storage, _, instance), \
+                unittest.mock.patch('terrareg.file_storage.time.time', unittest.mock.MagicMock(return_value=1000)) as mock_time:
+            instance.read_file('/test/file', bytes_mode=True).close()
+
+            mock_time.return_value = 1100
+            instance.read_file('/test/file', bytes_mode=True).close()
+            assert storage.get_file_version.call_count == 3
+
+            # Ensure revalidation time is updated
+            mock_time.return_value = 1150
+            instance.read_file('/test/file', bytes_mode=True).close()
+            assert storage.get_file_version.call_count == 3
+            storage.read_file.assert_called_once_with('/test/file', bytes_mode=True)
+
+    def test_read_file_modified_whilst_caching(self):
+        """Test file modified in storage whilst it is being cached is not cached"""
+        with self._create_cached_file_storage({'/test/file': b'Test Content'}) as (storage, cache_directory, instance):
+            original_read_file = storage.read_file
+
+            def read_file(*args, **kwargs):
+                fh = original_read_file(*args, **kwargs)
+                storage.write_file('/test/file', b'Modified Content', binary=True)
+                return fh
+            storage.read_file = unittest.mock.MagicMock(side_effect=read_file)
+
+            with instance.read_file('/test/file', bytes_mode=True) as fh:
+                assert fh.read() == b'Modified Content'
+
+            assert self._get_cached_files(cache_directory, 'test/file') == []
+
+    def test_fill_locks_removed(self):
+        """Test locks for caching files are removed once files have been cached"""
+        with self._create_cached_file_storage({'/test/file': b'Test Content'}) as (storage, _, instance):
+            instance.read_file('/test/file', bytes_mode=True).close()
+            instance.read_file('/does-not-exist', bytes_mode=True)
+            assert terrareg.file_storage.CachedFileStorage._FILL_LOCKS == {}
+
+    def test_get_presigned_url(self):
+        """Test presigned URLs are generated by storage"""
+        with self._create_cached_file_storage({}) as (storage, _, instance):
+            storage.get_presigned_url = unittest.mock.MagicMock(return_value='https://unittest-presigned-url')
+            assert instance.get_presigned_url(
+                '/test-file', expiry=30, download_name='source.zip', mimetype='application/zip'
+            ) == 'https://unittest-presigned-url'
+            storage.get_presigned_url.assert_called_once_with('/test-file', expiry=30, download_name='source.zip', mimetype='application/zip')
+            assert instance.get_local_path('/test-file') is None
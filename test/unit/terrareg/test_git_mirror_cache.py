@@ -0,0 +1,152 @@
+
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest.mock
+
+import pytest
+
+from terrareg.git_mirror_cache import GitMirrorCache
+from test.unit.terrareg import TerraregUnitTest
+
+
+class TestGitMirrorCache(TerraregUnitTest):
+    """Test GitMirrorCache class."""
+
+    _GIT_ENV = dict(
+        os.environ,
+        GIT_AUTHOR_NAME='Terrareg', GIT_AUTHOR_EMAIL='terrareg@localhost',
+        GIT_COMMITTER_NAME='Terrareg', GIT_COMMITTER_EMAIL='terrareg@localhost'
+    )
+
+    @pytest.fixture
+    def upstream_repository(self):
+        """Create upstream repository with two tagged commits."""
+        upstream_directory = tempfile.mkdtemp()
+        try:
+            subprocess.check_call(['git', 'init', '--quiet', upstream_directory])
+            for version in ['1.0.0', '2.0.0']:
+                with open(os.path.join(upstream_directory, 'main.tf'), 'w') as fh:
+                    fh.write(f'# Version {version}')
+                subprocess.check_call(['git', 'add', 'main.tf'], cwd=upstream_directory)
+                subprocess.check_call(['git', 'commit', '--quiet', '-m', version], cwd=upstream_directory, env=self._GIT_ENV)
+                subprocess.check_call(['git', 'tag', f'v{version}'], cwd=upstream_directory)
+            yield upstream_directory
+        finally:
+            shutil.rmtree(upstream_directory, ignore_errors=True)
+
+    @pytest.fixture
+    def cache_directory(self):
+        """Create cache directory."""
+        cache_directory = tempfile.mkdtemp()
+        try:
+            yield cache_directory
+        finally:
+            shutil.rmtree(cache_directory)
+
+    @staticmethod
+    def _clone_tag(cache, upstream_repository, tag):
+        """Clone tag using cache, returning content of main.tf."""
+        with tempfile.TemporaryDirectory() as destination:
+            cache.clone_tag(
+                repository_url=upstream_repository, fetch_url=upstream_repository,
+                tag=tag, destination=destination, env=dict(os.environ), timeout=None
+            )
+            with open(os.path.join(destination, 'main.tf'), 'r') as fh:
+                return fh.read()
+
+    @pytest.mark.parametrize('cache_directory_config, expect_cache', [
+        ('', False),
+        ('/tmp/git-mirror-cache', True),
+    ])
+    def test_get(self, cache_directory_config, expect_cache):
+        """Test get method."""
+        with unittest.mock.patch('terrareg.config.Config.GIT_MIRROR_CACHE_DIRECTORY', cache_directory_config), \
+                unittest.mock.patch('terrareg.config.Config.GIT_MIRROR_CACHE_MAX_SIZE', 5):
+            cache = GitMirrorCache.get()
+        if expect_cache:
+            assert cache._directory == '/tmp/git-mirror-cache'
+            assert cache._max_size == 5 * 1024 * 1024
+        else:
+            assert cache is None
+
+    def test_clone_tag(self, upstream_repository, cache_directory):
+        """Test cloning tags from mirror, without fetching tags that are present in the mirror."""
+        cache = GitMirrorCache(directory=cache_directory, max_size=0)
+
+        with unittest.mock.patch('terrareg.git_mirror_cache.GitMirrorCache._update_mirror',
+                                 unittest.mock.MagicMock(wraps=GitMirrorCache._update_mirror)) as mock_update_mirror:
+            assert self._clone_tag(cache, upstream_repository, 'v1.0.0') == '# Version 1.0.0'
+            mock_update_mirror.assert_called_once()
+
+            # Ensure mirror is used for tags that have already been fetched
+            mock_update_mirror.reset_mock()
+            assert self._clone_tag(cache, upstream_repository, 'v2.0.0') == '# Version 2.0.0'
+            mock_update_mirror.assert_not_called()
+
+        assert os.path.isdir(cache.get_mirror_path(upstream_repository))
+
+    def test_clone_tag_concurrent(self, upstream_repository, cache_directory):
+        """Test cloning tag whilst mirror is being cloned from elsewhere."""
+        cache = GitMirrorCache(directory=cache_directory, max_size=0)
+        self._clone_tag(cache, upstream_repository, 'v1.0.0')
+
+        with GitMirrorCache._lock(cache.get_mirror_path(upstream_repository), shared=True) as locked:
+            assert locked
+            assert self._clone_tag(cache, upstream_repository, 'v2.0.0') == '# Version 2.0.0'
+
+    def test_clone_new_tag(self, upstream_repository, cache_directory):
+        """Test cloning tag that was created after the mirror was created."""
+        cache = GitMirrorCache(directory=cache_directory, max_size=0)
+        assert self._clone_tag(cache, upstream_repository, 'v1.0.0') == '# Version 1.0.0'
+
+        with open(os.path.join(upstream_repository, 'main.tf'), 'w') as fh:
+            fh.write('# Version 3.0.0')
+        subprocess.check_call(['git', 'commit', '--quiet', '-am', '3.0.0'], cwd=upstream_repository, env=self._GIT_ENV)
+        subprocess.check_call(['git', 'tag', 'v3.0.0'], cwd=upstream_repository)
+
+        assert self._clone_tag(cache, upstream_repository, 'v3.0.0') == '# Version 3.0.0'
+
+    def test_clone_non_existent_tag(self, upstream_repository, cache_directory):
+        """Test cloning tag that does not exist in upstream repository."""
+        cache = GitMirrorCache(directory=cache_directory, max_size=0)
+        with pytest.raises(subprocess.CalledProcessError):
+            self._clone_tag(cache, upstream_repository, 'v9.9.9')
+
+    def test_prune(self, upstream_repository, cache_directory):
+        """Test least recently used mirrors are removed when the cache exceeds the maximum size."""
+        cache = GitMirrorCache(directory=cache_directory, max_size=0)
+        second_upstream_repository = tempfile.mkdtemp()
+        try:
+            shutil.copytree(upstream_repository, second_upstream_repository, dirs_exist_ok=True)
+
+            self._clone_tag(cache, upstream_repository, 'v1.0.0')
+            self._clone_tag(cache, second_upstream_repository, 'v1.0.0')
+            first_mirror_path = cache.get_mirror_path(upstream_repository)
+            second_mirror_path = cache.get_mirror_path(second_upstream_repository)
+            os.utime(f"{first_mirror_path}.lock", (1000, 1000))
+
+            # Set maximum size to allow a single mirror
+            cache._max_size = GitMirrorCache._get_directory_size(second_mirror_path) + 1
+            cache.prune()
+
+            assert not os.path.isdir(first_mirror_path)
+            assert os.path.isdir(second_mirror_path)
+        finally:
+            shutil.rmtree(second_upstream_repository)
+
+    def test_prune_skips_locked_mirror(self, upstream_repository, cache_directory):
+        """Test prune does not remove mirrors that are in use."""
+        cache = GitMirrorCache(directory=cache_directory, max_size=0)
+        self._clone_tag(cache, upstream_repository, 'v1.0.0')
+        mirror_path = cache.get_mirror_path(upstream_repository)
+
+        cache._max_size = 1
+        with GitMirrorCache._lock(mirror_path) as locked:
+            assert locked
+            cache.prune()
+            assert os.path.isdir(mirror_path)
+
+        cache.prune()
+        assert not os.path.isdir(mirror_path)
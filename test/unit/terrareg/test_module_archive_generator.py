@@ -0,0 +1,184 @@
+import hashlib
+
+import io
+import os
+import stat
+import tarfile
+import tempfile
+import zipfile
+
+import pytest
+
+from terrareg.module_archive_generator import ModuleArchiveGenerator
+from test.unit.terrareg import TerraregUnitTest
+
+
+class TestModuleArchiveGenerator(TerraregUnitTest):
+    """Test ModuleArchiveGenerator class."""
+
+    _TEST_FILES = {
+        'main.tf': 'resource "null_resource" "test" {}',
+        '.hidden-file.tf': '# Hidden file',
+        'subdir/nested-file.tf': '# Nested file',
+        'subdir/.git/nested-git-file': '# Nested git file',
+        '.git/HEAD': 'ref: refs/heads/main',
+    }
+
+    @staticmethod
+    def _write_files(base_directory, files):
+        """Write files to directory."""
+        for path, content in files.items():
+            file_path = os.path.join(base_directory, path)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, 'w') as fh:
+                fh.write(content)
+
+    @staticmethod
+    def _generate(source_directory):
+        """Generate archives, returning tar.gz and zip content."""
+        tar_gz_fh = io.BytesIO()
+        zip_fh = io.BytesIO()
+        ModuleArchiveGenerator(source_directory=source_directory).generate(tar_gz_fh=tar_gz_fh, zip_fh=zip_fh)
+        return tar_gz_fh.getvalue(), zip_fh.getvalue()
+
+    def test_generate(self):
+        """Test generating archives."""
+        with tempfile.TemporaryDirectory() as source_directory:
+            self._write_files(source_directory, self._TEST_FILES)
+            tar_gz_content, zip_content = self._generate(source_directory)
+
+        expected_files = {
+            '.hidden-file.tf': '# Hidden file',
+            'main.tf': 'resource "null_resource" "test" {}',
+            'subdir/.git/nested-git-file': '# Nested git file',
+            'subdir/nested-file.tf': '# Nested file',
+        }
+
+        with tarfile.open(fileobj=io.BytesIO(tar_gz_content), mode='r:gz') as tar:
+            assert tar.getnames() == ['.hidden-file.tf', 'main.tf', 'subdir', 'subdir/.git', 'subdir/.git/nested-git-file', 'subdir/nested-file.tf']
+            assert {
+                member.name: tar.extractfile(member).read().decode('utf-8')
+                for member in tar.getmembers()
+                if member.isfile()
+            } == expected_files
+            for member in tar.getmembers():
+                assert member.mtime == ModuleArchiveGenerator.ARCHIVE_MTIME
+                assert member.uid == 0
+                assert member.uname == ''
+
+        with zipfile.ZipFile(io.BytesIO(zip_content)) as zip_file:
+            assert zip_file.namelist() == ['.hidden-file.tf', 'main.tf', 'subdir/', 'subdir/.git/', 'subdir/.git/nested-git-file', 'subdir/nested-file.tf']
+            assert {
+                zip_info.filename: zip_file.read(zip_info).decode('utf-8')
+                for zip_info in zip_file.infolist()
+                if not zip_info.is_dir()
+            } == expected_files
+            assert zip_file.testzip() is None
+
+    def test_reproducible(self):
+        """Test archives are identical for identical source directories."""
+        with tempfile.TemporaryDirectory() as first_directory, tempfile.TemporaryDirectory() as second_directory:
+            self._write_files(first_directory, self._TEST_FILES)
+            # Write files in different order, with different modification times
+            self._write_files(second_directory, dict(reversed(list(self._TEST_FILES.items()))))
+            os.utime(os.path.join(second_directory, 'main.tf'), (1000000, 1000000))
+
+            assert self._generate(first_directory) == self._generate(second_directory)
+
+    def test_source_change(self):
+        """Test archives differ when source content changes."""
+        with tempfile.TemporaryDirectory() as first_directory, tempfile.TemporaryDirectory() as second_directory:
+            self._write_files(first_directory, self._TEST_FILES)
+            self._write_files(second_directory, dict(self._TEST_FILES, **{'main.tf': 'variable "changed" {}'}))
+
+            first_tar_gz, first_zip = self._generate(first_directory)
+            second_tar_gz, second_zip = self._generate(second_directory)
+            assert first_tar_gz != second_tar_gz
+            assert first_zip != second_zip
+
+    @pytest.mark.parametrize('source_mode, expected_mode', [
+        (0o600, 0o644),
+        (0o664, 0o644),
+        (0o700, 0o755),
+        (0o775, 0o755),
+    ])
+    def test_file_mode(self, source_mode, expected_mode):
+        """Test file modes are normalised."""
+        with tempfile.TemporaryDirectory() as source_directory:
+            self._write_files(source_directory, {'script.sh': '#!/bin/bash'})
+            os.chmod(os.path.join(source_directory, 'script.sh'), source_mode)
+            tar_gz_content, zip_content = self._generate(source_directory)
+
+        with tarfile.open(fileobj=io.BytesIO(tar_gz_content), mode='r:gz') as tar:
+            assert tar.getmember('script.sh').mode == expected_mode
+
+        with zipfile.ZipFile(io.BytesIO(zip_content)) as zip_file:
+            assert zip_file.getinfo('script.sh').external_attr >> 16 == stat.S_IFREG | expected_mode
+
+    def test_symlinks(self):
+        """Test symlinks are added to tar archives as symlinks and symlink targets are added to zip archives."""
+        with tempfile.TemporaryDirectory() as source_directory:
+            self._write_files(source_directory, {'subdir/main.tf': '# Main'})
+            os.symlink('subdir/main.tf', os.path.join(source_directory, 'file-link.tf'))
+            os.symlink('subdir', os.path.join(source_directory, 'directory-link'))
+            tar_gz_content, zip_content = self._generate(source_directory)
+
+        with tarfile.open(fileobj=io.BytesIO(tar_gz_content), mode='r:gz') as tar:
+            assert tar.getnames() == ['directory-link', 'file-link.tf', 'subdir', 'subdir/main.tf']
+            assert tar.getmember('file-link.tf').issym()
+            assert tar.getmember('file-link.tf').linkname == 'subdir/main.tf'
+            assert tar.getmember('directory-link').issym()
+            assert tar.getmember('directory-link').linkname == 'subdir'
+
+        with zipfile.ZipFile(io.BytesIO(zip_content)) as zip_file:
+            assert zip_file.namelist() == ['directory-link/', 'directory-link/main.tf', 'file-link.tf', 'subdir/', 'subdir/main.tf']
+            assert stat.S_ISREG(zip_file.getinfo('file-link.tf').external_attr >> 16)
+            assert zip_file.read('file-link.tf') == b'# Main'
+            assert zip_file.read('directory-link/main.tf') == b'# Main'
+            assert zip_file.testzip() is None
+
+    def test_symlinks_outside_source_directory(self):
+        """Test symlinks to paths outside of the source directory are not added to archives."""
+        with tempfile.TemporaryDirectory() as source_directory, tempfile.TemporaryDirectory() as outside_directory:
+            self._write_files(source_directory, {'main.tf': '# Main'})
+            self._write_files(outside_directory, {'secret': 'Secret content'})
+            os.symlink(os.path.join(outside_directory, 'secret'), os.path.join(source_directory, 'absolute-link'))
+            os.symlink(os.path.join('..', os.path.basename(outside_directory)), os.path.join(source_directory, 'relative-link'))
+            os.symlink('does-not-exist', os.path.join(source_directory, 'broken-link'))
+            tar_gz_content, zip_content = self._generate(source_directory)
+
+        with tarfile.open(fileobj=io.BytesIO(tar_gz_content), mode='r:gz') as tar:
+            assert tar.getnames() == ['main.tf']
+
+        with zipfile.ZipFile(io.BytesIO(zip_content)) as zip_file:
+            assert zip_file.namelist() == ['main.tf']
+
+    def test_symlink_loop(self):
+        """Test symlinks to parent directories are only followed once in zip archives."""
+        with tempfile.TemporaryDirectory() as source_directory:
+            self._write_files(source_directory, {'subdir/main.tf': '# Main'})
+            os.symlink('.', os.path.join(source_directory, 'subdir', 'self-link'))
+            os.symlink('../subdir', os.path.join(source_directory, 'subdir', 'parent-link'))
+            tar_gz_content, zip_content = self._generate(source_directory)
+
+        with tarfile.open(fileobj=io.BytesIO(tar_gz_content), mode='r:gz') as tar:
+            assert tar.getnames() == ['subdir', 'subdir/main.tf', 'subdir/parent-link', 'subdir/self-link']
+
+        with zipfile.ZipFile(io.BytesIO(zip_content)) as zip_file:
+            assert zip_file.namelist() == [
+                'subdir/', 'subdir/main.tf',
+                'subdir/parent-link/', 'subdir/parent-link/main.tf',
+                'subdir/self-link/', 'subdir/self-link/main.tf',
+            ]
+
+    def test_zip_digest(self):
+        """Test checksum and size of zip archive are returned."""
+        with tempfile.TemporaryDirectory() as source_directory:
+            self._write_files(source_directory, self._TEST_FILES)
+            zip_fh = io.BytesIO()
+            digest = ModuleArchiveGenerator(source_directory=source_directory).generate(tar_gz_fh=io.BytesIO(), zip_fh=zip_fh)
+
+        assert digest == {
+            'sha256': hashlib.sha256(zip_fh.getvalue()).hexdigest(),
+            'size': len(zip_fh.getvalue()),
+        }
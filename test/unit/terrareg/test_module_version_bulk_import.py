@@ -0,0 +1,67 @@
+
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest.mock
+
+import pytest
+
+import terrareg.errors
+from terrareg.module_version_bulk_import import ModuleVersionBulkImport
+from test.unit.terrareg import TerraregUnitTest
+
+
+class TestModuleVersionBulkImport(TerraregUnitTest):
+    """Test ModuleVersionBulkImport class."""
+
+    @pytest.fixture
+    def upstream_repository(self):
+        """Create upstream repository with tags."""
+        upstream_directory = tempfile.mkdtemp()
+        try:
+            subprocess.check_call(['git', 'init', '--quiet', upstream_directory])
+            subprocess.check_call(
+                ['git', 'commit', '--quiet', '--allow-empty', '-m', 'Initial commit'],
+                cwd=upstream_directory,
+                env=dict(os.environ,
+                         GIT_AUTHOR_NAME='Terrareg', GIT_AUTHOR_EMAIL='terrareg@localhost',
+                         GIT_COMMITTER_NAME='Terrareg', GIT_COMMITTER_EMAIL='terrareg@localhost')
+            )
+            for tag in ['v1.0.0', 'v1.1.0', 'release/v2.0.0']:
+                subprocess.check_call(['git', 'tag', tag], cwd=upstream_directory)
+            yield upstream_directory
+        finally:
+            shutil.rmtree(upstream_directory)
+
+    def test_get_remote_tags(self, upstream_repository):
+        """Test obtaining tags from upstream repository."""
+        module_provider = unittest.mock.MagicMock()
+        module_provider.get_git_clone_url.return_value = upstream_repository
+
+        bulk_import = ModuleVersionBulkImport(module_provider=module_provider)
+        assert sorted(bulk_import.get_remote_tags()) == ['release/v2.0.0', 'v1.0.0', 'v1.1.0']
+
+    def test_get_remote_tags_error(self):
+        """Test obtaining tags from non-existent repository."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            module_provider = unittest.mock.MagicMock()
+            module_provider.get_git_clone_url.return_value = os.path.join(temp_dir, 'does-not-exist')
+
+            bulk_import = ModuleVersionBulkImport(module_provider=module_provider)
+            with pytest.raises(terrareg.errors.GitCloneError) as exc:
+                bulk_import.get_remote_tags()
+            assert str(exc.value).startswith('Error occurred whilst obtaining git tags: fatal:')
+
+    def test_get_git_mirror_cache_temporary(self):
+        """Test temporary git mirror cache is used, if git mirror cache is not configured."""
+        bulk_import = ModuleVersionBulkImport(module_provider=unittest.mock.MagicMock())
+        with unittest.mock.patch('terrareg.config.Config.GIT_MIRROR_CACHE_DIRECTORY', ''):
+            with bulk_import._get_git_mirror_cache() as git_mirror_cache:
+                temp_directory = git_mirror_cache._directory
+                assert os.path.isdir(temp_directory)
+            assert not os.path.isdir(temp_directory)
+
+        with unittest.mock.patch('terrareg.config.Config.GIT_MIRROR_CACHE_DIRECTORY', '/tmp/git-mirror-cache'):
+            with bulk_import._get_git_mirror_cache() as git_mirror_cache:
+                assert git_mirror_cache._directory == '/tmp/git-mirror-cache'
@@ -1,5 +1,11 @@
 
+import base64
+import collections
 import datetime
+import hashlib
+import hmac
+import re
+import struct
 import unittest.mock
 
 import pytest
@@ -11,6 +17,12 @@ from terrareg.presigned_url import TerraformSourcePresignedUrl
 
 class TestTerraformSourcePresignedUrl:
 
+    @pytest.fixture(autouse=True)
+    def clear_verified_key_cache(self):
+        """Clear cache of verified pre-signed keys between tests"""
+        with unittest.mock.patch.object(TerraformSourcePresignedUrl, '_VERIFIED_KEY_CACHE', collections.OrderedDict()):
+            yield
+
     @pytest.mark.parametrize('now, expiry_config, expected_value', [
         # 10 seconds from now
         (datetime.datetime(2023, 9, 16, 6, 50, 24, 968701), 10, "2023-09-16T06:50:34.968701"),
@@ -49,11 +61,19 @@ class TestTerraformSourcePresignedUrl:
             presign_key = TerraformSourcePresignedUrl.generate_presigned_key('/some-test/path')
 
             assert type(presign_key) == str
+            assert len(presign_key) == 32
+            assert re.match(r'^[A-Za-z0-9_-]+$', presign_key)
+
+            # Decode key
+            key = base64.urlsafe_b64decode(presign_key)
+            assert struct.unpack('>Q', key[:8])[0] == int(now.timestamp()) + 10
+            assert key[8:] == hmac.new(
+                b"unittest-secret-key",
+                hashlib.sha256(b"/some-test/path").digest() + key[:8],
+                hashlib.sha256
+            ).digest()[:16]
 
-            # Decode JWT
-            val = jwt.decode(presign_key, key="unittest-secret-key", algorithms=["HS256"])
-            assert val["expiry"] == "2023-09-15T04:32:30.123456"
-            assert val["url"] == "/some-test/path"
+            TerraformSourcePresignedUrl.validate_presigned_key(url='/some-test/path', payload=presign_key)
 
     def test_validate_presigned_key(self):
         """Test validate_presigned_key with valid token"""
@@ -106,3 +126,103 @@ class TestTerraformSourcePresignedUrl:
 
             with pytest.raises(InvalidPresignedUrlKeyError):
                 TerraformSourcePresignedUrl.validate_presigned_key(url='/some-test/path', payload=val)
+
+    def _generate_presigned_key(self, now, url='/some-test/path', secret="unittest-secret-key"):
+        """Generate compact pre-signed key at time"""
+        with unittest.mock.patch('terrareg.presigned_url.get_datetime_now', unittest.mock.MagicMock(return_value=now)), \
+                unittest.mock.patch('terrareg.config.Config.TERRAFORM_PRESIGNED_URL_EXPIRY_SECONDS', 10), \
+                unittest.mock.patch('terrareg.config.Config.TERRAFORM_PRESIGNED_URL_SECRET', secret):
+            return TerraformSourcePresignedUrl.generate_presigned_key(url)
+
+    @pytest.mark.parametrize('validation_offset, url, secret, expected_valid', [
+        (0, '/some-test/path', "unittest-secret-key", True),
+        (10, '/some-test/path', "unittest-secret-key", True),
+        # Expired
+        (11, '/some-test/path', "unittest-secret-key", False),
+        # Incorrect path
+        (0, '/some-test/another', "unittest-secret-key", False),
+        # Different secret
+        (0, '/some-test/path', "another-key", False),
+    ])
+    def test_validate_compact_presigned_key(self, validation_offset, url, secret, expected_valid):
+        """Test validate_presigned_key with compact pre-signed keys"""
+        now = datetime.datetime(2023, 9, 15, 4, 32, 1)
+        presign_key = self._generate_presigned_key(now=now)
+
+        with unittest.mock.patch('terrareg.presigned_url.get_datetime_now',
+                                 unittest.mock.MagicMock(return_value=now + datetime.timedelta(seconds=validation_offset))), \
+                unittest.mock.patch('terrareg.config.Config.TERRAFORM_PRESIGNED_URL_SECRET', secret):
+            if expected_valid:
+                TerraformSourcePresignedUrl.validate_presigned_key(url=url, payload=presign_key)
+            else:
+                with pytest.raises(InvalidPresignedUrlKeyError):
+                    TerraformSourcePresignedUrl.validate_presigned_key(url=url, payload=presign_key)
+
+    @pytest.mark.parametrize('modify_key', [
+        # Modified expiry
+        lambda key: base64.urlsafe_b64encode(struct.pack('>Q', struct.unpack('>Q', base64.urlsafe_b64decode(key)[:8])[0] + 100) + base64.urlsafe_b64decode(key)[8:]).decode('utf-8'),
+        # Modified signature
+        lambda key: key[:-2] + ('AA' if key[-2:] != 'AA' else 'BB'),
+        # Truncated
+        lambda key: key[:-4],
+        # Invalid base64
+        lambda key: '!' * 32,
+        lambda key: 'a',
+        lambda key: '',
+        lambda key: None,
+    ])
+    def test_validate_compact_presigned_key_invalid(self, modify_key):
+        """Test validate_presigned_key with modified compact pre-signed keys"""
+        now = datetime.datetime(2023, 9, 15, 4, 32, 1)
+        presign_key = modify_key(self._generate_presigned_key(now=now))
+
+        with unittest.mock.patch('terrareg.presigned_url.get_datetime_now', unittest.mock.MagicMock(return_value=now)), \
+                unittest.mock.patch('terrareg.config.Config.TERRAFORM_PRESIGNED_URL_SECRET', "unittest-secret-key"):
+            with pytest.raises(InvalidPresignedUrlKeyError):
+                TerraformSourcePresignedUrl.validate_presigned_key(url='/some-test/path', payload=presign_key)
+
+    def test_validate_presigned_key_cached(self):
+        """Test verified pre-signed keys are not re-verified until they expire"""
+        now = datetime.datetime(2023, 9, 15, 4, 32, 1)
+        presign_key = self._generate_presigned_key(now=now)
+        mock_get_datetime_now = unittest.mock.MagicMock(return_value=now)
+
+        with unittest.mock.patch('terrareg.presigned_url.get_datetime_now', mock_get_datetime_now), \
+                unittest.mock.patch('terrareg.config.Config.TERRAFORM_PRESIGNED_URL_SECRET', "unittest-secret-key"), \
+                unittest.mock.patch.object(TerraformSourcePresignedUrl, '_validate_compact_presigned_key',
+                                           unittest.mock.MagicMock(wraps=TerraformSourcePresignedUrl._validate_compact_presigned_key)) as mock_validate:
+            for _ in range(3):
+                TerraformSourcePresignedUrl.validate_presigned_key(url='/some-test/path', payload=presign_key)
+            assert mock_validate.call_count == 1
+
+            # Ensure cached key is not used for a different URL
+            with pytest.raises(InvalidPresignedUrlKeyError):
+                TerraformSourcePresignedUrl.validate_presigned_key(url='/some-test/another', payload=presign_key)
+            assert mock_validate.call_count == 2
+
+            # Ensure cached key is not used once it has expired
+            mock_get_datetime_now.return_value = now + datetime.timedelta(seconds=11)
+            with pytest.raises(InvalidPresignedUrlKeyError):
+                TerraformSourcePresignedUrl.validate_presigned_key(url='/some-test/path', payload=presign_key)
+            assert mock_validate.call_count == 3
+
+        # Ensure cached key is not used when secret is changed
+        with unittest.mock.patch('terrareg.presigned_url.get_datetime_now', unittest.mock.MagicMock(return_value=now)), \
+                unittest.mock.patch('terrareg.config.Config.TERRAFORM_PRESIGNED_URL_SECRET', "another-key"):
+            with pytest.raises(InvalidPresignedUrlKeyError):
+                TerraformSourcePresignedUrl.validate_presigned_key(url='/some-test/path', payload=presign_key)
+
+    def test_verified_key_cache_size(self):
+        """Test least recently used keys are removed from verified key cache"""
+        now = datetime.datetime(2023, 9, 15, 4, 32, 1)
+        presign_keys = [self._generate_presigned_key(now=now, url=f'/some-test/path-{i}') for i in range(3)]
+
+        with unittest.mock.patch('terrareg.presigned_url.get_datetime_now', unittest.mock.MagicMock(return_value=now)), \
+                unittest.mock.patch('terrareg.config.Config.TERRAFORM_PRESIGNED_URL_SECRET', "unittest-secret-key"), \
+                unittest.mock.patch.object(TerraformSourcePresignedUrl, 'VERIFIED_KEY_CACHE_SIZE', 2):
+            for i, presign_key in enumerate(presign_keys):
+                TerraformSourcePresignedUrl.validate_presigned_key(url=f'/some-test/path-{i}', payload=presign_key)
+
+            assert [cache_key[1] for cache_key in TerraformSourcePresignedUrl._VERIFIED_KEY_CACHE] == [
+                '/some-test/path-1', '/some-test/path-2'
+            ]
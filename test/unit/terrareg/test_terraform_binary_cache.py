@@ -0,0 +1,176 @@
+
+import os
+import subprocess
+import tempfile
+import unittest.mock
+
+import pytest
+
+from terrareg.errors import TerraformVersionSwitchError, UnableToGetGlobalTerraformLockError
+from terrareg.terraform_binary_cache import TerraformBinaryCache
+from test.unit.terrareg import TerraregUnitTest
+import terrareg.config
+
+
+class TestTerraformBinaryCache(TerraregUnitTest):
+    """Test TerraformBinaryCache class."""
+
+    @pytest.mark.parametrize('product, expected_product_dir, expected_executable', [
+        ('terraform', 'terraform', 'terraform'),
+        ('opentofu', 'opentofu', 'tofu'),
+    ])
+    def test_get_binary_path(self, product, expected_product_dir, expected_executable):
+        """Test path of binary for version."""
+        with unittest.mock.patch('terrareg.config.Config.TERRAFORM_BINARY_CACHE_DIRECTORY', '/tmp/unittest-binaries'), \
+                unittest.mock.patch('terrareg.config.Config.PRODUCT', terrareg.config.Product(product)):
+            assert TerraformBinaryCache.get_binary_path('1.5.7') == f'/tmp/unittest-binaries/{expected_product_dir}/1.5.7/{expected_executable}'
+
+    @pytest.mark.parametrize('output, expected_version', [
+        (b'{"terraform_version": "1.5.7", "platform": "linux_amd64"}', '1.5.7'),
+        (b'{"terraform_version": "1.6.0-beta1", "platform": "linux_amd64"}', '1.6.0-beta1'),
+    ])
+    def test_get_binary_version(self, output, expected_version):
+        """Test obtaining version from JSON version output of binary."""
+        mock_check_output = unittest.mock.MagicMock(return_value=output)
+        with unittest.mock.patch('terrareg.terraform_binary_cache.subprocess.check_output', mock_check_output):
+            assert TerraformBinaryCache.get_binary_version('/tmp/mock-bin/terraform') == expected_version
+
+        mock_check_output.assert_called_once_with(['/tmp/mock-bin/terraform', '-version', '-json'])
+
+    @pytest.mark.parametrize('output', [
+        b'Terraform v1.5.7',
+        b'{}',
+        b'[]',
+        b'{"terraform_version": "../1.5.7"}',
+    ])
+    def test_get_binary_version_invalid(self, output):
+        """Test obtaining version from binary with invalid version output."""
+        with unittest.mock.patch('terrareg.terraform_binary_cache.subprocess.check_output', unittest.mock.MagicMock(return_value=output)):
+            with pytest.raises(TerraformVersionSwitchError):
+                TerraformBinaryCache.get_binary_version('/tmp/mock-bin/terraform')
+
+    @pytest.mark.parametrize('output, expected_version', [
+        ('Would have attempted to install version "1.5.7"\n', '1.5.7'),
+        ('[DRY-RUN] Would have attempted to install version "1.6.0-beta1"', '1.6.0-beta1'),
+    ])
+    def test_get_required_version(self, output, expected_version):
+        """Test resolving version required by module using tfswitch dry-run."""
+        mock_run_tfswitch = unittest.mock.MagicMock(return_value=output)
+        with unittest.mock.patch('terrareg.config.Config.TERRAFORM_ARCHIVE_MIRROR', 'https://example.com/mirror'), \
+                unittest.mock.patch('terrareg.terraform_binary_cache.TerraformBinaryCache._run_tfswitch', mock_run_tfswitch):
+            assert TerraformBinaryCache.get_required_version('/tmp/mock-module') == expected_version
+
+        mock_run_tfswitch.assert_called_once_with(
+            ['--dry-run', '--mirror', 'https://example.com/mirror'],
+            cwd='/tmp/mock-module'
+        )
+
+    @pytest.mark.parametrize('output', [
+        '',
+        'Unknown output',
+        'Would have attempted to install version "../1.5.7"',
+    ])
+    def test_get_required_version_invalid(self, output):
+        """Test resolving version required by module with invalid tfswitch output."""
+        with unittest.mock.patch('terrareg.terraform_binary_cache.TerraformBinaryCache._run_tfswitch', unittest.mock.MagicMock(return_value=output)):
+            with pytest.raises(TerraformVersionSwitchError):
+                TerraformBinaryCache.get_required_version('/tmp/mock-module')
+
+    def test_get_binary_for_module_already_installed(self):
+        """Test obtaining binary for module when required version is already present in cache."""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            mock_run_tfswitch = unittest.mock.MagicMock()
+            mock_get_version_lock = unittest.mock.MagicMock()
+            with unittest.mock.patch('terrareg.config.Config.TERRAFORM_BINARY_CACHE_DIRECTORY', cache_dir), \
+                    unittest.mock.patch('terrareg.terraform_binary_cache.TerraformBinaryCache.get_required_version', unittest.mock.MagicMock(return_value='1.5.7')), \
+                    unittest.mock.patch('terrareg.terraform_binary_cache.TerraformBinaryCache._run_tfswitch', mock_run_tfswitch), \
+                    unittest.mock.patch('terrareg.terraform_binary_cache.TerraformBinaryCache._get_version_lock', mock_get_version_lock):
+                binary_path = TerraformBinaryCache.get_binary_path('1.5.7')
+                os.makedirs(os.path.dirname(binary_path))
+                with open(binary_path, 'w') as fh:
+                    fh.write('existing')
+
+                assert TerraformBinaryCache.get_binary_for_module('/tmp/mock-module') == binary_path
+
+            with open(binary_path, 'r') as fh:
+                assert fh.read() == 'existing'
+
+            # Ensure neither tfswitch was run nor any lock obtained
+            mock_run_tfswitch.assert_not_called()
+            mock_get_version_lock.assert_not_called()
+
+    def test_get_binary_for_module(self):
+        """Test installing version required by module using tfswitch."""
+        def run_tfswitch(args, cwd=None):
+            # Create binary at path passed to --bin
+            with open(args[args.index('--bin') + 1], 'w'):
+                pass
+            return ''
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            mock_run_tfswitch = unittest.mock.MagicMock(side_effect=run_tfswitch)
+            mock_get_binary_version = unittest.mock.MagicMock(return_value='1.5.7')
+            with unittest.mock.patch('terrareg.config.Config.TERRAFORM_BINARY_CACHE_DIRECTORY', cache_dir), \
+                    unittest.mock.patch('terrareg.config.Config.TERRAFORM_ARCHIVE_MIRROR', 'https://example.com/mirror'), \
+                    unittest.mock.patch('terrareg.terraform_binary_cache.TerraformBinaryCache.get_required_version', unittest.mock.MagicMock(return_value='1.5.7')), \
+                    unittest.mock.patch('terrareg.terraform_binary_cache.TerraformBinaryCache._run_tfswitch', mock_run_tfswitch), \
+                    unittest.mock.patch('terrareg.terraform_binary_cache.TerraformBinaryCache.get_binary_version', mock_get_binary_version):
+                binary_path = TerraformBinaryCache.get_binary_for_module('/tmp/mock-module')
+
+            assert binary_path == os.path.join(cache_dir, 'terraform', '1.5.7', 'terraform')
+            assert os.path.isfile(binary_path)
+            # Ensure temporary install directory has been removed
+            assert os.listdir(cache_dir) == ['terraform']
+
+            mock_run_tfswitch.assert_called_once()
+            args = mock_run_tfswitch.call_args.args[0]
+            assert args[0] == '--bin'
+            temporary_binary_path = args[1]
+            assert args[2:4] == ['--install', os.path.dirname(temporary_binary_path)]
+            assert os.path.dirname(os.path.dirname(temporary_binary_path)) == cache_dir
+            assert args[4:] == ['--mirror', 'https://example.com/mirror', '1.5.7']
+            mock_get_binary_version.assert_called_once_with(temporary_binary_path)
+
+    def test_get_binary_for_module_version_mismatch(self):
+        """Test installing version required by module when installed binary reports a different version."""
+        def run_tfswitch(args, cwd=None):
+            with open(args[args.index('--bin') + 1], 'w'):
+                pass
+            return ''
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with unittest.mock.patch('terrareg.config.Config.TERRAFORM_BINARY_CACHE_DIRECTORY', cache_dir), \
+                    unittest.mock.patch('terrareg.terraform_binary_cache.TerraformBinaryCache.get_required_version', unittest.mock.MagicMock(return_value='1.5.7')), \
+                    unittest.mock.patch('terrareg.terraform_binary_cache.TerraformBinaryCache._run_tfswitch', unittest.mock.MagicMock(side_effect=run_tfswitch)), \
+                    unittest.mock.patch('terrareg.terraform_binary_cache.TerraformBinaryCache.get_binary_version', unittest.mock.MagicMock(return_value='1.6.0')):
+                with pytest.raises(TerraformVersionSwitchError):
+                    TerraformBinaryCache.get_binary_for_module('/tmp/mock-module')
+
+                assert not os.path.exists(TerraformBinaryCache.get_binary_path('1.5.7'))
+
+    def test_get_binary_for_module_lock_timeout(self):
+        """Test installing version required by module whilst lock for version is held."""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            mock_run_tfswitch = unittest.mock.MagicMock()
+            with unittest.mock.patch('terrareg.config.Config.TERRAFORM_BINARY_CACHE_DIRECTORY', cache_dir), \
+                    unittest.mock.patch('terrareg.terraform_binary_cache.TerraformBinaryCache.INSTALL_LOCK_TIMEOUT', 0.1), \
+                    unittest.mock.patch('terrareg.terraform_binary_cache.TerraformBinaryCache.get_required_version', unittest.mock.MagicMock(return_value='1.5.7')), \
+                    unittest.mock.patch('terrareg.terraform_binary_cache.TerraformBinaryCache._run_tfswitch', mock_run_tfswitch):
+                version_lock = TerraformBinaryCache._get_version_lock('terraform', '1.5.7')
+                version_lock.acquire()
+                try:
+                    with pytest.raises(UnableToGetGlobalTerraformLockError):
+                        TerraformBinaryCache.get_binary_for_module('/tmp/mock-module')
+                finally:
+                    version_lock.release()
+
+            mock_run_tfswitch.assert_not_called()
+
+    def test_run_tfswitch_error(self):
+        """Test error whilst running tfswitch."""
+        def raise_error(*args, **kwargs):
+            raise subprocess.CalledProcessError(cmd='tfswitch', returncode=1, output=b'Unittest error')
+
+        with unittest.mock.patch('terrareg.terraform_binary_cache.subprocess.check_output', unittest.mock.MagicMock(side_effect=raise_error)):
+            with pytest.raises(TerraformVersionSwitchError):
+                TerraformBinaryCache._run_tfswitch(['1.5.7'])
@@ -0,0 +1,61 @@
+
+import hashlib
+import os
+import tempfile
+
+import pytest
+
+from terrareg.upload_stream import UploadStream
+import terrareg.errors
+from test.unit.terrareg import TerraregUnitTest
+
+
+class TestUploadStream(TerraregUnitTest):
+    """Test UploadStream class."""
+
+    def test_write(self):
+        """Test writing content, calculating checksum, size and header"""
+        content = os.urandom(UploadStream.HEADER_SIZE * 3)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'upload')
+            with UploadStream(path=path) as upload_stream:
+                for itx in range(0, len(content), 1000):
+                    upload_stream.write(content[itx:itx + 1000])
+
+                # Ensure content can be read back
+                upload_stream.seek(0)
+                assert upload_stream.read() == content
+
+            assert upload_stream.path == path
+            assert upload_stream.size == len(content)
+            assert upload_stream.sha256 == hashlib.sha256(content).hexdigest()
+            assert upload_stream.header == content[:UploadStream.HEADER_SIZE]
+            with open(path, 'rb') as fh:
+                assert fh.read() == content
+
+    def test_write_small_file(self):
+        """Test header of file smaller than header size"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with UploadStream(path=os.path.join(temp_dir, 'upload')) as upload_stream:
+                upload_stream.write(b'PK\x03\x04')
+                upload_stream.write(b'')
+                upload_stream.write(b'test')
+
+            assert upload_stream.header == b'PK\x03\x04test'
+            assert upload_stream.size == 8
+
+    @pytest.mark.parametrize('max_size, content_size, should_raise', [
+        (None, 1024, False),
+        (1024, 1024, False),
+        (1024, 1025, True),
+    ])
+    def test_max_size(self, max_size, content_size, should_raise):
+        """Test maximum size of upload"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with UploadStream(path=os.path.join(temp_dir, 'upload'), max_size=max_size) as upload_stream:
+                upload_stream.write(b'a' * 1000)
+                if should_raise:
+                    with pytest.raises(terrareg.errors.UploadTooLargeError):
+                        upload_stream.write(b'a' * (content_size - 1000))
+                else:
+                    upload_stream.write(b'a' * (content_size - 1000))